@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Compare build modes of cimgui_complete (per-file, unity, dist)
+Usage:
+  ./bench/compare_builds.py <SDL2_PREFIX>                        # Compare every mode
+  ./bench/compare_builds.py <SDL2_PREFIX> --modes release,dist   # Before/after for the dist profile
+  ./bench/compare_builds.py <SDL2_PREFIX> -j 8 --frames 5000
+
+For each mode this measures the wall time of a clean build and of a no-op
+rebuild with build_imgui.py, the library size, its number of exported
+dynamic symbols and its dlopen time, then runs the headless frame workload
+in bench/imgui_frames.c against the resulting library. The first mode is
+the baseline for the change column.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import shutil
+from pathlib import Path
+
+from imgui_bench import compile_workload, library_env, run_workload
+
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == "Windows"
+IS_MACOS = SYSTEM == "Darwin"
+
+SOURCE_DIR = Path(__file__).resolve().parent.parent
+WORK_DIR = SOURCE_DIR / "build" / "bench" / "compare-builds"
+
+LIB_EXT = ".dll" if IS_WINDOWS else ".dylib" if IS_MACOS else ".so"
+
+MODES = {
+    "release": [],
+    "unity": ["--unity"],
+    "dist": ["--config", "dist"],
+}
+
+# Loads the library in a fresh interpreter and prints the dlopen time in us
+DLOPEN_PROBE = """
+import ctypes, sys, time
+start = time.perf_counter()
+ctypes.CDLL(sys.argv[1])
+print((time.perf_counter() - start) * 1e6)
+"""
+
+def print_step(msg):
+    print(f"\n==> {msg}")
+
+def print_error(msg):
+    print(f"[ERROR] {msg}")
+
+def run_build(sdl2_prefix, install_dir, build_dir, jobs, extra_args):
+    """Run build_imgui.py and return its wall time in seconds, or None on failure"""
+    cmd = [sys.executable, str(SOURCE_DIR / "build_imgui.py"), str(sdl2_prefix), str(install_dir),
+           "--build-dir", str(build_dir), "-j", str(jobs)] + extra_args
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout)
+        print(result.stderr)
+        return None
+    return elapsed
+
+def count_exported_symbols(lib):
+    """Number of symbols in the library's dynamic export table, or None if unknown"""
+    if IS_WINDOWS:
+        cmd = ["dumpbin", "/nologo", "/exports", str(lib)]
+        pattern = lambda line: len(line.split()) >= 4 and line.split()[0].isdigit()
+    else:
+        cmd = ["nm", "-gU", str(lib)] if IS_MACOS else ["nm", "-D", "--defined-only", str(lib)]
+        pattern = lambda line: bool(line.strip())
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return None
+    return sum(1 for line in result.stdout.splitlines() if pattern(line))
+
+def measure_dlopen(lib, install_dir, sdl2_prefix, runs):
+    """Best-of-N dlopen time in microseconds, each run in a fresh process"""
+    env = library_env(install_dir, sdl2_prefix)
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", DLOPEN_PROBE, str(lib)],
+                                capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            print(result.stderr)
+            return None
+        times.append(float(result.stdout.strip()))
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cimgui_complete build modes")
+    parser.add_argument("sdl2_prefix", type=Path, help="SDL2 install prefix passed to build_imgui.py")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Parallel compile jobs for both builds (default: CPU count)")
+    parser.add_argument("--frames", type=int, default=2000, help="Frames per workload run")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Workload and dlopen runs per mode (best is reported)")
+    parser.add_argument("--modes", default=",".join(MODES),
+                        help=f"Comma-separated modes to compare, baseline first (default: {','.join(MODES)})")
+    args = parser.parse_args()
+    sdl2_prefix = args.sdl2_prefix.resolve()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown or len(modes) < 2:
+        parser.error(f"--modes needs at least two of: {', '.join(MODES)}")
+
+    results = {}
+    for mode in modes:
+        extra_args = MODES[mode]
+        print_step(f"Benchmarking {mode} build...")
+        build_dir = WORK_DIR / mode / "build"
+        install_dir = WORK_DIR / mode / "install"
+        if build_dir.exists():
+            shutil.rmtree(build_dir)
+
+        clean = run_build(sdl2_prefix, install_dir, build_dir, args.jobs, extra_args)
+        if clean is None:
+            print_error(f"{mode} build failed")
+            return 1
+        print(f"  Clean build: {clean:.2f}s")
+
+        noop = run_build(sdl2_prefix, install_dir, build_dir, args.jobs, extra_args)
+        if noop is None:
+            print_error(f"{mode} rebuild failed")
+            return 1
+        print(f"  No-op rebuild: {noop:.2f}s")
+
+        exe = WORK_DIR / mode / ("imgui_frames.exe" if IS_WINDOWS else "imgui_frames")
+        if not compile_workload(install_dir, sdl2_prefix, exe):
+            print_error(f"Failed to compile the frame workload for {mode}")
+            return 1
+
+        runs = []
+        for _ in range(args.runs):
+            result = run_workload(exe, install_dir, sdl2_prefix, args.frames)
+            if result is None:
+                print_error(f"Frame workload failed for {mode}")
+                return 1
+            runs.append(result["us_per_frame"])
+        print(f"  Frame time: best {min(runs):.2f} us, worst {max(runs):.2f} us")
+
+        lib = install_dir / ("bin" if IS_WINDOWS else "lib") / f"cimgui_complete{LIB_EXT}"
+        results[mode] = {
+            "clean_build_s": clean,
+            "noop_build_s": noop,
+            "us_per_frame": min(runs),
+            "library_bytes": lib.stat().st_size,
+            "exported_symbols": count_exported_symbols(lib),
+            "dlopen_us": measure_dlopen(lib, install_dir, sdl2_prefix, args.runs),
+        }
+        print(f"  Library: {results[mode]['library_bytes']} bytes, "
+              f"{results[mode]['exported_symbols']} exported symbols, "
+              f"dlopen {results[mode]['dlopen_us']} us")
+
+    base = results[modes[0]]
+    width = 18 + 14 * len(modes)
+    print(f"\n{'=' * width}")
+    header = "".join(f"{mode:>14}" for mode in modes)
+    print(f"   {'':<18}{header}")
+    for key, label in [("clean_build_s", "Clean build (s)"),
+                       ("noop_build_s", "No-op build (s)"),
+                       ("us_per_frame", "Frame (us)"),
+                       ("library_bytes", "Library (bytes)"),
+                       ("exported_symbols", "Dynamic symbols"),
+                       ("dlopen_us", "dlopen (us)")]:
+        row = ""
+        for mode in modes:
+            value = results[mode][key]
+            if value is None:
+                row += f"{'n/a':>14}"
+            elif mode == modes[0] or not base[key]:
+                row += f"{value:>14.2f}"
+            else:
+                change = (value - base[key]) / base[key] * 100
+                row += f"{value:>7.0f} {change:>+5.0f}%" if value >= 1000 else f"{value:>7.2f} {change:>+5.0f}%"
+        print(f"   {label:<18}{row}")
+    print(f"{'=' * width}")
+    print(f"   jobs={args.jobs} frames={args.frames} runs={args.runs}")
+
+    (WORK_DIR / "results.json").write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {WORK_DIR / 'results.json'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
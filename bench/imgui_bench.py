@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Headless frame-time benchmark for an installed cimgui_complete
+Usage:
+  ./bench/imgui_bench.py run <INSTALL_PREFIX> -o before.json           # Benchmark one build
+  ./bench/imgui_bench.py run <INSTALL_PREFIX> --scenes table,text --frames 5000
+  ./bench/imgui_bench.py compare before.json after.json                 # Per-scene changes
+  ./bench/imgui_bench.py render <INSTALL_PREFIX> --scenes lines,table   # OpenGL render paths on llvmpipe
+
+'run' compiles bench/imgui_frames.c against the library in INSTALL_PREFIX
+(as installed by build_imgui.py in CI mode), runs every scene --runs times
+and keeps the run with the lowest median frame time per scene. Scenes:
+demo, windows (64 small windows), table (1000x6), text (64 KB wrapped and
+multiline text), plots (32 plots of 1000 samples plus polylines) and lines
+(25 thick polylines of 1000 points).
+
+'render' compiles bench/imgui_render.c, which draws the same scenes with
+OpenGL in a hidden SDL2 window, and compares the backend's renderer with the
+streaming render path (mapped and persistent, each also without the GL
+state backup/restore). It runs on Mesa's llvmpipe without a display by
+default; --hardware keeps the system's GL driver, --glthread turns on Mesa's
+threaded GL dispatch, where state queries are most expensive.
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == "Windows"
+IS_MACOS = SYSTEM == "Darwin"
+
+SOURCE_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = SOURCE_DIR / "bench"
+WORK_DIR = SOURCE_DIR / "build" / "bench" / "imgui"
+
+LIB_EXT = ".dll" if IS_WINDOWS else ".dylib" if IS_MACOS else ".so"
+
+SCENES = ["demo", "windows", "table", "text", "plots", "lines"]
+RENDER_MODES = ["backend", "mapped", "persistent", "mapped-nostate", "persistent-nostate"]
+
+# Environment for rendering headless through Mesa's software rasterizer
+LLVMPIPE_ENV = {
+    "SDL_VIDEODRIVER": "offscreen",
+    "LIBGL_ALWAYS_SOFTWARE": "1",
+    "GALLIUM_DRIVER": "llvmpipe",
+    "EGL_PLATFORM": "surfaceless",
+}
+
+# Rows of the per-scene comparison table: (result key, label)
+METRICS = [
+    ("us_median", "median us/frame"),
+    ("us_p95", "p95 us/frame"),
+    ("vertices", "vertices"),
+    ("indices", "indices"),
+    ("draw_cmds", "draw commands"),
+    ("allocs_per_frame", "allocs/frame"),
+    ("alloc_bytes_per_frame", "alloc bytes/frame"),
+]
+
+def print_step(msg):
+    print(f"\n==> {msg}")
+
+def print_error(msg):
+    print(f"[ERROR] {msg}")
+
+def compile_workload(install_dir, sdl2_prefix, exe, source="imgui_frames.c", link_sdl2=False):
+    """Compile a benchmark in bench/ against an installed cimgui_complete"""
+    source = BENCH_DIR / source
+    inc_dir = install_dir / "include" / "cimgui"
+    exe.parent.mkdir(parents=True, exist_ok=True)
+    if IS_WINDOWS:
+        cmd = ["cl.exe", "/nologo", "/O2", str(source), f"/I{inc_dir}", f"/Fe{exe}",
+               str(install_dir / "lib" / "cimgui_complete.lib")]
+        if link_sdl2:
+            cmd[4:4] = [f"/I{sdl2_prefix}/include/SDL2"]
+            cmd.append(f"{sdl2_prefix}/lib/SDL2.lib")
+    else:
+        cc = os.environ.get("CC", "clang" if IS_MACOS else "gcc")
+        lib = install_dir / "lib" / f"cimgui_complete{LIB_EXT}"
+        cmd = [cc, "-O2", str(source), f"-I{inc_dir}", str(lib), "-o", str(exe),
+               f"-Wl,-rpath,{lib.parent}", "-lm"]
+        if link_sdl2:
+            cmd[3:3] = [f"-I{sdl2_prefix}/include/SDL2"]
+            cmd += [f"-L{sdl2_prefix}/lib", "-lSDL2", f"-Wl,-rpath,{sdl2_prefix}/lib"]
+        if not IS_MACOS:
+            # cimgui_complete depends on SDL2; let the linker find it
+            cmd.append(f"-Wl,-rpath-link,{sdl2_prefix}/lib")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(result.stderr)
+        return False
+    return True
+
+def library_env(install_dir, sdl2_prefix):
+    """Environment that lets the loader find cimgui_complete and SDL2"""
+    env = os.environ.copy()
+    lib_dirs = [str(install_dir / "lib"), str(install_dir / "bin"), f"{sdl2_prefix}/lib", f"{sdl2_prefix}/bin"]
+    var = "PATH" if IS_WINDOWS else "DYLD_LIBRARY_PATH" if IS_MACOS else "LD_LIBRARY_PATH"
+    env[var] = os.pathsep.join(lib_dirs + [env.get(var, "")])
+    return env
+
+def run_workload(exe, install_dir, sdl2_prefix, frames, scenes=None, extra_args=(), extra_env=None):
+    """Run a benchmark executable once and return its JSON result"""
+    env = library_env(install_dir, sdl2_prefix)
+    env.update(extra_env or {})
+    cmd = [str(exe), str(frames), *extra_args]
+    if scenes:
+        cmd += ["--scenes", ",".join(scenes)]
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        print(result.stdout)
+        print(result.stderr)
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def best_of(runs):
+    """Merge several workload results, keeping each scene's fastest run"""
+    best = dict(runs[0])
+    best["scenes"] = {}
+    for name in runs[0]["scenes"]:
+        best["scenes"][name] = min((run["scenes"][name] for run in runs), key=lambda s: s["us_median"])
+    best["runs"] = len(runs)
+    return best
+
+def parse_list(value, available, what):
+    """Split a comma-separated --scenes/--modes value; None selects everything"""
+    items = [s.strip() for s in value.split(",") if s.strip()] if value else None
+    unknown = [s for s in items or [] if s not in available]
+    if unknown:
+        print_error(f"Unknown {what}: {', '.join(unknown)} (available: {', '.join(available)})")
+        raise SystemExit(1)
+    return items
+
+def run(args):
+    install_dir = args.install_prefix.resolve()
+    sdl2_prefix = (args.sdl2_prefix or args.install_prefix).resolve()
+    scenes = parse_list(args.scenes, SCENES, "scenes")
+
+    print_step(f"Compiling benchmark against {install_dir}")
+    exe = WORK_DIR / ("imgui_frames.exe" if IS_WINDOWS else "imgui_frames")
+    if not compile_workload(install_dir, sdl2_prefix, exe):
+        print_error("Failed to compile bench/imgui_frames.c")
+        return 1
+
+    print_step(f"Running {args.runs} x {args.frames} frames per scene")
+    runs = []
+    for i in range(args.runs):
+        result = run_workload(exe, install_dir, sdl2_prefix, args.frames, scenes)
+        if result is None:
+            print_error("Benchmark failed")
+            return 1
+        runs.append(result)
+        print(f"  run {i + 1}: {result['us_per_frame']:.2f} us/frame over all scenes")
+
+    result = best_of(runs)
+    lib = install_dir / ("bin" if IS_WINDOWS else "lib") / f"cimgui_complete{LIB_EXT}"
+    result["library"] = str(lib)
+    result["library_bytes"] = lib.stat().st_size if lib.exists() else None
+
+    print(f"\n  {'scene':<10}{'median us':>12}{'p95 us':>12}{'vertices':>10}{'allocs/frame':>14}")
+    for name, scene in result["scenes"].items():
+        print(f"  {name:<10}{scene['us_median']:>12.2f}{scene['us_p95']:>12.2f}"
+              f"{scene['vertices']:>10}{scene['allocs_per_frame']:>14.2f}")
+
+    output = args.output or WORK_DIR / "results.json"
+    Path(output).write_text(json.dumps(result, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+    return 0
+
+def render(args):
+    install_dir = args.install_prefix.resolve()
+    sdl2_prefix = (args.sdl2_prefix or args.install_prefix).resolve()
+    scenes = parse_list(args.scenes, SCENES, "scenes")
+    modes = parse_list(args.modes, RENDER_MODES, "modes")
+
+    print_step(f"Compiling render benchmark against {install_dir}")
+    exe = WORK_DIR / ("imgui_render.exe" if IS_WINDOWS else "imgui_render")
+    if not compile_workload(install_dir, sdl2_prefix, exe, "imgui_render.c", link_sdl2=True):
+        print_error("Failed to compile bench/imgui_render.c")
+        return 1
+
+    extra_args = ["--modes", ",".join(modes)] if modes else []
+    extra_env = {} if args.hardware else dict(LLVMPIPE_ENV)
+    if args.glthread:
+        extra_env["mesa_glthread"] = "true"
+    print_step(f"Rendering {args.frames} frames per scene and mode")
+    result = run_workload(exe, install_dir, sdl2_prefix, args.frames, scenes, extra_args, extra_env)
+    if result is None:
+        print_error("Render benchmark failed")
+        return 1
+    print(f"  {result['renderer']} / {result['gl_version']}")
+
+    print(f"\n  {'scene':<10}{'mode':<20}{'vertices':>10}{'submit us':>12}{'median us':>12}{'p95 us':>12}"
+          f"{'submit vs':>12}{'median vs':>12}")
+    for name, scene in result["scenes"].items():
+        backend = scene.get("backend")
+        for mode, r in scene.items():
+            submit_change = median_change = ""
+            if backend and mode != "backend":
+                submit_change = f"{(r['us_submit_median'] - backend['us_submit_median']) / backend['us_submit_median'] * 100:+.1f}%"
+                median_change = f"{(r['us_median'] - backend['us_median']) / backend['us_median'] * 100:+.1f}%"
+            print(f"  {name:<10}{mode:<20}{r['vertices']:>10}{r['us_submit_median']:>12.1f}"
+                  f"{r['us_median']:>12.1f}{r['us_p95']:>12.1f}{submit_change:>12}{median_change:>12}")
+
+    output = args.output or WORK_DIR / "render.json"
+    Path(output).write_text(json.dumps(result, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+    return 0
+
+def compare(args):
+    base = json.loads(Path(args.base).read_text())
+    other = json.loads(Path(args.other).read_text())
+    print(f"   base:  {args.base} (ImGui {base.get('imgui_version')}, {base.get('library_bytes')} bytes)")
+    print(f"   other: {args.other} (ImGui {other.get('imgui_version')}, {other.get('library_bytes')} bytes)")
+
+    for name, base_scene in base["scenes"].items():
+        other_scene = other["scenes"].get(name)
+        if other_scene is None:
+            print(f"\n   {name}: not in {args.other}")
+            continue
+        print(f"\n   {name}")
+        for key, label in METRICS:
+            a, b = base_scene[key], other_scene[key]
+            change = f"{(b - a) / a * 100:+7.1f}%" if a else "       "
+            print(f"     {label:<20}{a:>14.2f}{b:>14.2f}  {change}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmark for cimgui_complete")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Benchmark an installed cimgui_complete")
+    run_parser.add_argument("install_prefix", type=Path, help="Install prefix with lib/ and include/cimgui/")
+    run_parser.add_argument("--sdl2-prefix", type=Path, help="SDL2 install prefix (default: INSTALL_PREFIX)")
+    run_parser.add_argument("--frames", type=int, default=1000, help="Measured frames per scene")
+    run_parser.add_argument("--runs", type=int, default=3, help="Runs per scene (best median is kept)")
+    run_parser.add_argument("--scenes", help=f"Comma-separated subset of {','.join(SCENES)}")
+    run_parser.add_argument("-o", "--output", type=Path,
+                            help="JSON results file (default: build/bench/imgui/results.json)")
+
+    compare_parser = sub.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("base", help="Baseline results JSON")
+    compare_parser.add_argument("other", help="Results JSON to compare against the baseline")
+
+    render_parser = sub.add_parser("render", help="Compare the OpenGL render paths of an installed cimgui_complete")
+    render_parser.add_argument("install_prefix", type=Path, help="Install prefix with lib/ and include/cimgui/")
+    render_parser.add_argument("--sdl2-prefix", type=Path, help="SDL2 install prefix (default: INSTALL_PREFIX)")
+    render_parser.add_argument("--frames", type=int, default=300, help="Measured frames per scene and mode")
+    render_parser.add_argument("--scenes", help=f"Comma-separated subset of {','.join(SCENES)}")
+    render_parser.add_argument("--modes", help=f"Comma-separated subset of {','.join(RENDER_MODES)}")
+    render_parser.add_argument("--hardware", action="store_true",
+                               help="Use the system's GL driver and video backend instead of headless llvmpipe")
+    render_parser.add_argument("--glthread", action="store_true",
+                               help="Enable Mesa's threaded GL dispatch (mesa_glthread=true)")
+    render_parser.add_argument("-o", "--output", type=Path,
+                               help="JSON results file (default: build/bench/imgui/render.json)")
+
+    args = parser.parse_args()
+    commands = {"run": run, "compare": compare, "render": render}
+    return commands[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
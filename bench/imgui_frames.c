@@ -0,0 +1,193 @@
+// Headless Dear ImGui frame benchmark for cimgui_complete
+//
+// Creates an ImGui context without a GPU (null renderer, fixed display size)
+// and times igNewFrame()/igRender() over scripted scenes. Each scene runs in
+// a fresh context with the same scripted mouse input; allocations made
+// through ImGui's allocator are counted over the measured frames. Prints one
+// JSON object.
+//
+// Usage: imgui_frames [frames] [--warmup N] [--scenes demo,windows,...]
+#include "imgui_scenes.h"
+
+#include <stdint.h>
+#include <stdlib.h>
+
+#ifdef _WIN32
+#include <windows.h>
+static double now_us(void) {
+    LARGE_INTEGER freq, counter;
+    QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart * 1e6 / (double)freq.QuadPart;
+}
+#else
+#include <time.h>
+static double now_us(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec * 1e6 + (double)ts.tv_nsec / 1e3;
+}
+#endif
+
+// Allocation counters, fed by the allocator hooks below
+static long alloc_count;
+static long free_count;
+static size_t alloc_bytes;
+
+static void* counting_alloc(size_t size, void* user_data) {
+    (void)user_data;
+    alloc_count++;
+    alloc_bytes += size;
+    return malloc(size);
+}
+
+static void counting_free(void* ptr, void* user_data) {
+    (void)user_data;
+    if (ptr) {
+        free_count++;
+    }
+    free(ptr);
+}
+
+// Null renderer: acknowledge texture requests so the font atlas stays resident
+static void update_textures(void) {
+    ImGuiPlatformIO* platform_io = igGetPlatformIO_Nil();
+    for (int i = 0; i < platform_io->Textures.Size; i++) {
+        ImTextureData* tex = platform_io->Textures.Data[i];
+        if (tex->Status == ImTextureStatus_WantCreate) {
+            ImTextureData_SetTexID(tex, (ImTextureID)(intptr_t)(i + 1));
+            ImTextureData_SetStatus(tex, ImTextureStatus_OK);
+        } else if (tex->Status == ImTextureStatus_WantUpdates) {
+            ImTextureData_SetStatus(tex, ImTextureStatus_OK);
+        } else if (tex->Status == ImTextureStatus_WantDestroy) {
+            ImTextureData_SetTexID(tex, (ImTextureID)0);
+            ImTextureData_SetStatus(tex, ImTextureStatus_Destroyed);
+        }
+    }
+}
+
+typedef struct {
+    double total_us;
+    double min_us;
+    double median_us;
+    double p95_us;
+    int vertices;
+    int indices;
+    int draw_lists;
+    int draw_cmds;
+    long allocations;
+    long frees;
+    size_t alloc_bytes;
+} SceneResult;
+
+static int compare_double(const void* a, const void* b) {
+    double x = *(const double*)a, y = *(const double*)b;
+    return (x > y) - (x < y);
+}
+
+static SceneResult run_scene(const Scene* scene, int warmup, int frames, double* frame_us) {
+    SceneResult result;
+    memset(&result, 0, sizeof(result));
+
+    igCreateContext(NULL);
+    ImGuiIO* io = igGetIO_Nil();
+    io->DisplaySize = (ImVec2){1920, 1080};
+    io->DeltaTime = 1.0f / 60.0f;
+    io->IniFilename = NULL;
+    io->BackendFlags |= ImGuiBackendFlags_RendererHasTextures;
+
+    ImDrawData* draw_data = NULL;
+    for (int frame = 0; frame < warmup + frames; frame++) {
+        if (frame == warmup) {
+            alloc_count = 0;
+            free_count = 0;
+            alloc_bytes = 0;
+        }
+        feed_input(io, frame);
+        double start = now_us();
+        igNewFrame();
+        scene->build(frame);
+        igRender();
+        double elapsed = now_us() - start;
+        draw_data = igGetDrawData();
+        update_textures();
+        if (frame >= warmup) {
+            frame_us[frame - warmup] = elapsed;
+            result.total_us += elapsed;
+        }
+    }
+    result.allocations = alloc_count;
+    result.frees = free_count;
+    result.alloc_bytes = alloc_bytes;
+
+    // Draw data of the last frame
+    result.vertices = draw_data->TotalVtxCount;
+    result.indices = draw_data->TotalIdxCount;
+    result.draw_lists = draw_data->CmdListsCount;
+    for (int i = 0; i < draw_data->CmdLists.Size; i++) {
+        result.draw_cmds += draw_data->CmdLists.Data[i]->CmdBuffer.Size;
+    }
+    igDestroyContext(NULL);
+
+    qsort(frame_us, (size_t)frames, sizeof(double), compare_double);
+    result.min_us = frame_us[0];
+    result.median_us = frame_us[frames / 2];
+    result.p95_us = frame_us[(int)((double)(frames - 1) * 0.95)];
+    return result;
+}
+
+int main(int argc, char** argv) {
+    int frames = 1000;
+    int warmup = 60;
+    const char* scene_list = NULL;
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--warmup") == 0 && i + 1 < argc) {
+            warmup = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--scenes") == 0 && i + 1 < argc) {
+            scene_list = argv[++i];
+        } else {
+            frames = atoi(argv[i]);
+        }
+    }
+    if (frames < 1) {
+        fprintf(stderr, "usage: %s [frames] [--warmup N] [--scenes demo,windows,table,text,plots,lines]\n", argv[0]);
+        return 2;
+    }
+
+    int selected = 0;
+    for (int s = 0; s < NUM_SCENES; s++) {
+        selected += scene_selected(scene_list, scenes[s].name);
+    }
+    if (selected == 0) {
+        fprintf(stderr, "no scene matches '%s'\n", scene_list);
+        return 2;
+    }
+
+    igSetAllocatorFunctions(counting_alloc, counting_free, NULL);
+    init_long_text();
+    double* frame_us = malloc(sizeof(double) * (size_t)frames);
+
+    printf("{\"imgui_version\": \"%s\", \"display\": [1920, 1080], \"frames\": %d, \"warmup\": %d, \"scenes\": {",
+           igGetVersion(), frames, warmup);
+    double total_us = 0.0;
+    int measured = 0;
+    for (int s = 0; s < NUM_SCENES; s++) {
+        if (!scene_selected(scene_list, scenes[s].name)) {
+            continue;
+        }
+        SceneResult r = run_scene(&scenes[s], warmup, frames, frame_us);
+        printf("%s\"%s\": {\"total_ms\": %.3f, \"us_per_frame\": %.3f, \"us_min\": %.3f, \"us_median\": %.3f, "
+               "\"us_p95\": %.3f, \"vertices\": %d, \"indices\": %d, \"draw_lists\": %d, \"draw_cmds\": %d, "
+               "\"allocs_per_frame\": %.2f, \"frees_per_frame\": %.2f, \"alloc_bytes_per_frame\": %.1f}",
+               measured ? ", " : "", scenes[s].name, r.total_us / 1e3, r.total_us / frames, r.min_us,
+               r.median_us, r.p95_us, r.vertices, r.indices, r.draw_lists, r.draw_cmds,
+               (double)r.allocations / frames, (double)r.frees / frames, (double)r.alloc_bytes / frames);
+        total_us += r.total_us;
+        measured++;
+    }
+    printf("}, \"total_ms\": %.3f, \"us_per_frame\": %.3f}\n", total_us / 1e3,
+           total_us / ((double)frames * measured));
+
+    free(frame_us);
+    return 0;
+}
@@ -0,0 +1,228 @@
+-- Lua heap allocations and GC work of per-frame ImGui calls from LuaJIT
+--
+-- Usage:
+--   luajit bench/imgui_gc.lua <INSTALL_PREFIX> [frames]
+--   SDL_VIDEODRIVER=offscreen LIBGL_ALWAYS_SOFTWARE=1 luajit bench/imgui_gc.lua prebuilt/linux/x86_64
+--   luajit -joff bench/imgui_gc.lua prebuilt/linux/x86_64     # interpreter only
+--
+-- Builds the same UI every frame in two styles, with the SDL2 and OpenGL3
+-- backends on a hidden window; frames end with igRender and aren't drawn,
+-- as drawing doesn't touch the Lua heap. 'ffi' calls cimgui directly with an
+-- ffi.new per vector and out-parameter and string.format'ed labels (what
+-- gl.lua used to do), 'pooled' goes through lua/imgui.lua. The UI is 64
+-- small windows with a formatted label, a slider, a checkbox, a color edit
+-- and a button, plus a window drawing 100 lines through its draw list.
+--
+-- For each style it prints the bytes allocated on the Lua heap per frame
+-- (measured with the GC stopped), then runs the frames again with the GC on
+-- and prints the GC cycles completed and the time spent building the UI
+-- (median, p99 and max per frame, CPU time).
+local ffi = require("ffi")
+
+local prefix = arg[1]
+local frames = tonumber(arg[2] or 2000)
+if prefix == nil or frames == nil then
+    io.stderr:write("usage: luajit bench/imgui_gc.lua <INSTALL_PREFIX> [frames]\n")
+    os.exit(1)
+end
+local warmup = 100
+
+package.path = prefix .. "/share/lua/5.1/?.lua;" .. prefix .. "/share/lua/5.1/?/init.lua;" .. package.path
+local cdefs = require("cdefs")
+local imgui = require("imgui")
+
+local lib_ext = jit.os == "Windows" and ".dll" or jit.os == "OSX" and ".dylib" or ".so"
+local sdl_name = jit.os == "Windows" and "/lib/SDL2.dll" or jit.os == "OSX" and "/lib/libSDL2-2.0.0.dylib"
+                 or "/lib/libSDL2-2.0.so"
+local SDL = cdefs.lazy(ffi.load(prefix .. sdl_name), "sdl2")
+local C = ffi.load(prefix .. "/lib/cimgui_complete" .. lib_ext)
+local ui = imgui.bind(C)
+cdefs.need("sdl2", "SDL_Event")
+
+-- Hidden window and GL context for the backends
+if SDL.SDL_Init(SDL.SDL_INIT_VIDEO) < 0 then
+    error("SDL_Init failed: " .. ffi.string(SDL.SDL_GetError()))
+end
+SDL.SDL_GL_SetAttribute(SDL.SDL_GL_CONTEXT_MAJOR_VERSION, 3)
+SDL.SDL_GL_SetAttribute(SDL.SDL_GL_CONTEXT_MINOR_VERSION, 3)
+SDL.SDL_GL_SetAttribute(SDL.SDL_GL_CONTEXT_PROFILE_MASK, SDL.SDL_GL_CONTEXT_PROFILE_CORE)
+local window = SDL.SDL_CreateWindow("imgui_gc", 0, 0, 1920, 1080,
+                                    bit.bor(SDL.SDL_WINDOW_HIDDEN, SDL.SDL_WINDOW_OPENGL))
+if window == nil then
+    error("SDL_CreateWindow failed: " .. ffi.string(SDL.SDL_GetError()))
+end
+local gl_context = SDL.SDL_GL_CreateContext(window)
+if gl_context == nil then
+    error("SDL_GL_CreateContext failed: " .. ffi.string(SDL.SDL_GetError()))
+end
+SDL.SDL_GL_SetSwapInterval(0)
+
+local NUM_WINDOWS = 64
+local NUM_LINES = 100
+local COND_ONCE = 2  -- ImGuiCond_Once
+
+local values, checks, colors = {}, {}, {}
+local function reset_state()
+    for i = 1, NUM_WINDOWS do
+        values[i] = (i - 1) / NUM_WINDOWS
+        checks[i] = i % 2 == 0
+        colors[i] = {0.2, 0.3, 0.3}
+    end
+end
+
+-- ffi.new per call, labels formatted every frame
+local function build_ffi(frame)
+    for i = 1, NUM_WINDOWS do
+        C.igSetNextWindowPos(ffi.new("ImVec2", (i - 1) % 8 * 238, math.floor((i - 1) / 8) * 133),
+                             COND_ONCE, ffi.new("ImVec2", 0, 0))
+        C.igSetNextWindowSize(ffi.new("ImVec2", 230, 125), COND_ONCE)
+        if C.igBegin("Window " .. i, nil, 0) then
+            local label = string.format("Frame %d", frame)
+            C.cImGui_Text(label, #label)
+            C.igSameLine(0, -1)
+            label = string.format("value %.2f", values[i])
+            C.cImGui_Text(label, #label)
+            local value = ffi.new("float[1]", values[i])
+            C.igSliderFloat("Value", value, 0, 1, "%.2f", 0)
+            values[i] = value[0]
+            local check = ffi.new("bool[1]", checks[i])
+            C.igCheckbox("Enabled", check)
+            checks[i] = check[0]
+            local color = colors[i]
+            local col = ffi.new("float[3]", color)
+            C.igColorEdit3("Color", col, 0)
+            color[1], color[2], color[3] = col[0], col[1], col[2]
+            C.igButton("Apply", ffi.new("ImVec2", 0, 0))
+        end
+        C.igEnd()
+    end
+
+    C.igSetNextWindowPos(ffi.new("ImVec2", 0, 540), COND_ONCE, ffi.new("ImVec2", 0, 0))
+    C.igSetNextWindowSize(ffi.new("ImVec2", 1900, 500), COND_ONCE)
+    if C.igBegin("Lines", nil, 0) then
+        local draw_list = C.igGetWindowDrawList()
+        local origin = ffi.new("ImVec2")
+        C.igGetCursorScreenPos(origin)
+        for l = 0, NUM_LINES - 1 do
+            local x = origin.x + l * 18
+            C.ImDrawList_AddLine(draw_list, ffi.new("ImVec2", x, origin.y),
+                                 ffi.new("ImVec2", x + 9, origin.y + 400), 0xff00ffff, 2)
+        end
+        C.igDummy(ffi.new("ImVec2", NUM_LINES * 18, 400))
+    end
+    C.igEnd()
+end
+
+-- lua/imgui.lua
+local intern = imgui.intern
+local function build_pooled(frame)
+    for i = 1, NUM_WINDOWS do
+        ui.SetNextWindowPos((i - 1) % 8 * 238, math.floor((i - 1) / 8) * 133, COND_ONCE)
+        ui.SetNextWindowSize(230, 125, COND_ONCE)
+        if ui.Begin(intern("Window %d", i)) then
+            ui.TextInt("Frame ", frame, nil)
+            ui.SameLine(0, -1)
+            ui.TextFloat("value ", values[i], 2)
+            local _
+            _, values[i] = ui.SliderFloat("Value", values[i], 0, 1, "%.2f")
+            _, checks[i] = ui.Checkbox("Enabled", checks[i])
+            local color = colors[i]
+            _, color[1], color[2], color[3] = ui.ColorEdit3("Color", color[1], color[2], color[3])
+            ui.Button("Apply")
+        end
+        ui.End()
+    end
+
+    ui.SetNextWindowPos(0, 540, COND_ONCE)
+    ui.SetNextWindowSize(1900, 500, COND_ONCE)
+    if ui.Begin("Lines") then
+        local draw_list = C.igGetWindowDrawList()
+        local x0, y0 = ui.GetCursorScreenPos()
+        for l = 0, NUM_LINES - 1 do
+            local x = x0 + l * 18
+            ui.AddLine(draw_list, x, y0, x + 9, y0 + 400, 0xff00ffff, 2)
+        end
+        ui.Dummy(NUM_LINES * 18, 400)
+    end
+    ui.End()
+end
+
+local MAX_EVENTS = 64
+local events = ffi.new("SDL_Event[?]", MAX_EVENTS)
+
+-- Runs count frames; measure(build, frame) wraps the UI part of each frame
+local function run_frames(count, build, measure)
+    for frame = 1, count do
+        SDL.SDL_PumpEvents()
+        local n = SDL.SDL_PeepEvents(events, MAX_EVENTS, SDL.SDL_GETEVENT, SDL.SDL_FIRSTEVENT, SDL.SDL_LASTEVENT)
+        ui.NewFrame(events, math.max(n, 0))
+        measure(build, frame)
+        C.igRender()
+    end
+end
+
+local function percentile(sorted, p)
+    return sorted[math.max(1, math.ceil(#sorted * p))]
+end
+
+local function bench(name, build)
+    -- A fresh ImGui context per style, so both start from the same state
+    C.igCreateContext(nil)
+    if not C.cImGui_ImplSDL2_InitForOpenGL(window, gl_context) or not C.cImGui_ImplOpenGL3_Init(nil) then
+        error("Failed to initialize the ImGui backends")
+    end
+    reset_state()
+    run_frames(warmup, build, function(f, frame) f(frame) end)
+
+    -- Allocations, with the GC stopped
+    collectgarbage("collect")
+    collectgarbage("stop")
+    local allocated = 0
+    run_frames(frames, build, function(f, frame)
+        local before = collectgarbage("count")
+        f(frame)
+        allocated = allocated + collectgarbage("count") - before
+    end)
+    collectgarbage("restart")
+    collectgarbage("collect")
+
+    -- GC cycles and build times, with the GC running. A finalizer that
+    -- re-arms itself counts completed cycles.
+    local cycles, counting = 0, true
+    local function sentinel()
+        ffi.gc(ffi.new("char[1]"), function()
+            if counting then
+                cycles = cycles + 1
+                sentinel()
+            end
+        end)
+    end
+    sentinel()
+    local times, clock = {}, os.clock
+    for k = 1, frames do
+        times[k] = 0
+    end
+    run_frames(frames, build, function(f, frame)
+        local start = clock()
+        f(frame)
+        times[frame] = (clock() - start) * 1e6
+    end)
+    counting = false
+
+    C.cImGui_ImplOpenGL3_Shutdown()
+    C.cImGui_ImplSDL2_Shutdown()
+    C.igDestroyContext(nil)
+
+    table.sort(times)
+    print(string.format("%-8s %12.0f %10d %10.1f %10.1f %10.1f", name, allocated * 1024 / frames, cycles,
+                        percentile(times, 0.5), percentile(times, 0.99), times[#times]))
+end
+
+print(string.format("%d frames after %d warmup frames, JIT %s", frames, warmup, jit.status() and "on" or "off"))
+print(string.format("%-8s %12s %10s %10s %10s %10s", "style", "bytes/frame", "gc cycles", "median us", "p99 us", "max us"))
+bench("ffi", build_ffi)
+bench("pooled", build_pooled)
+
+SDL.SDL_GL_DeleteContext(gl_context)
+SDL.SDL_DestroyWindow(window)
+SDL.SDL_Quit()
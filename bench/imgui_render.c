@@ -0,0 +1,259 @@
+// Headless OpenGL render benchmark for cimgui_complete
+//
+// Renders the scenes of imgui_scenes.h into a hidden SDL2 window and times
+// the render call of each path: the backend's cImGui_ImplOpenGL3_RenderDrawData
+// ("backend") and cImGui_ImplOpenGL3_RenderDrawDataStreaming in its mapped and
+// persistent modes, each also without the GL state backup/restore
+// ("-nostate", cImGui_ImplOpenGL3_StreamingPreserveState(false)). Each frame is timed twice: until the render call returns
+// (submit) and until glFinish() returns (the frame including the GPU/rasterizer
+// work). Every scene and mode runs in a fresh ImGui context with the same
+// scripted input. Prints one JSON object.
+//
+// Meant to run on Mesa's llvmpipe without a display:
+//   SDL_VIDEODRIVER=offscreen LIBGL_ALWAYS_SOFTWARE=1 EGL_PLATFORM=surfaceless
+//
+// Usage: imgui_render [frames] [--warmup N] [--scenes table,lines,...]
+//                     [--modes backend,mapped,persistent,mapped-nostate,...]
+#include "imgui_scenes.h"
+#include "cimgui_sdl2_opengl3.h"
+
+#define SDL_MAIN_HANDLED
+#include <SDL.h>
+#include <stdlib.h>
+
+#define WIDTH 1920
+#define HEIGHT 1080
+
+// Only a few GL 1.0 entry points are needed; fetched through SDL so the
+// benchmark doesn't link libGL itself
+#define BENCH_GL_COLOR_BUFFER_BIT 0x00004000
+#define BENCH_GL_RENDERER 0x1F01
+#define BENCH_GL_VERSION 0x1F02
+
+#if defined(_WIN32) && !defined(__CYGWIN__)
+#define BENCH_APIENTRY __stdcall
+#else
+#define BENCH_APIENTRY
+#endif
+
+static void (BENCH_APIENTRY *gl_Viewport)(int, int, int, int);
+static void (BENCH_APIENTRY *gl_ClearColor)(float, float, float, float);
+static void (BENCH_APIENTRY *gl_Clear)(unsigned int);
+static void (BENCH_APIENTRY *gl_Finish)(void);
+static const unsigned char* (BENCH_APIENTRY *gl_GetString)(unsigned int);
+
+#ifdef _WIN32
+#include <windows.h>
+static double now_us(void) {
+    LARGE_INTEGER freq, counter;
+    QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart * 1e6 / (double)freq.QuadPart;
+}
+#else
+#include <time.h>
+static double now_us(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec * 1e6 + (double)ts.tv_nsec / 1e3;
+}
+#endif
+
+// Render paths; StreamingInit is given allow_persistent and must return `stream_mode`
+typedef struct {
+    const char* name;
+    int stream_mode;  // -1: the backend's own renderer
+    bool preserve_state;
+} Mode;
+
+static const Mode modes[] = {
+    { "backend", -1, true },
+    { "mapped", CIMGUI_STREAM_MAPPED, true },
+    { "persistent", CIMGUI_STREAM_PERSISTENT, true },
+    { "mapped-nostate", CIMGUI_STREAM_MAPPED, false },
+    { "persistent-nostate", CIMGUI_STREAM_PERSISTENT, false },
+};
+#define NUM_MODES (int)(sizeof(modes) / sizeof(modes[0]))
+
+typedef struct {
+    double submit_median_us;
+    double median_us;
+    double p95_us;
+    int vertices;
+    int indices;
+    int draw_cmds;
+} ModeResult;
+
+static int compare_double(const void* a, const void* b) {
+    double x = *(const double*)a, y = *(const double*)b;
+    return (x > y) - (x < y);
+}
+
+static double median(double* values, int count) {
+    qsort(values, (size_t)count, sizeof(double), compare_double);
+    return values[count / 2];
+}
+
+// Returns 0 when the mode isn't available in this GL context
+static int run_mode(const Scene* scene, const Mode* mode, int warmup, int frames,
+                    double* submit_us, double* frame_us, ModeResult* result) {
+    memset(result, 0, sizeof(*result));
+    igCreateContext(NULL);
+    ImGuiIO* io = igGetIO_Nil();
+    io->DisplaySize = (ImVec2){WIDTH, HEIGHT};
+    io->DeltaTime = 1.0f / 60.0f;
+    io->IniFilename = NULL;
+    cImGui_ImplOpenGL3_Init("#version 150");
+
+    int available = 1;
+    if (mode->stream_mode >= 0) {
+        available = cImGui_ImplOpenGL3_StreamingInit(mode->stream_mode == CIMGUI_STREAM_PERSISTENT) == mode->stream_mode;
+        cImGui_ImplOpenGL3_StreamingPreserveState(mode->preserve_state);
+    }
+
+    ImDrawData* draw_data = NULL;
+    for (int frame = 0; available && frame < warmup + frames; frame++) {
+        feed_input(io, frame);
+        cImGui_ImplOpenGL3_NewFrame();
+        igNewFrame();
+        scene->build(frame);
+        igRender();
+        draw_data = igGetDrawData();
+
+        gl_ClearColor(0.1f, 0.1f, 0.1f, 1.0f);
+        gl_Clear(BENCH_GL_COLOR_BUFFER_BIT);
+        gl_Finish();
+        double start = now_us();
+        if (mode->stream_mode < 0) {
+            cImGui_ImplOpenGL3_RenderDrawData(draw_data);
+        } else {
+            cImGui_ImplOpenGL3_RenderDrawDataStreaming(draw_data);
+        }
+        double submitted = now_us();
+        gl_Finish();
+        double finished = now_us();
+        if (frame >= warmup) {
+            submit_us[frame - warmup] = submitted - start;
+            frame_us[frame - warmup] = finished - start;
+        }
+    }
+
+    if (available) {
+        result->vertices = draw_data->TotalVtxCount;
+        result->indices = draw_data->TotalIdxCount;
+        for (int i = 0; i < draw_data->CmdLists.Size; i++) {
+            result->draw_cmds += draw_data->CmdLists.Data[i]->CmdBuffer.Size;
+        }
+        result->submit_median_us = median(submit_us, frames);
+        result->median_us = median(frame_us, frames);
+        result->p95_us = frame_us[(int)((double)(frames - 1) * 0.95)];
+    }
+    cImGui_ImplOpenGL3_StreamingPreserveState(true);
+    cImGui_ImplOpenGL3_StreamingShutdown();
+    cImGui_ImplOpenGL3_Shutdown();
+    igDestroyContext(NULL);
+    return available;
+}
+
+static SDL_Window* create_window(SDL_GLContext* context) {
+    // Persistent mapping needs GL 4.4; older drivers still get the mapped path
+    static const int versions[][2] = { {4, 5}, {3, 3} };
+    for (int i = 0; i < 2; i++) {
+        SDL_GL_SetAttribute(SDL_GL_CONTEXT_PROFILE_MASK, SDL_GL_CONTEXT_PROFILE_CORE);
+        SDL_GL_SetAttribute(SDL_GL_CONTEXT_MAJOR_VERSION, versions[i][0]);
+        SDL_GL_SetAttribute(SDL_GL_CONTEXT_MINOR_VERSION, versions[i][1]);
+        SDL_Window* window = SDL_CreateWindow("imgui_render", SDL_WINDOWPOS_UNDEFINED, SDL_WINDOWPOS_UNDEFINED,
+                                              WIDTH, HEIGHT, SDL_WINDOW_OPENGL | SDL_WINDOW_HIDDEN);
+        if (window == NULL) {
+            return NULL;
+        }
+        *context = SDL_GL_CreateContext(window);
+        if (*context != NULL) {
+            return window;
+        }
+        SDL_DestroyWindow(window);
+    }
+    return NULL;
+}
+
+int main(int argc, char** argv) {
+    int frames = 300;
+    int warmup = 30;
+    const char* scene_list = NULL;
+    const char* mode_list = NULL;
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--warmup") == 0 && i + 1 < argc) {
+            warmup = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--scenes") == 0 && i + 1 < argc) {
+            scene_list = argv[++i];
+        } else if (strcmp(argv[i], "--modes") == 0 && i + 1 < argc) {
+            mode_list = argv[++i];
+        } else {
+            frames = atoi(argv[i]);
+        }
+    }
+    if (frames < 1) {
+        fprintf(stderr, "usage: %s [frames] [--warmup N] [--scenes demo,windows,table,text,plots,lines] "
+                        "[--modes backend,mapped,persistent,mapped-nostate,persistent-nostate]\n", argv[0]);
+        return 2;
+    }
+
+    if (SDL_Init(SDL_INIT_VIDEO) != 0) {
+        fprintf(stderr, "SDL_Init failed: %s\n", SDL_GetError());
+        return 1;
+    }
+    SDL_GLContext context = NULL;
+    SDL_Window* window = create_window(&context);
+    if (window == NULL) {
+        fprintf(stderr, "no OpenGL 3.3+ core context: %s\n", SDL_GetError());
+        SDL_Quit();
+        return 1;
+    }
+    SDL_GL_SetSwapInterval(0);
+    gl_Viewport = (void (BENCH_APIENTRY *)(int, int, int, int))SDL_GL_GetProcAddress("glViewport");
+    gl_ClearColor = (void (BENCH_APIENTRY *)(float, float, float, float))SDL_GL_GetProcAddress("glClearColor");
+    gl_Clear = (void (BENCH_APIENTRY *)(unsigned int))SDL_GL_GetProcAddress("glClear");
+    gl_Finish = (void (BENCH_APIENTRY *)(void))SDL_GL_GetProcAddress("glFinish");
+    gl_GetString = (const unsigned char* (BENCH_APIENTRY *)(unsigned int))SDL_GL_GetProcAddress("glGetString");
+    gl_Viewport(0, 0, WIDTH, HEIGHT);
+
+    init_long_text();
+    double* submit_us = malloc(sizeof(double) * (size_t)frames);
+    double* frame_us = malloc(sizeof(double) * (size_t)frames);
+
+    printf("{\"imgui_version\": \"%s\", \"renderer\": \"%s\", \"gl_version\": \"%s\", \"display\": [%d, %d], "
+           "\"frames\": %d, \"warmup\": %d, \"scenes\": {",
+           igGetVersion(), gl_GetString(BENCH_GL_RENDERER), gl_GetString(BENCH_GL_VERSION), WIDTH, HEIGHT,
+           frames, warmup);
+    int measured = 0;
+    for (int s = 0; s < NUM_SCENES; s++) {
+        if (!scene_selected(scene_list, scenes[s].name)) {
+            continue;
+        }
+        printf("%s\"%s\": {", measured++ ? ", " : "", scenes[s].name);
+        int printed = 0;
+        for (int m = 0; m < NUM_MODES; m++) {
+            ModeResult r;
+            if (!scene_selected(mode_list, modes[m].name)) {
+                continue;
+            }
+            if (!run_mode(&scenes[s], &modes[m], warmup, frames, submit_us, frame_us, &r)) {
+                fprintf(stderr, "%s: mode not available in this context\n", modes[m].name);
+                continue;
+            }
+            printf("%s\"%s\": {\"us_submit_median\": %.3f, \"us_median\": %.3f, \"us_p95\": %.3f, "
+                   "\"vertices\": %d, \"indices\": %d, \"draw_cmds\": %d}",
+                   printed++ ? ", " : "", modes[m].name, r.submit_median_us, r.median_us, r.p95_us,
+                   r.vertices, r.indices, r.draw_cmds);
+        }
+        printf("}");
+    }
+    printf("}}\n");
+
+    free(submit_us);
+    free(frame_us);
+    SDL_GL_DeleteContext(context);
+    SDL_DestroyWindow(window);
+    SDL_Quit();
+    return 0;
+}
@@ -0,0 +1,209 @@
+// Scripted scenes shared by the headless benchmarks
+//
+// Each scene builds one frame of UI between igNewFrame() and igRender() for
+// a 1920x1080 display. imgui_frames.c times the ImGui side of these frames,
+// imgui_render.c the OpenGL rendering of their draw data.
+#ifndef IMGUI_SCENES_H
+#define IMGUI_SCENES_H
+
+#define CIMGUI_DEFINE_ENUMS_AND_STRUCTS
+#include "cimgui.h"
+
+#include <math.h>
+#include <stdio.h>
+#include <string.h>
+
+static void scene_demo(int frame) {
+    (void)frame;
+    igShowDemoWindow(NULL);
+}
+
+#define NUM_WINDOWS 64
+
+static float window_values[NUM_WINDOWS];
+static bool window_checks[NUM_WINDOWS];
+
+static void scene_windows(int frame) {
+    for (int i = 0; i < NUM_WINDOWS; i++) {
+        char title[32];
+        snprintf(title, sizeof(title), "Window %d", i);
+        igSetNextWindowPos((ImVec2){(float)(i % 8) * 238.0f, (float)(i / 8) * 133.0f}, ImGuiCond_Once, (ImVec2){0, 0});
+        igSetNextWindowSize((ImVec2){230, 125}, ImGuiCond_Once);
+        if (igBegin(title, NULL, 0)) {
+            igText("Frame %d", frame);
+            igSliderFloat("Value", &window_values[i], 0.0f, 1.0f, "%.2f", 0);
+            igCheckbox("Enabled", &window_checks[i]);
+            igButton("Apply", (ImVec2){0, 0});
+        }
+        igEnd();
+    }
+}
+
+#define TABLE_ROWS 1000
+#define TABLE_COLUMNS 6
+
+static void scene_table(int frame) {
+    igSetNextWindowPos((ImVec2){0, 0}, ImGuiCond_Once, (ImVec2){0, 0});
+    igSetNextWindowSize((ImVec2){1920, 1080}, ImGuiCond_Once);
+    if (igBegin("Table", NULL, 0)) {
+        ImGuiTableFlags flags = ImGuiTableFlags_Borders | ImGuiTableFlags_RowBg | ImGuiTableFlags_Resizable |
+                                ImGuiTableFlags_Sortable | ImGuiTableFlags_ScrollY;
+        if (igBeginTable("rows", TABLE_COLUMNS, flags, (ImVec2){0, 0}, 0.0f)) {
+            igTableSetupScrollFreeze(0, 1);
+            for (int c = 0; c < TABLE_COLUMNS; c++) {
+                char label[16];
+                snprintf(label, sizeof(label), "Column %d", c);
+                igTableSetupColumn(label, 0, 0.0f, 0);
+            }
+            igTableHeadersRow();
+            for (int row = 0; row < TABLE_ROWS; row++) {
+                igTableNextRow(0, 0.0f);
+                for (int c = 0; c < TABLE_COLUMNS; c++) {
+                    igTableSetColumnIndex(c);
+                    char cell[32];
+                    snprintf(cell, sizeof(cell), "%d:%d:%d", row, c, (row * 31 + c + frame) % 997);
+                    igTextUnformatted(cell, NULL);
+                }
+            }
+            igEndTable();
+        }
+    }
+    igEnd();
+}
+
+static char long_text[64 * 1024];
+
+static void init_long_text(void) {
+    static const char* words[] = {
+        "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit",
+        "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore", "et",
+    };
+    size_t len = 0;
+    for (int i = 0; len + 16 < sizeof(long_text); i++) {
+        int n = snprintf(long_text + len, sizeof(long_text) - len, "%s%s", words[(i * 7) % 16],
+                         i % 97 == 96 ? "\n\n" : " ");
+        len += (size_t)n;
+    }
+}
+
+static void scene_text(int frame) {
+    (void)frame;
+    igSetNextWindowPos((ImVec2){0, 0}, ImGuiCond_Once, (ImVec2){0, 0});
+    igSetNextWindowSize((ImVec2){960, 1080}, ImGuiCond_Once);
+    if (igBegin("Wrapped text", NULL, 0)) {
+        igPushTextWrapPos(0.0f);
+        igTextUnformatted(long_text, NULL);
+        igPopTextWrapPos();
+    }
+    igEnd();
+
+    igSetNextWindowPos((ImVec2){960, 0}, ImGuiCond_Once, (ImVec2){0, 0});
+    igSetNextWindowSize((ImVec2){960, 1080}, ImGuiCond_Once);
+    if (igBegin("Text editor", NULL, 0)) {
+        igInputTextMultiline("##source", long_text, sizeof(long_text), (ImVec2){-1.0f, -1.0f},
+                             ImGuiInputTextFlags_ReadOnly, NULL, NULL);
+    }
+    igEnd();
+}
+
+#define NUM_PLOTS 32
+#define PLOT_SAMPLES 1000
+
+static float plot_values[PLOT_SAMPLES];
+
+static void scene_plots(int frame) {
+    for (int i = 0; i < PLOT_SAMPLES; i++) {
+        plot_values[i] = sinf((float)(i + frame) * 0.05f) * cosf((float)i * 0.013f);
+    }
+
+    igSetNextWindowPos((ImVec2){0, 0}, ImGuiCond_Once, (ImVec2){0, 0});
+    igSetNextWindowSize((ImVec2){1920, 1080}, ImGuiCond_Once);
+    if (igBegin("Plots", NULL, 0)) {
+        for (int p = 0; p < NUM_PLOTS; p++) {
+            igPushID_Int(p);
+            if (p % 2 == 0) {
+                igPlotLines_FloatPtr("##lines", plot_values, PLOT_SAMPLES, p * 10, NULL, -1.0f, 1.0f,
+                                     (ImVec2){900, 60}, sizeof(float));
+            } else {
+                igSameLine(0.0f, -1.0f);
+                igPlotHistogram_FloatPtr("##histogram", plot_values, PLOT_SAMPLES / 4, p * 10, NULL, -1.0f, 1.0f,
+                                         (ImVec2){900, 60}, sizeof(float));
+            }
+            igPopID();
+        }
+
+        // Custom polylines through the draw list, as game debug overlays do
+        ImDrawList* draw_list = igGetWindowDrawList();
+        ImVec2 origin;
+        igGetCursorScreenPos(&origin);
+        static ImVec2 points[PLOT_SAMPLES];
+        for (int i = 0; i < PLOT_SAMPLES; i++) {
+            points[i] = (ImVec2){origin.x + (float)i * 1.8f, origin.y + 60.0f + plot_values[i] * 50.0f};
+        }
+        ImDrawList_AddPolyline(draw_list, points, PLOT_SAMPLES, 0xff00ffffu, 0, 2.0f);
+        igDummy((ImVec2){1800, 120});
+    }
+    igEnd();
+}
+
+#define NUM_LINES 25
+#define LINE_POINTS 1000
+
+// Thick anti-aliased polylines: ~50k vertices in a handful of draw commands,
+// so rendering is dominated by the vertex upload rather than by draw calls
+static void scene_lines(int frame) {
+    igSetNextWindowPos((ImVec2){0, 0}, ImGuiCond_Once, (ImVec2){0, 0});
+    igSetNextWindowSize((ImVec2){1920, 1080}, ImGuiCond_Once);
+    if (igBegin("Lines", NULL, 0)) {
+        ImDrawList* draw_list = igGetWindowDrawList();
+        ImVec2 origin;
+        igGetCursorScreenPos(&origin);
+        static ImVec2 points[LINE_POINTS];
+        for (int l = 0; l < NUM_LINES; l++) {
+            for (int i = 0; i < LINE_POINTS; i++) {
+                float t = (float)(i + frame * 4) * 0.02f + (float)l * 0.7f;
+                points[i] = (ImVec2){origin.x + (float)i * 1.85f, origin.y + 20.0f + (float)l * 40.0f + sinf(t) * 18.0f};
+            }
+            ImDrawList_AddPolyline(draw_list, points, LINE_POINTS, 0xff000000u | (0x3f5fffu * (ImU32)(l + 1)), 0, 3.0f);
+        }
+        igDummy((ImVec2){1850, (float)NUM_LINES * 40.0f});
+    }
+    igEnd();
+}
+
+typedef struct {
+    const char* name;
+    void (*build)(int frame);
+} Scene;
+
+static const Scene scenes[] = {
+    { "demo", scene_demo },
+    { "windows", scene_windows },
+    { "table", scene_table },
+    { "text", scene_text },
+    { "plots", scene_plots },
+    { "lines", scene_lines },
+};
+#define NUM_SCENES (int)(sizeof(scenes) / sizeof(scenes[0]))
+
+// Scripted input: the mouse sweeps over the display and clicks periodically
+static void feed_input(ImGuiIO* io, int frame) {
+    float t = (float)frame * 0.05f;
+    ImGuiIO_AddMousePosEvent(io, 960.0f + 900.0f * sinf(t), 540.0f + 500.0f * sinf(t * 0.37f));
+    ImGuiIO_AddMouseButtonEvent(io, 0, frame % 30 < 2);
+}
+
+static int scene_selected(const char* list, const char* name) {
+    if (!list) {
+        return 1;
+    }
+    size_t len = strlen(name);
+    for (const char* p = list; (p = strstr(p, name)) != NULL; p += len) {
+        if ((p == list || p[-1] == ',') && (p[len] == ',' || p[len] == '\0')) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+#endif // IMGUI_SCENES_H
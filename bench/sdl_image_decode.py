@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+JPEG decode throughput of an installed SDL_image through IMG_Load_RW
+Usage:
+  ./bench/sdl_image_decode.py <INSTALL_PREFIX>                     # With and without libjpeg-turbo's SIMD
+  ./bench/sdl_image_decode.py <INSTALL_PREFIX> --size 3840x2160 --seconds 5
+  ./bench/sdl_image_decode.py <INSTALL_PREFIX> --no-compare        # Only the SIMD run
+
+Encodes a synthetic photo-sized image (gradients plus noise, quality 90)
+with IMG_SaveJPG, then decodes it from memory with IMG_Load_RW for
+--seconds and prints the median time per decode, megapixels and compressed
+megabytes per second. The second run sets JSIMD_FORCENONE=1, which makes
+libjpeg-turbo use its plain C code, so the difference is what SIMD is
+worth. build_sdl_image.py runs this at the end of every build. Uses ctypes
+only, so it needs nothing besides the libraries in INSTALL_PREFIX.
+"""
+
+import os
+import sys
+import json
+import time
+import ctypes
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == "Windows"
+IS_MACOS = SYSTEM == "Darwin"
+
+SDL_PIXELFORMAT_RGB24 = 0x17101803
+IMG_INIT_JPG = 0x1
+
+# Leading fields of SDL_Surface, up to the pixels
+class SDL_Surface(ctypes.Structure):
+    _fields_ = [("flags", ctypes.c_uint32),
+                ("format", ctypes.c_void_p),
+                ("w", ctypes.c_int),
+                ("h", ctypes.c_int),
+                ("pitch", ctypes.c_int),
+                ("pixels", ctypes.c_void_p)]
+
+def find_library(prefix, patterns):
+    for directory in ("bin", "lib") if IS_WINDOWS else ("lib",):
+        for pattern in patterns:
+            found = sorted((prefix / directory).glob(pattern))
+            if found:
+                return found[0]
+    raise FileNotFoundError(f"none of {', '.join(patterns)} in {prefix}")
+
+def load_libraries(prefix):
+    """(SDL2, SDL2_image) from prefix, SDL2 first so SDL2_image resolves against it"""
+    if IS_WINDOWS:
+        os.add_dll_directory(str(prefix / "bin"))
+        sdl_patterns, image_patterns = ["SDL2.dll"], ["SDL2_image.dll"]
+    elif IS_MACOS:
+        sdl_patterns, image_patterns = ["libSDL2-2.0.0.dylib", "libSDL2*.dylib"], ["libSDL2_image*.dylib"]
+    else:
+        sdl_patterns, image_patterns = ["libSDL2-2.0.so.0", "libSDL2.so"], ["libSDL2_image-2.0.so.0", "libSDL2_image*.so*"]
+    sdl = ctypes.CDLL(str(find_library(prefix, sdl_patterns)), mode=ctypes.RTLD_GLOBAL)
+    image = ctypes.CDLL(str(find_library(prefix, image_patterns)))
+
+    sdl.SDL_GetError.restype = ctypes.c_char_p
+    sdl.SDL_CreateRGBSurfaceWithFormat.restype = ctypes.POINTER(SDL_Surface)
+    sdl.SDL_CreateRGBSurfaceWithFormat.argtypes = [ctypes.c_uint32, ctypes.c_int, ctypes.c_int,
+                                                   ctypes.c_int, ctypes.c_uint32]
+    sdl.SDL_FreeSurface.argtypes = [ctypes.POINTER(SDL_Surface)]
+    sdl.SDL_RWFromConstMem.restype = ctypes.c_void_p
+    sdl.SDL_RWFromConstMem.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    image.IMG_Init.argtypes = [ctypes.c_int]
+    image.IMG_SaveJPG.argtypes = [ctypes.POINTER(SDL_Surface), ctypes.c_char_p, ctypes.c_int]
+    image.IMG_Load_RW.restype = ctypes.POINTER(SDL_Surface)
+    image.IMG_Load_RW.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    return sdl, image
+
+def synthetic_rgb(width, height):
+    """RGB24 rows of diagonal gradients with a little noise, roughly as hard to compress as a photo"""
+    row_bytes = width * 3
+    gradient = bytes((x * 255 // max(1, row_bytes - 1)) for x in range(row_bytes))
+    rng = random.Random(1)
+    low_bits = bytes(i & 15 for i in range(256))
+    noise = [rng.randbytes(row_bytes).translate(low_bits) for _ in range(16)]
+    rows = []
+    for y in range(height):
+        shift = (y * 3) % row_bytes
+        brightness = bytes((i + y // 4) & 255 for i in range(256))
+        row = (gradient[shift:] + gradient[:shift]).translate(brightness)
+        rows.append((int.from_bytes(row, "little") ^ int.from_bytes(noise[y % 16], "little"))
+                    .to_bytes(row_bytes, "little"))
+    return rows
+
+def encode_jpeg(sdl, image, width, height):
+    """JPEG file contents for a synthetic width x height image"""
+    surface = sdl.SDL_CreateRGBSurfaceWithFormat(0, width, height, 24, SDL_PIXELFORMAT_RGB24)
+    if not surface:
+        raise RuntimeError(f"SDL_CreateRGBSurfaceWithFormat: {sdl.SDL_GetError().decode()}")
+    pitch, pixels = surface.contents.pitch, surface.contents.pixels
+    for y, row in enumerate(synthetic_rgb(width, height)):
+        ctypes.memmove(pixels + y * pitch, row, len(row))
+
+    fd, path = tempfile.mkstemp(suffix=".jpg")
+    os.close(fd)
+    try:
+        if image.IMG_SaveJPG(surface, path.encode(), 90) != 0:
+            raise RuntimeError(f"IMG_SaveJPG: {sdl.SDL_GetError().decode()}")
+        return Path(path).read_bytes()
+    finally:
+        sdl.SDL_FreeSurface(surface)
+        os.unlink(path)
+
+def measure(prefix, width, height, seconds):
+    """Decode times in seconds, and the size of the JPEG"""
+    sdl, image = load_libraries(prefix)
+    if not image.IMG_Init(IMG_INIT_JPG) & IMG_INIT_JPG:
+        raise RuntimeError(f"IMG_Init(IMG_INIT_JPG): {sdl.SDL_GetError().decode()}")
+    jpeg = encode_jpeg(sdl, image, width, height)
+    buffer = ctypes.create_string_buffer(jpeg, len(jpeg))
+
+    def decode():
+        rw = sdl.SDL_RWFromConstMem(buffer, len(jpeg))
+        start = time.perf_counter()
+        surface = image.IMG_Load_RW(rw, 1)
+        elapsed = time.perf_counter() - start
+        if not surface:
+            raise RuntimeError(f"IMG_Load_RW: {sdl.SDL_GetError().decode()}")
+        sdl.SDL_FreeSurface(surface)
+        return elapsed
+
+    decode()
+    times = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline or len(times) < 5:
+        times.append(decode())
+    return times, len(jpeg)
+
+def run(prefix, width, height, seconds, simd):
+    """measure() in a child process, so JSIMD_FORCENONE is seen when libjpeg-turbo initializes"""
+    env = dict(os.environ)
+    env.pop("JSIMD_FORCENONE", None)
+    if not simd:
+        env["JSIMD_FORCENONE"] = "1"
+    result = subprocess.run([sys.executable, __file__, str(prefix), "--size", f"{width}x{height}",
+                             "--seconds", str(seconds), "--child"],
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description="JPEG decode throughput of SDL_image's IMG_Load_RW")
+    parser.add_argument("prefix", type=Path, help="Install prefix containing SDL2 and SDL2_image")
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080), help="Image size (default: 1920x1080)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Decode time per run (default: 2)")
+    parser.add_argument("--no-compare", action="store_true", help="Skip the run with SIMD disabled")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    prefix = args.prefix.resolve()
+    width, height = args.size
+
+    if args.child:
+        times, size = measure(prefix, width, height, args.seconds)
+        print(json.dumps({"times": times, "bytes": size}))
+        return
+
+    runs = [("SIMD", True)] + ([] if args.no_compare else [("JSIMD_FORCENONE=1", False)])
+    print(f"\nJPEG decode through IMG_Load_RW, {width}x{height}:")
+    print(f"  {'':<18} {'decodes':>8} {'median ms':>10} {'MP/s':>8} {'MB/s':>8}")
+    medians = []
+    for label, simd in runs:
+        try:
+            result = run(prefix, width, height, args.seconds, simd)
+        except (RuntimeError, OSError, ValueError) as e:
+            print(f"  {label:<18} failed: {e}")
+            sys.exit(1)
+        median = statistics.median(result["times"])
+        medians.append(median)
+        print(f"  {label:<18} {len(result['times']):>8} {median * 1000:>10.2f} "
+              f"{width * height / median / 1e6:>8.1f} {result['bytes'] / median / 1e6:>8.1f}")
+    if len(medians) == 2:
+        print(f"  SIMD speedup: {medians[1] / medians[0]:.2f}x")
+
+if __name__ == "__main__":
+    main()
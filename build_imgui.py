@@ -4,25 +4,122 @@ Universal build script for cimgui with SDL2 and OpenGL3 backends
 Usage: 
   ./build_imgui.py                                    # Use default paths
   ./build_imgui.py <SDL2_PREFIX> <INSTALL_PREFIX>     # Specify paths
+  ./build_imgui.py -j 8 ...                           # Limit parallel compile jobs
+  ./build_imgui.py --config debug ...                 # Debug build in its own build directory
+  ./build_imgui.py --config dist ...                  # Release + LTO, hidden visibility, C API exports only
+  ./build_imgui.py --unity ...                        # Amalgamated (jumbo) translation units
+  ./build_imgui.py --variant production ...           # imconfig variant, installed to <INSTALL_PREFIX>/production
+  ./build_imgui.py --freetype ...                     # Rasterize fonts with FreeType, add the font atlas cache
+  ./build_imgui.py --static ...                       # Also build libcimgui_complete.a (fat LTO objects)
+  ./build_imgui.py --generator ninja ...              # Generate <build dir>/build.ninja and build with ninja
+  ./build_imgui.py --pch ...                          # Precompile the shared ImGui and SDL headers
+  ./build_imgui.py --compiler-cache auto ...          # Compile through ccache or sccache
 """
 
 import os
 import sys
+import argparse
+import hashlib
+import json
 import platform
+import re
+import shlex
 import subprocess
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import compiler_cache
+
 # Detect platform
 SYSTEM = platform.system()
 IS_WINDOWS = SYSTEM == "Windows"
 IS_MACOS = SYSTEM == "Darwin"
 IS_LINUX = SYSTEM == "Linux"
 
+# imconfig options, each a list of lines for the generated IMGUI_USER_CONFIG
+# header (see write_imconfig)
+IMCONFIG_OPTIONS = {
+    # ShowDemoWindow() and friends become empty stubs
+    "no-demo": ["#define IMGUI_DISABLE_DEMO_WINDOWS"],
+    "no-obsolete": ["#define IMGUI_DISABLE_OBSOLETE_FUNCTIONS", "#define IMGUI_DISABLE_OBSOLETE_KEYIO"],
+    # 32-bit draw indices, for draw lists with more than 64K vertices
+    "index32": ["#define ImDrawIdx unsigned int"],
+    # No malloc/free fallback: the application must call igSetAllocatorFunctions
+    # before igCreateContext, and every ImGui/backend allocation goes through it
+    "custom-alloc": ["#define IMGUI_DISABLE_DEFAULT_ALLOCATORS"],
+}
+
+# Named build variants. 'full' is the development build with default imconfig
+# settings; every other variant is installed to its own subdirectory.
+VARIANTS = {
+    "full": [],
+    "production": ["no-demo", "no-obsolete"],
+    "production-index32": ["no-demo", "no-obsolete", "index32"],
+    "production-alloc": ["no-demo", "no-obsolete", "custom-alloc"],
+}
+
 # Parse command line arguments
-if len(sys.argv) == 3:
-    SDL2_PREFIX = Path(sys.argv[1]).resolve()
-    INSTALL_PREFIX = Path(sys.argv[2]).resolve()
+parser = argparse.ArgumentParser(description="Build cimgui with SDL2 and OpenGL3 backends")
+parser.add_argument("sdl2_prefix", nargs="?", help="SDL2 install prefix (enables CI mode)")
+parser.add_argument("install_prefix", nargs="?", help="Install prefix for cimgui_complete")
+parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="Number of translation units to compile in parallel (default: CPU count)")
+parser.add_argument("--config", choices=["release", "debug", "dist"], default="release",
+                    help="Build configuration (default: release). 'dist' adds hidden visibility, "
+                         "LTO and section GC, and exports only the C API")
+parser.add_argument("--build-dir", type=Path,
+                    help="Directory for objects and the linked library "
+                         "(default: build/cimgui/<platform>-<config>[-unity][-freetype][-static][-pch][-<variant>])")
+parser.add_argument("--unity", action="store_true",
+                    help="Compile amalgamated translation units instead of one object per source")
+parser.add_argument("--freetype", action="store_true",
+                    help="Build imgui_freetype and the font atlas cache, and link FreeType "
+                         "(from SDL2_PREFIX in CI mode)")
+parser.add_argument("--freetype-prefix",
+                    help="FreeType install prefix (default: SDL2_PREFIX in CI mode, the system FreeType otherwise)")
+parser.add_argument("--static", action="store_true",
+                    help="Also build a static libcimgui_complete.a from LTO objects that keep regular "
+                         "machine code (-ffat-lto-objects), for linking ImGui and SDL2 into one executable")
+parser.add_argument("--pch", action="store_true",
+                    help="Precompile imgui.h/imgui_internal.h and SDL.h once and force-include them "
+                         "(.gch/.pch, or /Yc and /Yu with MSVC)")
+parser.add_argument("--generator", choices=["python", "ninja"], default="python",
+                    help="Build with the built-in compile loop (default) or generate a build.ninja in the "
+                         "build directory and run ninja on it")
+parser.add_argument("--generate-only", action="store_true",
+                    help="With --generator ninja: write build.ninja and stop (used by its regeneration rule)")
+parser.add_argument("--install-only", action="store_true",
+                    help="Install the outputs already built in the build directory (used by build.ninja's "
+                         "install target)")
+parser.add_argument("--variant", choices=list(VARIANTS), default="full",
+                    help="imconfig variant (default: full). Variants other than 'full' are "
+                         "installed to INSTALL_PREFIX/<variant>")
+compiler_cache.add_arguments(parser)
+ARGS = parser.parse_args()
+
+if ARGS.sdl2_prefix and not ARGS.install_prefix:
+    parser.error("INSTALL_PREFIX is required when SDL2_PREFIX is given")
+
+if ARGS.generate_only and ARGS.generator != "ninja":
+    parser.error("--generate-only requires --generator ninja")
+if ARGS.pch and ARGS.unity:
+    parser.error("--pch and --unity can't be combined (unity TUs already parse each header once)")
+
+JOBS = max(1, ARGS.jobs)
+
+# ccache/sccache in front of every compile (not links). It isn't part of the
+# object cache keys, so toggling it doesn't invalidate the build directory.
+COMPILER_LAUNCHER = compiler_cache.configure(ARGS.compiler_cache, ARGS.compiler_cache_dir)
+if COMPILER_LAUNCHER and ARGS.pch and compiler_cache.TOOL == "ccache":
+    # ccache only caches precompiled headers, and the TUs using them, with these checks relaxed
+    sloppiness = os.environ.get("CCACHE_SLOPPINESS", "")
+    os.environ["CCACHE_SLOPPINESS"] = ",".join(filter(None, [sloppiness, "pch_defines,time_macros,include_file_mtime,include_file_ctime"]))
+
+if ARGS.sdl2_prefix:
+    SDL2_PREFIX = Path(ARGS.sdl2_prefix).resolve()
+    INSTALL_PREFIX = Path(ARGS.install_prefix).resolve()
     CI_MODE = True
 else:
     # Default paths for local development
@@ -30,6 +127,40 @@ else:
     INSTALL_PREFIX = Path.cwd() / "libs"
     CI_MODE = False
 
+VARIANT = ARGS.variant
+if VARIANT != "full":
+    INSTALL_PREFIX = INSTALL_PREFIX / VARIANT
+
+# Sources are compiled in place; nothing is written into the cimgui submodule
+SOURCE_DIR = Path(__file__).resolve().parent
+CIMGUI_DIR = SOURCE_DIR / "cimgui"
+WRAPPER_DIR = SOURCE_DIR / "imgui_backends"
+
+# Each configuration gets its own build directory so that several builds can
+# run concurrently from one checkout. Compiled objects persist here between
+# runs (see compile_sources).
+BUILD_CONFIG = ARGS.config
+UNITY_BUILD = ARGS.unity
+FREETYPE = ARGS.freetype
+STATIC_LIB = ARGS.static
+GENERATOR = ARGS.generator
+USE_PCH = ARGS.pch
+if ARGS.build_dir:
+    BUILD_DIR = ARGS.build_dir.resolve()
+else:
+    variant = f"{SYSTEM.lower()}-{BUILD_CONFIG}" + ("-unity" if UNITY_BUILD else "")
+    if FREETYPE:
+        variant += "-freetype"
+    if STATIC_LIB:
+        variant += "-static"
+    if USE_PCH:
+        variant += "-pch"
+    if VARIANT != "full":
+        variant += f"-{VARIANT}"
+    BUILD_DIR = SOURCE_DIR / "build" / "cimgui" / variant
+OBJ_DIR = BUILD_DIR / "obj"
+IMCONFIG_PATH = BUILD_DIR / "imconfig_variant.h"
+
 # Platform-specific settings
 if IS_WINDOWS:
     LIB_EXT = ".dll"
@@ -49,8 +180,8 @@ if IS_WINDOWS:
 elif IS_MACOS:
     LIB_EXT = ".dylib"
     LIB_PREFIX = "lib"
-    CC = "clang"
-    CXX = "clang++"
+    CC = os.environ.get("CC", "clang")
+    CXX = os.environ.get("CXX", "clang++")
     EXTRA_CFLAGS = ["-stdlib=libc++"]
     if CI_MODE and SDL2_PREFIX:
         SDL_INCLUDE_DIRS = [f"{SDL2_PREFIX}/include/SDL2", f"{SDL2_PREFIX}/include"]
@@ -62,8 +193,8 @@ elif IS_MACOS:
 else:  # Linux
     LIB_EXT = ".so"
     LIB_PREFIX = "lib"
-    CC = "gcc"
-    CXX = "g++"
+    CC = os.environ.get("CC", "gcc")
+    CXX = os.environ.get("CXX", "g++")
     EXTRA_CFLAGS = []
     if CI_MODE and SDL2_PREFIX:
         # Try both paths since SDL2 CMake install might use either
@@ -72,8 +203,126 @@ else:  # Linux
         # Use $ORIGIN to find SDL2 in same directory as cimgui
         EXTRA_LDFLAGS = [f"-L{SDL_LIB_DIR}", "-lSDL2", "-lGL", "-ldl", "-lm", "-Wl,-rpath,'$ORIGIN'"]
     else:
-        EXTRA_LDFLAGS = ["-L../bindings", "-lSDL2-2.0", "-lGL", "-ldl", "-Wl,-rpath,$ORIGIN/../bindings"]
-        SDL_INCLUDE_DIRS = ["bindings/SDL2-2.32.4/include"]
+        # Absolute, so that commands also work from build.ninja (ninja runs them in BUILD_DIR)
+        EXTRA_LDFLAGS = [f"-L{Path.cwd() / 'bindings'}", "-lSDL2-2.0", "-lGL", "-ldl", "-Wl,-rpath,$ORIGIN/../bindings"]
+        SDL_INCLUDE_DIRS = [str(Path.cwd() / "bindings" / "SDL2-2.32.4" / "include")]
+
+# FreeType font loader: imgui_freetype.cpp replaces stb_truetype for
+# rasterization, and CIMGUI_FREETYPE exposes its C API from cimgui.cpp.
+# We link the FreeType built into the same prefix as SDL2.
+FREETYPE_CFLAGS = []
+FREETYPE_INCLUDE_DIRS = []
+FREETYPE_LDFLAGS = []
+if FREETYPE:
+    FREETYPE_CFLAGS = ["IMGUI_ENABLE_FREETYPE", "CIMGUI_FREETYPE=1"]
+    ft_prefix = ARGS.freetype_prefix or SDL2_PREFIX
+    if ft_prefix:
+        ft_prefix = Path(ft_prefix).resolve()
+        FREETYPE_INCLUDE_DIRS = [ft_prefix / "include" / "freetype2"]
+        if IS_WINDOWS:
+            FREETYPE_LDFLAGS = [f"/LIBPATH:{ft_prefix / 'lib'}", "freetype.lib"]
+        else:
+            FREETYPE_LDFLAGS = [f"-L{ft_prefix / 'lib'}", "-lfreetype"]
+    elif IS_WINDOWS:
+        FREETYPE_LDFLAGS = ["freetype.lib"]
+    else:
+        FREETYPE_INCLUDE_DIRS = [Path("/usr/include/freetype2"), Path("/usr/local/include/freetype2")]
+        FREETYPE_LDFLAGS = ["-lfreetype"]
+
+# Extra flags from the environment (e.g. build_pgo.py's instrumentation and
+# profile-use flags). They are part of the compile command, so changing them
+# invalidates cached objects.
+if IS_WINDOWS:
+    ENV_CXXFLAGS = []
+    ENV_LDFLAGS = []
+else:
+    ENV_CXXFLAGS = shlex.split(os.environ.get("CXXFLAGS", ""))
+    ENV_LDFLAGS = shlex.split(os.environ.get("LDFLAGS", ""))
+
+# Per-configuration optimization/debug flags. The 'dist' configuration hides
+# every symbol that isn't part of the C API (see write_export_list) so the
+# dynamic symbol table only holds what LuaJIT's ffi.load actually looks up.
+if IS_WINDOWS:
+    # MSVC only exports __declspec(dllexport) symbols, so no export list is needed
+    CONFIG_CFLAGS = {
+        "release": ["/O2", "/DNDEBUG"],
+        "debug": ["/Od", "/Z7"],
+        "dist": ["/O2", "/DNDEBUG", "/GL", "/Gy", "/Gw"],
+    }
+    CONFIG_LDFLAGS = {
+        "release": [],
+        "debug": ["/DEBUG"],
+        "dist": ["/LTCG", "/OPT:REF", "/OPT:ICF"],
+    }
+else:
+    CONFIG_CFLAGS = {
+        "release": ["-O2"],
+        "debug": ["-O0", "-g"],
+        "dist": ["-O2", "-flto", "-fvisibility=hidden", "-fvisibility-inlines-hidden",
+                 "-ffunction-sections", "-fdata-sections"],
+    }
+    CONFIG_LDFLAGS = {
+        "release": [],
+        "debug": [],
+        "dist": ["-O2", "-flto", "-Wl,-dead_strip"] if IS_MACOS else ["-O2", "-flto=auto", "-Wl,--gc-sections"],
+    }
+
+# Translation units linked into cimgui_complete, relative to SOURCE_DIR
+SOURCES = [
+    "cimgui/cimgui.cpp",
+    "cimgui/imgui/imgui.cpp",
+    "cimgui/imgui/imgui_draw.cpp",
+    "cimgui/imgui/imgui_tables.cpp",
+    "cimgui/imgui/imgui_widgets.cpp",
+    "cimgui/imgui/imgui_demo.cpp",
+    "cimgui/imgui/backends/imgui_impl_sdl2.cpp",
+    "cimgui/imgui/backends/imgui_impl_opengl3.cpp",
+    "imgui_backends/cimgui_sdl2_opengl3.cpp",
+    "imgui_backends/cimgui_opengl3_stream.cpp",
+    "imgui_backends/cimgui_draw_data.cpp",
+    "imgui_backends/cimgui_text.cpp",
+]
+# The font atlas cache builds on the dynamic atlas internals of ImGui 1.92+
+FREETYPE_SOURCES = ["cimgui/imgui/misc/freetype/imgui_freetype.cpp", "imgui_backends/cimgui_font_cache.cpp"]
+if FREETYPE:
+    SOURCES += FREETYPE_SOURCES
+
+# Unity build groups: each group is amalgamated into one translation unit.
+# The ImGui core shares imgui.h/imgui_internal.h; the backends and our
+# wrapper share the SDL2 and GL loader headers.
+UNITY_GROUPS = {
+    "unity_core.cpp": SOURCES[:6],
+    "unity_backends.cpp": SOURCES[6:12],
+}
+if FREETYPE:
+    # FreeType's headers stay out of the ImGui core TU
+    UNITY_GROUPS["unity_freetype.cpp"] = FREETYPE_SOURCES
+
+# Precompiled headers (--pch): each header is compiled once per build
+# directory and force-included into the translation units mapped to it.
+# imgui.cpp and friends define IMGUI_DEFINE_MATH_OPERATORS before including
+# imgui.h, so the header has to as well. imgui_demo.cpp and the headers that
+# need per-file macros (the GL loader, stb_truetype) are left alone.
+PCH_HEADERS = {
+    "imgui_pch.h": ["#define IMGUI_DEFINE_MATH_OPERATORS", '#include "imgui.h"', '#include "imgui_internal.h"'],
+    "backends_pch.h": ['#include "imgui.h"', "#include <SDL.h>"],
+}
+PCH_SOURCES = {
+    "cimgui/cimgui.cpp": "imgui_pch.h",
+    "cimgui/imgui/imgui.cpp": "imgui_pch.h",
+    "cimgui/imgui/imgui_draw.cpp": "imgui_pch.h",
+    "cimgui/imgui/imgui_tables.cpp": "imgui_pch.h",
+    "cimgui/imgui/imgui_widgets.cpp": "imgui_pch.h",
+    "cimgui/imgui/misc/freetype/imgui_freetype.cpp": "imgui_pch.h",
+    "imgui_backends/cimgui_font_cache.cpp": "imgui_pch.h",
+    "imgui_backends/cimgui_draw_data.cpp": "imgui_pch.h",
+    "imgui_backends/cimgui_text.cpp": "imgui_pch.h",
+    "cimgui/imgui/backends/imgui_impl_sdl2.cpp": "backends_pch.h",
+    "cimgui/imgui/backends/imgui_impl_opengl3.cpp": "backends_pch.h",
+    "imgui_backends/cimgui_sdl2_opengl3.cpp": "backends_pch.h",
+    "imgui_backends/cimgui_opengl3_stream.cpp": "backends_pch.h",
+}
+PCH_DIR = BUILD_DIR / "pch"
 
 # Simple text output - no colors to avoid encoding issues
 
@@ -129,9 +378,9 @@ def check_dependencies():
             print_success(f"Using SDL2 library from: {sdl_lib}")
         
         # Check headers in bindings
-        sdl_headers = Path(SDL_INCLUDE)
+        sdl_headers = Path(SDL_INCLUDE_DIRS[0])
         if not sdl_headers.exists():
-            print_error(f"SDL2 headers not found in {SDL_INCLUDE}")
+            print_error(f"SDL2 headers not found in {sdl_headers}")
             print("  The bindings/SDL2-2.32.4/include directory is missing")
             deps_ok = False
         else:
@@ -153,30 +402,30 @@ def check_submodule():
     """Initialize and update cimgui submodule if needed"""
     print_step("Checking cimgui submodule...")
     
-    cimgui_dir = Path("cimgui")
+    cimgui_dir = CIMGUI_DIR
     
     # Check if submodule is initialized
     if not cimgui_dir.exists():
         print("  Initializing submodule...")
-        if not run_cmd(["git", "submodule", "update", "--init", "--recursive"]):
+        if not run_cmd(["git", "submodule", "update", "--init", "--recursive"], cwd=SOURCE_DIR):
             print_error("Failed to initialize submodule")
             return False
     
     # Check if submodule is clean (no uncommitted changes)
-    success, stdout, _ = run_cmd(["git", "status", "--porcelain"], cwd="cimgui", capture=True)
+    success, stdout, _ = run_cmd(["git", "status", "--porcelain"], cwd=CIMGUI_DIR, capture=True)
     if success and stdout.strip():
         print_warning("cimgui submodule has uncommitted changes")
         if CI_MODE:
             # In CI, automatically reset to clean state
             print("  CI mode: Resetting submodule to clean state...")
-            run_cmd(["git", "reset", "--hard"], cwd="cimgui")
-            run_cmd(["git", "clean", "-fd"], cwd="cimgui")
+            run_cmd(["git", "reset", "--hard"], cwd=CIMGUI_DIR)
+            run_cmd(["git", "clean", "-fd"], cwd=CIMGUI_DIR)
             print_success("Submodule reset to clean state")
         else:
             response = input("  Reset submodule to clean state? (y/n): ")
             if response.lower() == 'y':
-                run_cmd(["git", "reset", "--hard"], cwd="cimgui")
-                run_cmd(["git", "clean", "-fd"], cwd="cimgui")
+                run_cmd(["git", "reset", "--hard"], cwd=CIMGUI_DIR)
+                run_cmd(["git", "clean", "-fd"], cwd=CIMGUI_DIR)
                 print_success("Submodule reset to clean state")
             else:
                 print_warning("Continuing with modified submodule...")
@@ -184,7 +433,7 @@ def check_submodule():
     # Check for imgui submodule inside cimgui
     if not (cimgui_dir / "imgui").exists():
         print("  Initializing imgui submodule inside cimgui...")
-        if not run_cmd(["git", "submodule", "update", "--init", "--recursive"], cwd="cimgui"):
+        if not run_cmd(["git", "submodule", "update", "--init", "--recursive"], cwd=CIMGUI_DIR):
             print_error("Failed to initialize imgui submodule")
             return False
     
@@ -200,8 +449,8 @@ def ensure_directories():
         Path(d).mkdir(exist_ok=True)
     
     # Check our wrapper files exist
-    wrapper_cpp = Path("imgui_backends/cimgui_sdl2_opengl3.cpp")
-    wrapper_h = Path("imgui_backends/cimgui_sdl2_opengl3.h")
+    wrapper_cpp = WRAPPER_DIR / "cimgui_sdl2_opengl3.cpp"
+    wrapper_h = WRAPPER_DIR / "cimgui_sdl2_opengl3.h"
     
     if not wrapper_cpp.exists() or not wrapper_h.exists():
         print_error("Wrapper files not found in imgui_backends/")
@@ -211,147 +460,843 @@ def ensure_directories():
     print_success("Directories ready")
     return True
 
-def build_library():
-    """Build the complete ImGui library"""
-    print_step("Building cimgui library...")
+def object_name(src):
+    """Object file path inside OBJ_DIR for a source path relative to SOURCE_DIR"""
+    ext = ".obj" if IS_WINDOWS else ".o"
+    if os.path.isabs(src):
+        # Generated sources (unity TUs) live in BUILD_DIR
+        src = os.path.basename(src)
+    return str(OBJ_DIR / src.replace(".cpp", ext).replace("/", "_"))
+
+_compiler_identity = None
+
+def compiler_identity():
+    """Version banner of CXX, used as part of every object's cache key"""
+    global _compiler_identity
+    if _compiler_identity is None:
+        if IS_WINDOWS:
+            # cl.exe prints its version banner to stderr when run without arguments
+            _, stdout, stderr = run_cmd([CXX], capture=True)
+            _compiler_identity = stderr.strip() or stdout.strip()
+        else:
+            _, stdout, _ = run_cmd([CXX, "--version"], capture=True)
+            _compiler_identity = stdout.strip()
+    return _compiler_identity
+
+_file_digests = {}
+
+def file_digest(path):
+    """sha256 of a file's contents, memoized for the duration of the run"""
+    path = os.path.abspath(path)
+    if path not in _file_digests:
+        try:
+            with open(path, "rb") as f:
+                _file_digests[path] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            _file_digests[path] = None
+    return _file_digests[path]
+
+def profile_inputs(cmd):
+    """PGO profile files read by a compile command via -fprofile-use.
     
-    # Ensure install directory exists
-    INSTALL_PREFIX.mkdir(parents=True, exist_ok=True)
+    Clang reads a single .profdata file; GCC reads every .gcda file in a
+    directory. The command line doesn't change when profiles are retrained,
+    so their contents have to be part of the cache key.
+    """
+    paths = []
+    for arg in cmd:
+        if arg.startswith("-fprofile-use="):
+            path = Path(arg.split("=", 1)[1])
+            if path.is_dir():
+                paths += sorted(str(p) for p in path.rglob("*.gcda"))
+            else:
+                paths.append(str(path))
+    return paths
+
+def cache_key(src, cmd, headers):
+    """Key an object by compiler, full command line, source, header and profile contents.
     
-    # Copy our wrapper files into cimgui temporarily (if they exist)
-    wrapper_cpp = Path("imgui_backends/cimgui_sdl2_opengl3.cpp")
-    wrapper_h = Path("imgui_backends/cimgui_sdl2_opengl3.h")
-    has_wrappers = wrapper_cpp.exists() and wrapper_h.exists()
-    
-    if has_wrappers:
-        print("  Including SDL2/OpenGL3 wrappers...")
-        shutil.copy(wrapper_cpp, "cimgui/")
-        shutil.copy(wrapper_h, "cimgui/")
-    
-    # Change to cimgui directory
-    os.chdir("cimgui")
-    
-    # Source files to compile
-    sources = [
-        "cimgui.cpp",
-        "imgui/imgui.cpp",
-        "imgui/imgui_draw.cpp",
-        "imgui/imgui_tables.cpp", 
-        "imgui/imgui_widgets.cpp",
-        "imgui/imgui_demo.cpp",
-        "imgui/backends/imgui_impl_sdl2.cpp",
-        "imgui/backends/imgui_impl_opengl3.cpp",
-        "cimgui_sdl2_opengl3.cpp"
-    ]
+    Returns None if any input can no longer be read, which forces a rebuild.
+    """
+    h = hashlib.sha256()
+    h.update(compiler_identity().encode())
+    h.update("\0".join(cmd).encode())
+    for path in [src] + sorted(headers) + profile_inputs(cmd):
+        digest = file_digest(path)
+        if digest is None:
+            return None
+        h.update(f"\0{os.path.abspath(path)}\0{digest}".encode())
+    return h.hexdigest()
+
+def parse_depfile(text):
+    """Parse a make-style depfile written by -MD into a list of prerequisites"""
+    text = text.replace("\\\n", " ").replace("\\\r\n", " ")
+    _, _, deps = text.partition(": ")
+    paths = []
+    current = ""
+    for token in deps.split(" "):
+        if token.endswith("\\"):
+            # Escaped space inside a path
+            current += token[:-1] + " "
+            continue
+        current += token
+        if current.strip():
+            paths.append(current.strip())
+        current = ""
+    return paths
+
+def split_show_includes(output):
+    """Separate MSVC /showIncludes notes from real compiler output"""
+    headers = []
+    lines = []
+    for line in output.splitlines():
+        if line.startswith("Note: including file:"):
+            headers.append(line.split(":", 2)[2].strip())
+        else:
+            lines.append(line)
+    return headers, "\n".join(lines)
+
+def manifest_path(obj):
+    """Cache manifest stored next to each object"""
+    return obj + ".json"
+
+def is_up_to_date(src, obj, cmd):
+    """Check an object against the key recorded when it was last compiled"""
+    if not os.path.exists(obj):
+        return False
+    try:
+        with open(manifest_path(obj)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    key = cache_key(src, cmd, manifest.get("headers", []))
+    return key is not None and key == manifest.get("key")
+
+def write_manifest(src, obj, cmd, headers, seconds):
+    """Record the cache key and compile time of a freshly compiled object"""
+    src_path = os.path.abspath(src)
+    headers = sorted({os.path.abspath(h) for h in headers} - {src_path})
+    manifest = {"source": src_path, "key": cache_key(src, cmd, headers), "headers": headers,
+                "seconds": round(seconds, 3)}
+    tmp = manifest_path(obj) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, manifest_path(obj))
+
+def launched(cmd):
+    """A compile command run through COMPILER_LAUNCHER, if any"""
+    return [COMPILER_LAUNCHER] + cmd if COMPILER_LAUNCHER else cmd
+
+def compile_source(src, obj, cmd):
+    """Compile one TU and record its cache manifest. Returns (success, output)"""
+    start = time.monotonic()
+    success, stdout, stderr = run_cmd(launched(cmd), capture=True)
+    seconds = time.monotonic() - start
+    output = stdout + stderr
+    if IS_WINDOWS:
+        headers, output = split_show_includes(output)
+    else:
+        depfile = obj + ".d"
+        headers = []
+        if success and os.path.exists(depfile):
+            with open(depfile) as f:
+                headers = parse_depfile(f.read())
+            os.remove(depfile)
     
-    # Compile each source file
-    obj_files = []
-    failed = False
+    if success:
+        write_manifest(src, obj, cmd, headers + pch_headers(cmd), seconds)
+    elif os.path.exists(manifest_path(obj)):
+        os.remove(manifest_path(obj))
+    return success, output.strip()
+
+def write_imconfig():
+    """Generate the IMGUI_USER_CONFIG header for VARIANT in BUILD_DIR.
     
-    for i, src in enumerate(sources, 1):
-        print(f"  [{i}/{len(sources)}] Compiling {src}...")
-        
+    imgui.h includes it before imconfig.h, so the defines apply to cimgui,
+    ImGui, the backends and our wrapper alike. The file is only rewritten
+    when its contents change; it is tracked through the depfiles like any
+    other header.
+    """
+    if VARIANT == "full":
+        return
+    lines = [f"// Generated by build_imgui.py --variant {VARIANT}. Do not edit.", "#pragma once"]
+    for option in VARIANTS[VARIANT]:
+        lines.append(f"// {option}")
+        lines += IMCONFIG_OPTIONS[option]
+    content = "\n".join(lines) + "\n"
+    if not IMCONFIG_PATH.exists() or IMCONFIG_PATH.read_text() != content:
+        IMCONFIG_PATH.write_text(content)
+    print(f"  imconfig: {', '.join(VARIANTS[VARIANT])}")
+
+def imconfig_flags(define):
+    """Compiler flags that point imgui.h at the variant's imconfig header"""
+    if VARIANT == "full":
+        return []
+    return [f'{define}IMGUI_USER_CONFIG="{IMCONFIG_PATH.as_posix()}"']
+
+def static_lto_flags():
+    """Extra compile and link flags for objects that also go into the static archive.
+    
+    GCC's fat LTO objects carry both GIMPLE and machine code: executables
+    that link the archive with -flto get whole-program optimization across
+    ImGui, the backends and their own code, everything else links the
+    machine code. Clang (and MSVC's /GL) objects hold IR only and would tie
+    the archive to one compiler version, so other compilers archive the
+    plain objects.
+    """
+    if not STATIC_LIB or BUILD_CONFIG == "debug" or IS_WINDOWS or "clang" in compiler_identity().lower():
+        return [], []
+    cflags = ["-ffat-lto-objects"]
+    if "-flto" not in CONFIG_CFLAGS[BUILD_CONFIG]:
+        cflags.insert(0, "-flto")
+    ldflags = [] if "-flto=auto" in CONFIG_LDFLAGS[BUILD_CONFIG] else ["-flto=auto"]
+    return cflags, ldflags
+
+def write_pch_headers():
+    """Generate the precompiled header sources in PCH_DIR (only rewritten when they change)"""
+    PCH_DIR.mkdir(parents=True, exist_ok=True)
+    for name, includes in PCH_HEADERS.items():
+        content = "\n".join(["// Generated by build_imgui.py --pch. Do not edit."] + includes) + "\n"
+        path = PCH_DIR / name
+        if not path.exists() or path.read_text() != content:
+            path.write_text(content)
         if IS_WINDOWS:
-            obj = src.replace(".cpp", ".obj").replace("/", "_")
-            cmd = [CXX, "/c", src, f"/Fo{obj}", "/O2", "/EHsc"]
-            cmd += ["/I.", "/Iimgui", "/Iimgui/backends"]
-            
-            # Add SDL2 include paths
-            for inc_dir in SDL_INCLUDE_DIRS:
-                cmd += [f"/I{inc_dir}"]
-            
-            cmd += ["/D_WINDOWS", "/DNDEBUG"]
-            cmd += EXTRA_CFLAGS
+            # /Yc compiles a source file up to and including the header
+            cpp = path.with_suffix(".cpp")
+            content = f'#include "{path}"\n'
+            if not cpp.exists() or cpp.read_text() != content:
+                cpp.write_text(content)
+
+def pch_output(name):
+    """Precompiled header file: next to the header for GCC/Clang, which find it via -include"""
+    header = PCH_DIR / name
+    if IS_WINDOWS:
+        return header.with_suffix(".pch")
+    return Path(str(header) + (".pch" if "clang" in compiler_identity().lower() else ".gch"))
+
+def pch_build(name):
+    """(source, output, command) that precompiles one header.
+    
+    MSVC's /Yc also writes an object file that has to be linked; for
+    GCC/Clang the output is the .gch/.pch itself.
+    """
+    header = PCH_DIR / name
+    if IS_WINDOWS:
+        src = str(header.with_suffix(".cpp"))
+        obj = str(header.with_suffix(".obj"))
+        cmd = compile_command(src, obj) + [f"/Yc{header}", f"/Fp{pch_output(name)}"]
+    else:
+        src = str(header)
+        obj = str(pch_output(name))
+        cmd = compile_command(src, obj)
+        cmd[cmd.index(src):cmd.index(src)] = ["-x", "c++-header"]
+    return src, obj, cmd
+
+def pch_flags(name):
+    """Flags that make a translation unit use a precompiled header"""
+    header = PCH_DIR / name
+    if IS_WINDOWS:
+        return [f"/Yu{header}", f"/FI{header}", f"/Fp{pch_output(name)}"]
+    # -Winvalid-pch: say so instead of silently parsing the headers again
+    flags = ["-include", str(header), "-Winvalid-pch"]
+    if compiler_cache.TOOL == "ccache":
+        # Lets ccache hash the preprocessed output without expanding the PCH
+        flags.append("-fpch-preprocess")
+    return flags
+
+def pch_headers(cmd):
+    """Headers a compile command reads through its precompiled header.
+    
+    The compiler's dependency output omits whatever came from the PCH, so
+    they are taken from the PCH's own cache manifest instead. Without them
+    an edit to imgui.h would rebuild the PCH but not the objects using it.
+    """
+    headers = []
+    for i, arg in enumerate(cmd):
+        if arg == "-include" and i + 1 < len(cmd):
+            header = Path(cmd[i + 1])
+        elif arg.startswith("/FI"):
+            header = Path(arg[3:])
         else:
-            obj = src.replace(".cpp", ".o").replace("/", "_")
-            cmd = [CXX, "-O2", "-fPIC", "-c", src, "-o", obj]
-            cmd += ["-I.", "-Iimgui", "-Iimgui/backends"]
-            
-            # Add SDL2 include paths
-            if CI_MODE:
-                for inc_dir in SDL_INCLUDE_DIRS:
-                    cmd += [f"-I{inc_dir}"]
-            else:
-                for inc_dir in SDL_INCLUDE_DIRS:
-                    cmd += [f"-I../{inc_dir}"]
-            
-            cmd += ["-D_REENTRANT"]
-            cmd += EXTRA_CFLAGS
+            continue
+        if header.parent != PCH_DIR or header.name not in PCH_HEADERS:
+            continue
+        headers.append(str(header))
+        try:
+            with open(manifest_path(pch_build(header.name)[1])) as f:
+                headers += json.load(f).get("headers", [])
+        except (OSError, ValueError):
+            pass
+    return headers
+
+def pch_for(src):
+    """Precompiled header used by a source (relative to SOURCE_DIR), or None"""
+    return PCH_SOURCES.get(src) if USE_PCH else None
+
+def compile_command(src, obj, pch=None):
+    """Compiler command line for a single translation unit"""
+    include_dirs = [CIMGUI_DIR, CIMGUI_DIR / "imgui", CIMGUI_DIR / "imgui" / "backends"]
+    include_dirs += SDL_INCLUDE_DIRS
+    include_dirs += FREETYPE_INCLUDE_DIRS
+    
+    if IS_WINDOWS:
+        cmd = [CXX, "/c", src, f"/Fo{obj}", "/EHsc", "/showIncludes"]
+        cmd += CONFIG_CFLAGS[BUILD_CONFIG]
+        cmd += [f"/I{inc_dir}" for inc_dir in include_dirs]
+        cmd += ["/D_WINDOWS"]
+        cmd += [f"/D{define}" for define in FREETYPE_CFLAGS]
+        cmd += imconfig_flags("/D")
+        cmd += EXTRA_CFLAGS
+    else:
+        cmd = [CXX, "-fPIC", "-c", src, "-o", obj, "-MD", "-MF", obj + ".d"]
+        cmd += CONFIG_CFLAGS[BUILD_CONFIG]
+        cmd += [f"-I{inc_dir}" for inc_dir in include_dirs]
+        cmd += ["-D_REENTRANT"]
+        cmd += [f"-D{define}" for define in FREETYPE_CFLAGS]
+        cmd += imconfig_flags("-D")
+        cmd += static_lto_flags()[0]
+        cmd += EXTRA_CFLAGS
+        cmd += ENV_CXXFLAGS
+    if pch:
+        cmd += pch_flags(pch)
+    return cmd
+
+def compile_units(units, kind):
+    """Compile the stale entries of units, a list of (label, source, object, command).
+    
+    Objects whose cache key (compiler, flags, source and included headers)
+    is unchanged since the last run are reused. Stale units are compiled by
+    a pool of JOBS workers, and every job is drained even after a failure so
+    that all broken units are reported in one run. Returns False if any unit
+    failed to compile.
+    """
+    total = len(units)
+    stale = []
+    for label, src_path, obj, cmd in units:
+        if is_up_to_date(src_path, obj, cmd):
+            print(f"  [cached] {label}")
+        else:
+            stale.append((label, src_path, obj, cmd))
+    
+    if not stale:
+        print(f"  All {total} {kind} are up to date")
+        return True
+    
+    print(f"  Compiling {len(stale)} of {total} {kind} ({JOBS} parallel jobs)...")
+    
+    failures = []
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=JOBS)
+    try:
+        futures = {}
+        for label, src_path, obj, cmd in stale:
+            futures[pool.submit(compile_source, src_path, obj, cmd)] = label
         
-        if not run_cmd(cmd):
-            print_error(f"Failed to compile {src}")
-            failed = True
-            break
-        obj_files.append(obj)
+        for future in as_completed(futures):
+            src = futures[future]
+            done += 1
+            # Output is captured per TU so parallel diagnostics don't interleave
+            success, output = future.result()
+            if success:
+                print(f"  [{done}/{len(stale)}] Compiled {src}")
+            else:
+                print_error(f"[{done}/{len(stale)}] Failed to compile {src}")
+                failures.append(src)
+            if output:
+                print(output)
+    except KeyboardInterrupt:
+        # Don't start queued TUs; running compilers get the same SIGINT
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    
+    if failures:
+        print_error(f"{len(failures)} of {total} {kind} failed:")
+        for label in sorted(failures, key=[entry[0] for entry in stale].index):
+            print(f"    {label}")
+        return False
+    return True
+
+def compile_sources(sources):
+    """Compile stale translation units, reusing cached objects from OBJ_DIR.
+    
+    With --pch the precompiled headers are brought up to date first; they
+    are cached like any object, so editing a header they include or
+    changing flags rebuilds them. Returns the object files to link, or None
+    if anything failed to compile.
+    """
+    OBJ_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"  Compiler: {compiler_identity().splitlines()[0] if compiler_identity() else CXX}")
+    
+    if USE_PCH:
+        write_pch_headers()
+        pch_units = [(name,) + pch_build(name) for name in PCH_HEADERS]
+        if not compile_units(pch_units, "precompiled headers"):
+            return None
+    
+    units = []
+    for src in sources:
+        src_path = str(SOURCE_DIR / src)
+        obj = object_name(src)
+        cmd = compile_command(src_path, obj, pch_for(src))
+        # Generated sources are shown by file name only
+        label = os.path.basename(src) if os.path.isabs(src) else src
+        units.append((label, src_path, obj, cmd))
+    if not compile_units(units, "translation units"):
+        return None
+    
+    obj_files = [object_name(src) for src in sources]
+    if USE_PCH:
+        report_pch_speedup(sources)
+        if IS_WINDOWS:
+            # Objects written by /Yc
+            obj_files += [pch_build(name)[1] for name in PCH_HEADERS]
+    return obj_files
+
+def recorded_seconds(obj):
+    """Compile time recorded in an object's cache manifest, or None"""
+    try:
+        with open(manifest_path(obj)) as f:
+            return json.load(f).get("seconds")
+    except (OSError, ValueError):
+        return None
+
+def report_pch_speedup(sources):
+    """Compare the compile time of this build with the same build without --pch.
+    
+    Times come from the cache manifests, so they are those of the last
+    actual compile of each object. The baseline is the default build
+    directory of the configuration without -pch.
+    """
+    tu_times = [recorded_seconds(object_name(src)) for src in sources]
+    pch_times = [recorded_seconds(pch_build(name)[1]) for name in PCH_HEADERS]
+    if None in tu_times or None in pch_times:
+        return
+    with_pch = sum(tu_times) + sum(pch_times)
+    print(f"  Compile time with PCH: {with_pch:.1f} s "
+          f"({sum(pch_times):.1f} s precompiling headers, {sum(tu_times):.1f} s translation units)")
+    
+    if ARGS.build_dir:
+        return
+    baseline_dir = BUILD_DIR.parent / BUILD_DIR.name.replace("-pch", "", 1)
+    baseline = [recorded_seconds(str(baseline_dir / "obj" / Path(object_name(src)).name)) for src in sources]
+    if None in baseline:
+        print(f"  Build once without --pch (into {baseline_dir}) to compare")
+        return
+    print(f"  Compile time without PCH: {sum(baseline):.1f} s -> {sum(baseline) / with_pch:.2f}x")
+
+def write_unity_sources():
+    """Generate the amalgamated translation units in BUILD_DIR/unity.
+    
+    Files are only rewritten when their contents change. Returns the
+    absolute paths of the generated sources.
+    """
+    unity_dir = BUILD_DIR / "unity"
+    unity_dir.mkdir(parents=True, exist_ok=True)
     
-    if not failed:
-        # Link into shared library
-        print("  Linking library...")
-        output = f"cimgui_complete{LIB_EXT}"
+    unity_sources = []
+    for name, group in UNITY_GROUPS.items():
+        lines = ["// Generated by build_imgui.py --unity. Do not edit."]
+        lines += [f'#include "{(SOURCE_DIR / src).as_posix()}"' for src in group]
+        content = "\n".join(lines) + "\n"
         
+        path = unity_dir / name
+        if not path.exists() or path.read_text() != content:
+            path.write_text(content)
+        unity_sources.append(str(path))
+    return unity_sources
+
+_build_dir_lock = None
+
+def lock_build_dir():
+    """Take an exclusive lock on BUILD_DIR for the lifetime of this process.
+    
+    Builds with different build directories never contend; a second build
+    into the same directory fails fast instead of corrupting objects.
+    """
+    global _build_dir_lock
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    lock_file = open(BUILD_DIR / ".lock", "a+")
+    try:
         if IS_WINDOWS:
-            cmd = ["link.exe", "/DLL", f"/OUT:{output}"] + obj_files
-            cmd += EXTRA_LDFLAGS
+            import msvcrt
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
         else:
-            cmd = [CXX, "-shared"] + obj_files + ["-o", output]
-            cmd += EXTRA_LDFLAGS
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _build_dir_lock = lock_file
+    return True
+
+# Exported C API: cimgui's ig*/Im* functions and our cImGui_* wrappers
+EXPORT_HEADERS = [
+    (CIMGUI_DIR / "cimgui.h", re.compile(r"^\s*CIMGUI_API\b[^(]*?\b((?:ig|Im)\w*)\s*\(", re.M)),
+    (WRAPPER_DIR / "cimgui_sdl2_opengl3.h", re.compile(r"^\s*CIMGUI_IMPL_API\b[^(]*?\b(cImGui_\w*)\s*\(", re.M)),
+]
+
+# Declared unconditionally but only compiled with --freetype
+FREETYPE_SYMBOL_PREFIXES = ("ImGuiFreeType_", "cImGui_FontAtlas_")
+
+def exported_symbols():
+    """Names of the C API functions declared in the installed headers"""
+    symbols = set()
+    for header, pattern in EXPORT_HEADERS:
+        symbols.update(pattern.findall(header.read_text(errors="replace")))
+    if not FREETYPE:
+        symbols = {name for name in symbols if not name.startswith(FREETYPE_SYMBOL_PREFIXES)}
+    return sorted(symbols)
+
+def write_export_list():
+    """Generate the linker export list for the dist configuration.
+    
+    GNU ld gets a version script with everything else made local; Apple ld
+    gets an exported symbols list. Returns the linker flags that apply it.
+    """
+    symbols = exported_symbols()
+    print(f"  Exporting {len(symbols)} C API symbols")
+    if IS_MACOS:
+        path = BUILD_DIR / "exports.txt"
+        path.write_text("".join(f"_{name}\n" for name in symbols))
+        return [f"-Wl,-exported_symbols_list,{path}"]
+    
+    path = BUILD_DIR / "exports.map"
+    lines = ["{", "  global:"] + [f"    {name};" for name in symbols] + ["  local: *;", "};"]
+    path.write_text("\n".join(lines) + "\n")
+    return [f"-Wl,--version-script={path}"]
+
+def link_command(obj_files, output):
+    """Linker command line for the cimgui_complete shared library"""
+    if IS_WINDOWS:
+        cmd = ["link.exe", "/DLL", f"/OUT:{output}"] + obj_files
+        cmd += CONFIG_LDFLAGS[BUILD_CONFIG]
+        cmd += EXTRA_LDFLAGS
+        cmd += FREETYPE_LDFLAGS
+    else:
+        cmd = [CXX, "-shared"] + obj_files + ["-o", str(output)]
+        cmd += CONFIG_LDFLAGS[BUILD_CONFIG]
+        cmd += static_lto_flags()[1]
+        if BUILD_CONFIG == "dist":
+            cmd += write_export_list()
+        cmd += EXTRA_LDFLAGS
+        cmd += FREETYPE_LDFLAGS
+        cmd += ENV_LDFLAGS
+    return cmd
+
+def link_library(obj_files, output):
+    """Link compiled objects into the cimgui_complete shared library"""
+    print("  Linking library...")
+    if not run_cmd(link_command(obj_files, output)):
+        print_error("Failed to link library")
+        return False
+    return True
+
+def static_library_name():
+    """File name of the static archive (cimgui_complete.lib is the DLL's import library on Windows)"""
+    return "cimgui_complete_static.lib" if IS_WINDOWS else "libcimgui_complete.a"
+
+def archive_command(obj_files, output):
+    """Archiver command line for the static library"""
+    if IS_WINDOWS:
+        return ["lib.exe", "/nologo", f"/OUT:{output}"] + obj_files
+    # gcc-ar also indexes the LTO symbol tables of the objects
+    default_ar = "gcc-ar" if shutil.which("gcc-ar") and "clang" not in compiler_identity().lower() else "ar"
+    return [os.environ.get("AR", default_ar), "rcs", str(output)] + obj_files
+
+def archive_library(obj_files, output):
+    """Collect the compiled objects into a static archive"""
+    print("  Creating static archive...")
+    if output.exists():
+        # ar would add to the old archive instead of replacing it
+        output.unlink()
+    if not run_cmd(archive_command(obj_files, output)):
+        print_error("Failed to create static archive")
+        return False
+    return True
+
+def write_pkgconfig(pc_dir):
+    """Write a pkg-config file describing how to link the static archive"""
+    if IS_WINDOWS:
+        return
+    # Everything cimgui_complete needs besides SDL2 itself, which consumers
+    # pick up from SDL2's own sdl2.pc (static: pkg-config --static sdl2)
+    system_libs = ["-framework OpenGL"] if IS_MACOS else ["-lGL", "-ldl", "-lm"]
+    if FREETYPE:
+        system_libs.insert(0, "-lfreetype")
+    system_libs.append("-lc++" if IS_MACOS else "-lstdc++")
+    lines = [
+        f"prefix={INSTALL_PREFIX.as_posix()}",
+        "libdir=${prefix}/lib",
+        "includedir=${prefix}/include",
+        "",
+        "Name: cimgui_complete",
+        f"Description: cimgui with SDL2 and OpenGL3 backends ({VARIANT}, static)",
+        "Version: 1.0",
+        "Requires.private: sdl2",
+        "Cflags: -I${includedir}/cimgui",
+        # The shared library sits next to the archive; name the archive so -l doesn't pick the .so
+        "Libs: ${libdir}/libcimgui_complete.a",
+        f"Libs.private: {' '.join(system_libs)}",
+    ]
+    pc_dir.mkdir(parents=True, exist_ok=True)
+    (pc_dir / "cimgui_complete.pc").write_text("\n".join(lines) + "\n")
+
+def install_cimgui_header(dest):
+    """Install cimgui.h, matching its ImDrawIdx typedef to the variant.
+    
+    cimgui.h declares ImDrawIdx itself for C users, so the index32 variant
+    has to rewrite it or FFI users would read index buffers with the wrong
+    stride.
+    """
+    text = (CIMGUI_DIR / "cimgui.h").read_text(errors="replace")
+    if "index32" in VARIANTS[VARIANT]:
+        text, count = re.subn(r"\btypedef\s+unsigned\s+short\s+ImDrawIdx\s*;",
+                              "typedef unsigned int ImDrawIdx;", text)
+        if count == 0:
+            print_warning("ImDrawIdx typedef not found in cimgui.h; installed header left unchanged")
+    dest.write_text(text)
+
+def install_library(output, archive=None):
+    """Copy the linked library, the static archive (and headers in CI mode) to INSTALL_PREFIX"""
+    wrapper_h = WRAPPER_DIR / "cimgui_sdl2_opengl3.h"
+    
+    if CI_MODE:
+        # For CI, install to proper directories
+        lib_dir = INSTALL_PREFIX / "lib"
+        bin_dir = INSTALL_PREFIX / "bin"
+        inc_dir = INSTALL_PREFIX / "include" / "cimgui"
         
-        if not run_cmd(cmd):
-            print_error("Failed to link library")
-            failed = True
-    
-    # Clean up regardless of success
-    print("  Cleaning up...")
-    
-    # Remove our copied files
-    if os.path.exists("cimgui_sdl2_opengl3.cpp"):
-        os.remove("cimgui_sdl2_opengl3.cpp")
-    if os.path.exists("cimgui_sdl2_opengl3.h"):
-        os.remove("cimgui_sdl2_opengl3.h")
-    
-    # Remove object files
-    for obj in obj_files:
-        if os.path.exists(obj):
-            os.remove(obj)
-    
-    # Copy successful build to install location
-    if not failed and os.path.exists(output):
-        os.chdir("..")
+        lib_dir.mkdir(parents=True, exist_ok=True)
+        inc_dir.mkdir(parents=True, exist_ok=True)
         
-        # Install library
-        if CI_MODE:
-            # For CI, install to proper directories
-            lib_dir = INSTALL_PREFIX / "lib"
-            bin_dir = INSTALL_PREFIX / "bin"
-            inc_dir = INSTALL_PREFIX / "include" / "cimgui"
-            
-            lib_dir.mkdir(parents=True, exist_ok=True)
-            inc_dir.mkdir(parents=True, exist_ok=True)
-            
-            if IS_WINDOWS:
-                bin_dir.mkdir(parents=True, exist_ok=True)
-                shutil.copy(f"cimgui/{output}", bin_dir / output)
-                # Also need .lib file for Windows
-                lib_output = output.replace(".dll", ".lib")
-                if os.path.exists(f"cimgui/{lib_output}"):
-                    shutil.copy(f"cimgui/{lib_output}", lib_dir / lib_output)
-            else:
-                shutil.copy(f"cimgui/{output}", lib_dir / output)
-            
-            # Install headers
-            shutil.copy("cimgui/cimgui.h", inc_dir / "cimgui.h")
-            if has_wrappers:
-                shutil.copy(wrapper_h, inc_dir / "cimgui_sdl2_opengl3.h")
+        if IS_WINDOWS:
+            bin_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy(output, bin_dir / output.name)
+            # Also need .lib file for Windows
+            lib_output = output.with_suffix(".lib")
+            if lib_output.exists():
+                shutil.copy(lib_output, lib_dir / lib_output.name)
         else:
-            # For local development, just put in libs/
-            shutil.copy(f"cimgui/{output}", INSTALL_PREFIX / output)
+            shutil.copy(output, lib_dir / output.name)
+        if archive:
+            shutil.copy(archive, lib_dir / archive.name)
+            write_pkgconfig(lib_dir / "pkgconfig")
         
-        os.remove(f"cimgui/{output}")
-        print_success(f"Library installed to: {INSTALL_PREFIX}")
+        # Install headers
+        install_cimgui_header(inc_dir / "cimgui.h")
+        if wrapper_h.exists():
+            shutil.copy(wrapper_h, inc_dir / "cimgui_sdl2_opengl3.h")
+        if VARIANT != "full":
+            # Record what the library was built with
+            shutil.copy(IMCONFIG_PATH, inc_dir / "imconfig_variant.h")
+    else:
+        # For local development, just put in libs/
+        shutil.copy(output, INSTALL_PREFIX / output.name)
+        if archive:
+            shutil.copy(archive, INSTALL_PREFIX / archive.name)
+    
+    print_success(f"Library installed to: {INSTALL_PREFIX}")
+
+def script_args():
+    """Arguments that re-run this script with the current configuration from any directory"""
+    args = [sys.executable, str(SOURCE_DIR / "build_imgui.py")]
+    if CI_MODE:
+        args += [str(SDL2_PREFIX), str(Path(ARGS.install_prefix).resolve())]
+    args += ["-j", str(JOBS), "--config", BUILD_CONFIG, "--build-dir", str(BUILD_DIR),
+             "--variant", VARIANT, "--generator", GENERATOR]
+    if UNITY_BUILD:
+        args.append("--unity")
+    if FREETYPE:
+        args.append("--freetype")
+        if ARGS.freetype_prefix:
+            args += ["--freetype-prefix", str(Path(ARGS.freetype_prefix).resolve())]
+    if STATIC_LIB:
+        args.append("--static")
+    if USE_PCH:
+        args.append("--pch")
+    if COMPILER_LAUNCHER:
+        args += ["--compiler-cache", compiler_cache.TOOL]
+        if ARGS.compiler_cache_dir:
+            args += ["--compiler-cache-dir", str(Path(ARGS.compiler_cache_dir).resolve())]
+    return args
+
+def ninja_path(path):
+    """Escape a path for a build statement in build.ninja"""
+    return str(path).replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+def ninja_command(cmd):
+    """Command line for a build.ninja variable (run by /bin/sh, or CreateProcess on Windows)"""
+    cmd = [str(arg) for arg in cmd]
+    line = subprocess.list2cmdline(cmd) if IS_WINDOWS else shlex.join(cmd)
+    return line.replace("$", "$$")
+
+def write_ninja_file(sources, output, archive):
+    """Generate BUILD_DIR/build.ninja for the current configuration.
+    
+    Compiles use the compiler's own dependency output (-MD depfiles, or
+    /showIncludes with deps = msvc), so ninja rebuilds exactly the TUs that
+    include an edited header, including the generated imconfig header.
+    build.ninja regenerates itself when this script or the headers the
+    export list is derived from change, and 'ninja install' copies the
+    outputs to INSTALL_PREFIX. Returns the default targets.
+    """
+    lines = [
+        "# Generated by build_imgui.py --generator ninja. Do not edit.",
+        "ninja_required_version = 1.7",
+        "",
+        "rule cxx",
+        "  command = $cmd",
+        "  description = CXX $label",
+    ]
+    lines += ["  deps = msvc"] if IS_WINDOWS else ["  depfile = $out.d", "  deps = gcc"]
+    lines += [
+        "",
+        "rule link",
+        "  command = $cmd",
+        "  description = LINK $out",
+        "",
+        "rule archive",
+        "  command = $cmd",
+        "  description = AR $out",
+        "",
+        "rule regenerate",
+        "  command = $cmd",
+        "  description = Regenerating build.ninja",
+        "  generator = 1",
+        "",
+        "rule install",
+        "  command = $cmd",
+        "  description = Installing to $prefix",
+        "  pool = console",
+        "",
+    ]
+    
+    obj_files = []
+    if USE_PCH:
+        write_pch_headers()
+        for name in PCH_HEADERS:
+            src_path, obj, cmd = pch_build(name)
+            if IS_WINDOWS:
+                # /Yc writes the .pch next to an object that gets linked
+                lines.append(f"build {ninja_path(obj)} | {ninja_path(pch_output(name))}: cxx {ninja_path(src_path)}")
+                obj_files.append(obj)
+            else:
+                lines.append(f"build {ninja_path(obj)}: cxx {ninja_path(src_path)}")
+            lines.append(f"  cmd = {ninja_command(launched(cmd))}")
+            lines.append(f"  label = {name}")
+    
+    for src in sources:
+        src_path = str(SOURCE_DIR / src)
+        obj = object_name(src)
+        pch = pch_for(src)
+        cmd = compile_command(src_path, obj, pch)
+        # Retrained PGO profiles don't change the command line
+        implicit = [ninja_path(p) for p in profile_inputs(cmd)]
+        if pch:
+            implicit.append(ninja_path(pch_output(pch)))
+        lines.append(f"build {ninja_path(obj)}: cxx {ninja_path(src_path)}" + (f" | {' '.join(implicit)}" if implicit else ""))
+        lines.append(f"  cmd = {ninja_command(launched(cmd))}")
+        lines.append(f"  label = {os.path.basename(src) if os.path.isabs(src) else src}")
+        obj_files.append(obj)
+    
+    objs = " ".join(ninja_path(obj) for obj in obj_files)
+    lines += ["", f"build {ninja_path(output)}: link {objs}", f"  cmd = {ninja_command(link_command(obj_files, output))}"]
+    targets = [output]
+    if archive:
+        cmd = archive_command(obj_files, archive)
+        # ar adds to an existing archive instead of replacing it
+        line = ninja_command(cmd) if IS_WINDOWS else f"rm -f {ninja_command([archive])} && {ninja_command(cmd)}"
+        lines += ["", f"build {ninja_path(archive)}: archive {objs}", f"  cmd = {line}"]
+        targets.append(archive)
+    
+    regen_inputs = [SOURCE_DIR / "build_imgui.py"] + [header for header, _ in EXPORT_HEADERS]
+    lines += [
+        "",
+        f"build build.ninja: regenerate | {' '.join(ninja_path(p) for p in regen_inputs)}",
+        f"  cmd = {ninja_command(script_args() + ['--generate-only'])}",
+        "",
+        f"build install: install {' '.join(ninja_path(t) for t in targets)}",
+        f"  cmd = {ninja_command(script_args() + ['--install-only'])}",
+        f"  prefix = {INSTALL_PREFIX}",
+        "",
+        f"default {' '.join(ninja_path(t) for t in targets)}",
+    ]
+    
+    content = "\n".join(lines) + "\n"
+    path = BUILD_DIR / "build.ninja"
+    if not path.exists() or path.read_text() != content:
+        path.write_text(content)
+    print(f"  Wrote {path}")
+    return targets
+
+def run_ninja(targets):
+    """Build the given targets of BUILD_DIR/build.ninja"""
+    ninja = shutil.which("ninja") or shutil.which("ninja-build")
+    if not ninja:
+        print_error("ninja not found. Install ninja or use --generator python")
+        return False
+    if not run_cmd([ninja, "-C", str(BUILD_DIR), f"-j{JOBS}"] + [str(t) for t in targets]):
+        print_error("ninja build failed")
+        return False
+    return True
+
+def build_library():
+    """Build the complete ImGui library out of tree in BUILD_DIR"""
+    print_step(f"Building cimgui library ({BUILD_CONFIG})...")
+    print(f"  Build directory: {BUILD_DIR}")
+    
+    output = BUILD_DIR / f"cimgui_complete{LIB_EXT}"
+    archive = BUILD_DIR / static_library_name() if STATIC_LIB else None
+    
+    # Ensure install directory exists
+    INSTALL_PREFIX.mkdir(parents=True, exist_ok=True)
+    
+    if ARGS.install_only:
+        # Invoked by 'ninja install', which already holds the outputs up to date
+        install_library(output, archive)
         return True
     
-    os.chdir("..")
-    return False
+    # build.ninja's regeneration rule runs while 'build_imgui.py --generator
+    # ninja' holds the lock
+    if not ARGS.generate_only and not lock_build_dir():
+        print_error(f"Another build is already using {BUILD_DIR}")
+        print("  Use --build-dir or a different --config to build concurrently")
+        return False
+    
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    write_imconfig()
+    
+    # Compile stale translation units concurrently, reusing cached objects.
+    # Our wrapper is compiled in place from imgui_backends/.
+    if UNITY_BUILD:
+        sources = write_unity_sources()
+        print(f"  Unity build: {len(SOURCES)} sources in {len(sources)} translation units")
+    else:
+        sources = SOURCES
+    
+    if GENERATOR == "ninja":
+        targets = write_ninja_file(sources, output, archive)
+        if ARGS.generate_only:
+            return True
+        with compiler_cache.tracking("cimgui"):
+            built = run_ninja(targets)
+        if not built:
+            return False
+    else:
+        with compiler_cache.tracking("cimgui"):
+            obj_files = compile_sources(sources)
+        if obj_files is None:
+            return False
+        
+        if not link_library(obj_files, output):
+            return False
+        
+        if STATIC_LIB and not archive_library(obj_files, archive):
+            return False
+    
+    install_library(output, archive)
+    return True
 
 def update_rock_file():
     """Update test_gl_triangle.rock to use the built library"""
@@ -412,6 +1357,20 @@ def test_build():
     """Quick test to verify the build works"""
     print_step("Testing build...")
     
+    # Variants without default allocators need igSetAllocatorFunctions first
+    set_allocator = ""
+    if "custom-alloc" in VARIANTS[VARIANT]:
+        set_allocator = """
+ffi.cdef[[
+    void* malloc(size_t size);
+    void free(void* ptr);
+    typedef void* (*ImGuiMemAllocFunc)(size_t sz, void* user_data);
+    typedef void (*ImGuiMemFreeFunc)(void* ptr, void* user_data);
+    void igSetAllocatorFunctions(ImGuiMemAllocFunc alloc_func, ImGuiMemFreeFunc free_func, void* user_data);
+]]
+lib.igSetAllocatorFunctions(ffi.cast("ImGuiMemAllocFunc", ffi.C.malloc), ffi.cast("ImGuiMemFreeFunc", ffi.C.free), nil)
+"""
+    
     test_script = f"""
 local ffi = require("ffi")
 ffi.cdef[[
@@ -420,8 +1379,8 @@ ffi.cdef[[
     void igDestroyContext(ImGuiContext* ctx);
 ]]
 
-local lib = ffi.load("./libs/cimgui_complete{LIB_EXT}")
-local ctx = lib.igCreateContext(nil)
+local lib = ffi.load("{(INSTALL_PREFIX / f"cimgui_complete{LIB_EXT}").as_posix()}")
+{set_allocator}local ctx = lib.igCreateContext(nil)
 if ctx ~= nil then
     lib.igDestroyContext(ctx)
     print("SUCCESS: Library loads and initializes correctly")
@@ -432,15 +1391,15 @@ else
 end
 """
     
-    # Write test script
-    with open("test_build.lua", "w") as f:
-        f.write(test_script)
+    # Write test script into the build directory so concurrent builds don't collide
+    test_file = BUILD_DIR / "test_build.lua"
+    test_file.write_text(test_script)
     
     # Run test
-    success = run_cmd(["luajit", "test_build.lua"])
+    success = run_cmd(["luajit", str(test_file)])
     
     # Clean up
-    os.remove("test_build.lua")
+    test_file.unlink()
     
     if success:
         print_success("Library test passed")
@@ -454,6 +1413,13 @@ def main():
     print(f"   cimgui Build System")
     print(f"   Platform: {SYSTEM}")
     print(f"   Mode: {'CI' if CI_MODE else 'Local Development'}")
+    print(f"   Config: {BUILD_CONFIG}{' (unity)' if UNITY_BUILD else ''}")
+    print(f"   Variant: {VARIANT}")
+    print(f"   Font loader: {'FreeType' if FREETYPE else 'stb_truetype'}")
+    if STATIC_LIB:
+        print(f"   Static archive: {static_library_name()}")
+    if COMPILER_LAUNCHER:
+        print(f"   Compiler cache: {COMPILER_LAUNCHER}")
     if CI_MODE:
         print(f"   SDL2: {SDL2_PREFIX}")
         print(f"   Install: {INSTALL_PREFIX}")
@@ -475,13 +1441,20 @@ def main():
             return 1
     
     # Build
-    if not build_library():
+    built = build_library()
+    compiler_cache.print_summary()
+    if not built:
         print_error("\nBuild failed!")
         return 1
     
+    # Steps run on behalf of build.ninja stop here
+    if ARGS.generate_only or ARGS.install_only:
+        return 0
+    
     # Only update Rock files and test in local mode
     if not CI_MODE:
-        if not update_rock_file():
+        # The Rock test file tracks the development (full) build
+        if VARIANT == "full" and not update_rock_file():
             print_warning("\nCould not update Rock file")
         
         if test_build():
@@ -13,10 +13,48 @@ mkdir -p build/cimgui
 mkdir -p build/luajit
 mkdir -p prebuilt/linux/x86_64
 
+# Compiler cache: off unless COMPILER_CACHE=auto|ccache|sccache picks the
+# tool (auto: whichever is installed), COMPILER_CACHE_DIR sets its directory.
+# build_imgui.py reads both from the environment as well.
+ROOT=$PWD
+export COMPILER_CACHE=${COMPILER_CACHE:-none}
+export COMPILER_CACHE_REPORT=$ROOT/build/compiler-cache-stats.txt
+: > "$COMPILER_CACHE_REPORT"
+LAUNCHER=$(python3 compiler_cache.py launcher "$COMPILER_CACHE" || true)
+CMAKE_LAUNCHER_ARGS=()
+MAKE_CC=()
+if [ -n "$LAUNCHER" ]; then
+  echo "Using compiler cache: $LAUNCHER"
+  CMAKE_LAUNCHER_ARGS=(-DCMAKE_C_COMPILER_LAUNCHER="$LAUNCHER" -DCMAKE_CXX_COMPILER_LAUNCHER="$LAUNCHER")
+  MAKE_CC=(CC="$LAUNCHER ${CC:-gcc}")
+  if [ -n "$COMPILER_CACHE_DIR" ]; then
+    export COMPILER_CACHE_DIR=$(realpath -m "$COMPILER_CACHE_DIR")
+    mkdir -p "$COMPILER_CACHE_DIR"
+    case "$LAUNCHER" in
+      *sccache*)
+        export SCCACHE_DIR=$COMPILER_CACHE_DIR
+        # A running server keeps the directory it was started with
+        "$LAUNCHER" --stop-server >/dev/null 2>&1 || true
+        ;;
+      *) export CCACHE_DIR=$COMPILER_CACHE_DIR ;;
+    esac
+  fi
+fi
+
+# Hit/miss counters around each library built here; build_imgui.py records its own
+cache_begin() {
+  python3 "$ROOT/compiler_cache.py" snapshot "$COMPILER_CACHE" > "$ROOT/build/compiler-cache-snapshot.json"
+}
+cache_end() {
+  python3 "$ROOT/compiler_cache.py" report "$1" "$ROOT/build/compiler-cache-snapshot.json" "$COMPILER_CACHE_REPORT" >/dev/null
+}
+
 # Build SDL2
 echo "Building SDL2..."
+cache_begin
 cd build/SDL2
 cmake ../../SDL2-2.32.4 \
+  "${CMAKE_LAUNCHER_ARGS[@]}" \
   -DCMAKE_BUILD_TYPE=Release \
   -DCMAKE_INSTALL_PREFIX=$PWD/../../prebuilt/linux/x86_64 \
   -DSDL_SHARED=ON \
@@ -33,11 +71,14 @@ make -j$(nproc)
 make install
 
 cd ../..
+cache_end SDL2
 
 # Build FreeType
 echo "Building FreeType..."
+cache_begin
 cd build/freetype
 cmake ../../freetype-2.14.1 \
+  "${CMAKE_LAUNCHER_ARGS[@]}" \
   -DCMAKE_BUILD_TYPE=Release \
   -DCMAKE_INSTALL_PREFIX=$PWD/../../prebuilt/linux/x86_64 \
   -DBUILD_SHARED_LIBS=ON \
@@ -48,19 +89,38 @@ make -j$(nproc)
 make install
 
 cd ../..
+cache_end FreeType
 
 # Build cimgui
 echo "Building cimgui (ImGui C wrapper)..."
-python3 build_imgui.py \
+CIMGUI_GENERATOR=python
+if command -v ninja >/dev/null 2>&1; then
+  CIMGUI_GENERATOR=ninja
+fi
+python3 build_imgui.py --generator $CIMGUI_GENERATOR \
   $PWD/prebuilt/linux/x86_64 \
   $PWD/prebuilt/linux/x86_64
 
+# Production variant (no demo windows, no obsolete API) for shipping;
+# a second full cimgui build, so only with BUILD_PRODUCTION=1
+if [ "${BUILD_PRODUCTION:-0}" = "1" ]; then
+  python3 build_imgui.py --generator $CIMGUI_GENERATOR --config dist --variant production \
+    $PWD/prebuilt/linux/x86_64 \
+    $PWD/prebuilt/linux/x86_64
+fi
+
 # Build LuaJIT
 echo "Building LuaJIT..."
+cache_begin
 cd luajit
-make -j$(nproc) PREFIX=$PWD/../prebuilt/linux/x86_64
+make -j$(nproc) PREFIX=$PWD/../prebuilt/linux/x86_64 "${MAKE_CC[@]}"
 make install PREFIX=$PWD/../prebuilt/linux/x86_64
 cd ..
+cache_end LuaJIT
+
+# Generate LuaJIT FFI declarations from the installed headers
+echo "Generating LuaJIT FFI declarations..."
+python3 generate_cdefs.py --imgui-dir cimgui/imgui $PWD/prebuilt/linux/x86_64
 
 # Create library info file
 echo "Creating library info..."
@@ -73,6 +133,7 @@ Libraries included:
 - FreeType Version: 2.14.1
 - cimgui (Dear ImGui C wrapper) with SDL2/OpenGL3 backends
 - LuaJIT 2.1 - Just-In-Time Compiler for Lua
+- LuaJIT FFI declarations (share/lua/5.1/cdefs), generated by generate_cdefs.py
 
 Libraries:
 $(ls -la prebuilt/linux/x86_64/lib/)
@@ -86,4 +147,9 @@ echo "=== Built libraries ==="
 find prebuilt/linux/x86_64 -type f -name "*.so*" -o -name "*.a" | sort
 echo ""
 echo "=== Header directories ==="
-ls -d prebuilt/linux/x86_64/include/*/ 2>/dev/null || ls prebuilt/linux/x86_64/include/
\ No newline at end of file
+ls -d prebuilt/linux/x86_64/include/*/ 2>/dev/null || ls prebuilt/linux/x86_64/include/
+if [ -s "$COMPILER_CACHE_REPORT" ]; then
+  echo ""
+  echo "=== Compiler cache ($LAUNCHER) ==="
+  cat "$COMPILER_CACHE_REPORT"
+fi
\ No newline at end of file
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Profile-guided optimization build of the prebuilt libraries
+Usage:
+  ./build_pgo.py                                  # Instrument, train and rebuild everything
+  ./build_pgo.py --export-profiles                # ...and save the profiles to pgo/profiles/
+  ./build_pgo.py --use-profiles                   # Rebuild from the profiles saved in pgo/profiles/
+  ./build_pgo.py --phase train --libraries SDL2,freetype
+  ./build_pgo.py --fonts a.ttf b.otf --corpus assets/
+
+Phases:
+  generate  Build instrumented SDL2, FreeType, cimgui, SDL_image and SDL_mixer
+            into build/pgo/instrumented
+  train     Run the headless workloads in pgo/training/ against them and
+            merge the raw profiles into build/pgo/profiles
+  use       Rebuild every library with its merged profile into the install
+            prefix (default: prebuilt/<platform>/<arch>)
+
+GCC and Clang only. Both phases build in the same directories under
+build/pgo/work, because GCC finds the profile of each object by its path.
+"""
+
+import os
+import sys
+import argparse
+import glob
+import hashlib
+import json
+import platform
+import shutil
+import subprocess
+from pathlib import Path
+
+SYSTEM = platform.system()
+IS_WINDOWS = SYSTEM == "Windows"
+IS_MACOS = SYSTEM == "Darwin"
+
+SOURCE_DIR = Path(__file__).resolve().parent
+PGO_DIR = SOURCE_DIR / "build" / "pgo"
+WORK_DIR = PGO_DIR / "work"
+INSTRUMENTED_PREFIX = PGO_DIR / "instrumented"
+RAW_PROFILE_DIR = PGO_DIR / "raw"
+MERGED_PROFILE_DIR = PGO_DIR / "profiles"
+TRAINING_DIR = SOURCE_DIR / "pgo" / "training"
+SAVED_PROFILE_DIR = SOURCE_DIR / "pgo" / "profiles"
+
+PLATFORM_NAME = "macos" if IS_MACOS else "windows" if IS_WINDOWS else "linux"
+ARCH = "arm64" if IS_MACOS else "x86_64"
+LIB_EXT = ".dylib" if IS_MACOS else ".so"
+
+CC = os.environ.get("CC", "clang" if IS_MACOS else "gcc")
+CXX = os.environ.get("CXX", "clang++" if IS_MACOS else "g++")
+
+# Libraries in build order; everything after SDL2 links against it
+LIBRARIES = {
+    "SDL2": {"version": "2.32.4", "workload": "sdl2_workload.c"},
+    "freetype": {"version": "2.14.1", "workload": "freetype_workload.c"},
+    "cimgui": {"version": None, "workload": "imgui_workload.c"},
+    "SDL2_image": {"version": "2.8.2", "workload": "sdl_image_workload.c"},
+    "SDL2_mixer": {"version": "2.8.0", "workload": "sdl_mixer_workload.c"},
+}
+
+# Sample files shipped with the vendored sources, added to the synthetic corpora
+IMAGE_SAMPLES = [
+    "SDL2_image-2.8.2/test/sample.png",
+    "SDL2_image-2.8.2/test/sample.jpg",
+    "SDL2_image-2.8.2/test/sample.webp",
+    "SDL2_image-2.8.2/test/sample.bmp",
+    "SDL2_image-2.8.2/test/sample.tga",
+    "SDL2_image-2.8.2/test/sample.qoi",
+    "SDL2_image-2.8.2/test/sample.pcx",
+    "SDL2_image-2.8.2/test/palette.gif",
+]
+AUDIO_SAMPLES = ["SDL2-2.32.4/test/sample.wav"]
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tga", ".qoi", ".pcx"}
+AUDIO_EXTENSIONS = {".wav", ".ogg", ".mp3", ".flac", ".opus"}
+
+# Fonts used by the FreeType workload when --fonts isn't given
+FONT_SEARCH_PATTERNS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans*.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans*.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans*.ttf",
+    "/System/Library/Fonts/Supplemental/Arial*.ttf",
+    "/Library/Fonts/Arial*.ttf",
+]
+
+# Simple text output - no colors to avoid encoding issues
+
+def print_step(msg):
+    print(f"\n==> {msg}")
+
+def print_success(msg):
+    print(f"[OK] {msg}")
+
+def print_error(msg):
+    print(f"[ERROR] {msg}")
+
+def print_warning(msg):
+    print(f"[WARNING] {msg}")
+
+def run_command(cmd, cwd=None, env=None):
+    """Run a command, streaming its output, and exit on failure"""
+    print(f"Running: {' '.join(str(c) for c in cmd)}")
+    result = subprocess.run([str(c) for c in cmd], cwd=cwd, env=env)
+    if result.returncode != 0:
+        print_error(f"Command failed with exit code {result.returncode}")
+        sys.exit(1)
+
+def capture(cmd):
+    """Output of a command, or an empty string if it can't be run"""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    except OSError:
+        return ""
+    return result.stdout.strip()
+
+def compiler_kind():
+    """'clang' or 'gcc', from the C compiler's version banner"""
+    return "clang" if "clang" in capture([CC, "--version"]).lower() else "gcc"
+
+def compiler_banner():
+    """First line of the C compiler's version banner"""
+    banner = capture([CC, "--version"])
+    return banner.splitlines()[0] if banner else CC
+
+def profile_tag():
+    """Directory name for saved profiles, e.g. linux-x86_64-gcc12"""
+    version = capture([CC, "-dumpversion"]).split(".")[0]
+    return f"{PLATFORM_NAME}-{ARCH}-{compiler_kind()}{version}"
+
+def file_digest(path):
+    """sha256 of a file's contents"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def library_versions():
+    """Versions of the libraries the profiles were recorded against"""
+    versions = {name: info["version"] for name, info in LIBRARIES.items()}
+    versions["cimgui"] = capture(["git", "-C", str(SOURCE_DIR / "cimgui"), "rev-parse", "HEAD"]) or None
+    return versions
+
+def profile_flags(phase, lib):
+    """Compiler and linker flags that instrument a library or apply its profile"""
+    kind = compiler_kind()
+    if phase == "generate":
+        profile = RAW_PROFILE_DIR / lib
+        update = "-fprofile-update=atomic" if kind == "clang" else "-fprofile-update=prefer-atomic"
+        return [f"-fprofile-generate={profile}", update], ["-fprofile-generate"]
+
+    if kind == "clang":
+        profile = MERGED_PROFILE_DIR / lib / f"{lib}.profdata"
+        cflags = [f"-fprofile-use={profile}", "-Wno-profile-instr-unprofiled",
+                  "-Wno-profile-instr-out-of-date"]
+    else:
+        # Code the workloads never reach keeps its normal optimization
+        # instead of being treated as cold
+        profile = MERGED_PROFILE_DIR / lib
+        cflags = [f"-fprofile-use={profile}", "-fprofile-partial-training",
+                  "-Wno-missing-profile", "-Wno-coverage-mismatch"]
+    return cflags, []
+
+def library_env(phase, lib):
+    """Environment for building one library, with its PGO flags appended"""
+    cflags, ldflags = profile_flags(phase, lib)
+    env = os.environ.copy()
+    env["CC"] = CC
+    env["CXX"] = CXX
+    for var, flags in (("CFLAGS", cflags), ("CXXFLAGS", cflags), ("LDFLAGS", ldflags)):
+        env[var] = " ".join([env.get(var, "")] + flags).strip()
+    return env
+
+def build_cmake_project(lib, source, prefix, env, jobs, options):
+    """Configure, build and install a vendored CMake project from scratch"""
+    build_dir = WORK_DIR / lib
+    # CMake only reads CFLAGS/LDFLAGS on the first configure
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    cmd = ["cmake", "-S", SOURCE_DIR / source, "-B", build_dir,
+           "-DCMAKE_BUILD_TYPE=Release", f"-DCMAKE_INSTALL_PREFIX={prefix}"] + options
+    if IS_MACOS:
+        cmd.append("-DCMAKE_OSX_ARCHITECTURES=arm64")
+    run_command(cmd, env=env)
+    run_command(["cmake", "--build", build_dir, "--parallel", str(jobs)], env=env)
+    run_command(["cmake", "--install", build_dir], env=env)
+
+def build_library(lib, prefix, env, jobs):
+    """Build one library into prefix with the flags in env"""
+    print_step(f"Building {lib} into {prefix}")
+    if lib == "SDL2":
+        # Same options as build_local.sh
+        build_cmake_project(lib, "SDL2-2.32.4", prefix, env, jobs, [
+            "-DSDL_SHARED=ON", "-DSDL_STATIC=ON", "-DSDL_ALSA=ON", "-DSDL_PULSEAUDIO=ON",
+            "-DSDL_X11=ON", "-DSDL_WAYLAND=ON", "-DSDL_OPENGL=ON", "-DSDL_OPENGLES=ON",
+            "-DSDL_VULKAN=ON",
+        ])
+    elif lib == "freetype":
+        build_cmake_project(lib, "freetype-2.14.1", prefix, env, jobs, [
+            "-DBUILD_SHARED_LIBS=ON", "-DFT_DISABLE_HARFBUZZ=ON", "-DFT_DISABLE_BROTLI=ON",
+        ])
+    elif lib == "cimgui":
+        run_command([sys.executable, SOURCE_DIR / "build_imgui.py", prefix, prefix,
+                     "--build-dir", WORK_DIR / "cimgui", "-j", str(jobs)], cwd=SOURCE_DIR, env=env)
+    elif lib == "SDL2_image":
+        run_command([sys.executable, SOURCE_DIR / "build_sdl_image.py", "--prefix", prefix,
+                     "--build-dir", WORK_DIR / "sdl_image", "-j", str(jobs)], cwd=SOURCE_DIR, env=env)
+    elif lib == "SDL2_mixer":
+        run_command([sys.executable, SOURCE_DIR / "build_sdl_mixer.py", "--prefix", prefix,
+                     "--build-dir", WORK_DIR / "sdl_mixer", "-j", str(jobs)], cwd=SOURCE_DIR, env=env)
+
+def find_fonts(fonts):
+    """Fonts for the FreeType workload: --fonts, or well-known system fonts"""
+    if fonts:
+        return [Path(f).resolve() for f in fonts]
+    found = []
+    for pattern in FONT_SEARCH_PATTERNS:
+        found += sorted(Path(p) for p in glob.glob(pattern))
+    return found
+
+def corpus_files(corpus_dirs, extensions):
+    """Files with one of the given extensions in the --corpus directories"""
+    files = []
+    for corpus in corpus_dirs:
+        files += sorted(p for p in Path(corpus).resolve().rglob("*") if p.suffix.lower() in extensions)
+    return files
+
+def workload_inputs(lib, args):
+    """Data files passed to a library's training workload"""
+    if lib == "freetype":
+        return find_fonts(args.fonts)
+    if lib == "SDL2_image":
+        return [SOURCE_DIR / p for p in IMAGE_SAMPLES] + corpus_files(args.corpus, IMAGE_EXTENSIONS)
+    if lib == "SDL2_mixer":
+        return [SOURCE_DIR / p for p in AUDIO_SAMPLES] + corpus_files(args.corpus, AUDIO_EXTENSIONS)
+    return []
+
+def workload_command(lib, exe, inputs):
+    """Command line that runs a compiled training workload"""
+    if lib == "SDL2":
+        return [exe, SOURCE_DIR / "SDL2-2.32.4" / "test"]
+    if lib == "freetype":
+        return [exe, "-n", "3"] + inputs
+    if lib == "cimgui":
+        return [exe, "2000"]
+    return [exe] + inputs
+
+def compile_workload(lib, prefix):
+    """Compile a training workload (itself uninstrumented) against prefix"""
+    source = TRAINING_DIR / LIBRARIES[lib]["workload"]
+    exe = PGO_DIR / "training" / source.stem
+    exe.parent.mkdir(parents=True, exist_ok=True)
+
+    lib_dir = prefix / "lib"
+    cmd = [CC, "-O2", source, "-o", exe,
+           f"-I{prefix / 'include'}", f"-I{prefix / 'include' / 'SDL2'}"]
+    if lib == "SDL2":
+        cmd += [f"-L{lib_dir}", "-lSDL2"]
+    elif lib == "freetype":
+        cmd += [f"-I{prefix / 'include' / 'freetype2'}", f"-L{lib_dir}", "-lfreetype"]
+    elif lib == "cimgui":
+        # cimgui_complete has no lib prefix, so link it by path
+        cmd += [f"-I{prefix / 'include' / 'cimgui'}", lib_dir / f"cimgui_complete{LIB_EXT}"]
+    elif lib == "SDL2_image":
+        cmd += [f"-L{lib_dir}", "-lSDL2_image", "-lSDL2"]
+    elif lib == "SDL2_mixer":
+        cmd += [f"-L{lib_dir}", "-lSDL2_mixer", "-lSDL2"]
+    cmd += [f"-Wl,-rpath,{lib_dir}", "-lm"]
+    run_command(cmd)
+    return exe
+
+def merge_profiles(lib):
+    """Merge a library's raw profiles into MERGED_PROFILE_DIR/<lib>"""
+    raw_dir = RAW_PROFILE_DIR / lib
+    merged_dir = MERGED_PROFILE_DIR / lib
+    if merged_dir.exists():
+        shutil.rmtree(merged_dir)
+    merged_dir.mkdir(parents=True)
+
+    if compiler_kind() == "clang":
+        raw_files = sorted(raw_dir.glob("*.profraw"))
+        if not raw_files:
+            return False
+        profdata = os.environ.get("LLVM_PROFDATA") or shutil.which("llvm-profdata")
+        cmd = [profdata] if profdata else ["xcrun", "llvm-profdata"]
+        run_command(cmd + ["merge", "-o", merged_dir / f"{lib}.profdata"] + raw_files)
+    else:
+        # libgcov already accumulates every run into one .gcda per object
+        raw_files = sorted(raw_dir.glob("*.gcda"))
+        if not raw_files:
+            return False
+        for path in raw_files:
+            shutil.copy2(path, merged_dir / path.name)
+    print_success(f"{lib}: merged {len(raw_files)} profile files")
+    return True
+
+def train(libraries, args):
+    """Run each library's workload against the instrumented build and merge the profiles"""
+    print_step("Training with headless workloads")
+    for lib in libraries:
+        if (RAW_PROFILE_DIR / lib).exists():
+            shutil.rmtree(RAW_PROFILE_DIR / lib)
+
+    env = os.environ.copy()
+    env["SDL_VIDEODRIVER"] = "dummy"
+    env["SDL_AUDIODRIVER"] = "dummy"
+    lib_path_var = "DYLD_LIBRARY_PATH" if IS_MACOS else "LD_LIBRARY_PATH"
+    env[lib_path_var] = os.pathsep.join(filter(None, [str(INSTRUMENTED_PREFIX / "lib"), env.get(lib_path_var)]))
+
+    inputs = {}
+    for lib in libraries:
+        lib_inputs = workload_inputs(lib, args)
+        if lib == "freetype" and not lib_inputs:
+            print_error("No fonts found for the FreeType workload; pass some with --fonts")
+            sys.exit(1)
+        inputs[lib] = lib_inputs
+
+    for lib in libraries:
+        print_step(f"Training {lib}")
+        exe = compile_workload(lib, INSTRUMENTED_PREFIX)
+        run_command(workload_command(lib, exe, inputs[lib]), env=env)
+
+    # Workloads also exercise the libraries they depend on (e.g. SDL2 under
+    # SDL_image), so merge only after every workload has run
+    for lib in libraries:
+        if not merge_profiles(lib):
+            print_error(f"{lib}: the workload produced no profile data")
+            sys.exit(1)
+    return inputs
+
+def workload_digests():
+    """sha256 of every training workload source, keyed by path"""
+    return {p.relative_to(SOURCE_DIR).as_posix(): file_digest(p) for p in sorted(TRAINING_DIR.glob("*.c"))}
+
+def gcda_prefix():
+    """GCC's mangled form of SOURCE_DIR at the start of .gcda file names"""
+    return str(SOURCE_DIR).replace("/", "#") + "#"
+
+def export_profiles(libraries, inputs):
+    """Save merged profiles under pgo/profiles/<tag> with a manifest.
+
+    GCC names each .gcda after the absolute path of its object, so the
+    checkout location is stripped from the saved names.
+    """
+    dest = SAVED_PROFILE_DIR / profile_tag()
+    print_step(f"Saving profiles to {dest.relative_to(SOURCE_DIR)}")
+    if dest.exists():
+        shutil.rmtree(dest)
+
+    prefix = gcda_prefix()
+    for lib in libraries:
+        (dest / lib).mkdir(parents=True)
+        for path in sorted((MERGED_PROFILE_DIR / lib).iterdir()):
+            name = path.name[len(prefix):] if path.name.startswith(prefix) else path.name
+            shutil.copy2(path, dest / lib / name)
+
+    workloads = workload_digests()
+    manifest = {
+        "compiler": compiler_banner(),
+        "platform": f"{PLATFORM_NAME}-{ARCH}",
+        "libraries": {lib: library_versions()[lib] for lib in libraries},
+        "workloads": workloads,
+        "workload_hash": hashlib.sha256(json.dumps(workloads, sort_keys=True).encode()).hexdigest(),
+        "inputs": {lib: {p.name: file_digest(p) for p in files} for lib, files in inputs.items() if files},
+    }
+    (dest / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    print_success(f"Saved profiles for {', '.join(libraries)}; commit {dest.relative_to(SOURCE_DIR)}")
+
+def import_profiles(libraries):
+    """Restore saved profiles from pgo/profiles/<tag> into MERGED_PROFILE_DIR"""
+    src = SAVED_PROFILE_DIR / profile_tag()
+    print_step(f"Using saved profiles from {src.relative_to(SOURCE_DIR)}")
+    manifest_file = src / "manifest.json"
+    if not manifest_file.exists():
+        print_error(f"No saved profiles for this platform and compiler ({profile_tag()})")
+        print("  Run ./build_pgo.py --export-profiles to record them")
+        sys.exit(1)
+    manifest = json.loads(manifest_file.read_text())
+
+    if manifest["compiler"] != compiler_banner():
+        print_error("Saved profiles were recorded with a different compiler:")
+        print(f"  recorded: {manifest['compiler']}")
+        print(f"  current:  {compiler_banner()}")
+        sys.exit(1)
+    if manifest["workloads"] != workload_digests():
+        print_warning("Training workloads changed since these profiles were recorded; "
+                      "re-run ./build_pgo.py --export-profiles")
+    versions = library_versions()
+    for lib in libraries:
+        if manifest["libraries"].get(lib) != versions[lib]:
+            print_warning(f"{lib} is {versions[lib]} but profiles were recorded against "
+                          f"{manifest['libraries'].get(lib)}; stale functions are built without PGO")
+
+    prefix = gcda_prefix()
+    for lib in libraries:
+        if not (src / lib).exists():
+            print_error(f"No saved profile for {lib}")
+            sys.exit(1)
+        merged_dir = MERGED_PROFILE_DIR / lib
+        if merged_dir.exists():
+            shutil.rmtree(merged_dir)
+        merged_dir.mkdir(parents=True)
+        for path in sorted((src / lib).iterdir()):
+            name = prefix + path.name if path.suffix == ".gcda" else path.name
+            shutil.copy2(path, merged_dir / name)
+    print_success(f"Restored profiles for {', '.join(libraries)}")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Profile-guided optimization build of the prebuilt libraries")
+    parser.add_argument("--phase", choices=["all", "generate", "train", "use"], default="all",
+                        help="Run a single phase (default: all)")
+    parser.add_argument("--libraries", default=",".join(LIBRARIES),
+                        help=f"Comma-separated subset of {', '.join(LIBRARIES)} (default: all)")
+    parser.add_argument("--install-prefix", type=Path,
+                        help="Where the optimized libraries are installed (default: prebuilt/<platform>/<arch>)")
+    parser.add_argument("--fonts", nargs="+", help="Fonts for the FreeType workload (default: DejaVu/Arial system fonts)")
+    parser.add_argument("--corpus", action="append", default=[],
+                        help="Directory of extra images and audio files (e.g. game assets) to train on")
+    parser.add_argument("--export-profiles", action="store_true",
+                        help="Save the merged profiles to pgo/profiles/<platform>-<arch>-<compiler>")
+    parser.add_argument("--use-profiles", action="store_true",
+                        help="Skip training and rebuild with the profiles saved in pgo/profiles/")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Parallel compile jobs for CMake, cimgui and SDL_image/SDL_mixer (default: CPU count)")
+    args = parser.parse_args()
+
+    unknown = [lib for lib in args.libraries.split(",") if lib not in LIBRARIES]
+    if unknown:
+        parser.error(f"unknown libraries: {', '.join(unknown)}")
+    if args.use_profiles and args.phase not in ("all", "use"):
+        parser.error("--use-profiles only runs the use phase")
+    if args.export_profiles and args.phase not in ("all", "train"):
+        parser.error("--export-profiles needs the train phase")
+    return args
+
+def main():
+    args = parse_args()
+    if IS_WINDOWS:
+        print_error("PGO builds are only supported with GCC and Clang (Linux and macOS)")
+        return 1
+
+    # Keep build order regardless of the order given on the command line
+    selected = args.libraries.split(",")
+    libraries = [lib for lib in LIBRARIES if lib in selected]
+    install_prefix = (args.install_prefix or SOURCE_DIR / "prebuilt" / PLATFORM_NAME / ARCH).resolve()
+    phases = ["use"] if args.use_profiles else ["generate", "train", "use"] if args.phase == "all" else [args.phase]
+
+    print(f"{'='*60}")
+    print(f"   PGO Build")
+    print(f"   Compiler: {compiler_banner()}")
+    print(f"   Libraries: {', '.join(libraries)}")
+    print(f"   Phases: {', '.join(phases)}")
+    print(f"{'='*60}")
+
+    if "generate" in phases:
+        print_step("Building instrumented libraries")
+        for lib in libraries:
+            build_library(lib, INSTRUMENTED_PREFIX, library_env("generate", lib), args.jobs)
+
+    if "train" in phases:
+        inputs = train(libraries, args)
+        if args.export_profiles:
+            export_profiles(libraries, inputs)
+
+    if args.use_profiles:
+        import_profiles(libraries)
+
+    if "use" in phases:
+        print_step("Rebuilding with profiles")
+        for lib in libraries:
+            if not (MERGED_PROFILE_DIR / lib).exists():
+                print_error(f"No merged profile for {lib}; run the train phase or use --use-profiles")
+                return 1
+        for lib in libraries:
+            build_library(lib, install_prefix, library_env("use", lib), args.jobs)
+        print(f"\n{'='*60}")
+        print(f"   PGO BUILD SUCCESSFUL!")
+        print(f"{'='*60}")
+        print(f"\nLibraries installed to: {install_prefix}")
+
+    return 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nBuild interrupted by user")
+        sys.exit(1)
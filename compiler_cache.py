@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+ccache/sccache support shared by the build scripts
+Usage:
+  ./compiler_cache.py launcher [auto|ccache|sccache]     # Print the compiler launcher, if one is found
+  ./compiler_cache.py snapshot [auto|ccache|sccache]     # Print the current hit/miss counters as JSON
+  ./compiler_cache.py report LABEL SNAPSHOT [REPORT]     # Print (and append to REPORT) the hits/misses since SNAPSHOT
+
+build_imgui.py, build_sdl_image.py and build_sdl_mixer.py take
+--compiler-cache and --compiler-cache-dir through add_arguments(); the
+snapshot/report commands let build_local.sh count its own CMake and make
+builds the same way. Counters are compared before and after each library
+rather than zeroed, so concurrent builds sharing a cache don't reset each
+other's statistics (they can still inflate them). With COMPILER_CACHE_REPORT
+set, every library's line is also appended to that file.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+CHOICES = ["auto", "ccache", "sccache", "none"]
+
+# Environment variable naming each tool's cache directory
+CACHE_DIR_VARS = {"ccache": "CCACHE_DIR", "sccache": "SCCACHE_DIR"}
+
+LAUNCHER = None
+TOOL = None
+# (label, (hits, misses) or None) per library built by this process
+RESULTS = []
+
+def add_arguments(parser):
+    """Add --compiler-cache and --compiler-cache-dir to a build script's parser"""
+    parser.add_argument("--compiler-cache", choices=CHOICES, default=os.environ.get("COMPILER_CACHE", "none"),
+                        help="Compile through ccache or sccache; 'auto' uses whichever is installed "
+                             "(default: $COMPILER_CACHE or none)")
+    parser.add_argument("--compiler-cache-dir", type=Path, default=os.environ.get("COMPILER_CACHE_DIR"),
+                        help="Cache directory (sets CCACHE_DIR or SCCACHE_DIR; default: the tool's own)")
+
+def find_launcher(choice):
+    """Path of the requested cache tool, or None"""
+    if choice == "none":
+        return None
+    for tool in (["ccache", "sccache"] if choice == "auto" else [choice]):
+        path = shutil.which(tool)
+        if path:
+            return path
+    return None
+
+def tool_name(launcher):
+    return "sccache" if "sccache" in Path(launcher).name.lower() else "ccache"
+
+def configure(choice, cache_dir=None):
+    """Select the cache tool for this process and its children. Returns the launcher or None.
+
+    The cache directory is exported in os.environ so that every compiler
+    started from here (directly, by CMake or by make) shares it. A running
+    sccache server keeps the directory it was started with, so it is
+    restarted when a directory is given.
+    """
+    global LAUNCHER, TOOL
+    LAUNCHER = find_launcher(choice)
+    TOOL = tool_name(LAUNCHER) if LAUNCHER else None
+    if LAUNCHER is None:
+        if choice not in ("auto", "none"):
+            print(f"[WARNING] {choice} not found, building without a compiler cache")
+        return None
+
+    if cache_dir:
+        cache_dir = Path(cache_dir).resolve()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        os.environ[CACHE_DIR_VARS[TOOL]] = str(cache_dir)
+        if TOOL == "sccache":
+            subprocess.run([LAUNCHER, "--stop-server"], capture_output=True)
+    if TOOL == "sccache":
+        subprocess.run([LAUNCHER, "--start-server"], capture_output=True)
+    return LAUNCHER
+
+def cmake_args():
+    """CMake options that compile C and C++ through the launcher.
+
+    Only the Makefile and Ninja generators honour them; Visual Studio
+    projects ignore compiler launchers.
+    """
+    if not LAUNCHER:
+        return []
+    return [f"-DCMAKE_C_COMPILER_LAUNCHER={LAUNCHER}", f"-DCMAKE_CXX_COMPILER_LAUNCHER={LAUNCHER}"]
+
+def wrap_env(env, cc="cc", cxx="c++"):
+    """Prefix CC/CXX in env with the launcher, for configure scripts and plain makefiles"""
+    if LAUNCHER:
+        env["CC"] = f"{LAUNCHER} {env.get('CC', cc)}"
+        env["CXX"] = f"{LAUNCHER} {env.get('CXX', cxx)}"
+    return env
+
+def read_stats(launcher=None):
+    """(hits, misses) counted so far by the cache tool, or None"""
+    launcher = launcher or LAUNCHER
+    if not launcher:
+        return None
+    try:
+        if tool_name(launcher) == "sccache":
+            result = subprocess.run([launcher, "--show-stats", "--stats-format", "json"],
+                                    capture_output=True, text=True)
+            stats = json.loads(result.stdout)["stats"]
+            hits = sum(stats["cache_hits"]["counts"].values())
+            misses = sum(stats["cache_misses"]["counts"].values())
+            return hits, misses
+
+        # Machine-readable "<counter>\t<value>" lines (ccache 3.7+)
+        result = subprocess.run([launcher, "--print-stats"], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        counters = {}
+        for line in result.stdout.splitlines():
+            name, _, value = line.partition("\t")
+            if value.strip().isdigit():
+                counters[name] = int(value)
+        hits = counters.get("direct_cache_hit", 0) + counters.get("preprocessed_cache_hit", 0)
+        return hits, counters.get("cache_miss", 0)
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+def stats_delta(before, after):
+    if before is None or after is None:
+        return None
+    return after[0] - before[0], after[1] - before[1]
+
+def format_stats(label, delta):
+    if delta is None:
+        return f"  {label:<16} statistics unavailable"
+    hits, misses = delta
+    total = hits + misses
+    rate = f"{hits / total * 100:5.1f}%" if total else "    -"
+    return f"  {label:<16} {hits:>6} hits {misses:>6} misses  {rate}"
+
+@contextmanager
+def tracking(label):
+    """Record the cache hits and misses of everything compiled inside the block as label"""
+    if not LAUNCHER:
+        yield
+        return
+    before = read_stats()
+    try:
+        yield
+    finally:
+        delta = stats_delta(before, read_stats())
+        RESULTS.append((label, delta))
+        # Collected by build_local.sh into one summary for all its builds
+        report = os.environ.get("COMPILER_CACHE_REPORT")
+        if report:
+            with open(report, "a") as f:
+                f.write(format_stats(label, delta) + "\n")
+
+def print_summary():
+    """Print the per-library statistics recorded by tracking()"""
+    if not RESULTS:
+        return
+    print(f"\nCompiler cache ({TOOL}, {os.environ.get(CACHE_DIR_VARS[TOOL], 'default directory')}):")
+    for label, delta in RESULTS:
+        print(format_stats(label, delta))
+
+def main():
+    parser = argparse.ArgumentParser(description="ccache/sccache helper for the build scripts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    launcher_parser = sub.add_parser("launcher", help="Print the compiler launcher to use")
+    launcher_parser.add_argument("choice", nargs="?", choices=CHOICES, default="auto")
+    snapshot_parser = sub.add_parser("snapshot", help="Print the current hit/miss counters as JSON")
+    snapshot_parser.add_argument("choice", nargs="?", choices=CHOICES, default="auto")
+    report_parser = sub.add_parser("report", help="Print the hits/misses since a snapshot")
+    report_parser.add_argument("label")
+    report_parser.add_argument("snapshot", type=Path)
+    report_parser.add_argument("report", nargs="?", type=Path, help="File to append the line to")
+    args = parser.parse_args()
+
+    if args.command == "launcher":
+        launcher = find_launcher(args.choice)
+        if launcher:
+            print(launcher)
+        return 0 if launcher else 1
+
+    if args.command == "snapshot":
+        launcher = find_launcher(args.choice)
+        print(json.dumps({"launcher": launcher, "stats": read_stats(launcher)}))
+        return 0
+
+    snapshot = json.loads(args.snapshot.read_text())
+    if not snapshot["launcher"]:
+        return 0
+    before = tuple(snapshot["stats"]) if snapshot["stats"] else None
+    line = format_stats(args.label, stats_delta(before, read_stats(snapshot["launcher"])))
+    print(line)
+    if args.report:
+        with open(args.report, "a") as f:
+            f.write(line + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
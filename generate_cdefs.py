@@ -0,0 +1,1460 @@
+#!/usr/bin/env python3
+"""
+Generate LuaJIT FFI declaration modules from the installed headers
+Usage:
+  ./generate_cdefs.py <INSTALL_PREFIX>                          # Write <INSTALL_PREFIX>/share/lua/5.1/cdefs
+  ./generate_cdefs.py <INSTALL_PREFIX> --imgui-dir cimgui/imgui  # Also check cimgui.h against imgui.h
+  ./generate_cdefs.py <INSTALL_PREFIX> --luajit PATH            # LuaJIT that verifies the modules
+  ./generate_cdefs.py <INSTALL_PREFIX> --require-verify         # Fail if no LuaJIT is found
+  ./generate_cdefs.py <INSTALL_PREFIX> --no-verify              # Skip the LuaJIT checks
+
+The headers of SDL2, SDL_image, SDL_mixer, FreeType and cimgui under
+<INSTALL_PREFIX>/include are run through the C preprocessor once. Every
+declaration is assigned to the header it comes from and every header becomes
+a Lua module (cdefs.<library>.<header>) that requires the modules it depends
+on; cimgui.h is split further, one module per function prefix. Integer and
+string macros are evaluated by a compiled probe, which also prints sizeof,
+alignof and offsetof of every struct; LuaJIT then loads the modules and has
+to agree with it. With --imgui-dir the same probe is compiled as C++ against
+imgui.h, so cimgui.h is checked against the layout the library was built with.
+Modules in lua/ that build on a library (imgui.lua) are installed next to
+cdefs.
+"""
+
+import os
+import sys
+import argparse
+import platform
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SOURCE_DIR = Path(__file__).resolve().parent
+WORK_DIR = SOURCE_DIR / "build" / "cdefs"
+IS_WINDOWS = platform.system() == "Windows"
+
+# Libraries, in the order their headers are included. 'files' claims headers
+# before 'dirs' does (SDL_image.h lives in include/SDL2); macros of headers
+# in 'no_constants' aren't emitted (configuration, platform detection).
+LIBRARIES = {
+    "sdl2": {
+        "check": "SDL2/SDL.h",
+        "dirs": ["SDL2"],
+        "defines": ["SDL_MAIN_HANDLED", "SDL_DISABLE_MMINTRIN_H", "SDL_DISABLE_XMMINTRIN_H",
+                    "SDL_DISABLE_EMMINTRIN_H", "SDL_DISABLE_PMMINTRIN_H", "SDL_DISABLE_IMMINTRIN_H",
+                    "SDL_DISABLE_ARM_NEON_H"],
+        "includes": ['"SDL.h"'],
+        "constants": r"^(SDL|AUDIO|RW_SEEK|KMOD)_",
+        "no_constants": r"/(SDL_config.*|SDL_platform|SDL_revision|begin_code|close_code)\.h$",
+    },
+    "sdl2_image": {
+        "check": "SDL2/SDL_image.h",
+        "files": ["SDL2/SDL_image.h"],
+        "includes": ['"SDL_image.h"'],
+        "constants": r"^(SDL_IMAGE|IMG)_",
+    },
+    "sdl2_mixer": {
+        "check": "SDL2/SDL_mixer.h",
+        "files": ["SDL2/SDL_mixer.h"],
+        "includes": ['"SDL_mixer.h"'],
+        "constants": r"^(SDL_MIXER|MIX|AUDIO)_",
+    },
+    "freetype": {
+        "check": "freetype2/ft2build.h",
+        "dirs": ["freetype2"],
+        "includes": ["<ft2build.h>", "FT_FREETYPE_H", "FT_GLYPH_H", "FT_OUTLINE_H", "FT_BITMAP_H",
+                     "FT_STROKER_H", "FT_SIZES_H", "FT_TRUETYPE_TABLES_H", "FT_ADVANCES_H", "FT_MODULE_H"],
+        "constants": r"^(FT|FREETYPE|TT|ft)_",
+        "no_constants": r"/(config/.*|ft2build)\.h$",
+    },
+    "cimgui": {
+        "check": "cimgui/cimgui.h",
+        "dirs": ["cimgui"],
+        "defines": ["CIMGUI_DEFINE_ENUMS_AND_STRUCTS"],
+        "includes": ['"cimgui.h"', '"cimgui_sdl2_opengl3.h"'],
+        "constants": r"^(CIMGUI|IMGUI)_",
+        # Functions of cimgui.h by prefix: ImDrawList_AddLine -> cdefs.cimgui.ImDrawList,
+        # igBegin -> cdefs.cimgui.ig
+        "split": ("cimgui/cimgui.h", r"^(Im[A-Za-z0-9]+)_", "ig"),
+    },
+}
+
+# Hand-written modules in lua/, installed next to cdefs with the library they wrap
+LUA_MODULES = {
+    "cimgui": ["imgui.lua"],
+}
+
+# Predefined by LuaJIT's C parser; redeclaring them from the system headers
+# would be harmless but platform-specific noise
+LUAJIT_TYPES = {
+    "int8_t", "int16_t", "int32_t", "int64_t", "uint8_t", "uint16_t", "uint32_t", "uint64_t",
+    "intptr_t", "uintptr_t", "ptrdiff_t", "size_t", "ssize_t", "wchar_t",
+    "va_list", "__builtin_va_list", "__gnuc_va_list",
+}
+
+BASIC_TYPES = {"void", "char", "short", "int", "long", "float", "double", "signed", "unsigned",
+               "_Bool", "bool", "__signed__", "__signed", "_Complex", "__int128", "__int64", "__int32"}
+QUALIFIERS = {"const", "volatile", "restrict", "__restrict", "__restrict__", "__const", "__volatile",
+              "__volatile__", "__ptr32", "__ptr64", "__unaligned", "__w64", "_Nullable", "_Nonnull",
+              "_Null_unspecified", "__nullable", "__nonnull"}
+CALLING_CONVENTIONS = {"__cdecl", "__stdcall", "__fastcall", "__thiscall", "__vectorcall", "_cdecl", "_stdcall"}
+STORAGE = {"typedef", "extern", "static", "inline", "__inline", "__inline__", "__forceinline",
+           "__extension__", "_Noreturn", "register", "auto", "_Thread_local", "__thread"}
+# Keywords followed by a parenthesized argument
+GROUPED = {"__attribute__", "__attribute", "__declspec", "_Alignas", "alignas", "__asm__", "__asm",
+           "asm", "__typeof__", "__typeof", "typeof", "_Pragma"}
+AGGREGATES = {"struct", "union", "enum"}
+KEYWORDS = BASIC_TYPES | QUALIFIERS | CALLING_CONVENTIONS | STORAGE | GROUPED | AGGREGATES | {"sizeof", "_Alignof"}
+# Attributes that change a layout; everything else is dropped from the output
+LAYOUT_ATTRIBUTES = re.compile(r"\b_*(packed|aligned|align|mode|vector_size)_*\b")
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<str>L?"(?:\\.|[^"\\])*")
+  | (?P<chr>L?'(?:\\.|[^'\\])*')
+  | (?P<id>[A-Za-z_]\w*)
+  | (?P<num>\.?\d(?:[eEpP][+-]|[\w.])*)
+  | (?P<op>\.\.\.|<<=|>>=|->|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^!~<>=?:;,.()\[\]{}#])
+""", re.X)
+IDENT_RE = re.compile(r"^[A-Za-z_]\w*$")
+LINE_MARKER_RE = re.compile(r'^#\s*(?:line\s+)?\d+\s+"((?:\\.|[^"\\])*)"')
+DEFINE_RE = re.compile(r"^#\s*define\s+([A-Za-z_]\w*)(\()?\s*(.*)$")
+PRAGMA_PACK_RE = re.compile(r"^#\s*pragma\s+pack\s*\(\s*(push|pop)?\s*,?\s*(\d*)\s*\)")
+FILE_MARK = "\x00"
+
+# Simple text output - no colors to avoid encoding issues
+
+def print_step(msg):
+    print(f"\n==> {msg}")
+
+def print_success(msg):
+    print(f"[OK] {msg}")
+
+def print_error(msg):
+    print(f"[ERROR] {msg}")
+
+def print_warning(msg):
+    print(f"[WARNING] {msg}")
+
+class GeneratorError(Exception):
+    pass
+
+# ---------------------------------------------------------------------------
+# Tokens and declarations
+# ---------------------------------------------------------------------------
+
+def tokenize(text):
+    tokens = []
+    for m in TOKEN_RE.finditer(text):
+        if m.lastgroup != "ws":
+            tokens.append(m.group())
+    return tokens
+
+def is_ident(token):
+    return IDENT_RE.match(token) is not None and token not in KEYWORDS
+
+def closing(tokens, i):
+    """Index of the bracket closing tokens[i]"""
+    pairs = {"(": ")", "[": "]", "{": "}"}
+    stack = []
+    for j in range(i, len(tokens)):
+        t = tokens[j]
+        if t in pairs:
+            stack.append(pairs[t])
+        elif stack and t == stack[-1]:
+            stack.pop()
+            if not stack:
+                return j
+    raise GeneratorError(f"unbalanced '{tokens[i]}' in: {' '.join(tokens[:40])}")
+
+def split_top(tokens, separator):
+    """Split at separator tokens outside of brackets"""
+    parts, start, i = [], 0, 0
+    while i < len(tokens):
+        t = tokens[i]
+        if t in "([{" and len(t) == 1:
+            i = closing(tokens, i) + 1
+            continue
+        if t == separator:
+            parts.append(tokens[start:i])
+            start = i + 1
+        i += 1
+    parts.append(tokens[start:])
+    return parts
+
+def opens_aggregate(tokens):
+    """Whether a '{' following tokens opens a struct/union/enum body"""
+    j = len(tokens) - 1
+    while j >= 0:
+        t = tokens[j]
+        if t == ")":
+            depth = 0
+            k = j
+            while k >= 0:
+                depth += {")": 1, "(": -1}.get(tokens[k], 0)
+                if depth == 0:
+                    break
+                k -= 1
+            if k > 0 and tokens[k - 1] in GROUPED:
+                j = k - 2
+                continue
+            return False
+        if t in AGGREGATES:
+            return True
+        if not IDENT_RE.match(t):
+            return False
+        j -= 1
+    return False
+
+def pragma_pack(line, stack):
+    """Apply '#pragma pack(...)' to stack (its last item is in effect; 0 is the default)"""
+    m = PRAGMA_PACK_RE.match(line)
+    if m is None:
+        return
+    action, value = m.groups()
+    if action == "push":
+        stack.append(int(value) if value else stack[-1])
+    elif action == "pop":
+        if len(stack) > 1:
+            stack.pop()
+    else:
+        stack[-1] = int(value) if value else 0
+
+def split_declarations(tokens):
+    """Top-level (path, declaration, pack) triples, without the ';'. A
+    declaration belongs to the file it starts in (FreeType includes its error
+    list in the middle of an enum). pack is the '#pragma pack' in effect, or
+    0. Function definitions are dropped."""
+    decls, current, i = [], [], 0
+    path = start = None
+    pack = [0]
+    while i < len(tokens):
+        t = tokens[i]
+        if t.startswith(FILE_MARK):
+            path = t[len(FILE_MARK):]
+        elif t.startswith("#"):
+            pragma_pack(t, pack)
+        elif t == ";":
+            if current:
+                decls.append((start, current, pack[-1]))
+            current = []
+        elif t in ("(", "[", "{"):
+            end = closing(tokens, i)
+            if not current:
+                start = path
+            if t == "{" and current and current[-1] != "=" and not opens_aggregate(current):
+                # A function body: the declaration goes with it
+                current = []
+            else:
+                current.extend(x for x in tokens[i:end + 1] if not x.startswith(FILE_MARK))
+            for x in tokens[i:end + 1]:
+                if x.startswith(FILE_MARK):
+                    path = x[len(FILE_MARK):]
+            i = end
+        else:
+            if not current:
+                start = path
+            current.append(t)
+        i += 1
+    if current:
+        decls.append((start, current, pack[-1]))
+    return decls
+
+class Specifiers:
+    def __init__(self):
+        self.storage = set()
+        self.has_type = False
+        self.type_name = None      # typedef name used as the type
+        self.aggregate = None      # "struct" / "union" / "enum"
+        self.tag = None
+        self.body = None           # tokens between the braces
+
+def parse_specifiers(tokens, typedefs):
+    """Declaration specifiers at the start of tokens; returns (index after them, Specifiers)"""
+    spec = Specifiers()
+    i = 0
+    while i < len(tokens):
+        t = tokens[i]
+        if t in GROUPED:
+            if t in ("__typeof__", "__typeof", "typeof"):
+                spec.has_type = True
+            i += 1
+            if i < len(tokens) and tokens[i] == "(":
+                i = closing(tokens, i) + 1
+        elif t in STORAGE:
+            spec.storage.add(t)
+            i += 1
+        elif t in QUALIFIERS or t in CALLING_CONVENTIONS:
+            i += 1
+        elif t in BASIC_TYPES:
+            spec.has_type = True
+            i += 1
+        elif t in AGGREGATES:
+            spec.has_type = True
+            spec.aggregate = t
+            i += 1
+            while i < len(tokens) and tokens[i] in GROUPED:
+                i += 1
+                if i < len(tokens) and tokens[i] == "(":
+                    i = closing(tokens, i) + 1
+            if i < len(tokens) and is_ident(tokens[i]):
+                spec.tag = tokens[i]
+                i += 1
+            if i < len(tokens) and tokens[i] == "{":
+                end = closing(tokens, i)
+                spec.body = tokens[i + 1:end]
+                i = end + 1
+        elif is_ident(t) and not spec.has_type:
+            # A typedef name; names that aren't known yet but are followed
+            # by another name or a pointer are taken as types too
+            following = tokens[i + 1] if i + 1 < len(tokens) else None
+            if t in typedefs or (following is not None and (is_ident(following) or following == "*")):
+                spec.has_type = True
+                spec.type_name = t
+                i += 1
+            else:
+                break
+        else:
+            break
+    return i, spec
+
+def parse_declarator(tokens):
+    """(name, is_function, is_pointer, is_bitfield) of one declarator"""
+    i = 0
+    pointer = False
+    while i < len(tokens):
+        t = tokens[i]
+        if t in ("*", "^", "&"):
+            pointer = True
+            i += 1
+        elif t in QUALIFIERS or t in CALLING_CONVENTIONS:
+            i += 1
+        elif t in GROUPED:
+            i += 1
+            if i < len(tokens) and tokens[i] == "(":
+                i = closing(tokens, i) + 1
+        else:
+            break
+    name = None
+    grouped = False
+    inner_function = inner_pointer = False
+    if i < len(tokens) and tokens[i] == "(":
+        end = closing(tokens, i)
+        inner = tokens[i + 1:end]
+        if inner and (inner[0] in ("*", "^") or inner[0] in CALLING_CONVENTIONS or inner[0] in GROUPED):
+            name, inner_function, inner_pointer, _ = parse_declarator(inner)
+            grouped = True
+            i = end + 1
+    elif i < len(tokens) and is_ident(tokens[i]):
+        name = tokens[i]
+        i += 1
+    suffix = tokens[i] if i < len(tokens) else None
+    if grouped:
+        is_function = inner_function or (not inner_pointer and suffix == "(")
+        pointer = pointer or inner_pointer
+    else:
+        is_function = suffix == "("
+    bitfield = ":" in [t for t in split_top(tokens[i:], ",")[0]]
+    return name, is_function, pointer, bitfield
+
+def enumerators(body):
+    names = []
+    for item in split_top(body, ","):
+        if item and is_ident(item[0]):
+            names.append(item[0])
+    return names
+
+def struct_fields(body, typedefs):
+    """Member names of a struct/union body; members of anonymous structs and
+    unions count as members of the enclosing one, bitfields are left out"""
+    fields = []
+    for member in split_top(body, ";"):
+        if not member or member[0] in ("_Static_assert", "static_assert"):
+            continue
+        i, spec = parse_specifiers(member, typedefs)
+        declarators = [d for d in split_top(member[i:], ",") if d]
+        if not declarators:
+            if spec.body is not None and spec.aggregate in ("struct", "union") and spec.tag is None:
+                fields += struct_fields(spec.body, typedefs)
+            continue
+        for declarator in declarators:
+            name, is_function, _, bitfield = parse_declarator(declarator)
+            if name and not bitfield and not is_function:
+                fields.append(name)
+    return fields
+
+def nested_definitions(tokens):
+    """Tags and enumerators defined anywhere in a declaration (C gives nested ones file scope)"""
+    defined = []
+    for i, t in enumerate(tokens):
+        if t not in AGGREGATES:
+            continue
+        j = i + 1
+        tag = None
+        if j < len(tokens) and is_ident(tokens[j]):
+            tag = tokens[j]
+            j += 1
+        if j < len(tokens) and tokens[j] == "{":
+            if tag:
+                defined.append(f"{t} {tag}")
+            if t == "enum":
+                defined += enumerators(tokens[j + 1:closing(tokens, j)])
+    return defined
+
+def references(tokens):
+    """Names a declaration needs declared before it, and tags it only names.
+    Tags only count where they're used by value: 'struct X *' and
+    'struct X;' don't need X's body, 'typedef struct X Y' only does once Y
+    is used (weak references)."""
+    refs, weak = set(), set()
+    depth = 0
+    for i, t in enumerate(tokens):
+        if t == "{":
+            depth += 1
+        elif t == "}":
+            depth -= 1
+        elif t in AGGREGATES and i + 1 < len(tokens) and is_ident(tokens[i + 1]):
+            following = tokens[i + 2] if i + 2 < len(tokens) else ";"
+            if following not in ("*", ";", "{"):
+                tag = f"{t} {tokens[i + 1]}"
+                if depth == 0 and tokens[0] == "typedef":
+                    weak.add(tag)
+                else:
+                    refs.add(tag)
+        elif is_ident(t) and (i == 0 or tokens[i - 1] not in AGGREGATES):
+            refs.add(t)
+    return refs, weak
+
+class Declaration:
+    def __init__(self, tokens, path):
+        self.tokens = tokens
+        self.path = path
+        self.chunk = None
+        self.defines = []          # names, "struct X" tags, enumerators
+        self.symbols = []          # functions and variables (looked up in the library)
+        self.functions = []
+        self.typedefs = []
+        self.refs = set()
+        self.weak_refs = set()
+        self.layouts = []          # (type spelling, fields or None for sizeof only, aliased tag)
+        self.order = 0             # position in the preprocessed headers
+        self.pack = 0              # '#pragma pack' in effect
+
+def analyze(tokens, path, typedefs):
+    """Declaration for tokens, or None when LuaJIT can't or shouldn't see it"""
+    decl = Declaration(tokens, path)
+    if tokens[0] in ("_Static_assert", "static_assert") or tokens[:2] == ["__extension__", "_Static_assert"]:
+        return None
+    i, spec = parse_specifiers(tokens, typedefs)
+    declarators = [d for d in split_top(tokens[i:], ",") if d]
+    is_typedef = "typedef" in spec.storage
+    if "static" in spec.storage and not is_typedef:
+        return None
+    decl.defines += nested_definitions(tokens)
+    decl.refs, decl.weak_refs = references(tokens)
+    if spec.aggregate and spec.tag and spec.body is not None and spec.aggregate != "enum":
+        decl.layouts.append((f"{spec.aggregate} {spec.tag}",
+                             struct_fields(spec.body, typedefs), None))
+    for declarator in declarators:
+        name, is_function, pointer, _ = parse_declarator(declarator)
+        if name is None:
+            continue
+        if is_typedef:
+            typedefs.add(name)
+            decl.typedefs.append(name)
+            decl.defines.append(name)
+            plain = len(declarator) == 1
+            if plain and spec.body is not None and spec.aggregate != "enum":
+                decl.layouts.append((name, struct_fields(spec.body, typedefs), None))
+            elif not is_function:
+                alias = f"{spec.aggregate} {spec.tag}" if spec.aggregate and spec.body is None and plain else None
+                decl.layouts.append((name, None, alias))
+        else:
+            decl.defines.append(name)
+            decl.symbols.append(name)
+            if is_function:
+                decl.functions.append(name)
+    return decl
+
+# ---------------------------------------------------------------------------
+# Preprocessing
+# ---------------------------------------------------------------------------
+
+def find_tool(explicit, env_var, candidates):
+    for name in [explicit, os.environ.get(env_var)] + candidates:
+        if name and shutil.which(name):
+            return shutil.which(name)
+    return None
+
+def include_flags(prefix):
+    inc = prefix / "include"
+    return [f"-I{inc}", f"-I{inc / 'SDL2'}", f"-I{inc / 'freetype2'}", f"-I{inc / 'cimgui'}"]
+
+def umbrella_source(libraries, prefix):
+    """The translation unit every header is preprocessed and probed in"""
+    lines = []
+    for name in libraries:
+        lib = LIBRARIES[name]
+        lines += [f"#define {define}" for define in lib.get("defines", [])]
+    for name in libraries:
+        for include in LIBRARIES[name]["includes"]:
+            header = include.strip('"')
+            if include.startswith('"') and not (prefix / "include" / Path(LIBRARIES[name]["check"]).parent / header).exists():
+                continue
+            lines.append(f"#include {include}")
+    return "\n".join(lines) + "\n"
+
+def preprocess(cc, prefix, source):
+    """Run `cc -E -dD` over source; returns its output"""
+    path = WORK_DIR / "headers.c"
+    path.write_text(source)
+    cmd = [cc, "-E", "-dD", "-std=gnu11", *include_flags(prefix), str(path)]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr)
+        raise GeneratorError("the preprocessor failed")
+    return result.stdout
+
+def unescape_path(path):
+    return path.replace("\\\\", "\\")
+
+def read_preprocessed(text):
+    """Tokens of the preprocessor output, with a FILE_MARK token wherever the
+    file changes, and {macro: (path, body)}"""
+    tokens = []
+    macros = {}
+    current = None
+    code = []
+
+    def flush():
+        if code:
+            tokens.extend(tokenize("\n".join(code)))
+            code.clear()
+
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            code.append(line)
+            continue
+        m = LINE_MARKER_RE.match(line)
+        if m:
+            flush()
+            current = unescape_path(m.group(1))
+            tokens.append(FILE_MARK + current)
+            continue
+        m = DEFINE_RE.match(line)
+        if m:
+            if not m.group(2):
+                macros[m.group(1)] = (current, m.group(3).strip())
+            continue
+        if PRAGMA_PACK_RE.match(line):
+            flush()
+            tokens.append(line.strip())
+    flush()
+    return tokens, macros
+
+# ---------------------------------------------------------------------------
+# Chunks
+# ---------------------------------------------------------------------------
+
+class Chunk:
+    def __init__(self, library, name, header):
+        self.library = library
+        self.name = name
+        self.header = header
+        self.decls = []
+        self.deps = set()
+        self.constants = []        # (name, value)
+
+    @property
+    def module(self):
+        return f"cdefs.{self.library}.{self.name}" if self.library else f"cdefs.{self.name}"
+
+class HeaderMap:
+    """Which library and chunk a header path belongs to"""
+    def __init__(self, prefix, libraries):
+        # Include directories may be symlinks (Homebrew-style prefixes), so a
+        # header is matched by its path as written as well as its real path
+        include = prefix / "include"
+        self.includes = list(dict.fromkeys([Path(os.path.abspath(include)), include.resolve()]))
+        self.libraries = libraries
+        self.cache = {}
+
+    def relative(self, path):
+        if path not in self.cache:
+            rel = None
+            if path and not path.startswith("<"):
+                for candidate in (Path(os.path.abspath(path)), Path(path).resolve()):
+                    for include in self.includes:
+                        try:
+                            rel = candidate.relative_to(include).as_posix()
+                            break
+                        except ValueError:
+                            pass
+                    if rel is not None:
+                        break
+            self.cache[path] = rel
+        return self.cache[path]
+
+    def library(self, path):
+        rel = self.relative(path)
+        if rel is None:
+            return None
+        for name in self.libraries:
+            if rel in LIBRARIES[name].get("files", []):
+                return name
+        for name in self.libraries:
+            if any(rel.startswith(d + "/") for d in LIBRARIES[name].get("dirs", [])):
+                return name
+        return None
+
+def chunk_name(rel):
+    return re.sub(r"\W", "_", Path(rel).stem)
+
+def build_chunks(tokens, headers, libraries):
+    """Analyze every declaration and assign it to a chunk.
+
+    Returns (chunks in first-declaration order, system declarations by name).
+    """
+    typedefs = set(LUAJIT_TYPES)
+    chunks = {}
+    order = []
+    system = {}                    # name -> Declaration from a system header
+    count = 0
+    for path, tokens_of_decl, pack in split_declarations(tokens):
+        library = headers.library(path)
+        try:
+            decl = analyze(tokens_of_decl, path, typedefs)
+        except GeneratorError:
+            if library is None:
+                continue
+            raise
+        if decl is None:
+            continue
+        decl.order = count
+        decl.pack = pack
+        count += 1
+        if library is None:
+            for name in decl.defines:
+                system.setdefault(name, decl)
+            continue
+        rel = headers.relative(path)
+        name = chunk_name(rel)
+        split = LIBRARIES[library].get("split")
+        if split and rel == split[0] and decl.functions and len(decl.functions) == len(decl.symbols):
+            m = re.match(split[1], decl.functions[0])
+            name = m.group(1) if m else split[2]
+        key = (library, name)
+        if key not in chunks:
+            chunks[key] = Chunk(library, name, rel)
+            order.append(chunks[key])
+        decl.chunk = chunks[key]
+        chunks[key].decls.append(decl)
+    return order, system
+
+def resolve_dependencies(chunks, system):
+    """Fill in chunk.deps; returns the chunk of the system declarations that
+    are needed, or None. Only types and constants are looked up: the other
+    identifiers of a declaration are parameter and member names."""
+    defined = {}
+    needed_system = []
+    system_chunk = Chunk(None, "system", None)
+
+    def need_system(name, seen):
+        decl = system.get(name)
+        if decl is None or name in LUAJIT_TYPES or name in decl.symbols or id(decl) in seen:
+            return
+        seen.add(id(decl))
+        for ref in decl.refs:
+            if ref not in defined:
+                need_system(ref, seen)
+        needed_system.append(decl)
+
+    seen = set()
+    all_decls = sorted((d for c in chunks for d in c.decls), key=lambda d: d.order)
+    for decl in all_decls:
+        for ref in decl.refs:
+            owner = defined.get(ref)
+            if owner is not None:
+                if owner is not decl.chunk:
+                    decl.chunk.deps.add(owner)
+            elif ref in system:
+                need_system(ref, seen)
+                if system[ref] in needed_system:
+                    decl.chunk.deps.add(system_chunk)
+        for name in decl.defines:
+            if name not in decl.symbols:
+                defined.setdefault(name, decl.chunk)
+    # A typedef of a library struct brings the struct's body along, wherever
+    # it is declared
+    for decl in all_decls:
+        for ref in decl.weak_refs:
+            owner = defined.get(ref)
+            if owner is not None and owner is not decl.chunk:
+                decl.chunk.deps.add(owner)
+    needed_system.sort(key=lambda d: d.order)
+    system_chunk.decls = needed_system
+    return system_chunk if needed_system else None
+
+def merge_cycles(chunks):
+    """Merge chunks that depend on each other (a header that includes another
+    one between its own declarations); Lua's require can't load a cycle"""
+    index = {id(c): n for n, c in enumerate(chunks)}
+    low, number, stack, on_stack, components = {}, {}, [], set(), []
+    counter = [0]
+
+    def visit(c):
+        number[id(c)] = low[id(c)] = counter[0]
+        counter[0] += 1
+        stack.append(c)
+        on_stack.add(id(c))
+        for d in c.deps:
+            if id(d) not in index:
+                continue
+            if id(d) not in number:
+                visit(d)
+                low[id(c)] = min(low[id(c)], low[id(d)])
+            elif id(d) in on_stack:
+                low[id(c)] = min(low[id(c)], number[id(d)])
+        if low[id(c)] == number[id(c)]:
+            component = []
+            while True:
+                d = stack.pop()
+                on_stack.discard(id(d))
+                component.append(d)
+                if d is c:
+                    break
+            components.append(component)
+
+    sys.setrecursionlimit(max(10000, sys.getrecursionlimit()))
+    for c in chunks:
+        if id(c) not in number:
+            visit(c)
+    replaced = {}
+    for component in components:
+        if len(component) < 2:
+            continue
+        component.sort(key=lambda c: index[id(c)])
+        target = component[0]
+        print_warning(f"{target.library}: merged {', '.join(c.name for c in component)} (circular dependency)")
+        for c in component[1:]:
+            target.decls += c.decls
+            target.deps |= c.deps
+            target.constants += c.constants
+            replaced[id(c)] = target
+    if not replaced:
+        return chunks
+    for c in chunks:
+        c.decls.sort(key=lambda d: d.order)
+        c.deps = {replaced.get(id(d), d) for d in c.deps}
+        c.deps.discard(c)
+        for d in c.decls:
+            d.chunk = c
+    return [c for c in chunks if id(c) not in replaced]
+
+def reduce_dependencies(chunks):
+    """Drop requires that another required module already implies"""
+    closure = {}
+
+    def reach(c):
+        if id(c) not in closure:
+            closure[id(c)] = set()
+            for d in c.deps:
+                closure[id(c)] |= {id(d)} | reach(d)
+        return closure[id(c)]
+
+    for c in chunks:
+        indirect = set()
+        for d in c.deps:
+            indirect |= reach(d)
+        c.deps = {d for d in c.deps if id(d) not in indirect}
+
+# ---------------------------------------------------------------------------
+# Probe
+# ---------------------------------------------------------------------------
+
+PROBE_PRELUDE = r"""
+#include <stdio.h>
+#include <stddef.h>
+#define PROBE_ALIGNOF(T) _Alignof(T)
+#define PROBE_IS_INT(x) _Generic((x), _Bool: 1, char: 1, signed char: 1, unsigned char: 1, short: 1, \
+    unsigned short: 1, int: 1, unsigned int: 1, long: 1, unsigned long: 1, long long: 1, \
+    unsigned long long: 1, default: 0)
+#define PROBE_STRING(x) _Generic((x), char*: (x), const char*: (x), default: (const char*)0)
+static void constant(const char* name, int is_int, int negative, unsigned long long value, const char* string) {
+    if (is_int)
+        printf("C\t%s\t%s%llu\n", name, negative ? "-" : "", negative ? 0ull - value : value);
+    else if (string)
+        printf("S\t%s\t%s\n", name, string);
+}
+"""
+
+CPP_PROBE_PRELUDE = r"""
+#include <stdio.h>
+#include <stddef.h>
+#include "imgui.h"
+#include "imgui_internal.h"
+#define PROBE_ALIGNOF(T) alignof(T)
+"""
+
+def probe_lines(types, macros=()):
+    """Probe statements, one per line so compiler errors map to entries.
+    Returns (lines, entries) where entries[i] describes lines[i]."""
+    lines, entries = [], []
+    for spelling, fields in types:
+        lines.append(f'printf("T\\t%s\\t%u\\t%u\\n", "{spelling}", (unsigned)sizeof({spelling}), '
+                     f'(unsigned)PROBE_ALIGNOF({spelling}));')
+        entries.append(("type", spelling, None))
+        for field in fields or ():
+            lines.append(f'printf("F\\t%s\\t%s\\t%u\\n", "{spelling}", "{field}", '
+                         f'(unsigned)offsetof({spelling}, {field}));')
+            entries.append(("field", spelling, field))
+    for name in macros:
+        lines.append(f'constant("{name}", PROBE_IS_INT({name}), PROBE_IS_INT({name}) && ({name}) < 0, '
+                     f'(unsigned long long)({name}), PROBE_STRING({name}));')
+        entries.append(("macro", name, None))
+    return lines, entries
+
+def run_probe(compiler, flags, prelude, lines, entries, name):
+    """Compile and run a probe, dropping entries the compiler rejects.
+
+    Returns (stdout, dropped entries).
+    """
+    suffix = ".cpp" if name.endswith("_cpp") else ".c"
+    source = WORK_DIR / (name + suffix)
+    exe = WORK_DIR / (name + (".exe" if IS_WINDOWS else ""))
+    dropped = []
+    is_clang = "clang" in subprocess.run([compiler, "--version"], capture_output=True, text=True).stdout
+    error_limit = ["-ferror-limit=0"] if is_clang else ["-fmax-errors=0"]
+    while True:
+        body = [prelude, "int main(void) {"]
+        first = len("\n".join(body).splitlines()) + 1
+        body += lines
+        body += ["return 0;", "}", ""]
+        source.write_text("\n".join(body))
+        cmd = [compiler, "-w", *error_limit, *flags, str(source), "-o", str(exe)]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            break
+        bad = set()
+        pattern = re.compile(re.escape(source.name) + r":(\d+):(?:\d+:)?\s*(error|note: in expansion)")
+        for line in result.stderr.splitlines():
+            m = pattern.search(line)
+            if m:
+                index = int(m.group(1)) - first
+                if 0 <= index < len(lines):
+                    bad.add(index)
+        if not bad:
+            print(result.stderr[-4000:])
+            raise GeneratorError(f"{source.name} doesn't compile")
+        # A type that doesn't compile takes its fields with it
+        bad_types = {entries[i][1] for i in bad if entries[i][0] == "type"}
+        keep = [i for i in range(len(lines))
+                if i not in bad and not (entries[i][0] == "field" and entries[i][1] in bad_types)]
+        dropped += [entries[i] for i in range(len(lines)) if i not in keep]
+        lines = [lines[i] for i in keep]
+        entries = [entries[i] for i in keep]
+    result = subprocess.run([str(exe)], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GeneratorError(f"{exe.name} failed")
+    return result.stdout, dropped
+
+def parse_probe_output(text):
+    """{type: (size, align, {field: offset})}, {macro: int or str}"""
+    layouts, constants = {}, {}
+    for line in text.splitlines():
+        parts = line.split("\t")
+        if parts[0] == "T":
+            layouts[parts[1]] = (int(parts[2]), int(parts[3]), {})
+        elif parts[0] == "F":
+            layouts[parts[1]][2][parts[2]] = int(parts[3])
+        elif parts[0] == "C":
+            constants[parts[1]] = int(parts[2])
+        elif parts[0] == "S" and len(parts) == 3:
+            constants[parts[1]] = parts[2]
+    return layouts, constants
+
+def probe_types(chunks):
+    """(spelling, fields) of every complete type declared in the chunks, and
+    {spelling: library}"""
+    complete_tags = set()
+    for c in chunks:
+        for d in c.decls:
+            complete_tags |= {name for name in d.defines if name.split(" ")[0] in ("struct", "union")}
+    types, owners, seen = [], {}, set()
+    for c in chunks:
+        for d in c.decls:
+            for spelling, fields, alias in d.layouts:
+                if spelling in seen or (alias and alias.split(" ")[0] != "enum" and alias not in complete_tags):
+                    continue
+                seen.add(spelling)
+                types.append((spelling, fields))
+                owners[spelling] = c.library
+    return types, owners
+
+def macro_candidates(macros, headers, defined, symbols):
+    """Object-like macros of the libraries that may be integer or string
+    constants. Aliases of functions and variables are left out, the probe
+    would have to link them."""
+    def uses_symbol(body, seen):
+        for token in tokenize(body):
+            if token in symbols:
+                return True
+            if token in macros and token not in seen:
+                seen.add(token)
+                if uses_symbol(macros[token][1], seen):
+                    return True
+        return False
+
+    names = []
+    for name, (path, body) in macros.items():
+        library = headers.library(path)
+        if library is None or not body or name in defined:
+            continue
+        lib = LIBRARIES[library]
+        if not re.match(lib["constants"], name):
+            continue
+        if lib.get("no_constants") and re.search(lib["no_constants"], "/" + headers.relative(path)):
+            continue
+        if re.search(r"[{};#]|\b(__attribute__|__declspec|typedef|struct|union|extern|static|inline)\b", body):
+            continue
+        if uses_symbol(body, {name}):
+            continue
+        names.append(name)
+    return names
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def strip_attributes(tokens):
+    """Drop attributes LuaJIT doesn't need; keep the ones that change a layout
+    and __asm__ symbol names"""
+    out = []
+    i = 0
+    while i < len(tokens):
+        t = tokens[i]
+        if t in ("__attribute__", "__attribute", "__declspec") and i + 1 < len(tokens) and tokens[i + 1] == "(":
+            end = closing(tokens, i + 1)
+            if LAYOUT_ATTRIBUTES.search(" ".join(tokens[i + 2:end])):
+                out += tokens[i:end + 1]
+            i = end + 1
+            continue
+        if t in ("__extension__", "_Noreturn", "__inline", "__inline__", "inline", "__forceinline"):
+            i += 1
+            continue
+        out.append(t)
+        i += 1
+    return out
+
+def needs_space(prev, token):
+    if prev is None:
+        return False
+    if token in (",", ";", ")", "]") or prev in ("(", "[", "~", "!"):
+        return False
+    if token in ("(", "[") and (is_ident(prev) or prev in (")", "]") or prev in KEYWORDS):
+        return prev in GROUPED or prev in AGGREGATES or prev in STORAGE or prev in QUALIFIERS \
+            or prev in CALLING_CONVENTIONS or prev in BASIC_TYPES
+    return True
+
+def format_declaration(tokens):
+    """C text of one declaration, one struct member or enumerator per line"""
+    tokens = strip_attributes(tokens)
+    out = []
+    line = []
+    depth = 0
+    enum_depths = []
+    pending_enum = False
+    prev = None
+    for t in tokens:
+        if t == "{":
+            line.append(" {")
+            out.append("    " * depth + "".join(line).strip())
+            line = []
+            depth += 1
+            if pending_enum:
+                enum_depths.append(depth)
+            pending_enum = False
+            prev = None
+            continue
+        if t == "}":
+            if line:
+                out.append("    " * depth + "".join(line).strip())
+                line = []
+            if enum_depths and enum_depths[-1] == depth:
+                enum_depths.pop()
+            depth -= 1
+            line = ["}"]
+            prev = "}"
+            continue
+        if t == "enum":
+            pending_enum = True
+        elif t in ("struct", "union"):
+            pending_enum = False
+        if needs_space(prev, t):
+            line.append(" ")
+        line.append(t)
+        prev = t
+        if depth > 0 and (t == ";" or (t == "," and enum_depths and enum_depths[-1] == depth)):
+            out.append("    " * depth + "".join(line).strip())
+            line = []
+            prev = None
+    if line:
+        out.append("    " * depth + "".join(line).strip())
+    return "\n".join(out) + ";"
+
+def lua_string(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+def lua_long_bracket(text):
+    level = 0
+    while f"]{'=' * level}]" in text:
+        level += 1
+    return f"[{'=' * level}[", f"]{'=' * level}]"
+
+def cdef_constant(name, value):
+    """C declaration for an integer constant, or None when LuaJIT's static
+    const can't hold it (strings, more than 32 bits)"""
+    if isinstance(value, str):
+        return None
+    if -2**31 <= value < 2**31:
+        return f"static const int {name} = {value};"
+    if 0 <= value < 2**32:
+        return f"static const unsigned int {name} = {value}u;"
+    return None
+
+def lua_constant(value):
+    if isinstance(value, str):
+        return lua_string(value)
+    if value < 0:
+        return f"{value}LL"
+    return f"{value}ULL"
+
+def chunk_source(chunk):
+    origin = chunk.header or "the system headers this platform's libraries use"
+    lines = [f"-- Generated by generate_cdefs.py from {origin}. Do not edit."]
+    for dep in sorted(chunk.deps, key=lambda c: c.module):
+        lines.append(f'require("{dep.module}")')
+    declarations = []
+    for d in chunk.decls:
+        if d.pack:
+            declarations.append(f"#pragma pack(push, {d.pack})\n{format_declaration(d.tokens)}\n#pragma pack(pop)")
+        else:
+            declarations.append(format_declaration(d.tokens))
+    text = "\n".join(declarations)
+    static = [cdef_constant(name, value) for name, value in chunk.constants]
+    text = "\n".join(filter(None, [text] + static))
+    if text:
+        open_bracket, close_bracket = lua_long_bracket(text)
+        lines.append(f'require("ffi").cdef{open_bracket}\n{text}\n{close_bracket}')
+    table = [(name, value) for name, value in chunk.constants if cdef_constant(name, value) is None]
+    if table:
+        lines.append("return {")
+        lines += [f"    {name} = {lua_constant(value)}," for name, value in table]
+        lines.append("}")
+    else:
+        lines.append("return {}")
+    return "\n".join(lines) + "\n"
+
+def index_hash(name):
+    """Bucket hash of a name; cdefs/init.lua computes the same"""
+    h = 0
+    for byte in name.encode():
+        h = (h * 31 + byte) % 65521
+    return h
+
+def index_source(library, chunks):
+    """Modules, and the declared names in buckets by index_hash: a bucket is
+    one string of '|name=module number|' entries. Loading a few strings and
+    searching one per lookup is cheaper than building a table of every name
+    when only some are used."""
+    modules, entries, seen = [], [], set()
+    for c in chunks:
+        modules.append(c.name)
+        for name in [n for d in c.decls for n in d.defines] + [n for n, _ in c.constants]:
+            if name not in seen:
+                seen.add(name)
+                entries.append((name, len(modules)))
+    count = max(1, len(entries) // 64)
+    buckets = [[] for _ in range(count)]
+    for name, module in entries:
+        buckets[index_hash(name) % count].append(f"{name}={module}")
+    lines = [f"-- Generated by generate_cdefs.py. Do not edit.",
+             f"-- Modules of cdefs.{library} and the names they declare",
+             "return {",
+             "    modules = {" + ", ".join(lua_string(m) for m in modules) + "},"]
+    lines += [f"    {lua_string('|' + '|'.join(bucket) + '|')}," for bucket in buckets]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def library_source(library, chunks):
+    names = ", ".join(lua_string(c.name) for c in chunks)
+    return f"""-- Generated by generate_cdefs.py. Do not edit.
+-- Declares all of {library}; returns its string and 64-bit constants
+local constants = {{}}
+for _, chunk in ipairs({{{names}}}) do
+    for name, value in pairs(require("cdefs.{library}." .. chunk)) do
+        constants[name] = value
+    end
+end
+return constants
+"""
+
+LOADER_SOURCE = """-- Generated by generate_cdefs.py. Do not edit.
+--
+-- FFI declarations of the bundled libraries, one module per header:
+--   require("cdefs.sdl2")                      -- all of SDL2
+--   require("cdefs.sdl2.SDL_video")            -- SDL_video.h and what it needs
+--   cdefs.need("sdl2", "SDL_Event")            -- the header declaring a name
+--   local SDL = cdefs.lazy(ffi.load(...), "sdl2")
+--                                              -- declares on first use of a symbol
+-- Integer macros are declared as constants; string macros and integers wider
+-- than 32 bits are returned by the header modules (and found by cdefs.lazy).
+local cdefs = {}
+
+local byte, find, match = string.byte, string.find, string.match
+
+local function module_of(lib, name)
+    local index = require("cdefs." .. lib .. ".index")
+    local h = 0
+    for i = 1, #name do
+        h = (h * 31 + byte(name, i)) % 65521
+    end
+    local bucket = index[h % #index + 1]
+    local _, last = find(bucket, "|" .. name .. "=", 1, true)
+    return last and "cdefs." .. lib .. "." .. index.modules[tonumber(match(bucket, "^%d+", last + 1))]
+end
+
+-- Declares the headers of lib that declare the given functions, types
+-- ("SDL_Event", "struct SDL_Rect") or constants
+function cdefs.need(lib, ...)
+    for i = 1, select("#", ...) do
+        local name = select(i, ...)
+        local module = module_of(lib, name)
+        if module == nil then
+            error(lib .. " doesn't declare " .. name, 2)
+        end
+        require(module)
+    end
+end
+
+-- Wraps a library namespace (ffi.load() or ffi.C): the first access to a
+-- symbol declares its header. Values are cached in the wrapper, so calls
+-- go through a function pointer; hot code can cdefs.need() what it uses and
+-- call through the namespace itself.
+function cdefs.lazy(clib, lib)
+    return setmetatable({}, {
+        __index = function(self, name)
+            local module = module_of(lib, name)
+            local value = module and require(module)[name]
+            if value == nil then
+                value = clib[name]
+            end
+            rawset(self, name, value)
+            return value
+        end,
+    })
+end
+
+return cdefs
+"""
+
+def write_modules(output, chunks, system_chunk, libraries):
+    """Replace output/cdefs with the generated modules and install LUA_MODULES"""
+    root = output / "cdefs"
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    (root / "init.lua").write_text(LOADER_SOURCE)
+    if system_chunk:
+        (root / "system.lua").write_text(chunk_source(system_chunk))
+    for library in libraries:
+        lib_chunks = [c for c in chunks if c.library == library]
+        lib_dir = root / library
+        lib_dir.mkdir()
+        for c in lib_chunks:
+            (lib_dir / f"{c.name}.lua").write_text(chunk_source(c))
+        (lib_dir / "index.lua").write_text(index_source(library, lib_chunks))
+        (lib_dir / "init.lua").write_text(library_source(library, lib_chunks))
+        for name in LUA_MODULES.get(library, []):
+            shutil.copyfile(SOURCE_DIR / "lua" / name, output / name)
+
+# ---------------------------------------------------------------------------
+# Verification
+# ---------------------------------------------------------------------------
+
+VERIFY_SOURCE = r"""
+local root, layout_file = ...
+package.path = root .. "/?.lua;" .. root .. "/?/init.lua;" .. package.path
+local ffi = require("ffi")
+local layout = dofile(layout_file)
+for _, lib in ipairs(layout.libraries) do
+    require("cdefs." .. lib)
+end
+local errors, checked = {}, 0
+local function check(what, expected, got)
+    checked = checked + 1
+    if expected ~= got then
+        errors[#errors + 1] = what .. ": C " .. tostring(expected) .. ", LuaJIT " .. tostring(got)
+    end
+end
+for _, t in ipairs(layout.types) do
+    local name, size, align, fields = t[1], t[2], t[3], t[4]
+    local ok, ct = pcall(ffi.typeof, name)
+    if not ok then
+        errors[#errors + 1] = name .. ": " .. tostring(ct)
+    else
+        check("sizeof(" .. name .. ")", size, ffi.sizeof(ct) or ffi.sizeof(ct, 0))
+        check("alignof(" .. name .. ")", align, ffi.alignof(ct))
+        for _, f in ipairs(fields) do
+            check("offsetof(" .. name .. ", " .. f[1] .. ")", f[2], ffi.offsetof(ct, f[1]))
+        end
+    end
+end
+for _, c in ipairs(layout.constants) do
+    local name, value, module = c[1], c[2], c[3]
+    local got = require(module)[name]
+    if got == nil then
+        local ok, v = pcall(function() return ffi.C[name] end)
+        got = ok and v or nil
+    end
+    check(name, value, got)
+end
+for i = 1, math.min(#errors, 50) do
+    io.stderr:write(errors[i], "\n")
+end
+print(checked, #errors)
+os.exit(#errors == 0 and 0 or 1)
+"""
+
+def write_layout(path, libraries, types, layouts, constants, constant_modules):
+    lines = ["return {", "libraries = {" + ", ".join(lua_string(l) for l in libraries) + "},", "types = {"]
+    for spelling, _ in types:
+        if spelling not in layouts:
+            continue
+        size, align, fields = layouts[spelling]
+        field_text = ", ".join(f"{{{lua_string(f)}, {o}}}" for f, o in fields.items())
+        lines.append(f"{{{lua_string(spelling)}, {size}, {align}, {{{field_text}}}}},")
+    lines.append("},")
+    lines.append("constants = {")
+    for name, value in constants.items():
+        if name in constant_modules:
+            lines.append(f"{{{lua_string(name)}, {lua_constant(value) if cdef_constant(name, value) is None else value}, "
+                         f"{lua_string(constant_modules[name])}}},")
+    lines.append("},")
+    lines.append("}")
+    path.write_text("\n".join(lines) + "\n")
+
+def verify_luajit(luajit, output, layout_path):
+    """Load every module into LuaJIT and compare it with the probe"""
+    script = WORK_DIR / "verify.lua"
+    script.write_text(VERIFY_SOURCE)
+    result = subprocess.run([luajit, str(script), str(output), str(layout_path)], capture_output=True, text=True)
+    if result.returncode != 0 or not result.stdout.strip():
+        print(result.stderr[-6000:])
+        return False
+    checked, errors = result.stdout.split()
+    print(f"  {checked} sizes, offsets and constants match")
+    return True
+
+def verify_standalone(luajit, output, chunks, jobs):
+    """Each module has to load in a fresh LuaJIT with nothing but its requires"""
+    def load(module):
+        code = (f'package.path = [[{output}/?.lua;{output}/?/init.lua;]] .. package.path; '
+                f'require("{module}")')
+        result = subprocess.run([luajit, "-e", code], capture_output=True, text=True)
+        return module, result.returncode == 0, result.stderr.strip()
+
+    modules = [c.module for c in chunks]
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for module, ok, err in pool.map(load, modules):
+            if not ok:
+                failed.append((module, err))
+    for module, err in failed[:20]:
+        print(f"  {module}: {err.splitlines()[-1] if err else 'failed'}")
+    if not failed:
+        print(f"  {len(modules)} modules load on their own")
+    return not failed
+
+def compare_cpp(cimgui_layouts, cpp_layouts, dropped):
+    """Differences between cimgui.h (C) and imgui.h (C++) layouts"""
+    problems = []
+    for entry in dropped:
+        if entry[0] == "field" and entry[1] in cpp_layouts:
+            problems.append(f"{entry[1]}.{entry[2]}: not a member in imgui.h")
+    for spelling, (size, align, fields) in cpp_layouts.items():
+        c_size, c_align, c_fields = cimgui_layouts[spelling]
+        if (size, align) != (c_size, c_align):
+            problems.append(f"{spelling}: size/align {c_size}/{c_align} in cimgui.h, {size}/{align} in imgui.h")
+        for field, offset in fields.items():
+            if c_fields.get(field) != offset:
+                problems.append(f"{spelling}.{field}: offset {c_fields.get(field)} in cimgui.h, {offset} in imgui.h")
+    return problems
+
+# ---------------------------------------------------------------------------
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate LuaJIT FFI declaration modules from installed headers")
+    parser.add_argument("install_prefix", type=Path, help="Install prefix with include/ (and bin/luajit)")
+    parser.add_argument("-o", "--output", type=Path,
+                        help="Lua module root (default: INSTALL_PREFIX/share/lua/5.1)")
+    parser.add_argument("--libraries", help=f"Comma-separated subset of {','.join(LIBRARIES)}")
+    parser.add_argument("--cc", help="C compiler for preprocessing and the probe (default: $CC, cc, gcc, clang)")
+    parser.add_argument("--cxx", help="C++ compiler for the --imgui-dir probe (default: $CXX, c++, g++, clang++)")
+    parser.add_argument("--imgui-dir", type=Path,
+                        help="Dear ImGui sources the library was built from; checks cimgui.h against imgui.h")
+    parser.add_argument("--luajit", help="LuaJIT used for verification (default: INSTALL_PREFIX/bin/luajit, luajit)")
+    parser.add_argument("--no-verify", action="store_true", help="Don't load the modules into LuaJIT")
+    parser.add_argument("--require-verify", action="store_true",
+                        help="Fail instead of warning when no LuaJIT is found to verify the modules")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Parallel LuaJIT processes for the per-module check")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.no_verify and args.require_verify:
+        print_error("--no-verify and --require-verify contradict each other")
+        return 1
+    prefix = args.install_prefix.resolve()
+    output = (args.output or prefix / "share" / "lua" / "5.1").resolve()
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+
+    cc = find_tool(args.cc, "CC", ["cc", "gcc", "clang"])
+    if cc is None:
+        print_error("No C compiler found (gcc or clang is needed for the preprocessor output)")
+        return 1
+
+    requested = args.libraries.split(",") if args.libraries else list(LIBRARIES)
+    unknown = [name for name in requested if name not in LIBRARIES]
+    if unknown:
+        print_error(f"Unknown libraries: {', '.join(unknown)}")
+        return 1
+    libraries = []
+    for name in requested:
+        if (prefix / "include" / LIBRARIES[name]["check"]).exists():
+            libraries.append(name)
+        else:
+            print_warning(f"{name}: {LIBRARIES[name]['check']} not installed in {prefix / 'include'}, skipped")
+    if not libraries:
+        print_error("No library headers found")
+        return 1
+
+    try:
+        print_step(f"Preprocessing headers of {', '.join(libraries)}")
+        source = umbrella_source(libraries, prefix)
+        tokens, macros = read_preprocessed(preprocess(cc, prefix, source))
+        headers = HeaderMap(prefix, libraries)
+        chunks, system = build_chunks(tokens, headers, libraries)
+        empty = [name for name in libraries if not any(c.decls for c in chunks if c.library == name)]
+        if empty:
+            raise GeneratorError(f"No declarations found for {', '.join(empty)}; "
+                                 f"their headers weren't matched under {prefix / 'include'}")
+        system_chunk = resolve_dependencies(chunks, system)
+        print(f"  {sum(len(c.decls) for c in chunks)} declarations in {len(chunks)} modules"
+              + (f", {len(system_chunk.decls)} from system headers" if system_chunk else ""))
+
+        print_step("Probing layouts and constants")
+        defined = {name for c in chunks for d in c.decls for name in d.defines}
+        symbols = {name for c in chunks for d in c.decls for name in d.symbols}
+        symbols |= {name for d in system.values() for name in d.symbols}
+        candidates = macro_candidates(macros, headers, defined, symbols)
+        types, owners = probe_types(chunks)
+        flags = ["-std=gnu11", *include_flags(prefix)]
+        lines, entries = probe_lines(types, candidates)
+        stdout, dropped = run_probe(cc, flags, PROBE_PRELUDE + source, lines, entries, "probe")
+        layouts, constants = parse_probe_output(stdout)
+        for entry in dropped:
+            if entry[0] != "macro":
+                print_warning(f"probe: {entry[1]}{'.' + entry[2] if entry[2] else ''} doesn't compile, not checked")
+        print(f"  {len(layouts)} types, {sum(len(f) for _, _, f in layouts.values())} fields, "
+              f"{len(constants)} constants")
+
+        # Constants go to the chunk of the header that defines them
+        by_key = {(c.library, c.name): c for c in chunks}
+        constant_modules = {}
+        for name, value in constants.items():
+            path = macros[name][0]
+            library = headers.library(path)
+            key = (library, chunk_name(headers.relative(path)))
+            if key not in by_key:
+                by_key[key] = Chunk(library, key[1], headers.relative(path))
+                chunks.append(by_key[key])
+            by_key[key].constants.append((name, value))
+            constant_modules[name] = by_key[key].module
+
+        chunks = merge_cycles(chunks)
+        reduce_dependencies(chunks + ([system_chunk] if system_chunk else []))
+        for c in chunks:
+            for name, _ in c.constants:
+                constant_modules[name] = c.module
+
+        print_step(f"Writing modules to {output / 'cdefs'}")
+        write_modules(output, chunks, system_chunk, libraries)
+        layout_path = WORK_DIR / "layout.lua"
+        write_layout(layout_path, libraries, types, layouts, constants, constant_modules)
+        for library in libraries:
+            lib_chunks = [c for c in chunks if c.library == library]
+            size = sum((output / "cdefs" / library / f"{c.name}.lua").stat().st_size for c in lib_chunks)
+            print(f"  {library}: {len(lib_chunks)} modules, {size // 1024} KB")
+
+        ok = True
+        if args.imgui_dir and "cimgui" in libraries:
+            print_step(f"Checking cimgui.h against {args.imgui_dir / 'imgui.h'}")
+            cxx = find_tool(args.cxx, "CXX", ["c++", "g++", "clang++"])
+            if cxx is None:
+                print_error("No C++ compiler found")
+                return 1
+            cpp_flags = ["-std=c++17", "-Wno-invalid-offsetof", f"-I{args.imgui_dir.resolve()}"]
+            imconfig = prefix / "include" / "cimgui" / "imconfig_variant.h"
+            if imconfig.exists():
+                cpp_flags.append(f'-DIMGUI_USER_CONFIG="{imconfig.as_posix()}"')
+            cimgui_types = [(s, list(layouts[s][2])) for s, _ in types
+                            if owners.get(s) == "cimgui" and s in layouts]
+            lines, entries = probe_lines(cimgui_types)
+            stdout, dropped = run_probe(cxx, cpp_flags, CPP_PROBE_PRELUDE, lines, entries, "probe_cpp")
+            cpp_layouts, _ = parse_probe_output(stdout)
+            problems = compare_cpp(layouts, cpp_layouts, dropped)
+            skipped = len([e for e in dropped if e[0] == "type"])
+            for problem in problems[:50]:
+                print(f"  {problem}")
+            if problems:
+                print_error(f"cimgui.h doesn't match imgui.h ({len(problems)} differences)")
+                ok = False
+            else:
+                print(f"  {len(cpp_layouts)} types match ({skipped} cimgui-only types, e.g. template instances, skipped)")
+
+        verified = False
+        if not args.no_verify:
+            if args.luajit:
+                luajit = shutil.which(args.luajit)
+            else:
+                luajit = next((str(p) for p in (prefix / "bin" / "luajit", prefix / "bin" / "luajit.exe")
+                               if p.exists()), None) or shutil.which("luajit")
+            if luajit is None and (args.luajit or args.require_verify):
+                print_error(f"LuaJIT not found ({args.luajit or 'pass --luajit'}); the modules can't be verified")
+                return 1
+            elif luajit is None:
+                print_warning("LuaJIT not found (--luajit); the modules were not verified")
+            else:
+                print_step(f"Verifying with {luajit}")
+                ok = verify_luajit(luajit, output, layout_path) and ok
+                all_chunks = chunks + ([system_chunk] if system_chunk else [])
+                ok = verify_standalone(luajit, output, all_chunks, args.jobs) and ok
+                if not ok:
+                    print_error("LuaJIT disagrees with the C compiler; see above")
+                verified = True
+    except GeneratorError as e:
+        print_error(str(e))
+        return 1
+
+    if not ok:
+        return 1
+    print_success(f"FFI modules written to {output / 'cdefs'}"
+                  + (" and verified with LuaJIT" if verified else " (not verified)"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
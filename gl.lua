@@ -21,282 +21,11 @@ end
 print("Platform: " .. os_name)
 print("Library path: " .. lib_path)
 
--- SDL2 C definitions
-ffi.cdef[[
-    typedef struct SDL_Window SDL_Window;
-    typedef struct SDL_Surface SDL_Surface;
-    typedef enum {
-        SDL_INIT_VIDEO = 0x00000020,
-        SDL_INIT_TIMER = 0x00000001
-    } SDL_InitFlag;
-
-    typedef enum {
-        SDL_WINDOWPOS_UNDEFINED = 0x1FFF0000,
-        SDL_WINDOW_SHOWN = 0x00000004,
-        SDL_WINDOW_OPENGL = 0x00000002,
-        SDL_WINDOW_RESIZABLE = 0x00000020,
-        SDL_WINDOW_ALLOW_HIGHDPI = 0x00002000
-    } SDL_WindowFlags;
-
-    typedef union SDL_Event {
-        uint32_t type;
-        struct {
-            uint32_t type;
-            uint32_t timestamp;
-            uint32_t windowID;
-            uint8_t state;
-            uint8_t repeat;
-            uint8_t padding2;
-            uint8_t padding3;
-            int32_t scancode;
-            int32_t sym;
-            uint16_t mod;
-            uint32_t unused;
-        } key;
-        char padding[56];
-    } SDL_Event;
-
-    typedef enum {
-        SDL_QUIT = 0x100,
-        SDL_KEYDOWN = 0x300,
-        SDL_WINDOWEVENT = 0x200
-    } SDL_EventType;
-
-    typedef enum {
-        SDLK_ESCAPE = 27
-    } SDL_Keycode;
-
-    typedef void* SDL_GLContext;
-
-    int SDL_Init(uint32_t flags);
-    void SDL_Quit(void);
-    SDL_Window* SDL_CreateWindow(const char* title, int x, int y, int w, int h, uint32_t flags);
-    void SDL_DestroyWindow(SDL_Window* window);
-    int SDL_PollEvent(SDL_Event* event);
-    void SDL_Delay(uint32_t ms);
-    int SDL_SetHint(const char* name, const char* value);
-    uint32_t SDL_GetTicks(void);
-    void SDL_GetWindowSize(SDL_Window* window, int* w, int* h);
-    int SDL_GL_SetAttribute(int attr, int value);
-
-    // OpenGL context functions
-    SDL_GLContext SDL_GL_CreateContext(SDL_Window* window);
-    void SDL_GL_DeleteContext(SDL_GLContext context);
-    int SDL_GL_SetSwapInterval(int interval);
-    void SDL_GL_SwapWindow(SDL_Window* window);
-    void* SDL_GL_GetProcAddress(const char* proc);
-
-    // Surface functions for screenshots
-    typedef struct SDL_Surface {
-        uint32_t flags;
-        void* format;
-        int w, h;
-        int pitch;
-        void* pixels;
-        void* userdata;
-        int locked;
-        void* lock_data;
-        void* clip_rect;
-        void* map;
-        int refcount;
-    } SDL_Surface;
-
-    SDL_Surface* SDL_CreateRGBSurfaceWithFormat(uint32_t flags, int width, int height, int depth, uint32_t format);
-    void SDL_FreeSurface(SDL_Surface* surface);
-
-    // File I/O
-    typedef struct SDL_RWops SDL_RWops;
-    SDL_RWops* SDL_RWFromFile(const char* file, const char* mode);
-    int SDL_SaveBMP_RW(SDL_Surface* surface, SDL_RWops* dst, int freedst);
-    int SDL_RWclose(SDL_RWops* ctx);
-]]
-
--- FreeType C definitions
-ffi.cdef[[
-    typedef struct FT_LibraryRec_* FT_Library;
-    typedef struct FT_FaceRec_* FT_Face;
-    typedef int FT_Error;
-    typedef long FT_Long;
-    typedef unsigned long FT_ULong;
-    typedef int FT_Int;
-    typedef unsigned int FT_UInt;
-    typedef int FT_Int32;
-    typedef short FT_Short;
-    typedef unsigned short FT_UShort;
-    typedef signed long FT_Pos;
-    typedef signed long FT_Fixed;
-    typedef signed long FT_F26Dot6;
-
-    typedef struct FT_Vector_ {
-        FT_Pos x;
-        FT_Pos y;
-    } FT_Vector;
-
-    typedef struct FT_BBox_ {
-        FT_Pos xMin, yMin;
-        FT_Pos xMax, yMax;
-    } FT_BBox;
-
-    typedef struct FT_Bitmap_ {
-        unsigned int rows;
-        unsigned int width;
-        int pitch;
-        unsigned char* buffer;
-        unsigned short num_grays;
-        unsigned char pixel_mode;
-        unsigned char palette_mode;
-        void* palette;
-    } FT_Bitmap;
-
-    typedef struct FT_Glyph_Metrics_ {
-        FT_Pos width;
-        FT_Pos height;
-        FT_Pos horiBearingX;
-        FT_Pos horiBearingY;
-        FT_Pos horiAdvance;
-        FT_Pos vertBearingX;
-        FT_Pos vertBearingY;
-        FT_Pos vertAdvance;
-    } FT_Glyph_Metrics;
-
-    typedef struct FT_GlyphSlotRec_* FT_GlyphSlot;
-
-    typedef struct FT_GlyphSlotRec_ {
-        FT_Library library;
-        FT_Face face;
-        FT_GlyphSlot next;
-        FT_UInt glyph_index;
-        FT_ULong generic_generic;
-        void* generic_data;
-        FT_Glyph_Metrics metrics;
-        FT_Fixed linearHoriAdvance;
-        FT_Fixed linearVertAdvance;
-        FT_Vector advance;
-        int format;
-        FT_Bitmap bitmap;
-        FT_Int bitmap_left;
-        FT_Int bitmap_top;
-        // ... more fields we don't need
-    } FT_GlyphSlotRec;
-
-    typedef struct FT_Size_Metrics_ {
-        FT_UShort x_ppem;
-        FT_UShort y_ppem;
-        FT_Fixed x_scale;
-        FT_Fixed y_scale;
-        FT_Pos ascender;
-        FT_Pos descender;
-        FT_Pos height;
-        FT_Pos max_advance;
-    } FT_Size_Metrics;
-
-    typedef struct FT_SizeRec_* FT_Size;
-
-    typedef struct FT_FaceRec_ {
-        FT_Long num_faces;
-        FT_Long face_index;
-        FT_Long face_flags;
-        FT_Long style_flags;
-        FT_Long num_glyphs;
-        char* family_name;
-        char* style_name;
-        FT_Int num_fixed_sizes;
-        void* available_sizes;
-        FT_Int num_charmaps;
-        void* charmaps;
-        void* generic_data;
-        void* generic_destructor;
-        FT_BBox bbox;
-        FT_UShort units_per_EM;
-        FT_Short ascender;
-        FT_Short descender;
-        FT_Short height;
-        FT_Short max_advance_width;
-        FT_Short max_advance_height;
-        FT_Short underline_position;
-        FT_Short underline_thickness;
-        FT_GlyphSlot glyph;
-        FT_Size size;
-        void* charmap;
-        // ... more fields
-    } FT_FaceRec;
-
-    // FreeType functions
-    FT_Error FT_Init_FreeType(FT_Library* library);
-    FT_Error FT_New_Face(FT_Library library, const char* filepathname, FT_Long face_index, FT_Face* aface);
-    FT_Error FT_New_Memory_Face(FT_Library library, const unsigned char* file_base, FT_Long file_size, FT_Long face_index, FT_Face* aface);
-    FT_Error FT_Set_Pixel_Sizes(FT_Face face, FT_UInt pixel_width, FT_UInt pixel_height);
-    FT_Error FT_Set_Char_Size(FT_Face face, FT_F26Dot6 char_width, FT_F26Dot6 char_height, FT_UInt horz_resolution, FT_UInt vert_resolution);
-    FT_UInt FT_Get_Char_Index(FT_Face face, FT_ULong charcode);
-    FT_Error FT_Load_Glyph(FT_Face face, FT_UInt glyph_index, FT_Int32 load_flags);
-    FT_Error FT_Load_Char(FT_Face face, FT_ULong char_code, FT_Int32 load_flags);
-    FT_Error FT_Render_Glyph(FT_GlyphSlot slot, int render_mode);
-    FT_Error FT_Done_Face(FT_Face face);
-    FT_Error FT_Done_FreeType(FT_Library library);
-
-    // Load flags
-    static const int FT_LOAD_DEFAULT = 0;
-    static const int FT_LOAD_RENDER = 4;
-
-    // Render modes
-    static const int FT_RENDER_MODE_NORMAL = 0;
-    static const int FT_RENDER_MODE_MONO = 1;
-]]
-
--- ImGui C definitions (from cimgui)
-ffi.cdef[[
-    typedef struct ImGuiContext ImGuiContext;
-    typedef struct ImDrawData ImDrawData;
-    typedef struct ImFont ImFont;
-    typedef struct ImVec2 { float x, y; } ImVec2;
-    typedef struct ImVec4 { float x, y, z, w; } ImVec4;
-
-    // ImGuiIO structure - partial definition with fields we need
-    typedef struct ImGuiIO {
-        int ConfigFlags;
-        int BackendFlags;
-        ImVec2 DisplaySize;
-        ImVec2 DisplayFramebufferScale;
-        float DeltaTime;
-        // ... many config fields we skip ...
-        char _padding[256]; // Padding to reach the metrics fields
-        float Framerate;
-        int MetricsRenderVertices;
-        int MetricsRenderIndices;
-        int MetricsRenderWindows;
-        int MetricsActiveWindows;
-    } ImGuiIO;
-
-    // Core ImGui functions
-    ImGuiContext* igCreateContext(ImFont* shared_font_atlas);
-    void igDestroyContext(ImGuiContext* ctx);
-    ImGuiIO* igGetIO_Nil(void);  // cimgui uses _Nil suffix for no-arg version
-    void igNewFrame(void);
-    void igRender(void);
-    ImDrawData* igGetDrawData(void);
-    void igShowDemoWindow(bool* p_open);
-    bool igBegin(const char* name, bool* p_open, int flags);
-    void igEnd(void);
-    void igText(const char* fmt, ...);
-    bool igButton(const char* label, ImVec2 size);
-    bool igSliderFloat(const char* label, float* v, float v_min, float v_max, const char* format, int flags);
-    bool igSliderInt(const char* label, int* v, int v_min, int v_max, const char* format, int flags);
-    bool igColorEdit3(const char* label, float col[3], int flags);
-    bool igCheckbox(const char* label, bool* v);
-    void igSeparator(void);
-
-    // SDL2 backend functions (from our wrapper)
-    bool cImGui_ImplSDL2_InitForOpenGL(SDL_Window* window, void* sdl_gl_context);
-    void cImGui_ImplSDL2_Shutdown(void);
-    void cImGui_ImplSDL2_NewFrame(void);
-    bool cImGui_ImplSDL2_ProcessEvent(const SDL_Event* event);
-
-    // OpenGL3 backend functions (from our wrapper)
-    bool cImGui_ImplOpenGL3_Init(const char* glsl_version);
-    void cImGui_ImplOpenGL3_Shutdown(void);
-    void cImGui_ImplOpenGL3_NewFrame(void);
-    void cImGui_ImplOpenGL3_RenderDrawData(ImDrawData* draw_data);
-]]
+-- C declarations, generated from the installed headers by generate_cdefs.py.
+-- Each header is declared on first use of one of its functions or constants
+-- (cdefs.lazy) or explicitly (cdefs.need) for types used with ffi.new.
+package.path = lib_path .. "/share/lua/5.1/?.lua;" .. lib_path .. "/share/lua/5.1/?/init.lua;" .. package.path
+local cdefs = require("cdefs")
 
 -- OpenGL constants and types
 local GL_COLOR_BUFFER_BIT = 0x00004000
@@ -342,18 +71,24 @@ local glGetUniformLocation, glUniform1i, glUniformMatrix4fv
 print("Loading SDL2 from prebuilt libraries...")
 local SDL
 if os_name == "Windows" then
-    SDL = ffi.load(lib_path .. "/lib/SDL2" .. lib_ext)
+    SDL = cdefs.lazy(ffi.load(lib_path .. "/lib/SDL2" .. lib_ext), "sdl2")
 else
-    SDL = ffi.load(lib_path .. "/lib/libSDL2-2.0" .. lib_ext)
+    SDL = cdefs.lazy(ffi.load(lib_path .. "/lib/libSDL2-2.0" .. lib_ext), "sdl2")
 end
 
 -- Load cimgui complete (includes ImGui + backends)
 print("Loading cimgui...")
-local imgui = ffi.load(lib_path .. "/lib/cimgui_complete" .. lib_ext)
+local cimgui_lib = ffi.load(lib_path .. "/lib/cimgui_complete" .. lib_ext)
+local imgui = cdefs.lazy(cimgui_lib, "cimgui")
+
+-- Per-frame ImGui calls go through lua/imgui.lua: values in and out instead
+-- of ffi.new'ed vectors and out-parameters
+local ImGui = require("imgui")
+local ui = ImGui.bind(cimgui_lib)
 
 -- Load FreeType
 print("Loading FreeType...")
-local ft = ffi.load(lib_path .. "/lib/libfreetype" .. lib_ext)
+local ft = cdefs.lazy(ffi.load(lib_path .. "/lib/libfreetype" .. lib_ext), "freetype")
 
 -- Helper function to load OpenGL functions
 local function loadGLFunction(name)
@@ -371,12 +106,12 @@ if SDL.SDL_Init(bit.bor(SDL.SDL_INIT_VIDEO, SDL.SDL_INIT_TIMER)) < 0 then
 end
 
 -- Setup SDL OpenGL attributes
-SDL.SDL_GL_SetAttribute(3, 3) -- SDL_GL_CONTEXT_MAJOR_VERSION
-SDL.SDL_GL_SetAttribute(4, 3) -- SDL_GL_CONTEXT_MINOR_VERSION
-SDL.SDL_GL_SetAttribute(5, 2) -- SDL_GL_CONTEXT_PROFILE_MASK = CORE
+SDL.SDL_GL_SetAttribute(SDL.SDL_GL_CONTEXT_MAJOR_VERSION, 3)
+SDL.SDL_GL_SetAttribute(SDL.SDL_GL_CONTEXT_MINOR_VERSION, 3)
+SDL.SDL_GL_SetAttribute(SDL.SDL_GL_CONTEXT_PROFILE_MASK, SDL.SDL_GL_CONTEXT_PROFILE_CORE)
 
 -- Set hint to prevent window from grabbing focus
-SDL.SDL_SetHint("SDL_HINT_WINDOW_NO_ACTIVATION_WHEN_SHOWN", "1")
+SDL.SDL_SetHint(SDL.SDL_HINT_WINDOW_NO_ACTIVATION_WHEN_SHOWN, "1")
 
 -- Create window
 print("Creating SDL window with OpenGL support...")
@@ -458,6 +193,7 @@ end
 
 -- Initialize FreeType
 print("Initializing FreeType...")
+cdefs.need("freetype", "FT_Library", "FT_Face")
 local ft_library = ffi.new("FT_Library[1]")
 if ft.FT_Init_FreeType(ft_library) ~= 0 then
     error("Failed to initialize FreeType")
@@ -493,9 +229,12 @@ if not font_loaded then
 end
 
 -- Initial font rasterization size
-local raster_size = ffi.new("int[1]", 48)
+local raster_size = 48
+local font_label
 if font_loaded then
-    ft.FT_Set_Pixel_Sizes(ft_face[0], 0, raster_size[0])
+    ft.FT_Set_Pixel_Sizes(ft_face[0], 0, raster_size)
+    local family_name = ft_face[0].family_name
+    font_label = "Font: " .. (family_name ~= nil and ffi.string(family_name) or "Unknown")
 end
 
 -- Shader source code for triangle
@@ -672,11 +411,11 @@ print("Press Escape or close window to exit...")
 
 -- ImGui demo window state
 local show_demo = ffi.new("bool[1]", false)  -- Hidden for debugging
-local show_another = ffi.new("bool[1]", false)
-local clear_color = ffi.new("float[3]", {0.2, 0.3, 0.3})
+local show_another = false
+local clear_color = {0.2, 0.3, 0.3}
 local counter = 0
-local slider_value = ffi.new("float[1]", 0.5)
-local checkbox_value = ffi.new("bool[1]", false)
+local slider_value = 0.5
+local checkbox_value = false
 
 -- FPS tracking
 local frame_count = 0
@@ -688,7 +427,14 @@ local total_frames = 0
 local screenshot_taken = false
 
 -- Main event loop
-local event = ffi.new("SDL_Event")
+-- Events are fetched in one batch per frame; anything beyond MAX_EVENTS stays
+-- queued for the next frame
+local MAX_EVENTS = 128
+cdefs.need("sdl2", "SDL_Event")
+local events = ffi.new("SDL_Event[?]", MAX_EVENTS)
+local display_w = ffi.new("int[1]")
+local display_h = ffi.new("int[1]")
+local quadVertices = ffi.new("float[24]")
 local running = true
 
 while running do
@@ -702,81 +448,81 @@ while running do
     end
 
     -- Poll events
-    while SDL.SDL_PollEvent(event) ~= 0 do
-        imgui.cImGui_ImplSDL2_ProcessEvent(event)
-
+    SDL.SDL_PumpEvents()
+    local num_events = SDL.SDL_PeepEvents(events, MAX_EVENTS, SDL.SDL_GETEVENT, SDL.SDL_FIRSTEVENT, SDL.SDL_LASTEVENT)
+    for i = 0, num_events - 1 do
+        local event = events[i]
         if event.type == SDL.SDL_QUIT then
             running = false
         elseif event.type == SDL.SDL_KEYDOWN then
-            if event.key.sym == SDL.SDLK_ESCAPE then
+            if event.key.keysym.sym == SDL.SDLK_ESCAPE then
                 running = false
             end
         end
     end
 
-    -- Start ImGui frame
-    imgui.cImGui_ImplOpenGL3_NewFrame()
-    imgui.cImGui_ImplSDL2_NewFrame()
-    imgui.igNewFrame()
+    -- Start ImGui frame, feeding it this frame's events
+    ui.NewFrame(events, math.max(num_events, 0))
 
     -- Show demo window
     if show_demo[0] then
-        imgui.igShowDemoWindow(show_demo)
+        ui.ShowDemoWindow(show_demo)
     end
 
     -- Create a custom window with FreeType controls
-    if imgui.igBegin("FreeType Controls", nil, 0) then
+    if ui.Begin("FreeType Controls") then
         -- FreeType rasterization controls
-        imgui.igText("FreeType Text Rendering")
-        imgui.igSeparator()
+        ui.Text("FreeType Text Rendering")
+        ui.Separator()
 
         if font_loaded then
-            local face = ft_face[0]
-            imgui.igText(string.format("Font: %s", ffi.string(face.family_name or "Unknown")))
+            ui.Text(font_label)
 
             -- Rasterization size slider
-            if imgui.igSliderInt("Raster Size", raster_size, 12, 200, "%d pixels", 0) then
+            local changed
+            changed, raster_size = ui.SliderInt("Raster Size", raster_size, 12, 200, "%d pixels")
+            if changed then
                 -- Re-set the pixel size when slider changes
-                ft.FT_Set_Pixel_Sizes(ft_face[0], 0, raster_size[0])
+                ft.FT_Set_Pixel_Sizes(ft_face[0], 0, raster_size)
             end
 
-            imgui.igText(string.format("Current: %dx%d pixels", raster_size[0], raster_size[0]))
-            imgui.igText("Tip: Higher = sharper text")
+            ui.Text(ImGui.intern("Current: %dx%d pixels", raster_size, raster_size))
+            ui.Text("Tip: Higher = sharper text")
         else
-            imgui.igText("FreeType: No font loaded")
+            ui.Text("FreeType: No font loaded")
         end
 
-        imgui.igSeparator()
-        imgui.igColorEdit3("Background", clear_color, 0)
-        imgui.igText(string.format("FPS: %.1f", fps))
+        ui.Separator()
+        local _
+        _, clear_color[1], clear_color[2], clear_color[3] =
+            ui.ColorEdit3("Background", clear_color[1], clear_color[2], clear_color[3])
+        ui.TextFloat("FPS: ", fps, 1)
     end
-    imgui.igEnd()
+    ui.End()
 
     -- Show another window
-    if show_another[0] then
-        if imgui.igBegin("Another Window", show_another, 0) then
-            imgui.igText("Hello from another window!")
-            if imgui.igButton("Close Me", ffi.new("ImVec2", {0, 0})) then
-                show_another[0] = false
+    if show_another then
+        local visible
+        visible, show_another = ui.Begin("Another Window", show_another)
+        if visible then
+            ui.Text("Hello from another window!")
+            if ui.Button("Close Me") then
+                show_another = false
             end
         end
-        imgui.igEnd()
+        ui.End()
     end
 
-    -- Rendering
-    imgui.igRender()
-
-    local display_w = ffi.new("int[1]")
-    local display_h = ffi.new("int[1]")
+    -- Rendering (ImGui is drawn on top at the end of the frame)
     SDL.SDL_GetWindowSize(window, display_w, display_h)
     glViewport(0, 0, display_w[0], display_h[0])
-    glClearColor(clear_color[0], clear_color[1], clear_color[2], 1.0)
+    glClearColor(clear_color[1], clear_color[2], clear_color[3], 1.0)
     glClear(GL_COLOR_BUFFER_BIT)
 
     -- Draw triangle if checkbox is enabled
-    if checkbox_value[0] then
+    if checkbox_value then
         -- Update triangle vertices based on slider
-        local size = slider_value[0]
+        local size = slider_value
         vertices[0] = -0.5 * size  -- bottom left x
         vertices[3] = 0.5 * size   -- bottom right x
         vertices[7] = 0.5 * size   -- top y
@@ -814,15 +560,15 @@ while running do
         local text_y = -0.2
         -- Scale based on rasterization size to maintain consistent visual size
         -- Target visual size: about 48 pixels, adjust based on actual raster size
-        local scale = 0.003 * (48.0 / raster_size[0])
+        local scale = 0.003 * (48.0 / raster_size)
 
         for i = 1, #text do
-            local char = text:sub(i,i)
-            if char == " " then
+            local char = string.byte(text, i)
+            if char == 32 then
                 text_x = text_x + 0.02  -- Space width (adjusted for scale)
             else
                 -- Load and render character
-                if ft.FT_Load_Char(ft_face[0], string.byte(char), ft.FT_LOAD_RENDER) == 0 then
+                if ft.FT_Load_Char(ft_face[0], char, ft.FT_LOAD_RENDER) == 0 then
                     local glyph = ft_face[0].glyph
                     local bitmap = glyph.bitmap
 
@@ -852,16 +598,15 @@ while running do
 
                         -- Update VBO with quad for this character
                         -- Keep original texture coordinates (no flip)
-                        local quadVertices = ffi.new("float[24]", {
-                            -- positions           -- texture coords
-                            xpos,     ypos + h,    0.0, 0.0,  -- top left
-                            xpos,     ypos,        0.0, 1.0,  -- bottom left
-                            xpos + w, ypos,        1.0, 1.0,  -- bottom right
+                        local q = quadVertices
+                        -- positions                         -- texture coords
+                        q[0],  q[1],  q[2],  q[3]  = xpos,     ypos + h, 0.0, 0.0  -- top left
+                        q[4],  q[5],  q[6],  q[7]  = xpos,     ypos,     0.0, 1.0  -- bottom left
+                        q[8],  q[9],  q[10], q[11] = xpos + w, ypos,     1.0, 1.0  -- bottom right
 
-                            xpos,     ypos + h,    0.0, 0.0,  -- top left
-                            xpos + w, ypos,        1.0, 1.0,  -- bottom right
-                            xpos + w, ypos + h,    1.0, 0.0   -- top right
-                        })
+                        q[12], q[13], q[14], q[15] = xpos,     ypos + h, 0.0, 0.0  -- top left
+                        q[16], q[17], q[18], q[19] = xpos + w, ypos,     1.0, 1.0  -- bottom right
+                        q[20], q[21], q[22], q[23] = xpos + w, ypos + h, 1.0, 0.0  -- top right
 
                         glBindBuffer(GL_ARRAY_BUFFER, textVBO[0])
                         glBufferSubData(GL_ARRAY_BUFFER, 0, ffi.sizeof(quadVertices), quadVertices)
@@ -885,7 +630,7 @@ while running do
         glDisable(GL_BLEND)
     end
 
-    imgui.cImGui_ImplOpenGL3_RenderDrawData(imgui.igGetDrawData())
+    ui.Render()
 
     -- Take screenshot on 5th frame
     total_frames = total_frames + 1
@@ -907,7 +652,7 @@ while running do
         glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE, pixels)
 
         -- Create SDL surface (note: OpenGL pixels are upside down)
-        local surface = SDL.SDL_CreateRGBSurfaceWithFormat(0, width, height, 32, 0x16762004) -- SDL_PIXELFORMAT_ABGR8888
+        local surface = SDL.SDL_CreateRGBSurfaceWithFormat(0, width, height, 32, SDL.SDL_PIXELFORMAT_ABGR8888)
 
         if surface ~= nil then
             -- Copy pixels to surface (flip vertically)
@@ -0,0 +1,129 @@
+// Flattened draw data for custom renderers
+//
+// Walking ImDrawData->CmdLists field by field through an FFI costs a call
+// (or a boxed access) per list and per command. These functions copy a
+// frame into three flat arrays in one pass instead: vertices, 32-bit
+// indices rebased onto the merged vertex array, and commands with their
+// clip rectangles already projected into framebuffer pixels. A renderer
+// can upload the vertices and indices as they are and issue one plain
+// indexed draw per command, without a base vertex.
+#define CIMGUI_IMPL_BUILD
+#include "cimgui_sdl2_opengl3.h"
+#include "../cimgui/imgui/imgui.h"
+
+#include <string.h>
+
+static_assert(sizeof(ImTextureID) <= sizeof(unsigned long long), "ImTextureID doesn't fit cImGui_DrawCmd::TextureId");
+
+namespace {
+
+struct SharedArrays {
+    ImVector<ImDrawVert> Vertices;
+    ImVector<unsigned int> Indices;
+    ImVector<cImGui_DrawCmd> Commands;
+    cImGui_FlatDrawData Flat;
+};
+
+SharedArrays g_Shared;
+
+void SetHeader(ImDrawData* draw_data, cImGui_FlatDrawData* out) {
+    int cmd_count = 0;
+    for (const ImDrawList* draw_list : draw_data->CmdLists) {
+        cmd_count += draw_list->CmdBuffer.Size;
+    }
+    out->VtxCount = draw_data->TotalVtxCount;
+    out->IdxCount = draw_data->TotalIdxCount;
+    out->CmdCount = cmd_count;
+    out->DisplayPos[0] = draw_data->DisplayPos.x;
+    out->DisplayPos[1] = draw_data->DisplayPos.y;
+    out->DisplaySize[0] = draw_data->DisplaySize.x;
+    out->DisplaySize[1] = draw_data->DisplaySize.y;
+    out->FramebufferScale[0] = draw_data->FramebufferScale.x;
+    out->FramebufferScale[1] = draw_data->FramebufferScale.y;
+    out->FramebufferWidth = (int)(draw_data->DisplaySize.x * draw_data->FramebufferScale.x);
+    out->FramebufferHeight = (int)(draw_data->DisplaySize.y * draw_data->FramebufferScale.y);
+}
+
+// Expects out's arrays to hold the counts set by SetHeader
+void WriteArrays(ImDrawData* draw_data, cImGui_FlatDrawData* out) {
+    const ImVec2 clip_off = draw_data->DisplayPos;
+    const ImVec2 clip_scale = draw_data->FramebufferScale;
+    unsigned int vtx_base = 0;
+    unsigned int idx_base = 0;
+    cImGui_DrawCmd* dst_cmd = out->Commands;
+
+    for (const ImDrawList* draw_list : draw_data->CmdLists) {
+        memcpy(out->Vertices + vtx_base, draw_list->VtxBuffer.Data, (size_t)draw_list->VtxBuffer.Size * sizeof(ImDrawVert));
+        const ImDrawIdx* src_idx = draw_list->IdxBuffer.Data;
+        unsigned int* dst_idx = out->Indices + idx_base;
+
+        for (const ImDrawCmd& cmd : draw_list->CmdBuffer) {
+            dst_cmd->ClipRect[0] = (cmd.ClipRect.x - clip_off.x) * clip_scale.x;
+            dst_cmd->ClipRect[1] = (cmd.ClipRect.y - clip_off.y) * clip_scale.y;
+            dst_cmd->ClipRect[2] = (cmd.ClipRect.z - clip_off.x) * clip_scale.x;
+            dst_cmd->ClipRect[3] = (cmd.ClipRect.w - clip_off.y) * clip_scale.y;
+            dst_cmd->IdxOffset = idx_base + cmd.IdxOffset;
+            dst_cmd->SourceList = draw_list;
+            dst_cmd->SourceCmd = &cmd;
+            if (cmd.UserCallback != NULL) {
+                dst_cmd->TextureId = 0;
+                dst_cmd->ElemCount = 0;
+                dst_cmd->UserCallback = (void*)cmd.UserCallback;
+            } else {
+                dst_cmd->TextureId = (unsigned long long)cmd.GetTexID();
+                dst_cmd->ElemCount = cmd.ElemCount;
+                dst_cmd->UserCallback = NULL;
+                const unsigned int offset = vtx_base + cmd.VtxOffset;
+                for (unsigned int i = 0; i < cmd.ElemCount; i++) {
+                    dst_idx[cmd.IdxOffset + i] = offset + src_idx[cmd.IdxOffset + i];
+                }
+            }
+            dst_cmd++;
+        }
+        vtx_base += (unsigned int)draw_list->VtxBuffer.Size;
+        idx_base += (unsigned int)draw_list->IdxBuffer.Size;
+    }
+}
+
+} // namespace
+
+extern "C" {
+
+bool cImGui_DrawData_Flatten(ImDrawData* draw_data, cImGui_FlatDrawData* out) {
+    SetHeader(draw_data, out);
+    const bool fits = (out->VtxCount == 0 || (out->Vertices != NULL && out->VtxCapacity >= out->VtxCount))
+        && (out->IdxCount == 0 || (out->Indices != NULL && out->IdxCapacity >= out->IdxCount))
+        && (out->CmdCount == 0 || (out->Commands != NULL && out->CmdCapacity >= out->CmdCount));
+    if (!fits) {
+        return false;
+    }
+    WriteArrays(draw_data, out);
+    return true;
+}
+
+const cImGui_FlatDrawData* cImGui_DrawData_FlattenShared(ImDrawData* draw_data) {
+    SharedArrays& s = g_Shared;
+    cImGui_FlatDrawData* out = &s.Flat;
+    SetHeader(draw_data, out);
+    // Grown with the usual ImVector policy, never shrunk until FreeShared
+    s.Vertices.resize(out->VtxCount);
+    s.Indices.resize(out->IdxCount);
+    s.Commands.resize(out->CmdCount);
+    out->Vertices = s.Vertices.Data;
+    out->Indices = s.Indices.Data;
+    out->Commands = s.Commands.Data;
+    out->VtxCapacity = s.Vertices.Capacity;
+    out->IdxCapacity = s.Indices.Capacity;
+    out->CmdCapacity = s.Commands.Capacity;
+    WriteArrays(draw_data, out);
+    return out;
+}
+
+void cImGui_DrawData_FreeShared() {
+    g_Shared.Vertices.clear();
+    g_Shared.Indices.clear();
+    g_Shared.Commands.clear();
+    memset(&g_Shared.Flat, 0, sizeof(g_Shared.Flat));
+}
+
+} // extern "C"
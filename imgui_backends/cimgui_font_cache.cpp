@@ -0,0 +1,346 @@
+// On-disk cache for the glyphs of a font atlas
+//
+// The cache file holds every baked font (font, size, rasterizer density)
+// with its glyph metrics and the glyph pixels copied out of the atlas
+// texture. Loading re-packs those pixels into the atlas and registers the
+// glyphs directly, so nothing has to be rasterized again by stb_truetype or
+// FreeType. Glyphs that weren't in the cache are still rasterized on demand.
+//
+// A cache is only used when its config hash matches the atlas: ImGui
+// version, font loader, texture format and every font source (file
+// contents, size, ranges, loader flags, ...). Any other file is ignored.
+//
+// Built with --freetype only. It uses the dynamic font atlas internals of
+// imgui_internal.h (ImFontAtlasBuilder, ImFontAtlasBakedAdd, ...), which
+// are not a stable API.
+#define CIMGUI_IMPL_BUILD
+#include "cimgui_sdl2_opengl3.h"
+#include "../cimgui/imgui/imgui.h"
+#include "../cimgui/imgui/imgui_internal.h"
+
+#include <stdio.h>
+#include <string.h>
+
+#if IMGUI_VERSION_NUM < 19200
+#error "cimgui_font_cache.cpp needs Dear ImGui 1.92 or later (dynamic font atlas)"
+#endif
+
+#define FONT_CACHE_MAGIC   0x43464d49u  // "IMFC"
+#define FONT_CACHE_VERSION 1u
+
+namespace {
+
+struct Hasher {
+    ImU64 value = 14695981039346656037ull;  // FNV-1a
+
+    void Add(const void* data, size_t size) {
+        const unsigned char* p = (const unsigned char*)data;
+        for (size_t i = 0; i < size; i++) {
+            value = (value ^ p[i]) * 1099511628211ull;
+        }
+    }
+    template <typename T> void Add(const T& v) { Add(&v, sizeof(v)); }
+    void AddString(const char* s) { Add(s ? s : "", s ? strlen(s) + 1 : 1); }
+    void AddRanges(const ImWchar* ranges) {
+        int count = 0;
+        while (ranges && ranges[count]) {
+            count++;
+        }
+        Add(count);
+        Add(ranges, count * sizeof(ImWchar));
+    }
+};
+
+int FontIndex(ImFontAtlas* atlas, ImFont* font) {
+    for (int i = 0; i < atlas->Fonts.Size; i++) {
+        if (atlas->Fonts[i] == font) {
+            return i;
+        }
+    }
+    return -1;
+}
+
+// Index of the font a baked size belongs to, found through its id (the
+// back pointer has been renamed between 1.92 releases)
+int BakedFontIndex(ImFontAtlas* atlas, const ImFontBaked* baked) {
+    for (int i = 0; i < atlas->Fonts.Size; i++) {
+        if (ImFontAtlasBakedGetId(atlas->Fonts[i]->FontId, baked->Size, baked->RasterizerDensity) == baked->BakedId) {
+            return i;
+        }
+    }
+    return -1;
+}
+
+ImU64 ConfigHash(ImFontAtlas* atlas) {
+    Hasher h;
+    h.Add(FONT_CACHE_VERSION);
+    h.Add(IMGUI_VERSION_NUM);
+    h.AddString(atlas->FontLoader ? atlas->FontLoader->Name : NULL);
+    h.Add(atlas->Flags);
+    h.Add(atlas->TexDesiredFormat);
+    h.Add(atlas->TexGlyphPadding);
+    h.Add(atlas->Sources.Size);
+    for (const ImFontConfig& src : atlas->Sources) {
+        h.Add(src.FontDataSize);
+        h.Add(src.FontData, src.FontDataSize);
+        h.Add(src.FontNo);
+        h.Add(src.MergeMode);
+        h.Add(src.PixelSnapH);
+        h.Add(src.OversampleH);
+        h.Add(src.OversampleV);
+        h.Add(src.SizePixels);
+        h.Add(src.GlyphOffset);
+        h.Add(src.GlyphMinAdvanceX);
+        h.Add(src.GlyphMaxAdvanceX);
+        h.Add(src.GlyphExtraAdvanceX);
+        h.Add(src.FontLoaderFlags);
+        h.Add(src.RasterizerMultiply);
+        h.Add(src.RasterizerDensity);
+        h.AddRanges(src.GlyphRanges);
+        h.AddRanges(src.GlyphExcludeRanges);
+        h.Add(FontIndex(atlas, src.DstFont));
+    }
+    return h.value;
+}
+
+// Fixed-size glyph record; pixels (w * h * BytesPerPixel) follow it
+struct CachedGlyph {
+    ImU32 codepoint;
+    ImU32 colored;
+    ImU32 visible;
+    ImU32 source_idx;
+    float advance_x;
+    float x0, y0, x1, y1;
+    ImU32 w, h;
+};
+
+struct CachedBaked {
+    ImS32 font_index;
+    float size;
+    float rasterizer_density;
+    ImU32 num_glyphs;
+};
+
+struct CacheHeader {
+    ImU32 magic;
+    ImU32 version;
+    ImU64 config_hash;
+    ImU32 tex_format;
+    ImU32 num_baked;
+};
+
+struct Reader {
+    const unsigned char* p;
+    const unsigned char* end;
+
+    bool Read(void* out, size_t size) {
+        if ((size_t)(end - p) < size) {
+            return false;
+        }
+        memcpy(out, p, size);
+        p += size;
+        return true;
+    }
+    const unsigned char* Skip(size_t size) {
+        if ((size_t)(end - p) < size) {
+            return NULL;
+        }
+        const unsigned char* data = p;
+        p += size;
+        return data;
+    }
+};
+
+struct AddedBaked {
+    ImFont* font;
+    ImFontBaked* baked;
+};
+
+// Reads one baked record and its glyphs. Without apply it only checks them,
+// leaving the atlas untouched; with apply it also adds a baked for sizes not
+// baked this session and packs its glyphs, appending the bakeds it creates
+// to added.
+bool LoadBaked(ImFontAtlas* atlas, Reader& reader, bool apply, ImVector<AddedBaked>& added) {
+    CachedBaked cb;
+    if (!reader.Read(&cb, sizeof(cb)) || cb.font_index < 0 || cb.font_index >= atlas->Fonts.Size
+        || !(cb.size > 0.0f) || !(cb.rasterizer_density > 0.0f)) {
+        return false;
+    }
+    ImFont* font = atlas->Fonts[cb.font_index];
+    ImFontBaked* baked = NULL;
+    if (apply) {
+        // Sizes already baked this session are left alone; only their records are skipped
+        ImGuiID baked_id = ImFontAtlasBakedGetId(font->FontId, cb.size, cb.rasterizer_density);
+        if (atlas->Builder->BakedMap.GetVoidPtr(baked_id) == NULL) {
+            baked = ImFontAtlasBakedAdd(atlas, font, cb.size, cb.rasterizer_density, baked_id);
+            // ImFontAtlasBakedAdd() leaves registering the baked to its caller
+            atlas->Builder->BakedMap.SetVoidPtr(baked_id, baked);
+            AddedBaked entry = { font, baked };
+            added.push_back(entry);
+        }
+    }
+
+    ImTextureData* tex = atlas->TexData;
+    for (ImU32 i = 0; i < cb.num_glyphs; i++) {
+        CachedGlyph cg;
+        if (!reader.Read(&cg, sizeof(cg)) || cg.source_idx >= (ImU32)font->Sources.Size
+            || cg.codepoint > IM_UNICODE_CODEPOINT_MAX || (cg.w == 0) != (cg.h == 0)
+            || cg.w > 0xFFFF || cg.h > 0xFFFF) {
+            return false;
+        }
+        const unsigned char* pixels = reader.Skip((size_t)cg.w * cg.h * tex->BytesPerPixel);
+        if (pixels == NULL) {
+            return false;
+        }
+        if (baked == NULL) {
+            continue;
+        }
+
+        ImFontGlyph glyph;
+        glyph.Codepoint = cg.codepoint;
+        glyph.Colored = cg.colored;
+        glyph.Visible = cg.visible;
+        glyph.SourceIdx = cg.source_idx;
+        glyph.AdvanceX = cg.advance_x;
+        glyph.X0 = cg.x0;
+        glyph.Y0 = cg.y0;
+        glyph.X1 = cg.x1;
+        glyph.Y1 = cg.y1;
+        if (cg.w > 0) {
+            glyph.PackId = ImFontAtlasPackAddRect(atlas, (int)cg.w, (int)cg.h);
+            if (glyph.PackId == ImFontAtlasRectId_Invalid) {
+                return false;
+            }
+            // Packing may have grown the texture
+            tex = atlas->TexData;
+            ImTextureRect* r = ImFontAtlasPackGetRect(atlas, glyph.PackId);
+            const size_t row_size = (size_t)cg.w * tex->BytesPerPixel;
+            for (ImU32 y = 0; y < cg.h; y++) {
+                memcpy(tex->GetPixelsAt(r->x, r->y + (int)y), pixels + y * row_size, row_size);
+            }
+            ImFontAtlasTextureBlockQueueUpload(atlas, tex, r->x, r->y, r->w, r->h);
+        }
+        // No source: the cached advance already has clamping, snapping and
+        // extra spacing applied, and the pixels their post-processing
+        ImFontAtlasBakedAddFontGlyph(atlas, baked, NULL, &glyph);
+    }
+    return true;
+}
+
+} // namespace
+
+extern "C" {
+
+unsigned long long cImGui_FontAtlas_ConfigHash(ImFontAtlas* atlas) {
+    return ConfigHash(atlas);
+}
+
+bool cImGui_FontAtlas_SaveCache(ImFontAtlas* atlas, const char* path) {
+    ImFontAtlasBuilder* builder = atlas->Builder;
+    ImTextureData* tex = atlas->TexData;
+    if (builder == NULL || tex == NULL || tex->Pixels == NULL) {
+        return false;
+    }
+
+    ImVector<unsigned char> out;
+    auto write = [&out](const void* data, size_t size) {
+        int offset = out.Size;
+        out.resize(offset + (int)size);
+        memcpy(out.Data + offset, data, size);
+    };
+
+    CacheHeader header = { FONT_CACHE_MAGIC, FONT_CACHE_VERSION, ConfigHash(atlas), (ImU32)tex->Format, 0 };
+    write(&header, sizeof(header));
+
+    for (int n = 0; n < builder->BakedPool.Size; n++) {
+        ImFontBaked* baked = &builder->BakedPool[n];
+        if (baked->WantDestroy) {
+            continue;
+        }
+        int font_index = BakedFontIndex(atlas, baked);
+        if (font_index < 0) {
+            continue;
+        }
+        CachedBaked cb = { font_index, baked->Size, baked->RasterizerDensity, (ImU32)baked->Glyphs.Size };
+        write(&cb, sizeof(cb));
+        for (const ImFontGlyph& glyph : baked->Glyphs) {
+            ImTextureRect* r = glyph.PackId != ImFontAtlasRectId_Invalid ? ImFontAtlasPackGetRect(atlas, glyph.PackId) : NULL;
+            CachedGlyph cg = {
+                glyph.Codepoint, glyph.Colored, glyph.Visible, glyph.SourceIdx, glyph.AdvanceX,
+                glyph.X0, glyph.Y0, glyph.X1, glyph.Y1,
+                r ? (ImU32)r->w : 0u, r ? (ImU32)r->h : 0u,
+            };
+            write(&cg, sizeof(cg));
+            for (ImU32 y = 0; y < cg.h; y++) {
+                write(tex->GetPixelsAt(r->x, r->y + (int)y), (size_t)cg.w * tex->BytesPerPixel);
+            }
+        }
+        header.num_baked++;
+    }
+    memcpy(out.Data, &header, sizeof(header));
+
+    // Write to a temporary file and rename it so readers never see a partial cache
+    ImGuiTextBuffer tmp_path;
+    tmp_path.appendf("%s.tmp", path);
+    FILE* f = fopen(tmp_path.c_str(), "wb");
+    if (f == NULL) {
+        return false;
+    }
+    bool ok = fwrite(out.Data, 1, (size_t)out.Size, f) == (size_t)out.Size;
+    ok = fclose(f) == 0 && ok;
+#ifdef _WIN32
+    if (ok) {
+        remove(path);
+    }
+#endif
+    if (!ok || rename(tmp_path.c_str(), path) != 0) {
+        remove(tmp_path.c_str());
+        return false;
+    }
+    return true;
+}
+
+bool cImGui_FontAtlas_LoadCache(ImFontAtlas* atlas, const char* path) {
+    size_t size = 0;
+    unsigned char* data = (unsigned char*)ImFileLoadToMemory(path, "rb", &size);
+    if (data == NULL) {
+        return false;
+    }
+
+    Reader reader = { data, data + size };
+    CacheHeader header;
+    bool ok = reader.Read(&header, sizeof(header))
+        && header.magic == FONT_CACHE_MAGIC
+        && header.version == FONT_CACHE_VERSION;
+    if (ok && atlas->Builder == NULL) {
+        // Selects the font loader and creates the texture, without baking anything
+        ImFontAtlasBuildInit(atlas);
+    }
+    ok = ok && header.config_hash == ConfigHash(atlas)
+        && header.tex_format == (ImU32)atlas->TexData->Format;
+
+    // Check every record before changing the atlas, so that a damaged file
+    // is rejected as a whole
+    const unsigned char* records = reader.p;
+    ImVector<AddedBaked> added;
+    for (ImU32 n = 0; ok && n < header.num_baked; n++) {
+        ok = LoadBaked(atlas, reader, false, added);
+    }
+    ok = ok && reader.p == reader.end;
+
+    reader.p = records;
+    for (ImU32 n = 0; ok && n < header.num_baked; n++) {
+        ok = LoadBaked(atlas, reader, true, added);
+    }
+    if (!ok) {
+        // The atlas ran out of room: drop the sizes added from the cache,
+        // with their packed glyphs, so they are rasterized as usual
+        for (const AddedBaked& entry : added) {
+            ImFontAtlasBakedDiscard(atlas, entry.font, entry.baked);
+        }
+    }
+    IM_FREE(data);
+    return ok;
+}
+
+} // extern "C"
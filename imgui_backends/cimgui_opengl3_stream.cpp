@@ -0,0 +1,753 @@
+// Streaming render path for the OpenGL3 backend
+//
+// cImGui_ImplOpenGL3_RenderDrawDataStreaming draws the same output as
+// ImGui_ImplOpenGL3_RenderDrawData, but the backend re-specifies its
+// VBO/IBO with glBufferData for every draw list, and drivers stall when the
+// GPU is still reading the previous contents. Here all draw lists of a
+// frame are written into one region of a ring buffer:
+//
+// - GL 4.4 or ARB_buffer_storage: the buffers are persistently mapped and
+//   split into STREAM_FRAMES regions, each guarded by a fence, so the CPU
+//   writes straight into memory the GPU is done with.
+// - GL 3.0+ / ES 3.0: one unsynchronized glMapBufferRange per buffer and
+//   frame, orphaning the buffer when the ring wraps.
+//
+// The buffers, vertex array and shader program are our own; textures (the
+// font atlas and user textures) are still created and updated by the
+// backend. Older contexts fall back to ImGui_ImplOpenGL3_RenderDrawData.
+// GL functions come from SDL_GL_GetProcAddress. Names here avoid the gl*
+// and GL_* identifiers of the backend's loader, which shares the unity TU.
+#define CIMGUI_IMPL_BUILD
+#include "cimgui_sdl2_opengl3.h"
+#include "../cimgui/imgui/imgui.h"
+#include "../cimgui/imgui/backends/imgui_impl_opengl3.h"
+#include <SDL.h>
+
+#include <stddef.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+
+#if defined(_WIN32) && !defined(__CYGWIN__)
+#define STREAM_APIENTRY __stdcall
+#else
+#define STREAM_APIENTRY
+#endif
+
+namespace {
+
+// GL enums used below
+enum : unsigned int {
+    E_ONE                      = 1,
+    E_TRIANGLES                = 0x0004,
+    E_SRC_ALPHA                = 0x0302,
+    E_ONE_MINUS_SRC_ALPHA      = 0x0303,
+    E_FRONT_AND_BACK           = 0x0408,
+    E_POLYGON_MODE             = 0x0B40,
+    E_CULL_FACE                = 0x0B44,
+    E_DEPTH_TEST               = 0x0B71,
+    E_STENCIL_TEST             = 0x0B90,
+    E_VIEWPORT                 = 0x0BA2,
+    E_BLEND                    = 0x0BE2,
+    E_SCISSOR_BOX              = 0x0C10,
+    E_SCISSOR_TEST             = 0x0C11,
+    E_TEXTURE_2D               = 0x0DE1,
+    E_UNSIGNED_BYTE            = 0x1401,
+    E_UNSIGNED_SHORT           = 0x1403,
+    E_UNSIGNED_INT             = 0x1405,
+    E_FLOAT                    = 0x1406,
+    E_FILL                     = 0x1B02,
+    E_VERSION                  = 0x1F02,
+    E_EXTENSIONS               = 0x1F03,
+    E_FUNC_ADD                 = 0x8006,
+    E_BLEND_EQUATION_RGB       = 0x8009,
+    E_TEXTURE_BINDING_2D       = 0x8069,
+    E_BLEND_DST_RGB            = 0x80C8,
+    E_BLEND_SRC_RGB            = 0x80C9,
+    E_BLEND_DST_ALPHA          = 0x80CA,
+    E_BLEND_SRC_ALPHA          = 0x80CB,
+    E_MAJOR_VERSION            = 0x821B,
+    E_MINOR_VERSION            = 0x821C,
+    E_NUM_EXTENSIONS           = 0x821D,
+    E_VERTEX_ARRAY_BINDING     = 0x85B5,
+    E_TEXTURE0                 = 0x84C0,
+    E_ACTIVE_TEXTURE           = 0x84E0,
+    E_BLEND_EQUATION_ALPHA     = 0x883D,
+    E_ARRAY_BUFFER             = 0x8892,
+    E_ELEMENT_ARRAY_BUFFER     = 0x8893,
+    E_ARRAY_BUFFER_BINDING     = 0x8894,
+    E_STREAM_DRAW              = 0x88E0,
+    E_SAMPLER_BINDING          = 0x8919,
+    E_FRAGMENT_SHADER          = 0x8B30,
+    E_VERTEX_SHADER            = 0x8B31,
+    E_COMPILE_STATUS           = 0x8B81,
+    E_LINK_STATUS              = 0x8B82,
+    E_CURRENT_PROGRAM          = 0x8B8D,
+    E_PRIMITIVE_RESTART        = 0x8F9D,
+    E_SYNC_GPU_COMMANDS_COMPLETE = 0x9117,
+    E_TIMEOUT_EXPIRED          = 0x911B,
+    E_MAP_WRITE_BIT            = 0x0002,
+    E_MAP_INVALIDATE_RANGE_BIT = 0x0004,
+    E_MAP_UNSYNCHRONIZED_BIT   = 0x0020,
+    E_MAP_PERSISTENT_BIT       = 0x0040,
+    E_MAP_COHERENT_BIT         = 0x0080,
+    E_SYNC_FLUSH_COMMANDS_BIT  = 0x0001,
+};
+
+// Regions of the persistently mapped buffers: the CPU fills one while the
+// GPU may still be reading the previous two frames
+const int STREAM_FRAMES = 3;
+const size_t MIN_VTX_BYTES = 1 << 20;
+const size_t MIN_IDX_BYTES = 1 << 18;
+const size_t ALIGNMENT = 256;
+
+struct Functions {
+    void (STREAM_APIENTRY *GetIntegerv)(unsigned int, int*);
+    const unsigned char* (STREAM_APIENTRY *GetString)(unsigned int);
+    const unsigned char* (STREAM_APIENTRY *GetStringi)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *Enable)(unsigned int);
+    void (STREAM_APIENTRY *Disable)(unsigned int);
+    unsigned char (STREAM_APIENTRY *IsEnabled)(unsigned int);
+    void (STREAM_APIENTRY *BlendEquationSeparate)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *BlendFuncSeparate)(unsigned int, unsigned int, unsigned int, unsigned int);
+    void (STREAM_APIENTRY *Viewport)(int, int, int, int);
+    void (STREAM_APIENTRY *Scissor)(int, int, int, int);
+    void (STREAM_APIENTRY *PolygonMode)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *ActiveTexture)(unsigned int);
+    void (STREAM_APIENTRY *BindTexture)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *BindSampler)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *DrawElements)(unsigned int, int, unsigned int, const void*);
+    void (STREAM_APIENTRY *GenBuffers)(int, unsigned int*);
+    void (STREAM_APIENTRY *DeleteBuffers)(int, const unsigned int*);
+    void (STREAM_APIENTRY *BindBuffer)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *BufferData)(unsigned int, ptrdiff_t, const void*, unsigned int);
+    void (STREAM_APIENTRY *BufferStorage)(unsigned int, ptrdiff_t, const void*, unsigned int);
+    void* (STREAM_APIENTRY *MapBufferRange)(unsigned int, ptrdiff_t, ptrdiff_t, unsigned int);
+    unsigned char (STREAM_APIENTRY *UnmapBuffer)(unsigned int);
+    void (STREAM_APIENTRY *GenVertexArrays)(int, unsigned int*);
+    void (STREAM_APIENTRY *DeleteVertexArrays)(int, const unsigned int*);
+    void (STREAM_APIENTRY *BindVertexArray)(unsigned int);
+    void (STREAM_APIENTRY *EnableVertexAttribArray)(unsigned int);
+    void (STREAM_APIENTRY *VertexAttribPointer)(unsigned int, int, unsigned int, unsigned char, int, const void*);
+    unsigned int (STREAM_APIENTRY *CreateShader)(unsigned int);
+    void (STREAM_APIENTRY *ShaderSource)(unsigned int, int, const char* const*, const int*);
+    void (STREAM_APIENTRY *CompileShader)(unsigned int);
+    void (STREAM_APIENTRY *GetShaderiv)(unsigned int, unsigned int, int*);
+    void (STREAM_APIENTRY *GetShaderInfoLog)(unsigned int, int, int*, char*);
+    void (STREAM_APIENTRY *DeleteShader)(unsigned int);
+    unsigned int (STREAM_APIENTRY *CreateProgram)();
+    void (STREAM_APIENTRY *AttachShader)(unsigned int, unsigned int);
+    void (STREAM_APIENTRY *BindAttribLocation)(unsigned int, unsigned int, const char*);
+    void (STREAM_APIENTRY *LinkProgram)(unsigned int);
+    void (STREAM_APIENTRY *GetProgramiv)(unsigned int, unsigned int, int*);
+    void (STREAM_APIENTRY *GetProgramInfoLog)(unsigned int, int, int*, char*);
+    void (STREAM_APIENTRY *DeleteProgram)(unsigned int);
+    void (STREAM_APIENTRY *UseProgram)(unsigned int);
+    int (STREAM_APIENTRY *GetUniformLocation)(unsigned int, const char*);
+    void (STREAM_APIENTRY *Uniform1i)(int, int);
+    void (STREAM_APIENTRY *UniformMatrix4fv)(int, int, unsigned char, const float*);
+    void* (STREAM_APIENTRY *FenceSync)(unsigned int, unsigned int);
+    unsigned int (STREAM_APIENTRY *ClientWaitSync)(void*, unsigned int, unsigned long long);
+    void (STREAM_APIENTRY *DeleteSync)(void*);
+};
+
+struct Stream {
+    bool Initialized = false;
+    int Mode = CIMGUI_STREAM_FALLBACK;
+    bool IsES = false;
+    bool HasPrimitiveRestart = false;
+    Functions Gl = {};
+
+    unsigned int Program = 0;
+    int AttribTex = -1;
+    int AttribProjMtx = -1;
+    unsigned int Vao = 0;
+    unsigned int Vbo = 0;
+    unsigned int Ibo = 0;
+
+    // Persistent mode: STREAM_FRAMES regions of VtxBytes/IdxBytes each.
+    // Mapped mode: one ring of VtxBytes/IdxBytes with a write head each.
+    size_t VtxBytes = 0;
+    size_t IdxBytes = 0;
+    size_t VtxHead = 0;
+    size_t IdxHead = 0;
+    unsigned char* VtxMapped = NULL;
+    unsigned char* IdxMapped = NULL;
+    void* Fences[STREAM_FRAMES] = {};
+    int Frame = 0;
+};
+
+Stream g_Stream;
+// Kept across StreamingInit/Shutdown, which reset g_Stream
+bool g_PreserveState = true;
+
+template <typename T> bool Load(T& fn, const char* name) {
+    fn = (T)SDL_GL_GetProcAddress(name);
+    return fn != NULL;
+}
+
+bool LoadFunctions(Functions& gl) {
+    bool ok = true;
+    ok &= Load(gl.GetIntegerv, "glGetIntegerv");
+    ok &= Load(gl.GetString, "glGetString");
+    ok &= Load(gl.GetStringi, "glGetStringi");
+    ok &= Load(gl.Enable, "glEnable");
+    ok &= Load(gl.Disable, "glDisable");
+    ok &= Load(gl.IsEnabled, "glIsEnabled");
+    ok &= Load(gl.BlendEquationSeparate, "glBlendEquationSeparate");
+    ok &= Load(gl.BlendFuncSeparate, "glBlendFuncSeparate");
+    ok &= Load(gl.Viewport, "glViewport");
+    ok &= Load(gl.Scissor, "glScissor");
+    ok &= Load(gl.ActiveTexture, "glActiveTexture");
+    ok &= Load(gl.BindTexture, "glBindTexture");
+    ok &= Load(gl.DrawElements, "glDrawElements");
+    ok &= Load(gl.GenBuffers, "glGenBuffers");
+    ok &= Load(gl.DeleteBuffers, "glDeleteBuffers");
+    ok &= Load(gl.BindBuffer, "glBindBuffer");
+    ok &= Load(gl.BufferData, "glBufferData");
+    ok &= Load(gl.MapBufferRange, "glMapBufferRange");
+    ok &= Load(gl.UnmapBuffer, "glUnmapBuffer");
+    ok &= Load(gl.GenVertexArrays, "glGenVertexArrays");
+    ok &= Load(gl.DeleteVertexArrays, "glDeleteVertexArrays");
+    ok &= Load(gl.BindVertexArray, "glBindVertexArray");
+    ok &= Load(gl.EnableVertexAttribArray, "glEnableVertexAttribArray");
+    ok &= Load(gl.VertexAttribPointer, "glVertexAttribPointer");
+    ok &= Load(gl.CreateShader, "glCreateShader");
+    ok &= Load(gl.ShaderSource, "glShaderSource");
+    ok &= Load(gl.CompileShader, "glCompileShader");
+    ok &= Load(gl.GetShaderiv, "glGetShaderiv");
+    ok &= Load(gl.GetShaderInfoLog, "glGetShaderInfoLog");
+    ok &= Load(gl.DeleteShader, "glDeleteShader");
+    ok &= Load(gl.CreateProgram, "glCreateProgram");
+    ok &= Load(gl.AttachShader, "glAttachShader");
+    ok &= Load(gl.BindAttribLocation, "glBindAttribLocation");
+    ok &= Load(gl.LinkProgram, "glLinkProgram");
+    ok &= Load(gl.GetProgramiv, "glGetProgramiv");
+    ok &= Load(gl.GetProgramInfoLog, "glGetProgramInfoLog");
+    ok &= Load(gl.DeleteProgram, "glDeleteProgram");
+    ok &= Load(gl.UseProgram, "glUseProgram");
+    ok &= Load(gl.GetUniformLocation, "glGetUniformLocation");
+    ok &= Load(gl.Uniform1i, "glUniform1i");
+    ok &= Load(gl.UniformMatrix4fv, "glUniformMatrix4fv");
+    // Optional, checked against the context version in Init: GLX hands out
+    // pointers even for functions the context doesn't have
+    Load(gl.PolygonMode, "glPolygonMode");
+    Load(gl.BindSampler, "glBindSampler");
+    Load(gl.FenceSync, "glFenceSync");
+    Load(gl.ClientWaitSync, "glClientWaitSync");
+    Load(gl.DeleteSync, "glDeleteSync");
+    Load(gl.BufferStorage, "glBufferStorage");
+    return ok;
+}
+
+bool HasExtension(const Functions& gl, const char* name) {
+    int count = 0;
+    gl.GetIntegerv(E_NUM_EXTENSIONS, &count);
+    for (int i = 0; i < count; i++) {
+        const char* ext = (const char*)gl.GetStringi(E_EXTENSIONS, (unsigned int)i);
+        if (ext && strcmp(ext, name) == 0) {
+            return true;
+        }
+    }
+    return false;
+}
+
+unsigned int CompileShader(const Functions& gl, unsigned int type, const char* version, const char* source) {
+    const char* sources[2] = { version, source };
+    unsigned int shader = gl.CreateShader(type);
+    gl.ShaderSource(shader, 2, sources, NULL);
+    gl.CompileShader(shader);
+    int status = 0;
+    gl.GetShaderiv(shader, E_COMPILE_STATUS, &status);
+    if (!status) {
+        char log[1024];
+        gl.GetShaderInfoLog(shader, sizeof(log), NULL, log);
+        fprintf(stderr, "cImGui_ImplOpenGL3_RenderDrawDataStreaming: failed to compile shader:\n%s\n", log);
+        gl.DeleteShader(shader);
+        return 0;
+    }
+    return shader;
+}
+
+bool CreateProgram(Stream& s, int major, int minor) {
+    static const char* vertex_shader =
+        "uniform mat4 ProjMtx;\n"
+        "in vec2 Position;\n"
+        "in vec2 UV;\n"
+        "in vec4 Color;\n"
+        "out vec2 Frag_UV;\n"
+        "out vec4 Frag_Color;\n"
+        "void main()\n"
+        "{\n"
+        "    Frag_UV = UV;\n"
+        "    Frag_Color = Color;\n"
+        "    gl_Position = ProjMtx * vec4(Position.xy, 0.0, 1.0);\n"
+        "}\n";
+    static const char* fragment_shader =
+        "uniform sampler2D Texture;\n"
+        "in vec2 Frag_UV;\n"
+        "in vec4 Frag_Color;\n"
+        "out vec4 Out_Color;\n"
+        "void main()\n"
+        "{\n"
+        "    Out_Color = Frag_Color * texture(Texture, Frag_UV.st);\n"
+        "}\n";
+    const char* version = s.IsES ? "#version 300 es\nprecision mediump float;\n"
+                        : (major > 3 || (major == 3 && minor >= 2)) ? "#version 150\n" : "#version 130\n";
+
+    const Functions& gl = s.Gl;
+    unsigned int vs = CompileShader(gl, E_VERTEX_SHADER, version, vertex_shader);
+    unsigned int fs = CompileShader(gl, E_FRAGMENT_SHADER, version, fragment_shader);
+    if (!vs || !fs) {
+        if (vs) gl.DeleteShader(vs);
+        if (fs) gl.DeleteShader(fs);
+        return false;
+    }
+    s.Program = gl.CreateProgram();
+    gl.AttachShader(s.Program, vs);
+    gl.AttachShader(s.Program, fs);
+    gl.BindAttribLocation(s.Program, 0, "Position");
+    gl.BindAttribLocation(s.Program, 1, "UV");
+    gl.BindAttribLocation(s.Program, 2, "Color");
+    gl.LinkProgram(s.Program);
+    gl.DeleteShader(vs);
+    gl.DeleteShader(fs);
+    int status = 0;
+    gl.GetProgramiv(s.Program, E_LINK_STATUS, &status);
+    if (!status) {
+        char log[1024];
+        gl.GetProgramInfoLog(s.Program, sizeof(log), NULL, log);
+        fprintf(stderr, "cImGui_ImplOpenGL3_RenderDrawDataStreaming: failed to link program:\n%s\n", log);
+        gl.DeleteProgram(s.Program);
+        s.Program = 0;
+        return false;
+    }
+    s.AttribTex = gl.GetUniformLocation(s.Program, "Texture");
+    s.AttribProjMtx = gl.GetUniformLocation(s.Program, "ProjMtx");
+    return true;
+}
+
+void WaitFence(Stream& s, int region) {
+    if (s.Fences[region] == NULL) {
+        return;
+    }
+    unsigned int result;
+    do {
+        result = s.Gl.ClientWaitSync(s.Fences[region], E_SYNC_FLUSH_COMMANDS_BIT, 1000000000ull);
+    } while (result == E_TIMEOUT_EXPIRED);
+    s.Gl.DeleteSync(s.Fences[region]);
+    s.Fences[region] = NULL;
+}
+
+size_t GrowTo(size_t needed, size_t minimum) {
+    size_t size = minimum;
+    while (size < needed) {
+        size *= 2;
+    }
+    return size;
+}
+
+// (Re)creates the buffers with room for vtx_bytes/idx_bytes per frame.
+// Expects the vertex array to be bound.
+bool CreateBuffers(Stream& s, size_t vtx_bytes, size_t idx_bytes) {
+    const Functions& gl = s.Gl;
+    if (s.Vbo) {
+        for (int i = 0; i < STREAM_FRAMES; i++) {
+            WaitFence(s, i);
+        }
+        if (s.VtxMapped) {
+            gl.BindBuffer(E_ARRAY_BUFFER, s.Vbo);
+            gl.UnmapBuffer(E_ARRAY_BUFFER);
+            gl.BindBuffer(E_ELEMENT_ARRAY_BUFFER, s.Ibo);
+            gl.UnmapBuffer(E_ELEMENT_ARRAY_BUFFER);
+        }
+        gl.DeleteBuffers(1, &s.Vbo);
+        gl.DeleteBuffers(1, &s.Ibo);
+        s.VtxMapped = s.IdxMapped = NULL;
+    }
+    s.VtxBytes = GrowTo(vtx_bytes, s.VtxBytes ? s.VtxBytes : MIN_VTX_BYTES);
+    s.IdxBytes = GrowTo(idx_bytes, s.IdxBytes ? s.IdxBytes : MIN_IDX_BYTES);
+    s.VtxHead = s.IdxHead = 0;
+
+    gl.GenBuffers(1, &s.Vbo);
+    gl.GenBuffers(1, &s.Ibo);
+    gl.BindBuffer(E_ARRAY_BUFFER, s.Vbo);
+    gl.BindBuffer(E_ELEMENT_ARRAY_BUFFER, s.Ibo);
+    if (s.Mode != CIMGUI_STREAM_PERSISTENT) {
+        gl.BufferData(E_ARRAY_BUFFER, (ptrdiff_t)s.VtxBytes, NULL, E_STREAM_DRAW);
+        gl.BufferData(E_ELEMENT_ARRAY_BUFFER, (ptrdiff_t)s.IdxBytes, NULL, E_STREAM_DRAW);
+        return true;
+    }
+
+    const unsigned int flags = E_MAP_WRITE_BIT | E_MAP_PERSISTENT_BIT | E_MAP_COHERENT_BIT;
+    gl.BufferStorage(E_ARRAY_BUFFER, (ptrdiff_t)(s.VtxBytes * STREAM_FRAMES), NULL, flags);
+    gl.BufferStorage(E_ELEMENT_ARRAY_BUFFER, (ptrdiff_t)(s.IdxBytes * STREAM_FRAMES), NULL, flags);
+    s.VtxMapped = (unsigned char*)gl.MapBufferRange(E_ARRAY_BUFFER, 0, (ptrdiff_t)(s.VtxBytes * STREAM_FRAMES), flags);
+    s.IdxMapped = (unsigned char*)gl.MapBufferRange(E_ELEMENT_ARRAY_BUFFER, 0, (ptrdiff_t)(s.IdxBytes * STREAM_FRAMES), flags);
+    return s.VtxMapped != NULL && s.IdxMapped != NULL;
+}
+
+void DestroyObjects(Stream& s) {
+    const Functions& gl = s.Gl;
+    for (int i = 0; i < STREAM_FRAMES; i++) {
+        WaitFence(s, i);
+    }
+    if (s.Vao) {
+        gl.BindVertexArray(s.Vao);
+        if (s.VtxMapped) {
+            gl.BindBuffer(E_ARRAY_BUFFER, s.Vbo);
+            gl.UnmapBuffer(E_ARRAY_BUFFER);
+        }
+        if (s.IdxMapped) {
+            gl.UnmapBuffer(E_ELEMENT_ARRAY_BUFFER);
+        }
+        gl.BindVertexArray(0);
+        gl.DeleteVertexArrays(1, &s.Vao);
+    }
+    if (s.Vbo) gl.DeleteBuffers(1, &s.Vbo);
+    if (s.Ibo) gl.DeleteBuffers(1, &s.Ibo);
+    if (s.Program) gl.DeleteProgram(s.Program);
+    s = Stream();
+}
+
+int Init(Stream& s, bool allow_persistent) {
+    s = Stream();
+    s.Initialized = true;
+    Functions& gl = s.Gl;
+    if (!LoadFunctions(gl)) {
+        return s.Mode;
+    }
+    int major = 0, minor = 0;
+    gl.GetIntegerv(E_MAJOR_VERSION, &major);
+    gl.GetIntegerv(E_MINOR_VERSION, &minor);
+    const char* version = (const char*)gl.GetString(E_VERSION);
+    s.IsES = version && strncmp(version, "OpenGL ES", 9) == 0;
+    if (major < 3) {
+        // GL 2.x / ES 2.0 (GL_MAJOR_VERSION doesn't exist there either)
+        return s.Mode;
+    }
+    s.HasPrimitiveRestart = !s.IsES && (major > 3 || minor >= 1);
+    if (s.IsES) {
+        gl.PolygonMode = NULL;
+    }
+    if (!s.IsES && major == 3 && minor < 3) {
+        gl.BindSampler = NULL;
+    }
+    bool has_storage = !s.IsES && gl.BufferStorage != NULL && gl.FenceSync != NULL && gl.ClientWaitSync != NULL
+                    && gl.DeleteSync != NULL
+                    && (major > 4 || (major == 4 && minor >= 4) || HasExtension(gl, "GL_ARB_buffer_storage"));
+    if (!CreateProgram(s, major, minor)) {
+        return s.Mode;
+    }
+
+    int last_vertex_array = 0, last_array_buffer = 0;
+    gl.GetIntegerv(E_VERTEX_ARRAY_BINDING, &last_vertex_array);
+    gl.GetIntegerv(E_ARRAY_BUFFER_BINDING, &last_array_buffer);
+    gl.GenVertexArrays(1, &s.Vao);
+    gl.BindVertexArray(s.Vao);
+    s.Mode = allow_persistent && has_storage ? CIMGUI_STREAM_PERSISTENT : CIMGUI_STREAM_MAPPED;
+    if (!CreateBuffers(s, 0, 0) && s.Mode == CIMGUI_STREAM_PERSISTENT) {
+        s.Mode = CIMGUI_STREAM_MAPPED;
+        CreateBuffers(s, 0, 0);
+    }
+    for (unsigned int attrib = 0; attrib < 3; attrib++) {
+        gl.EnableVertexAttribArray(attrib);
+    }
+    gl.BindVertexArray((unsigned int)last_vertex_array);
+    gl.BindBuffer(E_ARRAY_BUFFER, (unsigned int)last_array_buffer);
+    return s.Mode;
+}
+
+struct StateBackup {
+    int ActiveTexture, Program, Texture, Sampler, ArrayBuffer, VertexArray;
+    int PolygonMode[2], Viewport[4], ScissorBox[4];
+    int BlendSrcRgb, BlendDstRgb, BlendSrcAlpha, BlendDstAlpha, BlendEquationRgb, BlendEquationAlpha;
+    unsigned char Blend, CullFace, DepthTest, StencilTest, ScissorTest, PrimitiveRestart;
+};
+
+void BackupState(const Stream& s, StateBackup& b) {
+    const Functions& gl = s.Gl;
+    gl.GetIntegerv(E_ACTIVE_TEXTURE, &b.ActiveTexture);
+    gl.ActiveTexture(E_TEXTURE0);
+    gl.GetIntegerv(E_CURRENT_PROGRAM, &b.Program);
+    gl.GetIntegerv(E_TEXTURE_BINDING_2D, &b.Texture);
+    b.Sampler = 0;
+    if (gl.BindSampler) gl.GetIntegerv(E_SAMPLER_BINDING, &b.Sampler);
+    gl.GetIntegerv(E_ARRAY_BUFFER_BINDING, &b.ArrayBuffer);
+    gl.GetIntegerv(E_VERTEX_ARRAY_BINDING, &b.VertexArray);
+    if (gl.PolygonMode) gl.GetIntegerv(E_POLYGON_MODE, b.PolygonMode);
+    gl.GetIntegerv(E_VIEWPORT, b.Viewport);
+    gl.GetIntegerv(E_SCISSOR_BOX, b.ScissorBox);
+    gl.GetIntegerv(E_BLEND_SRC_RGB, &b.BlendSrcRgb);
+    gl.GetIntegerv(E_BLEND_DST_RGB, &b.BlendDstRgb);
+    gl.GetIntegerv(E_BLEND_SRC_ALPHA, &b.BlendSrcAlpha);
+    gl.GetIntegerv(E_BLEND_DST_ALPHA, &b.BlendDstAlpha);
+    gl.GetIntegerv(E_BLEND_EQUATION_RGB, &b.BlendEquationRgb);
+    gl.GetIntegerv(E_BLEND_EQUATION_ALPHA, &b.BlendEquationAlpha);
+    b.Blend = gl.IsEnabled(E_BLEND);
+    b.CullFace = gl.IsEnabled(E_CULL_FACE);
+    b.DepthTest = gl.IsEnabled(E_DEPTH_TEST);
+    b.StencilTest = gl.IsEnabled(E_STENCIL_TEST);
+    b.ScissorTest = gl.IsEnabled(E_SCISSOR_TEST);
+    b.PrimitiveRestart = s.HasPrimitiveRestart ? gl.IsEnabled(E_PRIMITIVE_RESTART) : 0;
+}
+
+void SetEnabled(const Functions& gl, unsigned int cap, unsigned char enabled) {
+    if (enabled) gl.Enable(cap); else gl.Disable(cap);
+}
+
+void RestoreState(const Stream& s, const StateBackup& b) {
+    const Functions& gl = s.Gl;
+    gl.UseProgram((unsigned int)b.Program);
+    gl.BindTexture(E_TEXTURE_2D, (unsigned int)b.Texture);
+    if (gl.BindSampler) gl.BindSampler(0, (unsigned int)b.Sampler);
+    gl.ActiveTexture((unsigned int)b.ActiveTexture);
+    gl.BindVertexArray((unsigned int)b.VertexArray);
+    gl.BindBuffer(E_ARRAY_BUFFER, (unsigned int)b.ArrayBuffer);
+    gl.BlendEquationSeparate((unsigned int)b.BlendEquationRgb, (unsigned int)b.BlendEquationAlpha);
+    gl.BlendFuncSeparate((unsigned int)b.BlendSrcRgb, (unsigned int)b.BlendDstRgb, (unsigned int)b.BlendSrcAlpha, (unsigned int)b.BlendDstAlpha);
+    SetEnabled(gl, E_BLEND, b.Blend);
+    SetEnabled(gl, E_CULL_FACE, b.CullFace);
+    SetEnabled(gl, E_DEPTH_TEST, b.DepthTest);
+    SetEnabled(gl, E_STENCIL_TEST, b.StencilTest);
+    SetEnabled(gl, E_SCISSOR_TEST, b.ScissorTest);
+    if (s.HasPrimitiveRestart) SetEnabled(gl, E_PRIMITIVE_RESTART, b.PrimitiveRestart);
+    // glPolygonMode has taken FRONT_AND_BACK only since GL 3.2 core
+    if (gl.PolygonMode) gl.PolygonMode(E_FRONT_AND_BACK, (unsigned int)b.PolygonMode[0]);
+    gl.Viewport(b.Viewport[0], b.Viewport[1], b.Viewport[2], b.Viewport[3]);
+    gl.Scissor(b.ScissorBox[0], b.ScissorBox[1], b.ScissorBox[2], b.ScissorBox[3]);
+}
+
+void SetupRenderState(const Stream& s, ImDrawData* draw_data, int fb_width, int fb_height) {
+    const Functions& gl = s.Gl;
+    gl.Enable(E_BLEND);
+    gl.BlendEquationSeparate(E_FUNC_ADD, E_FUNC_ADD);
+    gl.BlendFuncSeparate(E_SRC_ALPHA, E_ONE_MINUS_SRC_ALPHA, E_ONE, E_ONE_MINUS_SRC_ALPHA);
+    gl.Disable(E_CULL_FACE);
+    gl.Disable(E_DEPTH_TEST);
+    gl.Disable(E_STENCIL_TEST);
+    gl.Enable(E_SCISSOR_TEST);
+    if (s.HasPrimitiveRestart) gl.Disable(E_PRIMITIVE_RESTART);
+    if (gl.PolygonMode) gl.PolygonMode(E_FRONT_AND_BACK, E_FILL);
+    gl.Viewport(0, 0, fb_width, fb_height);
+
+    // Orthographic projection of the display rectangle, as in the backend
+    float L = draw_data->DisplayPos.x;
+    float R = draw_data->DisplayPos.x + draw_data->DisplaySize.x;
+    float T = draw_data->DisplayPos.y;
+    float B = draw_data->DisplayPos.y + draw_data->DisplaySize.y;
+    const float ortho_projection[4][4] = {
+        { 2.0f / (R - L),    0.0f,              0.0f, 0.0f },
+        { 0.0f,              2.0f / (T - B),    0.0f, 0.0f },
+        { 0.0f,              0.0f,             -1.0f, 0.0f },
+        { (R + L) / (L - R), (T + B) / (B - T), 0.0f, 1.0f },
+    };
+    gl.UseProgram(s.Program);
+    gl.Uniform1i(s.AttribTex, 0);
+    gl.UniformMatrix4fv(s.AttribProjMtx, 1, 0, &ortho_projection[0][0]);
+    if (gl.BindSampler) gl.BindSampler(0, 0);
+
+    gl.BindVertexArray(s.Vao);
+    gl.BindBuffer(E_ARRAY_BUFFER, s.Vbo);
+    gl.BindBuffer(E_ELEMENT_ARRAY_BUFFER, s.Ibo);
+}
+
+void SetVertexOffset(const Functions& gl, size_t offset) {
+    const int stride = (int)sizeof(ImDrawVert);
+    gl.VertexAttribPointer(0, 2, E_FLOAT, 0, stride, (const void*)(offset + offsetof(ImDrawVert, pos)));
+    gl.VertexAttribPointer(1, 2, E_FLOAT, 0, stride, (const void*)(offset + offsetof(ImDrawVert, uv)));
+    gl.VertexAttribPointer(2, 4, E_UNSIGNED_BYTE, 1, stride, (const void*)(offset + offsetof(ImDrawVert, col)));
+}
+
+void CopyDrawLists(ImDrawData* draw_data, unsigned char* vtx_dst, unsigned char* idx_dst) {
+    for (const ImDrawList* draw_list : draw_data->CmdLists) {
+        const size_t vtx_size = (size_t)draw_list->VtxBuffer.Size * sizeof(ImDrawVert);
+        const size_t idx_size = (size_t)draw_list->IdxBuffer.Size * sizeof(ImDrawIdx);
+        memcpy(vtx_dst, draw_list->VtxBuffer.Data, vtx_size);
+        memcpy(idx_dst, draw_list->IdxBuffer.Data, idx_size);
+        vtx_dst += vtx_size;
+        idx_dst += idx_size;
+    }
+}
+
+size_t AlignUp(size_t value) {
+    return (value + ALIGNMENT - 1) & ~(ALIGNMENT - 1);
+}
+
+// Writes the frame's vertices and indices. Returns false if the buffers
+// couldn't be mapped; vtx_offset/idx_offset receive where the data starts.
+bool Upload(Stream& s, ImDrawData* draw_data, size_t* vtx_offset, size_t* idx_offset) {
+    const Functions& gl = s.Gl;
+    const size_t vtx_bytes = (size_t)draw_data->TotalVtxCount * sizeof(ImDrawVert);
+    const size_t idx_bytes = (size_t)draw_data->TotalIdxCount * sizeof(ImDrawIdx);
+
+    if (s.Mode == CIMGUI_STREAM_PERSISTENT) {
+        if ((vtx_bytes > s.VtxBytes || idx_bytes > s.IdxBytes) && !CreateBuffers(s, vtx_bytes, idx_bytes)) {
+            return false;
+        }
+        const int region = s.Frame % STREAM_FRAMES;
+        WaitFence(s, region);
+        *vtx_offset = (size_t)region * s.VtxBytes;
+        *idx_offset = (size_t)region * s.IdxBytes;
+        CopyDrawLists(draw_data, s.VtxMapped + *vtx_offset, s.IdxMapped + *idx_offset);
+        return true;
+    }
+
+    if (vtx_bytes > s.VtxBytes || idx_bytes > s.IdxBytes) {
+        CreateBuffers(s, vtx_bytes, idx_bytes);
+    }
+    // Orphan a buffer when the ring wraps: the driver hands out fresh storage
+    // while the GPU finishes with the old one
+    if (s.VtxHead + vtx_bytes > s.VtxBytes) {
+        gl.BufferData(E_ARRAY_BUFFER, (ptrdiff_t)s.VtxBytes, NULL, E_STREAM_DRAW);
+        s.VtxHead = 0;
+    }
+    if (s.IdxHead + idx_bytes > s.IdxBytes) {
+        gl.BufferData(E_ELEMENT_ARRAY_BUFFER, (ptrdiff_t)s.IdxBytes, NULL, E_STREAM_DRAW);
+        s.IdxHead = 0;
+    }
+    const unsigned int flags = E_MAP_WRITE_BIT | E_MAP_INVALIDATE_RANGE_BIT | E_MAP_UNSYNCHRONIZED_BIT;
+    unsigned char* vtx_dst = (unsigned char*)gl.MapBufferRange(E_ARRAY_BUFFER, (ptrdiff_t)s.VtxHead, (ptrdiff_t)vtx_bytes, flags);
+    unsigned char* idx_dst = (unsigned char*)gl.MapBufferRange(E_ELEMENT_ARRAY_BUFFER, (ptrdiff_t)s.IdxHead, (ptrdiff_t)idx_bytes, flags);
+    if (vtx_dst && idx_dst) {
+        CopyDrawLists(draw_data, vtx_dst, idx_dst);
+    }
+    if (vtx_dst) gl.UnmapBuffer(E_ARRAY_BUFFER);
+    if (idx_dst) gl.UnmapBuffer(E_ELEMENT_ARRAY_BUFFER);
+    if (!vtx_dst || !idx_dst) {
+        return false;
+    }
+    *vtx_offset = s.VtxHead;
+    *idx_offset = s.IdxHead;
+    s.VtxHead = AlignUp(s.VtxHead + vtx_bytes);
+    s.IdxHead = AlignUp(s.IdxHead + idx_bytes);
+    return true;
+}
+
+} // namespace
+
+extern "C" {
+
+int cImGui_ImplOpenGL3_StreamingInit(bool allow_persistent) {
+    cImGui_ImplOpenGL3_StreamingShutdown();
+    return Init(g_Stream, allow_persistent);
+}
+
+void cImGui_ImplOpenGL3_StreamingPreserveState(bool preserve) {
+    g_PreserveState = preserve;
+}
+
+int cImGui_ImplOpenGL3_StreamingMode() {
+    return g_Stream.Initialized ? g_Stream.Mode : -1;
+}
+
+void cImGui_ImplOpenGL3_StreamingShutdown() {
+    if (g_Stream.Initialized && g_Stream.Mode != CIMGUI_STREAM_FALLBACK) {
+        DestroyObjects(g_Stream);
+    }
+    g_Stream = Stream();
+}
+
+void cImGui_ImplOpenGL3_RenderDrawDataStreaming(ImDrawData* draw_data) {
+    Stream& s = g_Stream;
+    if (!s.Initialized) {
+        Init(s, true);
+    }
+    if (s.Mode == CIMGUI_STREAM_FALLBACK) {
+        ImGui_ImplOpenGL3_RenderDrawData(draw_data);
+        return;
+    }
+
+    // Font atlas and user texture uploads are the backend's. They are done
+    // even while minimized, so that creations and destructions ImGui
+    // requested don't wait for the window to come back.
+    if (draw_data->Textures != NULL) {
+        for (ImTextureData* tex : *draw_data->Textures) {
+            if (tex->Status != ImTextureStatus_OK) {
+                ImGui_ImplOpenGL3_UpdateTexture(tex);
+            }
+        }
+    }
+
+    const int fb_width = (int)(draw_data->DisplaySize.x * draw_data->FramebufferScale.x);
+    const int fb_height = (int)(draw_data->DisplaySize.y * draw_data->FramebufferScale.y);
+    if (fb_width <= 0 || fb_height <= 0 || draw_data->TotalVtxCount == 0) {
+        return;
+    }
+
+    // Without state preservation nothing is queried with glGet*: the
+    // caller's state isn't needed, only ImGui's own is set
+    const Functions& gl = s.Gl;
+    const bool preserve = g_PreserveState;
+    StateBackup backup;
+    if (preserve) {
+        BackupState(s, backup);
+    } else {
+        gl.ActiveTexture(E_TEXTURE0);
+    }
+    gl.BindVertexArray(s.Vao);
+    gl.BindBuffer(E_ARRAY_BUFFER, s.Vbo);
+
+    size_t vtx_offset = 0, idx_offset = 0;
+    if (!Upload(s, draw_data, &vtx_offset, &idx_offset)) {
+        if (preserve) {
+            RestoreState(s, backup);
+        }
+        ImGui_ImplOpenGL3_RenderDrawData(draw_data);
+        return;
+    }
+    SetupRenderState(s, draw_data, fb_width, fb_height);
+
+    const ImVec2 clip_off = draw_data->DisplayPos;
+    const ImVec2 clip_scale = draw_data->FramebufferScale;
+    const unsigned int index_type = sizeof(ImDrawIdx) == 2 ? E_UNSIGNED_SHORT : E_UNSIGNED_INT;
+    for (const ImDrawList* draw_list : draw_data->CmdLists) {
+        size_t bound_vtx = SIZE_MAX;
+        for (const ImDrawCmd& cmd : draw_list->CmdBuffer) {
+            if (cmd.UserCallback != NULL) {
+                if (cmd.UserCallback == ImDrawCallback_ResetRenderState) {
+                    SetupRenderState(s, draw_data, fb_width, fb_height);
+                    bound_vtx = SIZE_MAX;
+                } else {
+                    cmd.UserCallback(draw_list, &cmd);
+                }
+                continue;
+            }
+
+            const float clip_min_x = (cmd.ClipRect.x - clip_off.x) * clip_scale.x;
+            const float clip_min_y = (cmd.ClipRect.y - clip_off.y) * clip_scale.y;
+            const float clip_max_x = (cmd.ClipRect.z - clip_off.x) * clip_scale.x;
+            const float clip_max_y = (cmd.ClipRect.w - clip_off.y) * clip_scale.y;
+            if (clip_max_x <= clip_min_x || clip_max_y <= clip_min_y) {
+                continue;
+            }
+
+            // Re-pointing the attributes replaces glDrawElementsBaseVertex
+            const size_t vtx = vtx_offset + (size_t)cmd.VtxOffset * sizeof(ImDrawVert);
+            if (vtx != bound_vtx) {
+                SetVertexOffset(gl, vtx);
+                bound_vtx = vtx;
+            }
+            gl.Scissor((int)clip_min_x, (int)((float)fb_height - clip_max_y), (int)(clip_max_x - clip_min_x), (int)(clip_max_y - clip_min_y));
+            gl.BindTexture(E_TEXTURE_2D, (unsigned int)(intptr_t)cmd.GetTexID());
+            gl.DrawElements(E_TRIANGLES, (int)cmd.ElemCount, index_type,
+                            (const void*)(idx_offset + (size_t)cmd.IdxOffset * sizeof(ImDrawIdx)));
+        }
+        vtx_offset += (size_t)draw_list->VtxBuffer.Size * sizeof(ImDrawVert);
+        idx_offset += (size_t)draw_list->IdxBuffer.Size * sizeof(ImDrawIdx);
+    }
+
+    if (s.Mode == CIMGUI_STREAM_PERSISTENT) {
+        s.Fences[s.Frame % STREAM_FRAMES] = gl.FenceSync(E_SYNC_GPU_COMMANDS_COMPLETE, 0);
+    }
+    s.Frame++;
+    if (preserve) {
+        RestoreState(s, backup);
+    } else {
+        gl.Disable(E_SCISSOR_TEST);
+        gl.BindVertexArray(0);
+        gl.UseProgram(0);
+    }
+}
+
+} // extern "C"
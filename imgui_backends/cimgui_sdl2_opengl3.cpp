@@ -1,4 +1,6 @@
 // C wrapper for SDL2 and OpenGL3 backends
+#define CIMGUI_IMPL_BUILD
+#include "cimgui_sdl2_opengl3.h"
 #include "../cimgui/imgui/imgui.h"
 #include "../cimgui/imgui/backends/imgui_impl_sdl2.h"
 #include "../cimgui/imgui/backends/imgui_impl_opengl3.h"
@@ -48,4 +50,19 @@ void cImGui_ImplOpenGL3_DestroyDeviceObjects() {
     ImGui_ImplOpenGL3_DestroyDeviceObjects();
 }
 
+// Batched per-frame functions
+void cImGui_ImplSDL2OpenGL3_NewFrame(const SDL_Event* events, int count) {
+    for (int i = 0; i < count; i++) {
+        ImGui_ImplSDL2_ProcessEvent(&events[i]);
+    }
+    ImGui_ImplOpenGL3_NewFrame();
+    ImGui_ImplSDL2_NewFrame();
+    ImGui::NewFrame();
+}
+
+void cImGui_ImplSDL2OpenGL3_Render() {
+    ImGui::Render();
+    ImGui_ImplOpenGL3_RenderDrawData(ImGui::GetDrawData());
+}
+
 } // extern "C"
\ No newline at end of file
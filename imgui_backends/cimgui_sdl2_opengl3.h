@@ -3,6 +3,19 @@
 
 #include <stdbool.h>
 
+// Exported from cimgui_complete even when it is built with -fvisibility=hidden
+#if defined(_WIN32) || defined(__CYGWIN__)
+    #ifdef CIMGUI_IMPL_BUILD
+        #define CIMGUI_IMPL_API __declspec(dllexport)
+    #else
+        #define CIMGUI_IMPL_API
+    #endif
+#elif defined(__GNUC__)
+    #define CIMGUI_IMPL_API __attribute__((__visibility__("default")))
+#else
+    #define CIMGUI_IMPL_API
+#endif
+
 #ifdef __cplusplus
 extern "C" {
 #endif
@@ -11,20 +24,128 @@ extern "C" {
 struct SDL_Window;
 union SDL_Event;
 struct ImDrawData;
+struct ImDrawList;
+struct ImDrawCmd;
+struct ImDrawVert;
+struct ImFontAtlas;
 
 // SDL2 Backend Functions
-bool cImGui_ImplSDL2_InitForOpenGL(struct SDL_Window* window, void* sdl_gl_context);
-void cImGui_ImplSDL2_Shutdown();
-void cImGui_ImplSDL2_NewFrame();
-bool cImGui_ImplSDL2_ProcessEvent(const union SDL_Event* event);
+CIMGUI_IMPL_API bool cImGui_ImplSDL2_InitForOpenGL(struct SDL_Window* window, void* sdl_gl_context);
+CIMGUI_IMPL_API void cImGui_ImplSDL2_Shutdown();
+CIMGUI_IMPL_API void cImGui_ImplSDL2_NewFrame();
+CIMGUI_IMPL_API bool cImGui_ImplSDL2_ProcessEvent(const union SDL_Event* event);
 
 // OpenGL3 Backend Functions  
-bool cImGui_ImplOpenGL3_Init(const char* glsl_version);
-void cImGui_ImplOpenGL3_Shutdown();
-void cImGui_ImplOpenGL3_NewFrame();
-void cImGui_ImplOpenGL3_RenderDrawData(struct ImDrawData* draw_data);
-bool cImGui_ImplOpenGL3_CreateDeviceObjects();
-void cImGui_ImplOpenGL3_DestroyDeviceObjects();
+CIMGUI_IMPL_API bool cImGui_ImplOpenGL3_Init(const char* glsl_version);
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_Shutdown();
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_NewFrame();
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_RenderDrawData(struct ImDrawData* draw_data);
+CIMGUI_IMPL_API bool cImGui_ImplOpenGL3_CreateDeviceObjects();
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_DestroyDeviceObjects();
+
+// Batched per-frame functions: one call each at the start and end of a frame
+// instead of one per event and per backend. NewFrame feeds count events to
+// the SDL2 backend, then starts the OpenGL3, SDL2 and ImGui frames. Render
+// ends the ImGui frame and draws it with the OpenGL3 backend.
+CIMGUI_IMPL_API void cImGui_ImplSDL2OpenGL3_NewFrame(const union SDL_Event* events, int count);
+CIMGUI_IMPL_API void cImGui_ImplSDL2OpenGL3_Render();
+
+// Streaming render path (cimgui_opengl3_stream.cpp)
+// A drop-in replacement for cImGui_ImplOpenGL3_RenderDrawData that writes
+// all draw lists of a frame into one ring buffer region: persistently mapped
+// with GL 4.4 / ARB_buffer_storage, otherwise one unsynchronized
+// glMapBufferRange per frame. Contexts before GL 3.0 / ES 3.0 use the
+// backend's renderer. Initializes itself on first use (persistent mapping
+// where available); StreamingInit picks the mode explicitly and returns the
+// mode in use. Call StreamingShutdown before cImGui_ImplOpenGL3_Shutdown.
+#define CIMGUI_STREAM_FALLBACK   0
+#define CIMGUI_STREAM_MAPPED     1
+#define CIMGUI_STREAM_PERSISTENT 2
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_RenderDrawDataStreaming(struct ImDrawData* draw_data);
+CIMGUI_IMPL_API int cImGui_ImplOpenGL3_StreamingInit(bool allow_persistent);
+CIMGUI_IMPL_API int cImGui_ImplOpenGL3_StreamingMode();  // -1 before the first frame
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_StreamingShutdown();
+// By default the GL state is queried before and restored after each frame,
+// like the backend does. With preserve = false the caller promises not to
+// rely on its state surviving the call: nothing is queried (glGet* can
+// stall the driver), only ImGui's state is set, and afterwards the scissor
+// test is disabled and no program or vertex array is bound. Everything else
+// is left as ImGui set it: blending on with ImGui's blend function, depth,
+// stencil, face culling and primitive restart off, polygon mode GL_FILL,
+// texture unit 0 active with the last font/image texture bound, no sampler,
+// viewport covering the framebuffer.
+CIMGUI_IMPL_API void cImGui_ImplOpenGL3_StreamingPreserveState(bool preserve);
+
+// Flattened draw data (cimgui_draw_data.cpp)
+// Merges all draw lists of a frame into one vertex array, one 32-bit index
+// array and one command array, for renderers other than the OpenGL3
+// backend. Indices already include each list's and command's vertex
+// offset, so they address Vertices directly, and IdxOffset addresses
+// Indices directly. Textures (draw_data->Textures) are not touched; a
+// renderer that sets ImGuiBackendFlags_RendererHasTextures still has to
+// create and update them.
+typedef struct cImGui_DrawCmd {
+    float ClipRect[4];                   // min x, min y, max x, max y in framebuffer pixels (top-left origin)
+    unsigned long long TextureId;        // ImTextureID to bind
+    unsigned int IdxOffset;              // First index in Indices
+    unsigned int ElemCount;              // Number of indices; 0 for callbacks
+    void* UserCallback;                  // NULL, or the ImDrawCallback to call with SourceList/SourceCmd
+    const struct ImDrawList* SourceList;
+    const struct ImDrawCmd* SourceCmd;
+} cImGui_DrawCmd;
+
+typedef struct cImGui_FlatDrawData {
+    struct ImDrawVert* Vertices;
+    unsigned int* Indices;
+    cImGui_DrawCmd* Commands;
+    int VtxCount, IdxCount, CmdCount;
+    int VtxCapacity, IdxCapacity, CmdCapacity;  // Flatten: room in the caller's arrays
+    float DisplayPos[2];
+    float DisplaySize[2];
+    float FramebufferScale[2];
+    int FramebufferWidth, FramebufferHeight;
+} cImGui_FlatDrawData;
+
+// Writes into the arrays and capacities set in out. The counts and display
+// fields are always filled in; returns false, without writing the arrays,
+// when one of them is too small (pass NULL/0 to query the sizes).
+CIMGUI_IMPL_API bool cImGui_DrawData_Flatten(struct ImDrawData* draw_data, cImGui_FlatDrawData* out);
+// Flattens into internal arrays reused from frame to frame. The result is
+// valid until the next call or cImGui_DrawData_FreeShared.
+CIMGUI_IMPL_API const cImGui_FlatDrawData* cImGui_DrawData_FlattenShared(struct ImDrawData* draw_data);
+CIMGUI_IMPL_API void cImGui_DrawData_FreeShared();
+
+// Non-variadic text functions (cimgui_text.cpp)
+// Counterparts of igText, igTextColored, ... that take already formatted
+// text and its length in bytes (-1: NUL-terminated) instead of a printf
+// format and varargs, for FFI callers. col is an ImU32 (IM_COL32).
+CIMGUI_IMPL_API void cImGui_Text(const char* text, int len);
+CIMGUI_IMPL_API void cImGui_TextColored(unsigned int col, const char* text, int len);
+CIMGUI_IMPL_API void cImGui_TextDisabled(const char* text, int len);
+CIMGUI_IMPL_API void cImGui_TextWrapped(const char* text, int len);
+CIMGUI_IMPL_API void cImGui_LabelText(const char* label, const char* text, int len);
+CIMGUI_IMPL_API void cImGui_BulletText(const char* text, int len);
+CIMGUI_IMPL_API bool cImGui_TreeNode(const char* str_id, const char* text, int len);
+CIMGUI_IMPL_API bool cImGui_TreeNodeEx(const char* str_id, int flags, const char* text, int len);
+CIMGUI_IMPL_API void cImGui_SetTooltip(const char* text, int len);
+CIMGUI_IMPL_API void cImGui_SetItemTooltip(const char* text, int len);
+CIMGUI_IMPL_API void cImGui_LogText(const char* text, int len);
+// prefix, value, suffix as one text item; prefix and suffix may be NULL
+CIMGUI_IMPL_API void cImGui_TextInt(const char* prefix, long long value, const char* suffix);
+CIMGUI_IMPL_API void cImGui_TextFloat(const char* prefix, double value, int decimals, const char* suffix);
+CIMGUI_IMPL_API void cImGui_LabelTextInt(const char* label, long long value);
+CIMGUI_IMPL_API void cImGui_LabelTextFloat(const char* label, double value, int decimals);
+
+// Font atlas cache (cimgui_font_cache.cpp, only built with --freetype;
+// needs Dear ImGui 1.92 or later)
+// Load after adding fonts and initializing the renderer backend, before the
+// first frame; save before shutdown to keep the glyphs rasterized so far.
+// A cache built with different fonts, font settings, ImGui version or font
+// loader is rejected (LoadCache returns false) and glyphs are rasterized
+// as usual.
+CIMGUI_IMPL_API bool cImGui_FontAtlas_LoadCache(struct ImFontAtlas* atlas, const char* path);
+CIMGUI_IMPL_API bool cImGui_FontAtlas_SaveCache(struct ImFontAtlas* atlas, const char* path);
+CIMGUI_IMPL_API unsigned long long cImGui_FontAtlas_ConfigHash(struct ImFontAtlas* atlas);
 
 #ifdef __cplusplus
 }
@@ -0,0 +1,93 @@
+// Non-variadic text functions
+//
+// igText, igTextColored, igSetTooltip & co. are variadic, which is awkward
+// from LuaJIT: numbers passed through "..." arrive as doubles (so "%d"
+// prints garbage unless every argument is cast), the format string is
+// parsed on every call, and text containing '%' has to be escaped. These
+// take text that is already formatted, with its length (or -1 for a
+// NUL-terminated string), and numbers with fixed C types.
+//
+// Each forwards "%.*s": ImFormatStringToTempBufferV recognizes that format
+// and uses the string in place, so there is no printf parsing or copy and
+// the behaviour is exactly that of the ImGui function.
+#define CIMGUI_IMPL_BUILD
+#include "cimgui_sdl2_opengl3.h"
+#include "../cimgui/imgui/imgui.h"
+
+#include <string.h>
+
+namespace {
+
+int Length(const char* text, int len) {
+    return len >= 0 ? len : (int)strlen(text);
+}
+
+} // namespace
+
+extern "C" {
+
+void cImGui_Text(const char* text, int len) {
+    ImGui::TextUnformatted(text, text + Length(text, len));
+}
+
+void cImGui_TextColored(unsigned int col, const char* text, int len) {
+    ImGui::PushStyleColor(ImGuiCol_Text, col);
+    ImGui::TextUnformatted(text, text + Length(text, len));
+    ImGui::PopStyleColor();
+}
+
+void cImGui_TextDisabled(const char* text, int len) {
+    ImGui::TextDisabled("%.*s", Length(text, len), text);
+}
+
+void cImGui_TextWrapped(const char* text, int len) {
+    ImGui::TextWrapped("%.*s", Length(text, len), text);
+}
+
+void cImGui_LabelText(const char* label, const char* text, int len) {
+    ImGui::LabelText(label, "%.*s", Length(text, len), text);
+}
+
+void cImGui_BulletText(const char* text, int len) {
+    ImGui::BulletText("%.*s", Length(text, len), text);
+}
+
+bool cImGui_TreeNode(const char* str_id, const char* text, int len) {
+    return ImGui::TreeNode(str_id, "%.*s", Length(text, len), text);
+}
+
+bool cImGui_TreeNodeEx(const char* str_id, int flags, const char* text, int len) {
+    return ImGui::TreeNodeEx(str_id, flags, "%.*s", Length(text, len), text);
+}
+
+void cImGui_SetTooltip(const char* text, int len) {
+    ImGui::SetTooltip("%.*s", Length(text, len), text);
+}
+
+void cImGui_SetItemTooltip(const char* text, int len) {
+    ImGui::SetItemTooltip("%.*s", Length(text, len), text);
+}
+
+void cImGui_LogText(const char* text, int len) {
+    ImGui::LogText("%.*s", Length(text, len), text);
+}
+
+// Numbers are formatted here, so Lua doesn't need string.format (and a new
+// string) per frame. prefix and suffix may be NULL.
+void cImGui_TextInt(const char* prefix, long long value, const char* suffix) {
+    ImGui::Text("%s%lld%s", prefix ? prefix : "", value, suffix ? suffix : "");
+}
+
+void cImGui_TextFloat(const char* prefix, double value, int decimals, const char* suffix) {
+    ImGui::Text("%s%.*f%s", prefix ? prefix : "", decimals, value, suffix ? suffix : "");
+}
+
+void cImGui_LabelTextInt(const char* label, long long value) {
+    ImGui::LabelText(label, "%lld", value);
+}
+
+void cImGui_LabelTextFloat(const char* label, double value, int decimals) {
+    ImGui::LabelText(label, "%.*f", decimals, value);
+}
+
+} // extern "C"
@@ -0,0 +1,389 @@
+-- Allocation-free wrappers for per-frame Dear ImGui calls through cimgui
+--
+--   local imgui = require("imgui")
+--   local ui = imgui.bind(ffi.load(prefix .. "/lib/cimgui_complete.so"))
+--   ui.NewFrame(events, count)            -- batched backend NewFrame, resets the frame arena
+--   if ui.Begin("Settings") then
+--       changed, volume = ui.SliderFloat("Volume", volume, 0, 1)
+--       changed, r, g, b = ui.ColorEdit3("Background", r, g, b)
+--       if ui.Button("Apply", 80, 0) then apply() end
+--       ui.Text(imgui.intern("%d of %d loaded", done, total))
+--   end
+--   ui.End()                              -- names without a wrapper call ig<Name>
+--   ui.Render()
+--
+-- Vectors are passed as numbers and out-parameters as values: the wrappers
+-- fill ImVec2/ImVec4 structs and float/int/bool slots taken from a per-frame
+-- arena of preallocated cdata instead of calling ffi.new, and return what
+-- ImGui wrote back. Once the arena and the intern cache are warm, a frame
+-- built from these functions doesn't allocate on the Lua heap
+-- (bench/imgui_gc.lua).
+local ffi = require("ffi")
+local cdefs = require("cdefs")
+
+local imgui = {}
+
+local format = string.format
+
+-- Slots per cdata type in the frame arena. A slot is reused once this many
+-- more of its type were taken in the same frame.
+local ARENA_SLOTS = 64
+
+-- Formatted strings cached per format string by imgui.intern
+local INTERN_LIMIT = 256
+
+local FLT_MAX = 3.4028234663852886e38
+local FLT_MIN = 1.1754943508222875e-38
+
+-- Ring of preallocated cdata of one type
+local function new_ring(ctype)
+    local ring = {i = 0}
+    for k = 1, ARENA_SLOTS do
+        ring[k] = ffi.new(ctype)
+    end
+    return ring
+end
+
+local function take(ring)
+    local i = ring.i
+    if i == ARENA_SLOTS then
+        i = 0
+    end
+    i = i + 1
+    ring.i = i
+    return ring[i]
+end
+
+local interned = {}
+local interned_count = {}
+local NIL = interned  -- table key standing in for a nil argument
+
+-- Returns string.format(fmt, a, b, c), formatting each distinct set of
+-- arguments only once. Strings stay referenced, so labels rebuilt every
+-- frame neither allocate nor become garbage. Meant for values that repeat
+-- (sizes, counts, states); a format that sees more than INTERN_LIMIT
+-- different values starts over with an empty cache.
+function imgui.intern(fmt, a, b, c)
+    if a ~= a or b ~= b or c ~= c then  -- NaN can't be a table key
+        return format(fmt, a, b, c)
+    end
+    local cache = interned[fmt]
+    if cache == nil or interned_count[fmt] >= INTERN_LIMIT then
+        cache = {}
+        interned[fmt] = cache
+        interned_count[fmt] = 0
+    end
+    local ka, kb, kc = a, b, c
+    if ka == nil then ka = NIL end
+    if kb == nil then kb = NIL end
+    if kc == nil then kc = NIL end
+    local by_a = cache[ka]
+    if by_a == nil then
+        by_a = {}
+        cache[ka] = by_a
+    end
+    local by_b = by_a[kb]
+    if by_b == nil then
+        by_b = {}
+        by_a[kb] = by_b
+    end
+    local s = by_b[kc]
+    if s == nil then
+        s = format(fmt, a, b, c)
+        by_b[kc] = s
+        interned_count[fmt] = interned_count[fmt] + 1
+    end
+    return s
+end
+
+-- Wraps the cimgui namespace C (ffi.load() of cimgui_complete, or a
+-- cdefs.lazy() wrapper of it). Every binding has its own arena.
+function imgui.bind(C)
+    cdefs.need("cimgui", "ImVec2", "ImVec4", "igBegin", "ImDrawList_AddLine", "cImGui_Text")
+
+    local ui = {intern = imgui.intern}
+
+    local vec2s = new_ring("ImVec2")
+    local vec4s = new_ring("ImVec4")
+    local floats = new_ring("float[4]")
+    local ints = new_ring("int[4]")
+    local bools = new_ring("bool[1]")
+    local rings = {vec2s, vec4s, floats, ints, bools}
+
+    -- Growable buffers for InputText and PlotLines, valid during one call
+    local chars, chars_size = nil, 0
+    local values, values_size = nil, 0
+
+    -- Frame arena: slots for raw ig* calls, valid for the rest of the frame
+    -- (see ARENA_SLOTS). Missing arguments are 0 (false for bool).
+
+    function ui.vec2(x, y)
+        local v = take(vec2s)
+        v.x, v.y = x or 0, y or 0
+        return v
+    end
+
+    function ui.vec4(x, y, z, w)
+        local v = take(vec4s)
+        v.x, v.y, v.z, v.w = x or 0, y or 0, z or 0, w or 0
+        return v
+    end
+
+    function ui.float(a, b, c, d)
+        local p = take(floats)
+        p[0], p[1], p[2], p[3] = a or 0, b or 0, c or 0, d or 0
+        return p
+    end
+
+    function ui.int(a, b, c, d)
+        local p = take(ints)
+        p[0], p[1], p[2], p[3] = a or 0, b or 0, c or 0, d or 0
+        return p
+    end
+
+    function ui.bool(value)
+        local p = take(bools)
+        p[0] = value or false
+        return p
+    end
+
+    -- Starts the next frame of the arena; NewFrame calls it
+    function ui.reset()
+        for k = 1, #rings do
+            rings[k].i = 0
+        end
+    end
+
+    local vec2, vec4, float, int, bool = ui.vec2, ui.vec4, ui.float, ui.int, ui.bool
+
+    -- Frame
+
+    function ui.NewFrame(events, count)
+        ui.reset()
+        C.cImGui_ImplSDL2OpenGL3_NewFrame(events, count or 0)
+    end
+
+    function ui.Render()
+        C.cImGui_ImplSDL2OpenGL3_Render()
+    end
+
+    -- Windows
+
+    -- Without open there is no close button and only the visibility is
+    -- returned; with it, also whether the window is still open.
+    function ui.Begin(name, open, flags)
+        if open == nil then
+            return C.igBegin(name, nil, flags or 0)
+        end
+        local p = bool(open)
+        local visible = C.igBegin(name, p, flags or 0)
+        return visible, p[0]
+    end
+
+    function ui.BeginChild(id, w, h, child_flags, window_flags)
+        return C.igBeginChild_Str(id, vec2(w, h), child_flags or 0, window_flags or 0)
+    end
+
+    function ui.SetNextWindowPos(x, y, cond, pivot_x, pivot_y)
+        C.igSetNextWindowPos(vec2(x, y), cond or 0, vec2(pivot_x, pivot_y))
+    end
+
+    function ui.SetNextWindowSize(w, h, cond)
+        C.igSetNextWindowSize(vec2(w, h), cond or 0)
+    end
+
+    function ui.PushStyleColor(idx, r, g, b, a)
+        C.igPushStyleColor_Vec4(idx, vec4(r, g, b, a or 1))
+    end
+
+    -- Queries, returning x, y
+
+    local function vec2_query(name)
+        return function(...)
+            local v = take(vec2s)
+            C[name](v, ...)
+            return v.x, v.y
+        end
+    end
+
+    ui.GetCursorScreenPos = vec2_query("igGetCursorScreenPos")
+    ui.GetContentRegionAvail = vec2_query("igGetContentRegionAvail")
+    ui.GetWindowPos = vec2_query("igGetWindowPos")
+    ui.GetWindowSize = vec2_query("igGetWindowSize")
+    ui.GetMousePos = vec2_query("igGetMousePos")
+
+    function ui.CalcTextSize(text, wrap_width)
+        local v = take(vec2s)
+        C.igCalcTextSize(v, text, nil, false, wrap_width or -1)
+        return v.x, v.y
+    end
+
+    -- Text, without printf formats (cimgui_text.cpp)
+
+    function ui.Text(text)
+        C.cImGui_Text(text, #text)
+    end
+
+    function ui.TextColored(col, text)
+        C.cImGui_TextColored(col, text, #text)
+    end
+
+    function ui.TextDisabled(text)
+        C.cImGui_TextDisabled(text, #text)
+    end
+
+    function ui.TextWrapped(text)
+        C.cImGui_TextWrapped(text, #text)
+    end
+
+    function ui.BulletText(text)
+        C.cImGui_BulletText(text, #text)
+    end
+
+    function ui.LabelText(label, text)
+        C.cImGui_LabelText(label, text, #text)
+    end
+
+    function ui.TextInt(prefix, value, suffix)
+        C.cImGui_TextInt(prefix, value, suffix)
+    end
+
+    function ui.TextFloat(prefix, value, decimals, suffix)
+        C.cImGui_TextFloat(prefix, value, decimals or 3, suffix)
+    end
+
+    -- Widgets: value in, (changed, value) out
+
+    function ui.Button(label, w, h)
+        return C.igButton(label, vec2(w, h))
+    end
+
+    function ui.Selectable(label, selected, flags, w, h)
+        return C.igSelectable_Bool(label, selected or false, flags or 0, vec2(w, h))
+    end
+
+    function ui.Dummy(w, h)
+        C.igDummy(vec2(w, h))
+    end
+
+    function ui.ProgressBar(fraction, w, h, overlay)
+        C.igProgressBar(fraction, vec2(w or -FLT_MIN, h), overlay)
+    end
+
+    function ui.Checkbox(label, value)
+        local p = bool(value)
+        local changed = C.igCheckbox(label, p)
+        return changed, p[0]
+    end
+
+    function ui.SliderFloat(label, value, min, max, fmt, flags)
+        local p = float(value)
+        local changed = C.igSliderFloat(label, p, min, max, fmt or "%.3f", flags or 0)
+        return changed, p[0]
+    end
+
+    function ui.SliderInt(label, value, min, max, fmt, flags)
+        local p = int(value)
+        local changed = C.igSliderInt(label, p, min, max, fmt or "%d", flags or 0)
+        return changed, p[0]
+    end
+
+    function ui.DragFloat(label, value, speed, min, max, fmt, flags)
+        local p = float(value)
+        local changed = C.igDragFloat(label, p, speed or 1, min or 0, max or 0, fmt or "%.3f", flags or 0)
+        return changed, p[0]
+    end
+
+    function ui.DragInt(label, value, speed, min, max, fmt, flags)
+        local p = int(value)
+        local changed = C.igDragInt(label, p, speed or 1, min or 0, max or 0, fmt or "%d", flags or 0)
+        return changed, p[0]
+    end
+
+    function ui.InputInt(label, value, step, step_fast, flags)
+        local p = int(value)
+        local changed = C.igInputInt(label, p, step or 1, step_fast or 100, flags or 0)
+        return changed, p[0]
+    end
+
+    function ui.InputFloat(label, value, step, step_fast, fmt, flags)
+        local p = float(value)
+        local changed = C.igInputFloat(label, p, step or 0, step_fast or 0, fmt or "%.3f", flags or 0)
+        return changed, p[0]
+    end
+
+    function ui.ColorEdit3(label, r, g, b, flags)
+        local p = float(r, g, b)
+        local changed = C.igColorEdit3(label, p, flags or 0)
+        return changed, p[0], p[1], p[2]
+    end
+
+    function ui.ColorEdit4(label, r, g, b, a, flags)
+        local p = float(r, g, b, a)
+        local changed = C.igColorEdit4(label, p, flags or 0)
+        return changed, p[0], p[1], p[2], p[3]
+    end
+
+    -- Edits text of up to capacity - 1 bytes (default 256). A new string is
+    -- only created when the text changed.
+    function ui.InputText(label, text, capacity, flags)
+        capacity = capacity or 256
+        if capacity > chars_size then
+            chars_size = math.max(capacity, 2 * chars_size)
+            chars = ffi.new("char[?]", chars_size)
+        end
+        local len = math.min(#text, capacity - 1)
+        ffi.copy(chars, text, len)
+        chars[len] = 0
+        local changed = C.igInputText(label, chars, capacity, flags or 0, nil, nil)
+        if changed then
+            return true, ffi.string(chars)
+        end
+        return false, text
+    end
+
+    -- data is a Lua array; count defaults to #data, min and max to the
+    -- range of the values.
+    function ui.PlotLines(label, data, count, overlay, min, max, w, h)
+        count = count or #data
+        if count > values_size then
+            values_size = math.max(count, 2 * values_size)
+            values = ffi.new("float[?]", values_size)
+        end
+        for k = 1, count do
+            values[k - 1] = data[k]
+        end
+        C.igPlotLines_FloatPtr(label, values, count, 0, overlay, min or FLT_MAX, max or FLT_MAX,
+                               vec2(w, h), 4)
+    end
+
+    -- Draw lists (igGetWindowDrawList(), ...); col is an ImU32
+
+    function ui.AddLine(draw_list, x1, y1, x2, y2, col, thickness)
+        C.ImDrawList_AddLine(draw_list, vec2(x1, y1), vec2(x2, y2), col, thickness or 1)
+    end
+
+    function ui.AddRectFilled(draw_list, x1, y1, x2, y2, col, rounding, flags)
+        C.ImDrawList_AddRectFilled(draw_list, vec2(x1, y1), vec2(x2, y2), col, rounding or 0, flags or 0)
+    end
+
+    function ui.AddCircleFilled(draw_list, x, y, radius, col, segments)
+        C.ImDrawList_AddCircleFilled(draw_list, vec2(x, y), radius, col, segments or 0)
+    end
+
+    function ui.AddText(draw_list, x, y, col, text)
+        C.ImDrawList_AddText_Vec2(draw_list, vec2(x, y), col, text, nil)
+    end
+
+    -- Everything else: ui.End() is C.igEnd(), ui.SameLine(0, -1) is
+    -- C.igSameLine(0, -1), cached on first use
+    return setmetatable(ui, {
+        __index = function(self, name)
+            local f = C["ig" .. name]
+            rawset(self, name, f)
+            return f
+        end,
+    })
+end
+
+return imgui
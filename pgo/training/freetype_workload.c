@@ -0,0 +1,107 @@
+// FreeType PGO training workload
+//
+// Loads, hints and rasterizes glyphs the way font atlas builders do: every
+// printable Latin-1 character of each font at UI and title sizes, with the
+// default, light and monochrome hinting targets plus unhinted outlines, and
+// kerning lookups between glyph pairs.
+//
+// Usage: freetype_workload [-n iterations] <font>...
+#include <ft2build.h>
+#include FT_FREETYPE_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+static const int pixel_sizes[] = { 11, 13, 16, 20, 24, 32, 48, 64 };
+#define NUM_SIZES (int)(sizeof(pixel_sizes) / sizeof(pixel_sizes[0]))
+
+typedef struct {
+    FT_Int32 load_flags;
+    FT_Render_Mode render_mode;
+} RenderVariant;
+
+static const RenderVariant variants[] = {
+    { FT_LOAD_DEFAULT, FT_RENDER_MODE_NORMAL },
+    { FT_LOAD_TARGET_LIGHT, FT_RENDER_MODE_LIGHT },
+    { FT_LOAD_TARGET_MONO, FT_RENDER_MODE_MONO },
+    { FT_LOAD_NO_HINTING, FT_RENDER_MODE_NORMAL },
+};
+#define NUM_VARIANTS (int)(sizeof(variants) / sizeof(variants[0]))
+
+// Printable ASCII followed by the Latin-1 supplement
+static int next_charcode(int c) {
+    if (c < 32) {
+        return 32;
+    }
+    if (c == 126) {
+        return 160;
+    }
+    return c + 1;
+}
+
+static long render_face(FT_Face face) {
+    long rendered = 0;
+    for (int s = 0; s < NUM_SIZES; s++) {
+        if (FT_Set_Pixel_Sizes(face, 0, (FT_UInt)pixel_sizes[s]) != 0) {
+            continue;
+        }
+        for (int v = 0; v < NUM_VARIANTS; v++) {
+            FT_UInt previous = 0;
+            for (int c = 32; c <= 255; c = next_charcode(c)) {
+                FT_UInt glyph = FT_Get_Char_Index(face, (FT_ULong)c);
+                if (glyph == 0) {
+                    continue;
+                }
+                if (FT_Load_Glyph(face, glyph, variants[v].load_flags) != 0) {
+                    continue;
+                }
+                if (FT_Render_Glyph(face->glyph, variants[v].render_mode) == 0) {
+                    rendered++;
+                }
+                if (previous && FT_HAS_KERNING(face)) {
+                    FT_Vector delta;
+                    FT_Get_Kerning(face, previous, glyph, FT_KERNING_DEFAULT, &delta);
+                }
+                previous = glyph;
+            }
+        }
+    }
+    return rendered;
+}
+
+int main(int argc, char** argv) {
+    int iterations = 3;
+    int first_font = 1;
+    if (argc > 2 && strcmp(argv[1], "-n") == 0) {
+        iterations = atoi(argv[2]);
+        first_font = 3;
+    }
+    if (first_font >= argc) {
+        fprintf(stderr, "usage: %s [-n iterations] <font>...\n", argv[0]);
+        return 2;
+    }
+
+    FT_Library library;
+    if (FT_Init_FreeType(&library) != 0) {
+        fprintf(stderr, "FT_Init_FreeType failed\n");
+        return 1;
+    }
+
+    long rendered = 0;
+    for (int i = 0; i < iterations; i++) {
+        for (int f = first_font; f < argc; f++) {
+            FT_Face face;
+            if (FT_New_Face(library, argv[f], 0, &face) != 0) {
+                fprintf(stderr, "warning: could not open %s\n", argv[f]);
+                continue;
+            }
+            rendered += render_face(face);
+            FT_Done_Face(face);
+        }
+    }
+
+    FT_Done_FreeType(library);
+    printf("freetype_workload: %ld glyphs rendered\n", rendered);
+    return rendered > 0 ? 0 : 1;
+}
@@ -0,0 +1,184 @@
+// Dear ImGui PGO training workload
+//
+// Runs headless frames (null renderer, fixed display size) over a scene
+// with many widgets: the demo window, tables, tree nodes, text input,
+// sliders, plots and custom draw-list shapes, with scripted mouse and
+// keyboard input so hover, click and text editing paths are exercised.
+//
+// Usage: imgui_workload [frames]
+#define CIMGUI_DEFINE_ENUMS_AND_STRUCTS
+#include "cimgui.h"
+
+#include <math.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+// Null renderer: acknowledge texture requests so the font atlas stays resident
+static void update_textures(void) {
+    ImGuiPlatformIO* platform_io = igGetPlatformIO_Nil();
+    for (int i = 0; i < platform_io->Textures.Size; i++) {
+        ImTextureData* tex = platform_io->Textures.Data[i];
+        if (tex->Status == ImTextureStatus_WantCreate) {
+            ImTextureData_SetTexID(tex, (ImTextureID)(intptr_t)(i + 1));
+            ImTextureData_SetStatus(tex, ImTextureStatus_OK);
+        } else if (tex->Status == ImTextureStatus_WantUpdates) {
+            ImTextureData_SetStatus(tex, ImTextureStatus_OK);
+        } else if (tex->Status == ImTextureStatus_WantDestroy) {
+            ImTextureData_SetTexID(tex, (ImTextureID)0);
+            ImTextureData_SetStatus(tex, ImTextureStatus_Destroyed);
+        }
+    }
+}
+
+#define ROWS 128
+
+static float slider_values[ROWS];
+static int drag_values[ROWS];
+static bool checkbox_values[ROWS];
+static float colors[8][4];
+static float plot_values[256];
+static char text_buffer[256] = "Hello";
+static int selected_row = -1;
+
+// Scripted input: sweep the mouse over the workload window, click every
+// few frames and type into the text field
+static void feed_input(ImGuiIO* io, int frame) {
+    float t = (float)frame * 0.05f;
+    ImGuiIO_AddMousePosEvent(io, 900.0f + 300.0f + 280.0f * sinf(t), 40.0f + 480.0f + 460.0f * sinf(t * 0.37f));
+    ImGuiIO_AddMouseButtonEvent(io, 0, frame % 20 < 2);
+    if (frame % 50 == 0) {
+        ImGuiIO_AddMouseWheelEvent(io, 0.0f, frame % 100 == 0 ? -1.0f : 1.0f);
+    }
+    if (frame % 7 == 0) {
+        ImGuiIO_AddInputCharacter(io, (unsigned int)('a' + frame % 26));
+    }
+}
+
+static void build_table(int frame) {
+    ImGuiTableFlags flags = ImGuiTableFlags_Borders | ImGuiTableFlags_RowBg | ImGuiTableFlags_Resizable |
+                            ImGuiTableFlags_Sortable | ImGuiTableFlags_ScrollY;
+    if (igBeginTable("rows", 4, flags, (ImVec2){0, 400}, 0.0f)) {
+        igTableSetupColumn("Name", 0, 0.0f, 0);
+        igTableSetupColumn("Value", 0, 0.0f, 0);
+        igTableSetupColumn("Enabled", 0, 0.0f, 0);
+        igTableSetupColumn("Progress", 0, 0.0f, 0);
+        igTableHeadersRow();
+        for (int i = 0; i < ROWS; i++) {
+            igPushID_Int(i);
+            igTableNextRow(0, 0.0f);
+            igTableSetColumnIndex(0);
+            char label[32];
+            snprintf(label, sizeof(label), "Entity %d", i);
+            if (igSelectable_Bool(label, selected_row == i, ImGuiSelectableFlags_SpanAllColumns, (ImVec2){0, 0})) {
+                selected_row = i;
+            }
+            igTableSetColumnIndex(1);
+            igSetNextItemWidth(-1.0f);
+            igDragInt("##drag", &drag_values[i], 1.0f, 0, 1000, "%d", 0);
+            igTableSetColumnIndex(2);
+            igCheckbox("##check", &checkbox_values[i]);
+            igTableSetColumnIndex(3);
+            igProgressBar(fmodf((float)(frame + i) * 0.01f, 1.0f), (ImVec2){-1.0f, 0}, NULL);
+            igPopID();
+        }
+        igEndTable();
+    }
+}
+
+static void build_tree(int depth, int index) {
+    char label[32];
+    snprintf(label, sizeof(label), "Node %d.%d", depth, index);
+    if (igTreeNode_Str(label)) {
+        igText("Depth %d, index %d", depth, index);
+        if (depth < 4) {
+            for (int i = 0; i < 3; i++) {
+                build_tree(depth + 1, i);
+            }
+        }
+        igTreePop();
+    }
+}
+
+static void build_canvas(int frame) {
+    ImDrawList* draw_list = igGetWindowDrawList();
+    ImVec2 origin;
+    igGetCursorScreenPos(&origin);
+    for (int i = 0; i < 64; i++) {
+        float x = origin.x + (float)(i % 16) * 32.0f + 16.0f;
+        float y = origin.y + (float)(i / 16) * 32.0f + 16.0f;
+        ImU32 color = 0xff000000u | (ImU32)(i * 4) << 16 | (ImU32)(frame % 256) << 8 | 0x80u;
+        ImDrawList_AddCircleFilled(draw_list, (ImVec2){x, y}, 10.0f + (float)(i % 4), color, 0);
+        ImDrawList_AddRectFilled(draw_list, (ImVec2){x - 4, y - 4}, (ImVec2){x + 4, y + 4}, 0xffffffffu, 2.0f, 0);
+        ImDrawList_AddLine(draw_list, (ImVec2){x, y}, (ImVec2){x + 16.0f, y + 16.0f}, color, 1.5f);
+    }
+    igDummy((ImVec2){512, 128});
+}
+
+static void build_scene(int frame) {
+    igShowDemoWindow(NULL);
+
+    for (int i = 0; i < 256; i++) {
+        plot_values[i] = sinf((float)(i + frame) * 0.1f);
+    }
+
+    igSetNextWindowPos((ImVec2){900, 40}, ImGuiCond_Once, (ImVec2){0, 0});
+    igSetNextWindowSize((ImVec2){600, 960}, ImGuiCond_Once);
+    if (igBegin("Workload", NULL, 0)) {
+        igInputText("Text", text_buffer, sizeof(text_buffer), 0, NULL, NULL);
+        for (int i = 0; i < 8; i++) {
+            igPushID_Int(i);
+            igColorEdit4("Color", colors[i], 0);
+            igPopID();
+        }
+        igPlotLines_FloatPtr("Signal", plot_values, 256, 0, NULL, -1.0f, 1.0f, (ImVec2){0, 80}, sizeof(float));
+        igPlotHistogram_FloatPtr("Histogram", plot_values, 64, 0, NULL, -1.0f, 1.0f, (ImVec2){0, 80}, sizeof(float));
+
+        if (igCollapsingHeader_TreeNodeFlags("Table", ImGuiTreeNodeFlags_DefaultOpen)) {
+            build_table(frame);
+        }
+        if (igCollapsingHeader_TreeNodeFlags("Tree", ImGuiTreeNodeFlags_DefaultOpen)) {
+            igSetNextItemOpen(true, ImGuiCond_Once);
+            build_tree(0, 0);
+        }
+        if (igCollapsingHeader_TreeNodeFlags("Sliders", ImGuiTreeNodeFlags_DefaultOpen)) {
+            for (int i = 0; i < ROWS; i++) {
+                igPushID_Int(i);
+                igSliderFloat("##slider", &slider_values[i], 0.0f, 1.0f, "%.3f", 0);
+                if (igIsItemHovered(0)) {
+                    igSetTooltip("Slider %d: %.3f", i, slider_values[i]);
+                }
+                igPopID();
+            }
+        }
+        if (igCollapsingHeader_TreeNodeFlags("Canvas", ImGuiTreeNodeFlags_DefaultOpen)) {
+            build_canvas(frame);
+        }
+    }
+    igEnd();
+}
+
+int main(int argc, char** argv) {
+    int frames = argc > 1 ? atoi(argv[1]) : 2000;
+
+    igCreateContext(NULL);
+    ImGuiIO* io = igGetIO_Nil();
+    io->DisplaySize = (ImVec2){1920, 1080};
+    io->DeltaTime = 1.0f / 60.0f;
+    io->IniFilename = NULL;
+    io->BackendFlags |= ImGuiBackendFlags_RendererHasTextures;
+
+    ImDrawData* draw_data = NULL;
+    for (int frame = 0; frame < frames; frame++) {
+        feed_input(io, frame);
+        igNewFrame();
+        build_scene(frame);
+        igRender();
+        draw_data = igGetDrawData();
+        update_textures();
+    }
+
+    printf("imgui_workload: %d frames, %d vertices in last frame\n", frames, draw_data->TotalVtxCount);
+    igDestroyContext(NULL);
+    return 0;
+}
@@ -0,0 +1,304 @@
+// SDL2 PGO training workload
+//
+// Exercises the software paths games hit every frame without a display or a
+// sound card: surface conversion and blits between common pixel formats,
+// scaled blits, the software renderer, YUV conversion, audio resampling and
+// mixing, and the event queue. Run with SDL_VIDEODRIVER=dummy and
+// SDL_AUDIODRIVER=dummy.
+//
+// Usage: sdl2_workload <SDL2 test dir> [iterations]
+#include <SDL.h>
+
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+#define TARGET_W 1280
+#define TARGET_H 720
+
+static const Uint32 formats[] = {
+    SDL_PIXELFORMAT_ARGB8888,
+    SDL_PIXELFORMAT_ABGR8888,
+    SDL_PIXELFORMAT_RGBA8888,
+    SDL_PIXELFORMAT_RGB888,
+    SDL_PIXELFORMAT_RGB24,
+    SDL_PIXELFORMAT_RGB565,
+};
+#define NUM_FORMATS (int)(sizeof(formats) / sizeof(formats[0]))
+
+static const SDL_BlendMode blend_modes[] = {
+    SDL_BLENDMODE_NONE, SDL_BLENDMODE_BLEND, SDL_BLENDMODE_ADD, SDL_BLENDMODE_MOD,
+};
+#define NUM_BLEND_MODES (int)(sizeof(blend_modes) / sizeof(blend_modes[0]))
+
+// Procedural sprite with an alpha gradient, used when a test image is missing
+static SDL_Surface* make_sprite(int w, int h) {
+    SDL_Surface* surface = SDL_CreateRGBSurfaceWithFormat(0, w, h, 32, SDL_PIXELFORMAT_ARGB8888);
+    for (int y = 0; y < h; y++) {
+        Uint32* row = (Uint32*)((Uint8*)surface->pixels + y * surface->pitch);
+        for (int x = 0; x < w; x++) {
+            Uint8 a = (Uint8)(255 * x / w);
+            row[x] = ((Uint32)a << 24) | ((Uint32)(x ^ y) << 16 & 0xff0000) | ((Uint32)(y * 3) << 8 & 0xff00) | 0x40;
+        }
+    }
+    return surface;
+}
+
+static SDL_Surface* load_image(const char* dir, const char* name, int fallback_size) {
+    char path[1024];
+    SDL_snprintf(path, sizeof(path), "%s/%s", dir, name);
+    SDL_Surface* surface = SDL_LoadBMP(path);
+    if (!surface) {
+        fprintf(stderr, "warning: %s: %s, using a generated sprite\n", path, SDL_GetError());
+        surface = make_sprite(fallback_size, fallback_size);
+    }
+    return surface;
+}
+
+static void blit_workload(SDL_Surface** sprites, int num_sprites, SDL_Surface* target, int iteration) {
+    for (int i = 0; i < num_sprites; i++) {
+        for (int f = 0; f < NUM_FORMATS; f++) {
+            SDL_Surface* converted = SDL_ConvertSurfaceFormat(sprites[i], formats[f], 0);
+            if (!converted) {
+                continue;
+            }
+            for (int b = 0; b < NUM_BLEND_MODES; b++) {
+                SDL_SetSurfaceBlendMode(converted, blend_modes[b]);
+                SDL_SetSurfaceColorMod(converted, 255, (Uint8)(128 + b * 32), (Uint8)(iteration * 7));
+                SDL_SetSurfaceAlphaMod(converted, (Uint8)(255 - f * 20));
+                SDL_Rect dst = { (i * 97 + f * 53 + b * 31) % (TARGET_W - 64), (f * 71 + b * 43) % (TARGET_H - 64), 0, 0 };
+                SDL_BlitSurface(converted, NULL, target, &dst);
+
+                SDL_Rect scaled = { dst.x / 2, dst.y / 2, converted->w * 3 / 2, converted->h * 3 / 2 };
+                SDL_BlitScaled(converted, NULL, target, &scaled);
+            }
+            SDL_FreeSurface(converted);
+        }
+    }
+
+    SDL_Rect rects[64];
+    for (int i = 0; i < 64; i++) {
+        rects[i].x = (i * 37 + iteration) % TARGET_W;
+        rects[i].y = (i * 53) % TARGET_H;
+        rects[i].w = 16 + i;
+        rects[i].h = 8 + i / 2;
+    }
+    SDL_FillRects(target, rects, 64, SDL_MapRGB(target->format, 30, 60, (Uint8)iteration));
+}
+
+static void renderer_workload(SDL_Renderer* renderer, SDL_Texture** textures, int num_textures, int iteration) {
+    SDL_SetRenderDrawColor(renderer, 20, 20, 30, 255);
+    SDL_RenderClear(renderer);
+
+    SDL_FRect rects[128];
+    SDL_FPoint points[128];
+    for (int i = 0; i < 128; i++) {
+        rects[i] = (SDL_FRect){ (float)((i * 41 + iteration) % TARGET_W), (float)((i * 29) % TARGET_H), 24.0f, 12.0f };
+        points[i] = (SDL_FPoint){ (float)(i * 10), (float)(TARGET_H / 2 + 100 * sinf((float)(i + iteration) * 0.1f)) };
+    }
+    SDL_SetRenderDrawBlendMode(renderer, SDL_BLENDMODE_BLEND);
+    SDL_SetRenderDrawColor(renderer, 200, 120, 40, 160);
+    SDL_RenderFillRectsF(renderer, rects, 128);
+    SDL_RenderDrawLinesF(renderer, points, 128);
+
+    for (int i = 0; i < 256; i++) {
+        SDL_Texture* texture = textures[i % num_textures];
+        SDL_FRect dst = { (float)((i * 67) % TARGET_W), (float)((i * 31) % TARGET_H), 48.0f, 48.0f };
+        SDL_SetTextureAlphaMod(texture, (Uint8)(i * 3));
+        SDL_RenderCopyExF(renderer, texture, NULL, &dst, (double)(i * 15 + iteration), NULL, SDL_FLIP_NONE);
+    }
+
+    // Textured quads through the geometry path, as used by ImGui-style UIs
+    SDL_Vertex vertices[4 * 64];
+    int indices[6 * 64];
+    for (int q = 0; q < 64; q++) {
+        float x = (float)(q % 16) * 80.0f, y = (float)(q / 16) * 80.0f;
+        SDL_Color color = { (Uint8)(q * 4), 200, 255, 220 };
+        vertices[q * 4 + 0] = (SDL_Vertex){ { x, y }, color, { 0, 0 } };
+        vertices[q * 4 + 1] = (SDL_Vertex){ { x + 70, y }, color, { 1, 0 } };
+        vertices[q * 4 + 2] = (SDL_Vertex){ { x + 70, y + 70 }, color, { 1, 1 } };
+        vertices[q * 4 + 3] = (SDL_Vertex){ { x, y + 70 }, color, { 0, 1 } };
+        int base = q * 4;
+        int* idx = &indices[q * 6];
+        idx[0] = base; idx[1] = base + 1; idx[2] = base + 2;
+        idx[3] = base; idx[4] = base + 2; idx[5] = base + 3;
+    }
+    SDL_RenderGeometry(renderer, textures[0], vertices, 4 * 64, indices, 6 * 64);
+    SDL_RenderPresent(renderer);
+}
+
+static void yuv_workload(SDL_Surface* source) {
+    SDL_Surface* argb = SDL_ConvertSurfaceFormat(source, SDL_PIXELFORMAT_ARGB8888, 0);
+    int w = argb->w & ~1, h = argb->h & ~1;
+    Uint8* yuv = malloc((size_t)w * h * 2);
+    Uint8* back = malloc((size_t)w * h * 4);
+    const Uint32 yuv_formats[] = { SDL_PIXELFORMAT_YV12, SDL_PIXELFORMAT_NV12, SDL_PIXELFORMAT_YUY2 };
+    for (int i = 0; i < 3; i++) {
+        int yuv_pitch = yuv_formats[i] == SDL_PIXELFORMAT_YUY2 ? w * 2 : w;
+        SDL_ConvertPixels(w, h, SDL_PIXELFORMAT_ARGB8888, argb->pixels, argb->pitch, yuv_formats[i], yuv, yuv_pitch);
+        SDL_ConvertPixels(w, h, yuv_formats[i], yuv, yuv_pitch, SDL_PIXELFORMAT_ARGB8888, back, w * 4);
+    }
+    free(back);
+    free(yuv);
+    SDL_FreeSurface(argb);
+}
+
+typedef struct {
+    SDL_AudioFormat src_format;
+    Uint8 src_channels;
+    int src_rate;
+    SDL_AudioFormat dst_format;
+    Uint8 dst_channels;
+    int dst_rate;
+} AudioConversion;
+
+static const AudioConversion conversions[] = {
+    { AUDIO_S16SYS, 2, 44100, AUDIO_F32SYS, 2, 48000 },
+    { AUDIO_F32SYS, 2, 48000, AUDIO_S16SYS, 2, 44100 },
+    { AUDIO_U8, 1, 22050, AUDIO_S16SYS, 2, 44100 },
+    { AUDIO_S16SYS, 1, 32000, AUDIO_F32SYS, 2, 48000 },
+    { AUDIO_F32SYS, 6, 48000, AUDIO_S16SYS, 2, 48000 },
+};
+#define NUM_CONVERSIONS (int)(sizeof(conversions) / sizeof(conversions[0]))
+
+static void audio_workload(int iteration) {
+    enum { FRAMES = 4096 };
+    static float source[FRAMES * 6];
+    static Uint8 input[FRAMES * 6 * 4];
+    static Uint8 output[FRAMES * 8 * 4 * 2];
+    for (int i = 0; i < FRAMES * 6; i++) {
+        source[i] = 0.5f * sinf((float)(i + iteration * FRAMES) * 0.031f) + 0.1f * sinf((float)i * 0.77f);
+    }
+
+    for (int c = 0; c < NUM_CONVERSIONS; c++) {
+        const AudioConversion* conv = &conversions[c];
+        SDL_AudioStream* stream = SDL_NewAudioStream(conv->src_format, conv->src_channels, conv->src_rate,
+                                                     conv->dst_format, conv->dst_channels, conv->dst_rate);
+        if (!stream) {
+            continue;
+        }
+        // Bring the float test signal into the source format with SDL_AudioCVT
+        SDL_AudioCVT cvt;
+        int samples = FRAMES * conv->src_channels;
+        SDL_memcpy(input, source, (size_t)samples * sizeof(float));
+        SDL_BuildAudioCVT(&cvt, AUDIO_F32SYS, conv->src_channels, conv->src_rate,
+                          conv->src_format, conv->src_channels, conv->src_rate);
+        cvt.buf = input;
+        cvt.len = samples * (int)sizeof(float);
+        if (cvt.needed) {
+            SDL_ConvertAudio(&cvt);
+        }
+        int len = cvt.needed ? cvt.len_cvt : cvt.len;
+
+        SDL_AudioStreamPut(stream, input, len);
+        SDL_AudioStreamFlush(stream);
+        while (SDL_AudioStreamGet(stream, output, sizeof(output)) > 0) {
+        }
+        SDL_FreeAudioStream(stream);
+    }
+
+    // Software mixing of several voices into one buffer
+    SDL_memset(output, 0, FRAMES * 4);
+    for (int voice = 0; voice < 8; voice++) {
+        SDL_MixAudioFormat(output, (const Uint8*)source, AUDIO_F32SYS, FRAMES * 4, 48 + voice * 10);
+    }
+}
+
+static void event_workload(int iteration) {
+    for (int i = 0; i < 256; i++) {
+        SDL_Event event;
+        SDL_zero(event);
+        switch (i % 4) {
+        case 0:
+            event.type = SDL_KEYDOWN;
+            event.key.keysym.scancode = (SDL_Scancode)(SDL_SCANCODE_A + i % 26);
+            event.key.keysym.sym = SDL_GetKeyFromScancode(event.key.keysym.scancode);
+            break;
+        case 1:
+            event.type = SDL_MOUSEMOTION;
+            event.motion.x = (i * 13 + iteration) % TARGET_W;
+            event.motion.y = (i * 7) % TARGET_H;
+            break;
+        case 2:
+            event.type = SDL_MOUSEBUTTONDOWN;
+            event.button.button = SDL_BUTTON_LEFT;
+            break;
+        default:
+            event.type = SDL_USEREVENT;
+            event.user.code = i;
+            break;
+        }
+        SDL_PushEvent(&event);
+    }
+
+    SDL_Event event;
+    SDL_PumpEvents();
+    while (SDL_PollEvent(&event)) {
+    }
+    SDL_GetKeyboardState(NULL);
+    SDL_GetTicks64();
+}
+
+int main(int argc, char** argv) {
+    if (argc < 2) {
+        fprintf(stderr, "usage: %s <SDL2 test dir> [iterations]\n", argv[0]);
+        return 2;
+    }
+    const char* test_dir = argv[1];
+    int iterations = argc > 2 ? atoi(argv[2]) : 200;
+
+    if (SDL_Init(SDL_INIT_VIDEO | SDL_INIT_AUDIO | SDL_INIT_EVENTS) != 0) {
+        fprintf(stderr, "SDL_Init failed: %s\n", SDL_GetError());
+        return 1;
+    }
+
+    SDL_Surface* sprites[] = {
+        load_image(test_dir, "sample.bmp", 128),
+        load_image(test_dir, "icon.bmp", 32),
+        load_image(test_dir, "button.bmp", 64),
+        load_image(test_dir, "shapes/trollface_32alpha.bmp", 96),
+        make_sprite(64, 64),
+    };
+    int num_sprites = (int)(sizeof(sprites) / sizeof(sprites[0]));
+
+    SDL_Window* window = SDL_CreateWindow("sdl2_workload", 0, 0, TARGET_W, TARGET_H, 0);
+    SDL_Surface* target = SDL_CreateRGBSurfaceWithFormat(0, TARGET_W, TARGET_H, 32, SDL_PIXELFORMAT_ARGB8888);
+    SDL_Renderer* renderer = SDL_CreateSoftwareRenderer(target);
+    SDL_Texture* textures[8];
+    for (int i = 0; i < num_sprites; i++) {
+        textures[i] = SDL_CreateTextureFromSurface(renderer, sprites[i]);
+        SDL_SetTextureBlendMode(textures[i], SDL_BLENDMODE_BLEND);
+    }
+    SDL_Surface* yuv_source = load_image(test_dir, "testyuv.bmp", 256);
+
+    for (int i = 0; i < iterations; i++) {
+        blit_workload(sprites, num_sprites, target, i);
+        renderer_workload(renderer, textures, num_sprites, i);
+        audio_workload(i);
+        event_workload(i);
+        if (i % 10 == 0) {
+            yuv_workload(yuv_source);
+        }
+        if (window) {
+            SDL_Surface* window_surface = SDL_GetWindowSurface(window);
+            if (window_surface) {
+                SDL_BlitSurface(target, NULL, window_surface, NULL);
+                SDL_UpdateWindowSurface(window);
+            }
+        }
+    }
+
+    SDL_FreeSurface(yuv_source);
+    for (int i = 0; i < num_sprites; i++) {
+        SDL_DestroyTexture(textures[i]);
+        SDL_FreeSurface(sprites[i]);
+    }
+    SDL_DestroyRenderer(renderer);
+    SDL_FreeSurface(target);
+    if (window) {
+        SDL_DestroyWindow(window);
+    }
+    SDL_Quit();
+    printf("sdl2_workload: %d iterations\n", iterations);
+    return 0;
+}
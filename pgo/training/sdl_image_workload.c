@@ -0,0 +1,157 @@
+// SDL_image PGO training workload
+//
+// Decodes a synthetic corpus from memory: PNG and JPEG files encoded at
+// startup from generated images (smooth gradients, noise, flat UI-style
+// blocks, with and without alpha, several sizes and JPEG qualities), plus
+// the image files passed on the command line (WebP, GIF, TGA, ...). Every
+// decoded surface is converted to ARGB8888, as texture upload does.
+//
+// Usage: sdl_image_workload [-n iterations] [image file]...
+#include <SDL.h>
+#include <SDL_image.h>
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define MAX_BLOBS 128
+
+typedef struct {
+    void* data;
+    size_t size;
+} Blob;
+
+static Blob blobs[MAX_BLOBS];
+static int num_blobs;
+
+static Uint32 lcg_state = 12345;
+
+static Uint32 lcg(void) {
+    lcg_state = lcg_state * 1664525u + 1013904223u;
+    return lcg_state >> 8;
+}
+
+static SDL_Surface* generate_image(int kind, int w, int h, int alpha) {
+    SDL_Surface* surface = SDL_CreateRGBSurfaceWithFormat(0, w, h, 32,
+        alpha ? SDL_PIXELFORMAT_ABGR8888 : SDL_PIXELFORMAT_XBGR8888);
+    for (int y = 0; y < h; y++) {
+        Uint8* row = (Uint8*)surface->pixels + y * surface->pitch;
+        for (int x = 0; x < w; x++) {
+            Uint8* p = row + x * 4;
+            switch (kind) {
+            case 0:  // smooth gradient
+                p[0] = (Uint8)(255 * x / w);
+                p[1] = (Uint8)(255 * y / h);
+                p[2] = (Uint8)(128 + (x - y) / 4);
+                break;
+            case 1:  // noise
+                p[0] = (Uint8)lcg();
+                p[1] = (Uint8)lcg();
+                p[2] = (Uint8)lcg();
+                break;
+            default:  // flat blocks with hard edges, like UI atlases
+                p[0] = (Uint8)(((x / 24) * 53) & 0xff);
+                p[1] = (Uint8)(((y / 16) * 97) & 0xff);
+                p[2] = (Uint8)((((x / 24) ^ (y / 16)) & 1) ? 220 : 40);
+                break;
+            }
+            p[3] = alpha ? (Uint8)(255 * ((x + y) % w) / w) : 255;
+        }
+    }
+    return surface;
+}
+
+static void add_blob(void* data, size_t size) {
+    if (num_blobs < MAX_BLOBS) {
+        blobs[num_blobs].data = data;
+        blobs[num_blobs].size = size;
+        num_blobs++;
+    } else {
+        SDL_free(data);
+    }
+}
+
+// Encode a surface into memory with IMG_SavePNG_RW / IMG_SaveJPG_RW
+static void add_encoded(SDL_Surface* surface, int jpeg_quality) {
+    size_t capacity = (size_t)surface->w * surface->h * 5 + 65536;
+    void* buffer = SDL_malloc(capacity);
+    SDL_RWops* rw = SDL_RWFromMem(buffer, (int)capacity);
+    int result = jpeg_quality > 0 ? IMG_SaveJPG_RW(surface, rw, 0, jpeg_quality) : IMG_SavePNG_RW(surface, rw, 0);
+    Sint64 size = SDL_RWtell(rw);
+    SDL_RWclose(rw);
+    if (result == 0 && size > 0) {
+        add_blob(buffer, (size_t)size);
+    } else {
+        fprintf(stderr, "warning: encode failed: %s\n", IMG_GetError());
+        SDL_free(buffer);
+    }
+}
+
+static void generate_corpus(void) {
+    static const int sizes[][2] = { { 64, 64 }, { 256, 256 }, { 1024, 512 } };
+    for (int s = 0; s < 3; s++) {
+        for (int kind = 0; kind < 3; kind++) {
+            for (int alpha = 0; alpha < 2; alpha++) {
+                SDL_Surface* surface = generate_image(kind, sizes[s][0], sizes[s][1], alpha);
+                add_encoded(surface, 0);
+                if (!alpha) {
+                    add_encoded(surface, 50);
+                    add_encoded(surface, 90);
+                }
+                SDL_FreeSurface(surface);
+            }
+        }
+    }
+}
+
+static void load_file(const char* path) {
+    size_t size;
+    void* data = SDL_LoadFile(path, &size);
+    if (data) {
+        add_blob(data, size);
+    } else {
+        fprintf(stderr, "warning: could not read %s\n", path);
+    }
+}
+
+int main(int argc, char** argv) {
+    int iterations = 20;
+    int first_file = 1;
+    if (argc > 2 && strcmp(argv[1], "-n") == 0) {
+        iterations = atoi(argv[2]);
+        first_file = 3;
+    }
+
+    if (SDL_Init(0) != 0) {
+        fprintf(stderr, "SDL_Init failed: %s\n", SDL_GetError());
+        return 1;
+    }
+    IMG_Init(IMG_INIT_PNG | IMG_INIT_JPG | IMG_INIT_WEBP);
+
+    generate_corpus();
+    for (int i = first_file; i < argc; i++) {
+        load_file(argv[i]);
+    }
+
+    long decoded = 0;
+    for (int i = 0; i < iterations; i++) {
+        for (int b = 0; b < num_blobs; b++) {
+            SDL_Surface* surface = IMG_Load_RW(SDL_RWFromConstMem(blobs[b].data, (int)blobs[b].size), 1);
+            if (!surface) {
+                continue;
+            }
+            SDL_Surface* converted = SDL_ConvertSurfaceFormat(surface, SDL_PIXELFORMAT_ARGB8888, 0);
+            SDL_FreeSurface(converted);
+            SDL_FreeSurface(surface);
+            decoded++;
+        }
+    }
+
+    for (int b = 0; b < num_blobs; b++) {
+        SDL_free(blobs[b].data);
+    }
+    IMG_Quit();
+    SDL_Quit();
+    printf("sdl_image_workload: %d files, %ld decodes\n", num_blobs, decoded);
+    return decoded > 0 ? 0 : 1;
+}
@@ -0,0 +1,195 @@
+// SDL_mixer PGO training workload
+//
+// Decodes a synthetic corpus of WAV files generated in memory (8/16-bit PCM
+// and 32-bit float, mono and stereo, 22-48 kHz) plus any audio files passed
+// on the command line (Ogg Vorbis, MP3, ...), converting each to the device
+// format as Mix_LoadWAV does. Then mixes 32 channels with panning, distance
+// and position effects plus streaming music on the dummy audio device.
+// Run with SDL_AUDIODRIVER=dummy.
+//
+// Usage: sdl_mixer_workload [-n iterations] [-s mix seconds] [audio file]...
+#include <SDL.h>
+#include <SDL_mixer.h>
+
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define MAX_BLOBS 64
+
+typedef struct {
+    Uint8* data;
+    size_t size;
+} Blob;
+
+static Blob blobs[MAX_BLOBS];
+static int num_blobs;
+
+typedef struct {
+    int rate;
+    int channels;
+    int bits;
+    int is_float;
+} WavFormat;
+
+static const WavFormat wav_formats[] = {
+    { 22050, 1, 8, 0 },
+    { 32000, 1, 16, 0 },
+    { 44100, 2, 16, 0 },
+    { 48000, 2, 16, 0 },
+    { 48000, 2, 32, 1 },
+};
+
+static void put_le(Uint8* p, Uint32 value, int bytes) {
+    for (int i = 0; i < bytes; i++) {
+        p[i] = (Uint8)(value >> (8 * i));
+    }
+}
+
+// Two seconds of a sine sweep with some noise, as a RIFF/WAVE file in memory
+static Blob make_wav(const WavFormat* fmt) {
+    int frames = fmt->rate * 2;
+    int sample_bytes = fmt->bits / 8;
+    Uint32 data_size = (Uint32)(frames * fmt->channels * sample_bytes);
+    Blob blob = { SDL_malloc(44 + data_size), 44 + data_size };
+    Uint8* p = blob.data;
+
+    memcpy(p, "RIFF", 4);
+    put_le(p + 4, 36 + data_size, 4);
+    memcpy(p + 8, "WAVEfmt ", 8);
+    put_le(p + 16, 16, 4);
+    put_le(p + 20, fmt->is_float ? 3 : 1, 2);
+    put_le(p + 22, (Uint32)fmt->channels, 2);
+    put_le(p + 24, (Uint32)fmt->rate, 4);
+    put_le(p + 28, (Uint32)(fmt->rate * fmt->channels * sample_bytes), 4);
+    put_le(p + 32, (Uint32)(fmt->channels * sample_bytes), 2);
+    put_le(p + 34, (Uint32)fmt->bits, 2);
+    memcpy(p + 36, "data", 4);
+    put_le(p + 40, data_size, 4);
+
+    Uint8* out = p + 44;
+    Uint32 noise = 1;
+    for (int i = 0; i < frames; i++) {
+        float t = (float)i / (float)fmt->rate;
+        for (int c = 0; c < fmt->channels; c++) {
+            noise = noise * 1664525u + 1013904223u;
+            float v = 0.6f * sinf(6.2831853f * (220.0f + 400.0f * t + 50.0f * (float)c) * t) +
+                      0.05f * ((float)(noise >> 16) / 32768.0f - 1.0f);
+            if (fmt->is_float) {
+                memcpy(out, &v, 4);
+            } else if (fmt->bits == 8) {
+                *out = (Uint8)(128 + (int)(v * 127.0f));
+            } else {
+                put_le(out, (Uint32)(Uint16)(Sint16)(v * 32767.0f), 2);
+            }
+            out += sample_bytes;
+        }
+    }
+    return blob;
+}
+
+static Mix_Chunk* load_chunk(const Blob* blob) {
+    return Mix_LoadWAV_RW(SDL_RWFromConstMem(blob->data, (int)blob->size), 1);
+}
+
+int main(int argc, char** argv) {
+    int iterations = 10;
+    int mix_seconds = 5;
+    int arg = 1;
+    while (arg + 1 < argc && argv[arg][0] == '-') {
+        if (strcmp(argv[arg], "-n") == 0) {
+            iterations = atoi(argv[arg + 1]);
+        } else if (strcmp(argv[arg], "-s") == 0) {
+            mix_seconds = atoi(argv[arg + 1]);
+        }
+        arg += 2;
+    }
+
+    if (SDL_Init(SDL_INIT_AUDIO) != 0) {
+        fprintf(stderr, "SDL_Init failed: %s\n", SDL_GetError());
+        return 1;
+    }
+    Mix_Init(MIX_INIT_OGG | MIX_INIT_MP3);
+    if (Mix_OpenAudio(MIX_DEFAULT_FREQUENCY, MIX_DEFAULT_FORMAT, 2, 1024) != 0) {
+        fprintf(stderr, "Mix_OpenAudio failed: %s\n", Mix_GetError());
+        return 1;
+    }
+
+    for (size_t i = 0; i < sizeof(wav_formats) / sizeof(wav_formats[0]); i++) {
+        blobs[num_blobs++] = make_wav(&wav_formats[i]);
+    }
+    for (; arg < argc && num_blobs < MAX_BLOBS; arg++) {
+        size_t size;
+        void* data = SDL_LoadFile(argv[arg], &size);
+        if (data) {
+            blobs[num_blobs].data = data;
+            blobs[num_blobs].size = size;
+            num_blobs++;
+        } else {
+            fprintf(stderr, "warning: could not read %s\n", argv[arg]);
+        }
+    }
+
+    // Decode and convert every file to the device format
+    long decoded = 0;
+    for (int i = 0; i < iterations; i++) {
+        for (int b = 0; b < num_blobs; b++) {
+            Mix_Chunk* chunk = load_chunk(&blobs[b]);
+            if (chunk) {
+                Mix_FreeChunk(chunk);
+                decoded++;
+            }
+        }
+    }
+
+    // Mix many effect channels and streamed music on the device thread
+    Mix_Chunk* chunks[MAX_BLOBS];
+    int num_chunks = 0;
+    for (int b = 0; b < num_blobs; b++) {
+        Mix_Chunk* chunk = load_chunk(&blobs[b]);
+        if (chunk) {
+            chunks[num_chunks++] = chunk;
+        }
+    }
+    Mix_Music* music = Mix_LoadMUS_RW(SDL_RWFromConstMem(blobs[num_blobs - 1].data, (int)blobs[num_blobs - 1].size), 1);
+    if (music) {
+        Mix_VolumeMusic(MIX_MAX_VOLUME / 2);
+        Mix_PlayMusic(music, -1);
+    }
+
+    Mix_AllocateChannels(32);
+    for (int channel = 0; channel < 32 && num_chunks > 0; channel++) {
+        Mix_Volume(channel, 32 + channel * 3);
+        switch (channel % 3) {
+        case 0:
+            Mix_SetPanning(channel, (Uint8)(channel * 8), (Uint8)(255 - channel * 8));
+            break;
+        case 1:
+            Mix_SetDistance(channel, (Uint8)(channel * 7));
+            break;
+        default:
+            Mix_SetPosition(channel, (Sint16)(channel * 11), (Uint8)(channel * 5));
+            break;
+        }
+        Mix_PlayChannel(channel, chunks[channel % num_chunks], -1);
+    }
+    SDL_Delay((Uint32)mix_seconds * 1000);
+
+    Mix_HaltChannel(-1);
+    Mix_HaltMusic();
+    if (music) {
+        Mix_FreeMusic(music);
+    }
+    for (int c = 0; c < num_chunks; c++) {
+        Mix_FreeChunk(chunks[c]);
+    }
+    for (int b = 0; b < num_blobs; b++) {
+        SDL_free(blobs[b].data);
+    }
+    Mix_CloseAudio();
+    Mix_Quit();
+    SDL_Quit();
+    printf("sdl_mixer_workload: %d files, %ld decodes, %d s mixed\n", num_blobs, decoded, mix_seconds);
+    return decoded > 0 ? 0 : 1;
+}
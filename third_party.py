@@ -0,0 +1,1027 @@
+#!/usr/bin/env python3
+"""
+Recipes and a parallel scheduler for the third-party libraries behind SDL_image and SDL_mixer
+Usage:
+  ./third_party.py list                                  # Print the recipes and their dependencies
+  ./third_party.py build SDL_image SDL_mixer [-j N]      # Build targets and everything they depend on, N jobs in all
+  ./third_party.py build libpng --prefix /tmp/prefix     # Any recipe can be a target
+  ./third_party.py build SDL_image --force               # Ignore the stamps and rebuild everything
+  ./third_party.py fetch [--offline] [--mirror DIR]      # Fill the shared download cache without building
+
+build_sdl_image.py and build_sdl_mixer.py are front-ends for the SDL_image
+and SDL_mixer targets. Every library is described by one entry in RECIPES
+(version, URL, checksum, build system, flags, dependencies); build() starts
+each one as soon as the libraries it depends on are installed, so
+independent chains (zlib -> libpng next to libjpeg-turbo and libwebp) build
+concurrently and the whole graph takes roughly as long as its longest chain.
+Archives come from a download cache shared across checkouts and verified by
+sha256 on every use (see fetch_archive()), so repeated builds don't touch
+the network, and per-library stamps skip the extract, configure and build
+steps that are already current (see build_one()).
+"""
+
+import os
+import sys
+import time
+import re
+import json
+import hashlib
+import functools
+import argparse
+import shutil
+import select
+import subprocess
+import platform
+import threading
+import urllib.request
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+import compiler_cache
+
+SOURCE_DIR = Path(__file__).resolve().parent
+
+# One entry per library. Fields:
+#   version, url      url may refer to {version}
+#   sha256            expected archive digest, required unless unpinned archives are allowed
+#   archive           download file name (default: the last part of url)
+#   source            directory the archive extracts to (default: <name>-<version>)
+#   vendored          source is a directory in this repository instead of a download (no url or sha256)
+#   deps              recipes that must be installed first
+#   system            "cmake" or "configure"
+#   cmake_args, configure_args, env
+#                     build flags; values may refer to {prefix} and to
+#                     {lib_<name>}, the installed path of any recipe's library
+#   libraries         static libraries the recipe installs, as referred to by {lib_<name>}
+#   patches           (file, old, new) replacements applied after extracting
+#   options           dependency -> (cmake_args if it was installed, cmake_args if it was skipped)
+#   optional          skip the library, with a warning, when its build system is missing
+#   simd              assembler: tools to look for, the first found is passed as CMAKE_ASM_NASM_COMPILER;
+#                     require_args: cmake_args making a build without SIMD an error;
+#                     symbols: SIMD functions each installed library must contain.
+#                     A missing assembler or symbol fails the build unless SIMD is allowed to be missing
+#   unix, windows, macos, linux
+#                     platform overrides, applied in that order: lists are
+#                     appended to, dicts updated and other values replaced
+RECIPES = {
+    "zlib": {
+        "version": "1.3.1",
+        "url": "https://github.com/madler/zlib/releases/download/v{version}/zlib-{version}.tar.gz",
+        "sha256": "9a93b2b7dfdac77ceba5a558a580e74667dd6fede4585b91eefb60f03b72df23",
+        "deps": [],
+        "system": "configure",
+        "configure_args": ["--static"],
+        "libraries": {"z": "libz.a"},
+        # Force arm64 architecture on macOS for Apple Silicon
+        "macos": {"env": {"CFLAGS": "-arch arm64", "LDFLAGS": "-arch arm64"}},
+        "windows": {"system": "cmake", "libraries": {"z": "zlibstatic.lib"}},
+    },
+    "libpng": {
+        "version": "1.6.44",
+        "url": "https://download.sourceforge.net/libpng/libpng-{version}.tar.gz",
+        "sha256": "8c25a7792099a0089fa1cc76c94260d0bb3f1ec52b93671b572f8bb61577b732",
+        "deps": ["zlib"],
+        "system": "configure",
+        "configure_args": ["--enable-static", "--disable-shared", "--with-zlib-prefix={prefix}"],
+        "cmake_args": ["-DZLIB_ROOT={prefix}", "-DPNG_SHARED=OFF", "-DPNG_STATIC=ON"],
+        # Our include and library paths come first so libpng uses our zlib;
+        # system search paths that might interfere are cleared
+        "env": {
+            "CFLAGS": "-I{prefix}/include",
+            "CPPFLAGS": "-I{prefix}/include",
+            "LDFLAGS": "-L{prefix}/lib",
+            "PKG_CONFIG_PATH": "{prefix}/lib/pkgconfig",
+            "ZLIB_CFLAGS": "-I{prefix}/include",
+            "ZLIB_LIBS": "-L{prefix}/lib -lz",
+            "C_INCLUDE_PATH": None,
+            "CPLUS_INCLUDE_PATH": None,
+        },
+        "libraries": {"png": "libpng.a"},
+        # fp.h is missing on current macOS, and NEON detection breaks the arm64 build
+        "macos": {
+            "patches": [("pngpriv.h", "#      include <fp.h>", "/* #      include <fp.h> */")],
+            "configure_args": ["--disable-arm-neon"],
+            "env": {
+                "CFLAGS": "-I{prefix}/include -DPNG_ARM_NEON_OPT=0 -arch arm64",
+                "CPPFLAGS": "-I{prefix}/include -DPNG_ARM_NEON_OPT=0 -DPNG_ARM_NEON_IMPLEMENTATION=0",
+                "LDFLAGS": "-L{prefix}/lib -arch arm64",
+                "ZLIB_LIBS": "-L{prefix}/lib -arch arm64 -lz",
+            },
+        },
+        "windows": {"system": "cmake", "libraries": {"png": "libpng16_static.lib"}},
+    },
+    "libjpeg-turbo": {
+        "version": "3.0.4",
+        "url": "https://github.com/libjpeg-turbo/libjpeg-turbo/releases/download/{version}/libjpeg-turbo-{version}.tar.gz",
+        "sha256": "99130559e7d62e8d695f2c0eaeef912c5828d5b84a0537dcb24c9678c9d5b76b",
+        "deps": [],
+        "system": "cmake",
+        "cmake_args": ["-DENABLE_SHARED=OFF", "-DENABLE_STATIC=ON", "-DWITH_SIMD=ON"],
+        "libraries": {"jpeg": "libjpeg.a"},
+        # Without NASM or YASM the x86-64 SIMD code is quietly left out,
+        # which makes decoding several times slower
+        "simd": {
+            "assembler": ["nasm", "yasm"],
+            "require_args": ["-DREQUIRE_SIMD=ON"],
+            "symbols": ["jsimd_idct_islow_sse2", "jsimd_idct_islow_avx2", "jsimd_ycc_rgb_convert_avx2"],
+        },
+        # arm64 SIMD is NEON intrinsics, compiled by the C compiler
+        "macos": {"simd": {"assembler": [], "symbols": ["jsimd_idct_islow_neon", "jsimd_ycc_rgb_convert_neon"]}},
+        "windows": {"libraries": {"jpeg": "jpeg-static.lib"}},
+    },
+    "libwebp": {
+        "version": "1.3.2",
+        # The release tarball, not GitHub's generated archive, whose bytes aren't guaranteed to stay the same
+        "url": "https://storage.googleapis.com/downloads.webmproject.org/releases/webp/libwebp-{version}.tar.gz",
+        "sha256": "2a499607df669e40258e53d0ade8035ba4ec0175244869d1025d460562aa09b4",
+        "deps": [],
+        "system": "cmake",
+        "cmake_args": [
+            "-DBUILD_SHARED_LIBS=OFF",
+            "-DWEBP_BUILD_ANIM_UTILS=OFF",
+            "-DWEBP_BUILD_CWEBP=OFF",
+            "-DWEBP_BUILD_DWEBP=OFF",
+            "-DWEBP_BUILD_GIF2WEBP=OFF",
+            "-DWEBP_BUILD_IMG2WEBP=OFF",
+            "-DWEBP_BUILD_VWEBP=OFF",
+            "-DWEBP_BUILD_WEBPINFO=OFF",
+            "-DWEBP_BUILD_WEBPMUX=OFF",
+            "-DWEBP_BUILD_EXTRAS=OFF",
+        ],
+        "libraries": {"webp": "libwebp.a"},
+        "windows": {"libraries": {"webp": "webp.lib"}},
+    },
+    "libogg": {
+        "version": "1.3.5",
+        "url": "https://downloads.xiph.org/releases/ogg/libogg-{version}.tar.gz",
+        "sha256": "0eb4b4b9420a0f51db142ba3f9c64b333f826532dc0f48c6410ae51f4799b664",
+        "deps": [],
+        "system": "cmake",
+        # -fPIC, as the codecs are linked into the shared SDL_mixer
+        "cmake_args": ["-DBUILD_SHARED_LIBS=OFF", "-DCMAKE_POSITION_INDEPENDENT_CODE=ON"],
+        "libraries": {"ogg": "libogg.a"},
+        "windows": {"libraries": {"ogg": "ogg.lib"}},
+    },
+    "libvorbis": {
+        "version": "1.3.7",
+        "url": "https://downloads.xiph.org/releases/vorbis/libvorbis-{version}.tar.gz",
+        "sha256": "0e982409a9c3fc82ee06e08205b1355e5c6aa4c36bca58146ef399621b0ce5ab",
+        "deps": ["libogg"],
+        "system": "cmake",
+        "cmake_args": ["-DOGG_ROOT={prefix}", "-DBUILD_SHARED_LIBS=OFF", "-DCMAKE_POSITION_INDEPENDENT_CODE=ON"],
+        "libraries": {"vorbis": "libvorbis.a", "vorbisfile": "libvorbisfile.a"},
+        "windows": {"libraries": {"vorbis": "vorbis.lib", "vorbisfile": "vorbisfile.lib"}},
+    },
+    # Not a dependency of SDL_mixer: FLAC is disabled there to simplify builds
+    # and avoid linking issues, but the recipe can still be built on its own
+    "flac": {
+        "version": "1.4.3",
+        "url": "https://downloads.xiph.org/releases/flac/flac-{version}.tar.xz",
+        "sha256": "6c58e69cd22348f441b861092b825e591d0b822e106de6eb0ee4d05d27205b70",
+        "deps": ["libogg"],
+        "system": "cmake",
+        "cmake_args": [
+            "-DOGG_ROOT={prefix}",
+            "-DBUILD_SHARED_LIBS=OFF",
+            "-DBUILD_PROGRAMS=OFF",
+            "-DBUILD_EXAMPLES=OFF",
+            "-DBUILD_TESTING=OFF",
+            "-DBUILD_DOCS=OFF",
+            "-DINSTALL_MANPAGES=OFF",
+            "-DWITH_OGG=ON",
+            "-DCMAKE_POSITION_INDEPENDENT_CODE=ON",
+        ],
+        "env": {"PKG_CONFIG_PATH": "{prefix}/lib/pkgconfig"},
+        "libraries": {"flac": "libFLAC.a"},
+        "windows": {"libraries": {"flac": "FLAC.lib"}},
+    },
+    "mpg123": {
+        "version": "1.32.10",
+        "url": "https://sourceforge.net/projects/mpg123/files/mpg123/{version}/mpg123-{version}.tar.bz2",
+        "sha256": "87b2c17fe0c979d3ef38eeceff6362b35b28ac8589fbf1854b5be75c9ab6557c",
+        "deps": [],
+        "system": "configure",
+        # Only decoding is needed, not audio output
+        "configure_args": ["--enable-static", "--disable-shared", "--with-audio=dummy",
+                           "--enable-int-quality=yes", "--with-pic"],
+        "cmake_args": ["-DBUILD_SHARED_LIBS=OFF"],
+        "libraries": {"mpg123": "libmpg123.a"},
+        "macos": {"configure_args": ["--host=aarch64-apple-darwin"]},
+        # The release tarball has no CMake build; without it there is no MP3 support on Windows
+        "windows": {"system": "cmake", "optional": True, "libraries": {"mpg123": "mpg123.lib"}},
+    },
+    "SDL_image": {
+        "version": "2.8.2",
+        "source": "SDL2_image-{version}",
+        "vendored": True,
+        "deps": ["zlib", "libpng", "libjpeg-turbo", "libwebp"],
+        "system": "cmake",
+        "cmake_args": [
+            "-DCMAKE_PREFIX_PATH={prefix}",
+            "-DSDL2_DIR={prefix}/lib/cmake/SDL2",
+            "-DSDL2IMAGE_SAMPLES=OFF",
+            "-DBUILD_SHARED_LIBS=ON",
+            "-DSDL2IMAGE_DEPS_SHARED=OFF",
+            "-DSDL2IMAGE_VENDORED=OFF",
+            # Decode with the libraries built here, not the stb_image fallback
+            "-DSDL2IMAGE_BACKEND_STB=OFF",
+            "-DSDL2IMAGE_PNG=ON",
+            "-DSDL2IMAGE_PNG_SHARED=OFF",
+            "-DSDL2IMAGE_JPG=ON",
+            "-DSDL2IMAGE_JPG_SHARED=OFF",
+            "-DSDL2IMAGE_WEBP=ON",
+            "-DSDL2IMAGE_WEBP_SHARED=OFF",
+            "-DSDL2IMAGE_TIF=OFF",
+            "-DSDL2IMAGE_AVIF=OFF",
+            "-DSDL2IMAGE_JXL=OFF",
+            "-DZLIB_LIBRARY={lib_z}",
+            "-DZLIB_INCLUDE_DIR={prefix}/include",
+            "-DPNG_LIBRARY={lib_png}",
+            "-DPNG_PNG_INCLUDE_DIR={prefix}/include",
+            "-DJPEG_LIBRARY={lib_jpeg}",
+            "-DJPEG_INCLUDE_DIR={prefix}/include",
+            "-DWEBP_LIBRARY={lib_webp}",
+            "-DWEBP_INCLUDE_DIR={prefix}/include",
+        ],
+        "env": {"CFLAGS": "-I{prefix}/include", "LDFLAGS": "-L{prefix}/lib"},
+        "macos": {"cmake_args": ["-DCMAKE_OSX_DEPLOYMENT_TARGET=11.0", "-DSDL2IMAGE_BACKEND_IMAGEIO=OFF"]},
+    },
+    "SDL_mixer": {
+        "version": "2.8.0",
+        "source": "SDL2_mixer-{version}",
+        "vendored": True,
+        "deps": ["libogg", "libvorbis", "mpg123"],
+        "system": "cmake",
+        "cmake_args": [
+            "-DCMAKE_PREFIX_PATH={prefix}",
+            "-DSDL2_DIR={prefix}/lib/cmake/SDL2",
+            "-DSDL2MIXER_SAMPLES=OFF",
+            "-DSDL2MIXER_INSTALL_TEST=OFF",
+            "-DBUILD_SHARED_LIBS=ON",
+            "-DSDL2MIXER_DEPS_SHARED=OFF",
+            "-DSDL2MIXER_VENDORED=OFF",
+            "-DSDL2MIXER_WAV=ON",
+            "-DSDL2MIXER_OGG=ON",
+            "-DSDL2MIXER_OGG_SHARED=OFF",
+            "-DSDL2MIXER_FLAC=OFF",
+            "-DSDL2MIXER_MOD=OFF",
+            "-DSDL2MIXER_MIDI=OFF",
+            "-DSDL2MIXER_OPUS=OFF",
+            "-DSDL2MIXER_WAVPACK=OFF",
+            "-DOGG_LIBRARY={lib_ogg}",
+            "-DOGG_INCLUDE_DIR={prefix}/include",
+            "-DVORBIS_LIBRARY={lib_vorbis}",
+            "-DVORBISFILE_LIBRARY={lib_vorbisfile}",
+            "-DVORBIS_INCLUDE_DIR={prefix}/include",
+        ],
+        "options": {
+            "mpg123": (["-DSDL2MIXER_MP3=ON",
+                        "-DSDL2MIXER_MP3_MPG123=ON",
+                        "-DSDL2MIXER_MP3_MPG123_SHARED=OFF",
+                        "-DMPG123_LIBRARY={lib_mpg123}",
+                        "-DMPG123_INCLUDE_DIR={prefix}/include"],
+                       ["-DSDL2MIXER_MP3=OFF"]),
+        },
+        "env": {"PKG_CONFIG_PATH": "{prefix}/lib/pkgconfig"},
+        "unix": {"env": {"CFLAGS": "-I{prefix}/include", "LDFLAGS": "-L{prefix}/lib"}},
+        "macos": {"cmake_args": ["-DCMAKE_OSX_DEPLOYMENT_TARGET=11.0"]},
+    },
+}
+
+PLATFORM_KEYS = ["unix", "windows", "macos", "linux"]
+
+# Compiler and linker flags keep whatever the caller exported after ours
+FLAG_VARS = ["CFLAGS", "CXXFLAGS", "CPPFLAGS", "LDFLAGS"]
+
+# Downloaded archives are shared by every checkout and build directory,
+# stored by content as <cache>/sha256/<digest>/<archive>. Set by
+# configure_downloads().
+DOWNLOAD_CACHE = None
+# Base URLs tried, as <mirror>/<archive>, before a recipe's own URL
+MIRRORS = []
+# Only the cache and file:// mirrors are used
+OFFLINE = False
+# Download archives whose recipe has no sha256, trusting the first download
+ALLOW_UNPINNED = False
+
+# Set by build() while it runs, except on Windows (MSBuild has no jobserver)
+JOBSERVER = None
+# Set by build(): warn instead of failing when a recipe's SIMD code can't be built
+ALLOW_NO_SIMD = False
+
+# Serializes output lines from concurrent builds
+_print_lock = threading.Lock()
+_current = threading.local()
+
+class BuildError(Exception):
+    pass
+
+def log(message):
+    """Print message prefixed with the library the calling thread is building"""
+    name = getattr(_current, "name", None)
+    with _print_lock:
+        for line in str(message).splitlines() or [""]:
+            print(f"[{name}] {line}" if name else line, flush=True)
+
+class Jobserver:
+    """GNU make jobserver shared by every make run by build()
+
+    A named pipe holds one token per job. Each library build takes a token
+    for its whole run, which becomes the implicit job of the make it starts
+    (through cmake --build or directly); make reads another token for every
+    job it runs beside that one, so all libraries together never run more
+    than `jobs` jobs. GNU make 4.4+ and Ninja 1.13+ open the fifo by path;
+    older makes get the same pipe as inherited file descriptors.
+    """
+
+    def __init__(self, jobs):
+        self.dir = tempfile.mkdtemp(prefix="third-party-jobserver-")
+        self.path = os.path.join(self.dir, "fifo")
+        os.mkfifo(self.path, 0o600)
+        # Opening read-write doesn't wait for a writer, and keeps the pipe open
+        self.read_fd = os.open(self.path, os.O_RDWR)
+        self.write_fd = os.open(self.path, os.O_WRONLY)
+        os.write(self.write_fd, b"+" * jobs)
+        self.child_fds = ()
+
+        version = make_version()
+        if version is None or version >= (4, 4):
+            auth = f"--jobserver-auth=fifo:{self.path}"
+        else:
+            # Separate descriptors, as make makes its read end non-blocking
+            self.child_fds = (os.open(self.path, os.O_RDONLY), os.open(self.path, os.O_WRONLY))
+            option = "--jobserver-auth" if version >= (4, 2) else "--jobserver-fds"
+            auth = f"{option}={self.child_fds[0]},{self.child_fds[1]}"
+        self.makeflags = f" -j{jobs} {auth}"
+
+    def acquire(self):
+        """Wait for a token"""
+        while True:
+            select.select([self.read_fd], [], [])
+            try:
+                token = os.read(self.read_fd, 1)
+            except (BlockingIOError, InterruptedError):
+                continue  # another thread or a make got it first
+            if token:
+                return token
+
+    def release(self, token):
+        os.write(self.write_fd, token)
+
+    def env(self, env):
+        """env with MAKEFLAGS pointing make at the jobserver"""
+        env = dict(env)
+        env.pop("MFLAGS", None)
+        env["MAKEFLAGS"] = self.makeflags
+        return env
+
+    def close(self):
+        for fd in (self.read_fd, self.write_fd, *self.child_fds):
+            os.close(fd)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+def get_platform():
+    """Detect the current platform"""
+    system = platform.system().lower()
+    if system == "darwin":
+        return "macos"
+    elif system == "windows":
+        return "windows"
+    return "linux"
+
+def get_arch(platform_name):
+    """Architecture directory of the prebuilt tree"""
+    return "arm64" if platform_name == "macos" else "x86_64"
+
+def default_download_cache():
+    """$THIRD_PARTY_CACHE, or rock-headers/downloads in the user's cache directory"""
+    if os.environ.get("THIRD_PARTY_CACHE"):
+        return Path(os.environ["THIRD_PARTY_CACHE"])
+    if os.environ.get("XDG_CACHE_HOME"):
+        base = Path(os.environ["XDG_CACHE_HOME"])
+    elif get_platform() == "windows" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    elif get_platform() == "macos":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path.home() / ".cache"
+    return base / "rock-headers" / "downloads"
+
+def configure_downloads(cache_dir=None, mirrors=(), offline=False, allow_unpinned=False):
+    """Select the download cache, mirrors, offline mode and unpinned archive policy for this process"""
+    global DOWNLOAD_CACHE, MIRRORS, OFFLINE, ALLOW_UNPINNED
+    DOWNLOAD_CACHE = Path(cache_dir or default_download_cache()).expanduser().resolve()
+    # Plain directories are file:// mirrors
+    MIRRORS = [m if "://" in m else Path(m).expanduser().resolve().as_uri() for m in mirrors]
+    OFFLINE = offline
+    ALLOW_UNPINNED = allow_unpinned
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def extract_archive(archive_path, dest_dir):
+    """Extract tar.gz, tar.xz, tar.bz2 or zip archives"""
+    log(f"Extracting {archive_path}...")
+    archive_str = str(archive_path)
+    if archive_str.endswith('.tar.gz'):
+        with tarfile.open(archive_path, 'r:gz') as tar:
+            tar.extractall(dest_dir)
+    elif archive_str.endswith('.tar.xz'):
+        with tarfile.open(archive_path, 'r:xz') as tar:
+            tar.extractall(dest_dir)
+    elif archive_str.endswith('.tar.bz2'):
+        with tarfile.open(archive_path, 'r:bz2') as tar:
+            tar.extractall(dest_dir)
+    elif archive_str.endswith('.zip'):
+        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+            zip_ref.extractall(dest_dir)
+
+def env_flags(var, flags):
+    """Our flags followed by any the caller exported (e.g. PGO flags from build_pgo.py)"""
+    extra = os.environ.get(var, "")
+    return f"{flags} {extra}".strip()
+
+def run_command(cmd, cwd=None, env=None):
+    """Run a command, raising BuildError with its output if it fails"""
+    log(f"Running: {' '.join(cmd)}")
+    pass_fds = JOBSERVER.child_fds if JOBSERVER else ()
+    result = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True, pass_fds=pass_fds)
+    if result.returncode != 0:
+        log(f"Command failed with exit code {result.returncode}")
+        if result.stdout:
+            log(f"STDOUT:\n{result.stdout}")
+        if result.stderr:
+            log(f"STDERR:\n{result.stderr}")
+        raise BuildError(f"{cmd[0]} failed with exit code {result.returncode}")
+    return result
+
+def resolve(name, platform_name):
+    """The recipe for name with the overrides for platform_name applied"""
+    recipe = dict(RECIPES[name])
+    keys = (["unix"] if platform_name != "windows" else []) + [platform_name]
+    for key in PLATFORM_KEYS:
+        recipe.pop(key, None)
+    for key in keys:
+        for field, value in RECIPES[name].get(key, {}).items():
+            if isinstance(value, list):
+                recipe[field] = recipe.get(field, []) + value
+            elif isinstance(value, dict):
+                recipe[field] = {**recipe.get(field, {}), **value}
+            else:
+                recipe[field] = value
+    version = recipe["version"]
+    recipe["source"] = recipe.get("source", f"{name}-{{version}}").format(version=version)
+    if "url" in recipe:
+        recipe["url"] = recipe["url"].format(version=version)
+        recipe["archive"] = recipe.get("archive", recipe["url"].rsplit("/", 1)[-1]).format(version=version)
+    return recipe
+
+def substitutions(install_dir, platform_name):
+    """Values for the {placeholders} in recipe flags"""
+    values = {"prefix": str(install_dir)}
+    for name in RECIPES:
+        for lib, filename in resolve(name, platform_name).get("libraries", {}).items():
+            values[f"lib_{lib}"] = str(install_dir / "lib" / filename)
+    return values
+
+def closure(targets):
+    """targets and everything they depend on, dependencies first"""
+    order = []
+    def visit(name, chain):
+        if name not in RECIPES:
+            raise BuildError(f"Unknown library '{name}' (known: {', '.join(RECIPES)})")
+        if name in chain:
+            raise BuildError(f"Dependency cycle: {' -> '.join(chain + [name])}")
+        if name in order:
+            return
+        for dep in RECIPES[name]["deps"]:
+            visit(dep, chain + [name])
+        order.append(name)
+    for target in targets:
+        visit(target, [])
+    return order
+
+def download(url, staging):
+    """Download url to a new file in staging. Returns (path, sha256)."""
+    log(f"Downloading {url}...")
+    digest = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=staging, suffix=".part")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f, urllib.request.urlopen(url, timeout=60) as response:
+            expected = response.headers.get("Content-Length")
+            for chunk in iter(lambda: response.read(1 << 20), b""):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        if expected is not None and size != int(expected):
+            raise OSError(f"truncated: {size} of {expected} bytes")
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return Path(tmp), digest.hexdigest()
+
+def fetch_archive(recipe):
+    """Path of the recipe's archive in the download cache, downloading it if needed.
+
+    Pinned archives are found by their sha256 and checked on every use; a
+    corrupt cached copy is downloaded again. An archive without a sha256
+    is an error unless unpinned archives are allowed; then it is found by
+    the digest its first download recorded. Downloads go to a temporary
+    file that is renamed into place only once complete and verified, so
+    builds sharing the cache never see partial files.
+    """
+    if DOWNLOAD_CACHE is None:
+        configure_downloads()
+    archive = recipe["archive"]
+    pinned = recipe.get("sha256")
+    if not pinned and not ALLOW_UNPINNED:
+        raise BuildError(f"No sha256 pinned for {archive} in RECIPES; pin one, "
+                         "or pass --allow-unpinned to trust whatever is downloaded first")
+    record = DOWNLOAD_CACHE / "unpinned" / f"{archive}.sha256"
+    expected = pinned or (record.read_text().strip() if record.exists() else None)
+
+    if expected:
+        path = DOWNLOAD_CACHE / "sha256" / expected / archive
+        if path.exists():
+            actual = file_sha256(path)
+            if actual == expected:
+                log(f"Using cached {path}")
+                return path
+            log(f"Warning: cached {archive} has sha256 {actual}, expected {expected}; downloading it again")
+            path.unlink()
+
+    sources = [f"{mirror.rstrip('/')}/{archive}" for mirror in MIRRORS]
+    if OFFLINE:
+        sources = [url for url in sources if url.startswith("file:")]
+    else:
+        sources.append(recipe["url"])
+
+    staging = DOWNLOAD_CACHE / "tmp"
+    staging.mkdir(parents=True, exist_ok=True)
+    errors = []
+    for url in sources:
+        try:
+            tmp, actual = download(url, staging)
+        except (OSError, ValueError) as e:
+            errors.append(f"{url}: {e}")
+            continue
+        if pinned and actual != pinned:
+            tmp.unlink()
+            errors.append(f"{url}: sha256 {actual}, expected {pinned}")
+            continue
+        path = DOWNLOAD_CACHE / "sha256" / actual / archive
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, path)
+        if not pinned:
+            if expected and actual != expected:
+                log(f"Warning: {archive} changed upstream (sha256 was {expected})")
+            record.parent.mkdir(parents=True, exist_ok=True)
+            tmp_record = record.with_suffix(f".{os.getpid()}.{threading.get_ident()}")
+            tmp_record.write_text(actual + "\n")
+            os.replace(tmp_record, record)
+            log(f"Warning: sha256 {actual} is not pinned in RECIPES, nothing was verified")
+        log(f"Cached as {path}")
+        return path
+
+    if OFFLINE:
+        raise BuildError(f"{archive} is not in the download cache ({DOWNLOAD_CACHE}) or a file:// mirror; "
+                         "run './third_party.py fetch' online first" + "".join(f"\n  {e}" for e in errors))
+    raise BuildError(f"Could not download {archive}:" + "".join(f"\n  {e}" for e in errors))
+
+def fetch_source(name, recipe, build_dir):
+    """Download (or copy, if vendored), extract and patch a clean source tree. Returns its path."""
+    src = build_dir / recipe["source"]
+    if src.exists():
+        shutil.rmtree(src)
+
+    if recipe.get("vendored"):
+        vendored = SOURCE_DIR / recipe["source"]
+        log(f"Copying vendored source from {vendored} to {src}")
+        shutil.copytree(vendored, src)
+    else:
+        extract_archive(fetch_archive(recipe), build_dir)
+
+    for filename, old, new in recipe.get("patches", []):
+        path = src / filename
+        if path.exists():
+            path.write_text(path.read_text().replace(old, new))
+            log(f"Patched {filename}")
+    return src
+
+def source_identity(name, recipe):
+    """What the source tree is extracted from: the archive's sha256, or the
+    relative path, size and modification time of every vendored file"""
+    if recipe.get("vendored"):
+        root = SOURCE_DIR / recipe["source"]
+        if not root.exists():
+            raise BuildError(f"Vendored {name} source not found at {root}")
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                st = os.stat(os.path.join(dirpath, filename))
+                entries.append([os.path.relpath(os.path.join(dirpath, filename), root), st.st_size, st.st_mtime_ns])
+        return entries
+    if recipe.get("sha256"):
+        return recipe["sha256"]
+    record = DOWNLOAD_CACHE / "unpinned" / f"{recipe['archive']}.sha256"
+    if ALLOW_UNPINNED and record.exists():
+        return record.read_text().strip()
+    return fetch_archive(recipe).parent.name
+
+@functools.lru_cache(maxsize=None)
+def tool_version(command):
+    """First line of `command --version`, or "" if it can't be run"""
+    try:
+        result = subprocess.run(command.split() + ["--version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return (result.stdout or result.stderr).strip().split("\n")[0]
+
+def make_version():
+    """(major, minor) of GNU make, or None if it isn't installed"""
+    match = re.match(r"GNU Make (\d+)\.(\d+)", tool_version("make"))
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def toolchain(system):
+    """Identity of the compilers and build tool, for the configure stamp"""
+    tools = [os.environ.get("CC", "cc"), os.environ.get("CXX", "c++"), "cmake" if system == "cmake" else "make"]
+    return {tool: [shutil.which(tool.split()[0]), tool_version(tool)] for tool in tools}
+
+def fingerprint(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+def read_stamp(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def write_stamp(path, stamp):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(stamp, indent=2) + "\n")
+    os.replace(tmp, path)
+
+def build_env(recipe, values, base):
+    env = dict(base)
+    for var, value in recipe.get("env", {}).items():
+        if value is None:
+            env.pop(var, None)
+        elif var in FLAG_VARS:
+            env[var] = env_flags(var, value.format_map(values))
+        else:
+            env[var] = value.format_map(values)
+    return env
+
+def configure_command(recipe, values, platform_name, args):
+    if recipe["system"] == "configure":
+        return ["./configure", f"--prefix={values['prefix']}", *args]
+    cmake_args = [
+        "cmake", "..", *compiler_cache.cmake_args(),
+        f"-DCMAKE_INSTALL_PREFIX={values['prefix']}",
+        "-DCMAKE_BUILD_TYPE=Release",
+        "-DCMAKE_POLICY_VERSION_MINIMUM=3.5",  # Allow older CMakeLists.txt
+        *args,
+    ]
+    if platform_name == "windows":
+        cmake_args.extend(["-G", "Visual Studio 17 2022", "-A", "x64"])
+    elif platform_name == "macos":
+        cmake_args.append("-DCMAKE_OSX_ARCHITECTURES=arm64")
+    return cmake_args
+
+def build_commands(recipe):
+    # No -j: make takes its parallelism from the jobserver in MAKEFLAGS, and
+    # an explicit -j (which cmake --build --parallel passes on) would make it
+    # start a jobserver of its own
+    if recipe["system"] == "configure":
+        return [["make"], ["make", "install"]]
+    return [["cmake", "--build", ".", "--config", "Release"], ["cmake", "--install", "."]]
+
+def is_installed(recipe, build_path, values):
+    """Whether the recipe's libraries, and everything its last CMake install listed, are still in the prefix"""
+    files = [values[f"lib_{lib}"] for lib in recipe.get("libraries", {})]
+    manifest = build_path / "install_manifest.txt"
+    if recipe["system"] == "cmake" and manifest.exists():
+        files += manifest.read_text().splitlines()
+    return all(os.path.exists(f) for f in files if f)
+
+def verify_simd(name, recipe, values):
+    """Check that every installed library of the recipe contains its SIMD functions"""
+    for lib in recipe.get("libraries", {}):
+        path = values[f"lib_{lib}"]
+        with open(path, "rb") as f:
+            contents = f.read()
+        missing = [symbol for symbol in recipe["simd"]["symbols"] if symbol.encode() not in contents]
+        if not missing:
+            log(f"SIMD functions present in {os.path.basename(path)}")
+        elif ALLOW_NO_SIMD:
+            log(f"Warning: {os.path.basename(path)} was built without SIMD (missing {', '.join(missing)})")
+        else:
+            raise BuildError(f"{os.path.basename(path)} is missing its SIMD functions: {', '.join(missing)}")
+
+def build_one(name, build_dir, install_dir, platform_name, statuses, force=False):
+    """Bring one recipe up to date in install_dir. Returns "installed", "up to date" or "skipped".
+
+    build_dir/stamps/<name>.json records what each step last ran with, and a
+    step runs again only when that changed (or when force is set):
+      extract    source (archive sha256 or vendored files) and patches
+      configure  flags, environment and toolchain; a change starts from a
+                 clean tree, as make wouldn't rebuild objects for new flags
+      install    install prefix and the dependencies' installs; also rerun
+                 when installed files have gone missing
+    """
+    _current.name = name
+    recipe = resolve(name, platform_name)
+    values = substitutions(install_dir, platform_name)
+    system = recipe["system"]
+    src = build_dir / recipe["source"]
+    build_path = src / "build" if system == "cmake" else src
+    stamp_path = build_dir / "stamps" / f"{name}.json"
+    stamp = {} if force else read_stamp(stamp_path)
+
+    args = [arg.format_map(values) for arg in recipe.get(f"{system}_args", [])]
+    for dep, (with_dep, without_dep) in recipe.get("options", {}).items():
+        if statuses.get(dep) in ("installed", "up to date"):
+            args += [arg.format_map(values) for arg in with_dep]
+        else:
+            args += [arg.format_map(values) for arg in without_dep]
+            log(f"Note: building without {dep}")
+    simd = recipe.get("simd", {})
+    assembler = None
+    if simd:
+        assembler = next(filter(None, map(shutil.which, simd.get("assembler", []))), None)
+        if simd.get("assembler") and not assembler:
+            message = f"{' or '.join(tool.upper() for tool in simd['assembler'])} not found, {name} would build without SIMD"
+            if not ALLOW_NO_SIMD:
+                raise BuildError(f"{message}; install one, or pass --allow-no-simd to build it anyway")
+            log(f"Warning: {message}")
+        if assembler:
+            args.append(f"-DCMAKE_ASM_NASM_COMPILER={assembler}")
+        if not ALLOW_NO_SIMD:
+            args += simd.get("require_args", [])
+    # The launcher is left out: turning the compiler cache on or off doesn't rebuild
+    key_env = build_env(recipe, values, os.environ)
+    env_vars = sorted(set(FLAG_VARS) | set(recipe.get("env", {})) | {"CC", "CXX"})
+
+    extract_key = fingerprint(source_identity(name, recipe), recipe.get("patches", []))
+    configure_key = fingerprint(extract_key, system, args, platform_name,
+                                {var: key_env.get(var) for var in env_vars}, toolchain(system),
+                                tool_version(assembler) if assembler else None)
+    install_key = fingerprint(configure_key, values["prefix"],
+                              {dep: read_stamp(build_dir / "stamps" / f"{dep}.json").get("install")
+                               for dep in recipe["deps"]})
+
+    if stamp.get("install") == install_key and is_installed(recipe, build_path, values):
+        log("Up to date")
+        return "up to date"
+
+    if stamp.get("extract") != extract_key or not src.exists() or \
+            (system == "configure" and stamp.get("configure") != configure_key):
+        stamp = {}
+        write_stamp(stamp_path, stamp)
+        fetch_source(name, recipe, build_dir)
+        stamp["extract"] = extract_key
+        write_stamp(stamp_path, stamp)
+
+    marker = "CMakeLists.txt" if system == "cmake" else "configure"
+    if not (src / marker).exists():
+        if recipe.get("optional"):
+            log(f"Warning: {src.name} has no {marker} on {platform_name}, skipping {name}")
+            return "skipped"
+        raise BuildError(f"{src.name} has no {marker}")
+
+    if system == "cmake":
+        env = key_env
+    else:
+        # configure records CC, so make compiles through the cache too
+        env = build_env(recipe, values, compiler_cache.wrap_env(os.environ.copy()))
+    if JOBSERVER:
+        env = JOBSERVER.env(env)
+
+    if stamp.get("configure") != configure_key:
+        stamp.pop("install", None)
+        write_stamp(stamp_path, stamp)
+        if system == "cmake" and build_path.exists():
+            shutil.rmtree(build_path)
+        build_path.mkdir(exist_ok=True)
+        run_command(configure_command(recipe, values, platform_name, args), cwd=build_path, env=env)
+        stamp["configure"] = configure_key
+        write_stamp(stamp_path, stamp)
+
+    for cmd in build_commands(recipe):
+        run_command(cmd, cwd=build_path, env=env)
+    if simd.get("symbols"):
+        verify_simd(name, recipe, values)
+    stamp["install"] = install_key
+    write_stamp(stamp_path, stamp)
+    return "installed"
+
+def tracked_build(name, build_dir, install_dir, platform_name, statuses, force=False):
+    """build_one() holding a jobserver token, inside compiler_cache.tracking,
+    timed from when it got the token. Returns (status, start, end)."""
+    token = JOBSERVER.acquire() if JOBSERVER else None
+    start = time.monotonic()
+    try:
+        with compiler_cache.tracking(name):
+            status = build_one(name, build_dir, install_dir, platform_name, statuses, force)
+    finally:
+        _current.name = None
+        if token:
+            JOBSERVER.release(token)
+    return status, start, time.monotonic()
+
+def critical_path(order, timings):
+    """The chain of dependencies with the longest total build time, and that time"""
+    longest = {}
+    for name in order:
+        start, end = timings[name]
+        deps = [dep for dep in RECIPES[name]["deps"] if dep in longest]
+        best = max(deps, key=lambda dep: longest[dep][0], default=None)
+        chain_time, chain = longest[best] if best else (0.0, [])
+        longest[name] = (chain_time + end - start, chain + [name])
+    return max(longest.values(), key=lambda entry: entry[0], default=(0.0, []))
+
+def build(targets, build_dir, install_dir, platform_name, jobs=None, force=False, allow_no_simd=False):
+    """Build targets and their dependencies into install_dir, running up to jobs compile jobs at a time.
+
+    The jobs are shared through a Jobserver by every library being built.
+    A library starts as soon as everything it depends on is installed, and
+    steps whose stamps are current are skipped unless force is set. After a
+    failure nothing new is started, the libraries already building are
+    finished, and False is returned. Recipes with SIMD code fail without it
+    unless allow_no_simd is set.
+    """
+    order = closure(targets)
+    jobs = max(1, jobs or len(order))
+    install_dir = Path(install_dir).resolve()
+    build_dir.mkdir(parents=True, exist_ok=True)
+    (install_dir / "lib").mkdir(parents=True, exist_ok=True)
+    (install_dir / "include").mkdir(parents=True, exist_ok=True)
+
+    global JOBSERVER, ALLOW_NO_SIMD
+    ALLOW_NO_SIMD = allow_no_simd
+    if platform_name != "windows":
+        JOBSERVER = Jobserver(jobs)
+    print(f"\nBuilding {', '.join(order)} ({jobs} jobs" + (", shared through a jobserver)" if JOBSERVER else ")"))
+    statuses = {}
+    timings = {}
+    waiting = list(order)
+    running = {}
+    failed = []
+    began = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        while waiting or running:
+            if not failed:
+                for name in list(waiting):
+                    if len(running) >= jobs:
+                        break
+                    if all(dep in statuses for dep in RECIPES[name]["deps"]):
+                        waiting.remove(name)
+                        print(f"\n=== Building {name} ===", flush=True)
+                        # statuses of all deps are final before the build starts
+                        future = pool.submit(tracked_build, name, build_dir, install_dir,
+                                             platform_name, dict(statuses), force)
+                        running[future] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    status, start, end = future.result()
+                except (BuildError, OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+                    print(f"\n=== {name} failed: {e} ===", flush=True)
+                    failed.append(name)
+                    continue
+                statuses[name] = status
+                timings[name] = (start - began, end - began)
+                print(f"\n=== {name} {status} in {end - start:.1f}s ===", flush=True)
+    except KeyboardInterrupt:
+        # Don't start queued builds; running ones get the same SIGINT
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    else:
+        pool.shutdown()
+    finally:
+        if JOBSERVER:
+            JOBSERVER.close()
+            JOBSERVER = None
+    wall = time.monotonic() - began
+
+    if failed:
+        print(f"\nFailed: {', '.join(failed)}")
+        if waiting:
+            print(f"Not built: {', '.join(waiting)}")
+        return False
+
+    print(f"\nBuild timeline ({wall:.1f}s wall):")
+    for name in order:
+        start, end = timings[name]
+        print(f"  {name:<16} {start:7.1f}s - {end:7.1f}s  {statuses[name]}")
+    chain_time, chain = critical_path(order, timings)
+    print(f"  Longest chain: {' -> '.join(chain)} ({chain_time:.1f}s)")
+    return True
+
+def add_download_arguments(parser):
+    """Add --download-cache, --mirror, --offline and --allow-unpinned"""
+    parser.add_argument("--download-cache", type=Path, default=None,
+                        help="Shared directory of downloaded archives "
+                             f"(default: $THIRD_PARTY_CACHE or {default_download_cache()})")
+    parser.add_argument("--mirror", action="append", default=os.environ.get("THIRD_PARTY_MIRRORS", "").split(),
+                        help="Base URL or directory tried before the upstream URLs; repeatable "
+                             "(default: $THIRD_PARTY_MIRRORS, space-separated)")
+    parser.add_argument("--offline", action="store_true", default=bool(os.environ.get("THIRD_PARTY_OFFLINE")),
+                        help="Use only the download cache and file:// mirrors (default: $THIRD_PARTY_OFFLINE)")
+    parser.add_argument("--allow-unpinned", action="store_true",
+                        default=bool(os.environ.get("THIRD_PARTY_ALLOW_UNPINNED")),
+                        help="Download archives that have no sha256 in RECIPES, recording the digest of "
+                             "the first download instead of verifying it (default: $THIRD_PARTY_ALLOW_UNPINNED)")
+
+def add_arguments(parser, default_build_dir):
+    """Add --prefix, --build-dir, --jobs, --force, --allow-no-simd, the download options and the compiler cache options"""
+    parser.add_argument("--prefix", type=Path,
+                        help="Install prefix, must already contain SDL2 (default: prebuilt/<platform>/<arch>)")
+    parser.add_argument("--build-dir", type=Path,
+                        help=f"Directory for build trees (default: {default_build_dir})")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Compile jobs across all libraries building at once, shared through "
+                             "a make jobserver (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true",
+                        help="Extract, configure and build every library again, ignoring the stamps")
+    parser.add_argument("--allow-no-simd", action="store_true",
+                        default=bool(os.environ.get("THIRD_PARTY_ALLOW_NO_SIMD")),
+                        help="Build libjpeg-turbo without SIMD when NASM/YASM is missing, instead of failing "
+                             "(default: $THIRD_PARTY_ALLOW_NO_SIMD)")
+    add_download_arguments(parser)
+    compiler_cache.add_arguments(parser)
+
+def directories(args, platform_name, default_build_dir):
+    """(build_dir, install_dir) from the parsed arguments, as absolute paths"""
+    build_dir = args.build_dir.resolve() if args.build_dir else Path.cwd() / default_build_dir
+    if args.prefix:
+        install_dir = args.prefix.resolve()
+    else:
+        install_dir = Path.cwd() / "prebuilt" / platform_name / get_arch(platform_name)
+    return build_dir, install_dir
+
+def list_recipes(platform_name):
+    print(f"{'library':<16} {'version':<10} {'system':<18} deps")
+    for name in RECIPES:
+        recipe = resolve(name, platform_name)
+        system = recipe["system"] + (" (vendored)" if recipe.get("vendored") else "")
+        print(f"{name:<16} {recipe['version']:<10} {system:<18} {', '.join(recipe['deps']) or '-'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the third-party libraries from RECIPES")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Print the recipes for this platform")
+    build_parser = sub.add_parser("build", help="Build libraries and their dependencies")
+    build_parser.add_argument("targets", nargs="+", help="Libraries to build")
+    add_arguments(build_parser, "build/third_party")
+    fetch_parser = sub.add_parser("fetch", help="Download archives into the cache without building")
+    fetch_parser.add_argument("targets", nargs="*", help="Libraries to fetch, with their dependencies (default: all)")
+    add_download_arguments(fetch_parser)
+    args = parser.parse_args()
+
+    platform_name = get_platform()
+    if args.command == "list":
+        list_recipes(platform_name)
+        return
+
+    configure_downloads(args.download_cache, args.mirror, args.offline, args.allow_unpinned)
+    if args.command == "fetch":
+        try:
+            for name in closure(args.targets or list(RECIPES)):
+                recipe = resolve(name, platform_name)
+                if not recipe.get("vendored"):
+                    path = fetch_archive(recipe)
+                    print(f"{name:<16} {path.parent.name}  {path.name}")
+        except BuildError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    compiler_cache.configure(args.compiler_cache, args.compiler_cache_dir)
+    build_dir, install_dir = directories(args, platform_name, "build/third_party")
+    try:
+        ok = build(args.targets, build_dir, install_dir, platform_name, args.jobs, args.force,
+                   args.allow_no_simd)
+    except BuildError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    compiler_cache.print_summary()
+    if not ok:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()